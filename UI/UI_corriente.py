@@ -189,8 +189,8 @@ class Ui_corriente(QtWidgets.QWidget):
             kwargs = self.pageDefinition.kwargs()
             kwargs.update(self.pageConfig.kwargs)
             kwargs["solido"] = self.pageSolids.solido
-        if not self.evaluate.isRunning():
-            self.evaluate.start(self.corriente, kwargs)
+        # A calculation in progress is superseded by the new values
+        self.evaluate.start(self.corriente, kwargs)
 
 
 class Corriente_Dialog(QtWidgets.QDialog, Ui_corriente):
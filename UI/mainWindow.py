@@ -20,7 +20,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 from configparser import ConfigParser
 from functools import partial
-import json
 import os
 import platform
 import subprocess
@@ -33,9 +32,8 @@ from UI import newComponent, flujo, wizard, plots, viewComponents
 from UI.petro import Definicion_Petro
 import plots as charts
 from UI.widgets import createAction, ClickableLabel
-from lib import config
+from lib import config, projectFile
 from lib.config import conf_dir, setMainWindowConfig, IMAGE_PATH, Preferences
-from lib.project import Project
 from lib.EoS import K, H
 import equipment
 from tools import (UI_confComponents, UI_Preferences, UI_confTransport,
@@ -1308,46 +1306,44 @@ class UI_pychemqt(QtWidgets.QMainWindow):
         if not self.filename[indice]:
             self.fileSaveAs()
         else:
-            with open(self.filename[indice], "w") as file:
-                data = {}
-                self.getScene(indice).project.writeToJSON(data)
-
-                PFD = {}
-                win = self.centralwidget.currentWidget().subWindowList()[0]
-                PFD["x"] = win.pos().x()
-                PFD["y"] = win.pos().y()
-                PFD["height"] = win.size().height()
-                PFD["width"] = win.size().width()
-                self.currentScene.writeToJSON(PFD)
-                data["PFD"] = PFD
-
-                other = {}
-                ventanas = self.centralwidget.currentWidget().subWindowList()
-                for ind, win in enumerate(ventanas[1:]):
-                    ventana = {}
-                    ventana["class"] = win.widget().__class__.__name__
-                    ventana["x"] = win.pos().x()
-                    ventana["y"] = win.pos().y()
-                    ventana["height"] = win.size().height()
-                    ventana["width"] = win.size().width()
-
-                    widget = {}
-                    win.widget().writeToJSON(widget)
-                    ventana["window"] = widget
-                    other[ind] = ventana
-
-                    # Add dependences from other windows
-                    if widget["external_dependences"]:
-                        data["external_dependences"].add(
-                            widget["external_dependences"])
-
-                data["other"] = other
-
-                # python set are not serializable so convert to lis s
-                data["external_dependences"] = list(
-                    data["external_dependences"])
-
-                json.dump(data, file, indent=4)
+            data = {}
+            dependences = set()
+
+            PFD = {}
+            win = self.centralwidget.currentWidget().subWindowList()[0]
+            PFD["x"] = win.pos().x()
+            PFD["y"] = win.pos().y()
+            PFD["height"] = win.size().height()
+            PFD["width"] = win.size().width()
+            self.currentScene.writeToJSON(PFD)
+            data["PFD"] = PFD
+
+            other = {}
+            ventanas = self.centralwidget.currentWidget().subWindowList()
+            for ind, win in enumerate(ventanas[1:]):
+                ventana = {}
+                ventana["class"] = win.widget().__class__.__name__
+                ventana["x"] = win.pos().x()
+                ventana["y"] = win.pos().y()
+                ventana["height"] = win.size().height()
+                ventana["width"] = win.size().width()
+
+                widget = {}
+                win.widget().writeToJSON(widget)
+                ventana["window"] = widget
+                other[ind] = ventana
+
+                # Add dependences from other windows
+                if widget["external_dependences"]:
+                    dependences.add(widget["external_dependences"])
+
+            data["other"] = other
+            data["external_dependences"] = dependences
+
+            # The project entities are saved in the binary container, only
+            # the changed ones if the file was already a container
+            projectFile.save(self.filename[indice],
+                             self.getScene(indice).project, data)
 
             self.dirty[self.idTab] = False
             self.updateStatus(
@@ -1417,8 +1413,7 @@ class UI_pychemqt(QtWidgets.QMainWindow):
                 return
 
         if fname:
-            with open(fname, "r") as file:
-                data = json.load(file)
+            data = projectFile.readData(fname)
 
             # Check availability of optional dependences necessary for the file
             if "external_dependences" in data:
@@ -1441,8 +1436,7 @@ class UI_pychemqt(QtWidgets.QMainWindow):
             self.filename.append(fname)
             self.addRecentFile(fname)
 
-            project = Project()
-            project.readFromJSON(data)
+            project = projectFile.load(fname, data)
             self.config.append(project.config)
 
             mdiArea = QtWidgets.QMdiArea()
@@ -27,7 +27,7 @@ from scipy import array, optimize, linspace
 
 from lib.plot import Plot
 from lib.compuestos import (Componente, MuL_Parametric, Pv_Antoine, Pv_Wagner,
-                            Tension_Parametric, Henry, DIPPR)
+                            Tension_Parametric, Henry, DIPPR_array)
 from lib import unidades, sql
 from lib.config import IMAGE_PATH
 from UI.inputTable import InputTableDialog, eqDIPPR
@@ -339,7 +339,7 @@ class DIPPR_widget(QtWidgets.QGroupBox):
         kw = {}
         kw["Tc"] = self.parent.Tc.value
         kw["M"] = self.parent.M.value
-        var = [DIPPR(self.prop, ti, array[:-2], **kw) for ti in t]
+        var = DIPPR_array(self.prop, t, [array[:-2]], **kw)[0]
         dialog = Plot()
         dialog.addData(t, var)
         if self.data:
@@ -377,9 +377,13 @@ class DIPPR_widget(QtWidgets.QGroupBox):
             p = array(dlg.widget.column(1, self.unit))
             eq = dlg.widget.eqDIPPR.value()
 
+            kw = {}
+            kw["Tc"] = self.parent.Tc.value
+            kw["M"] = self.parent.M.value
+
             def errf(parametros, eq, t, f):
                 var = array([eq]+list(parametros))
-                return f-array([DIPPR(self.prop, ti, var) for ti in t])
+                return f-DIPPR_array(self.prop, t, [var], **kw)[0]
 
             # Do the least square fitting
             p0 = [1, 1, 1, 1, 1]
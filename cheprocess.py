@@ -42,9 +42,27 @@ parser.add_argument("--debug", action="store_true",
 parser.add_argument("-n", "--nosplash", action="store_true",
                     help="Don't show the splash screen at start")
 parser.add_argument("--style", help="Set qt style")
+parser.add_argument("--batch", action="store_true",
+                    help="Solve the project files without graphical interface "
+                    "and save its results, the exit code is 0 if all the "
+                    "projects are solved")
+parser.add_argument("-o", "--output",
+                    help="Directory to save the results in batch mode, by "
+                    "default the project file directory")
+parser.add_argument("-j", "--jobs", type=int,
+                    help="Number of parallel worker processes in batch mode, "
+                    "by default the number of cores")
+parser.add_argument("--format", action="append", choices=("json", "csv"),
+                    help="Format of results files in batch mode, it can be "
+                    "repeated, by default json and csv")
+parser.add_argument("--profile", action="store_true",
+                    help="Save a profiling report and a chrome trace of the "
+                    "solution of each project in batch mode")
 parser.add_argument("projectFile", nargs="*",
                     help="Optional CheProcess project files to load at startup")
 args = parser.parse_args()
+if args.batch and not args.projectFile:
+    parser.error("--batch needs the project files to solve")
 
 
 # Add CheProcess folder to python path
@@ -55,6 +73,20 @@ sys.path.append(path)
 os.environ["CheProcess"] = path + os.sep
 conf_dir = os.path.expanduser("~") + os.sep + ".CheProcess" + os.sep
 
+# Batch mode, solve the project files without Qt
+if args.batch:
+    level = "DEBUG" if args.debug else args.loglevel
+    logging.basicConfig(level=getattr(logging, level.upper()),
+                        format="%(levelname)s: %(message)s")
+
+    from lib import batch
+    # The worker processes started with spawn import the main module, so
+    # define the batch module as main to not start the graphical interface
+    sys.modules["__main__"] = batch
+    formats = args.format or ["json", "csv"]
+    sys.exit(batch.runBatch(args.projectFile, args.output, args.jobs,
+                            formats, args.profile))
+
 # Check mandatory external dependences
 # PyQt5
 try:
@@ -32,7 +32,7 @@ from PyQt5 import QtWidgets
 from lib.config import getComponents
 from lib.unidades import Pressure, Volume, Length, Power, Density, Currency
 from tools.costIndex import CostData
-from equipment.parents import UI_equip
+from equipment.UI_parents import UI_equip
 from equipment.distillation import ColumnFUG
 from UI.widgets import Entrada_con_unidades
 
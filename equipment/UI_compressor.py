@@ -29,7 +29,7 @@ from PyQt5 import QtWidgets
 
 from lib.unidades import Pressure, Power, Currency
 from tools.costIndex import CostData
-from equipment.parents import UI_equip
+from equipment.UI_parents import UI_equip
 from equipment.compressor import Compressor
 from UI.widgets import Entrada_con_unidades
 
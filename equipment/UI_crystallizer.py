@@ -28,13 +28,13 @@ from PyQt5 import QtCore, QtWidgets
 
 from equipment.liquid_solid import Crystallizer
 from UI import UI_corriente
-from equipment import parents
+from equipment import UI_parents
 from lib import unidades
 from tools import costIndex
 from UI.widgets import Entrada_con_unidades
 
 
-class UI_equipment(parents.UI_equip):
+class UI_equipment(UI_parents.UI_equip):
     """Diálogo de definición de cristalizadores"""
     def __init__(self, entrada=None, parent=None):
         """entrada: Parametro opcional de clase corriente que indica la corriente de entrada en el equipo"""
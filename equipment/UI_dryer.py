@@ -30,7 +30,7 @@ from PyQt5 import QtWidgets
 
 from equipment.gas_solid_liquid import Dryer
 from lib import unidades
-from equipment.parents import UI_equip
+from equipment.UI_parents import UI_equip
 from UI.widgets import Entrada_con_unidades
 
 
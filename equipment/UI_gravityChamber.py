@@ -30,7 +30,7 @@ from PyQt5 import QtWidgets
 
 from lib.unidades import Length, Speed, VolFlow, DeltaP
 from .gas_solid import GravityChamber
-from equipment.parents import UI_equip
+from equipment.UI_parents import UI_equip
 from UI.widgets import Entrada_con_unidades
 
 
@@ -28,7 +28,7 @@ from PyQt5 import QtCore, QtWidgets
 
 from equipment.solids import Grinder
 from UI import UI_corriente
-from equipment import parents
+from equipment import UI_parents
 from lib import unidades
 from tools import costIndex
 from UI.widgets import Entrada_con_unidades
@@ -117,7 +117,7 @@ BondIndex={   'Mineral de uranio': 17.93,
                         'Diorita': 19.4,
                         'Cuarzo': 12.77}
 
-class UI_equipment(parents.UI_equip):
+class UI_equipment(UI_parents.UI_equip):
     """Diálogo de definición de molinos trituradores de sólidos"""
 
     def __init__(self, entrada=None, parent=None):
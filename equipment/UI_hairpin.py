@@ -32,7 +32,7 @@ from lib.unidades import (Temperature, Pressure, DeltaP, Power, Length, Area,
 from UI.widgets import Entrada_con_unidades
 from equipment.heatExchanger import Hairpin
 from equipment.UI_pipe import Catalogo_Materiales_Dialog
-from equipment.parents import UI_equip
+from equipment.UI_parents import UI_equip
 from equipment.widget import FoulingWidget, Dialog_Finned
 from tools.costIndex import CostData
 
@@ -38,7 +38,7 @@ from lib.pipeDatabase import CATALOG, CATALOG_TRANSLATE, FITTING, FITTING_DESC
 from lib.friction import (K_contraction, K_enlargement, K_flush, K_MitreBend,
                           Ft, K_longBend)
 from tools.costIndex import CostData
-from equipment.parents import UI_equip
+from equipment.UI_parents import UI_equip
 from equipment.pipe import Pipe
 from UI.delegate import SpinEditor, CellEditor
 from UI.widgets import Entrada_con_unidades
@@ -31,7 +31,7 @@ from lib.unidades import Length, DeltaP
 from UI import UI_corriente
 from UI.widgets import Entrada_con_unidades
 from equipment.gas_solid_liquid import Scrubber
-from equipment.parents import UI_equip
+from equipment.UI_parents import UI_equip
 
 
 class UI_equipment(UI_equip):
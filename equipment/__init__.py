@@ -24,57 +24,52 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 #Inicializa importando las interfaces gráficas de los equipos
 
 # flow
-from . import UI_divider
-from . import UI_valve
-from . import UI_mixer
-from . import UI_compressor
-from . import UI_turbine
-from . import UI_pump
-from . import UI_pipe
-
-# Operaciones
-from . import UI_flash
-from . import UI_columnFUG
-from . import UI_heatExchanger
-from . import UI_hairpin
-from . import UI_shellTube
-from . import UI_fireHeater
-
-# solids
-from . import UI_ciclon
-from . import UI_gravityChamber
-from . import UI_baghouse
-from . import UI_electricPrecipitator
-from . import UI_dryer
-from . import UI_scrubber
-
-# Tools
-from . import UI_spreadsheet
-
-# No funcionales
-from . import UI_centrifuge
-from . import UI_crystallizer
-from . import UI_filter
-from . import UI_grinder
-from . import UI_screen
-from . import UI_solidWasher
-from . import UI_vacuum
-from . import UI_tank
-from . import UI_tower
-from . import UI_reactor
-
-
-UI_equipments = [UI_divider, UI_valve, UI_mixer, UI_pump, UI_compressor,
-                 UI_turbine, UI_pipe, UI_flash, UI_columnFUG, UI_heatExchanger,
-                 UI_shellTube, UI_hairpin, UI_fireHeater, UI_ciclon,
-                 UI_gravityChamber, UI_baghouse, UI_electricPrecipitator,
-                 UI_dryer, UI_scrubber, UI_spreadsheet, UI_reactor]
-# UI_tower, UI_reactor, UI_centrifuge, UI_grinder, UI_solidWasher, UI_vacuum, ]
-
-equipments=[ui.UI_equipment.Equipment.__class__ for ui in UI_equipments]
-
-#__all__ = [equip.__name__ for equip in UI_equipments]
-#print(__all__)
+from importlib import import_module
+
+from .flux import Divider, Valve, Mixer
+from .pump import Pump
+from .compressor import Compressor, Turbine
+from .pipe import Pipe
+from .distillation import Flash, ColumnFUG
+from .heatExchanger import Heat_Exchanger, Shell_Tube, Hairpin, Fired_Heater
+from .gas_solid import Ciclon, GravityChamber, Baghouse, ElectricPrecipitator
+from .gas_solid_liquid import Dryer, Scrubber
+from .spreadsheet import Spreadsheet
+from .reactor import Reactor
+
+
+# Calculation classes of equipments, they don't depend of Qt
+equipments = [Divider, Valve, Mixer, Pump, Compressor, Turbine, Pipe, Flash,
+              ColumnFUG, Heat_Exchanger, Shell_Tube, Hairpin, Fired_Heater,
+              Ciclon, GravityChamber, Baghouse, ElectricPrecipitator, Dryer,
+              Scrubber, Spreadsheet, Reactor]
+
+# Graphical modules of equipments, in the same order of equipments
+_UI_equipments = [
+    "UI_divider", "UI_valve", "UI_mixer", "UI_pump", "UI_compressor",
+    "UI_turbine", "UI_pipe", "UI_flash", "UI_columnFUG", "UI_heatExchanger",
+    "UI_shellTube", "UI_hairpin", "UI_fireHeater", "UI_ciclon",
+    "UI_gravityChamber", "UI_baghouse", "UI_electricPrecipitator",
+    "UI_dryer", "UI_scrubber", "UI_spreadsheet", "UI_reactor"]
+_UI_modules = _UI_equipments + [
+    "UI_centrifuge", "UI_crystallizer", "UI_filter", "UI_grinder",
+    "UI_screen", "UI_solidWasher", "UI_vacuum", "UI_tank", "UI_tower"]
+
+__all__ = ["equipments", "UI_equipments"] + _UI_modules
+
+
+def __getattr__(name):
+    """Import the graphical modules on first access, so the equipment
+    calculation can be used without Qt"""
+    if name == "UI_equipments":
+        global UI_equipments
+        UI_equipments = [import_module("equipment." + module)
+                         for module in _UI_equipments]
+        return UI_equipments
+    if name in _UI_modules:
+        return import_module("equipment." + name)
+    raise AttributeError("module 'equipment' has no attribute '%s'" % name)
+
 
 # To get a list of equipment available to add to lib/firstrun.py file:
 # equipos=[equipment.__name__ for equipment in equipments]
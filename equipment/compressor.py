@@ -27,11 +27,11 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 import os
 
-from PyQt5.QtWidgets import QApplication
 from scipy import log, exp
 from scipy.constants import R
 from scipy.optimize import fsolve
 
+from lib.kernel import QApplication
 from lib.unidades import (DeltaT, DeltaP, Temperature, Pressure, MassFlow,
                           Power, Currency, Dimensionless)
 from equipment.parents import equipment
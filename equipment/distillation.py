@@ -30,11 +30,10 @@ import os
 
 from scipy import log, exp, pi, log10, linspace
 from scipy.optimize import fsolve
-from PyQt5.QtWidgets import QApplication
 
 from lib import unidades
 from lib.corriente import Corriente
-from lib.plot import Plot
+from lib.kernel import QApplication
 from equipment.parents import equipment
 from equipment.heatExchanger import Heat_Exchanger
 
@@ -435,6 +434,7 @@ class Tower(equipment):
         xP = xD
         yP = xD
 
+        from lib.plot import Plot
         dialog=Plot()
         dialog.plot.ax.grid(True)
         dialog.plot.ax.set_title(QApplication.translate("pychemqt", "x-y Diagram for") + "{:s}/{:s} P={:s}".format(A,B,P.str), size="x-large")
@@ -28,10 +28,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 import os
 
-from PyQt5.QtWidgets import QApplication
 from scipy.optimize import fsolve
 
 from lib.corriente import Corriente
+from lib.kernel import QApplication
 from lib import unidades
 from equipment.parents import equipment
 
@@ -30,11 +30,11 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 import os
 from math import exp, sqrt, ceil
 
-from PyQt5.QtWidgets import QApplication
 from scipy import roots
 from scipy.constants import pi, g, e, epsilon_0
 from scipy.optimize import fsolve
 
+from lib.kernel import QApplication
 from lib.unidades import (Length, Pressure, DeltaP, Speed, Time, Area, VolFlow,
                           PotencialElectric, Currency, Dimensionless, MassFlow)
 from lib.datasheet import pdf
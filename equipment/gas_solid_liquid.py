@@ -27,9 +27,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 import os
 
-from PyQt5.QtWidgets import QApplication
 from scipy import pi, exp, sqrt, log
 
+from lib.kernel import QApplication
 from lib.unidades import (Pressure, DeltaP, Area, Speed, Dimensionless,
                           Length, Power)
 from lib.physics import Cunningham
@@ -29,7 +29,6 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 import os
 
-from PyQt5.QtWidgets import QApplication
 from scipy import sqrt, exp, log, pi, arccos, sin, cos, tanh
 from scipy.constants import g
 from scipy.optimize import fsolve
@@ -38,6 +37,7 @@ from lib import unidades
 from lib.adimensional import Re, Pr, Gr, Gz
 from lib.friction import f_friccion
 from lib.heatTransfer import *  # noqa
+from lib.kernel import QApplication
 from equipment.parents import equipment
 
 
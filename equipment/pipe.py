@@ -25,12 +25,12 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 import os
 
-from PyQt5.QtWidgets import QApplication
 from scipy.constants import g, pi
 
 from lib import unidades
 from lib.friction import f_friccion
 from lib.adimensional import Re
+from lib.kernel import QApplication
 from equipment.parents import equipment
 from equipment.heatExchanger import Heat_Exchanger
 
@@ -24,10 +24,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ############################
 
 from scipy.optimize import fsolve
-from PyQt5.QtWidgets import  QApplication
 
 from lib import unidades
 from lib.corriente import Corriente
+from lib.kernel import QApplication
 from lib.reaction import Reaction
 from .parents import equipment
 
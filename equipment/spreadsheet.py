@@ -32,8 +32,7 @@ try:
 except:
     pass
 
-from PyQt5.QtWidgets import QApplication
-
+from lib.kernel import QApplication
 from .parents import equipment
 
 
@@ -22,8 +22,8 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###Modulo que define los equipos de almacenamiento
 
 from scipy import log, exp, pi
-from PyQt5.QtWidgets import  QApplication
 
+from lib.kernel import QApplication
 from lib.unidades import Density, Length, Currency, Volume
 from lib.corriente import Corriente
 from .parents import equipment
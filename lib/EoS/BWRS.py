@@ -18,176 +18,402 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 
-
 ###############################################################################
-# Library to add EoS common functionality
+# Benedict-Webb-Rubin-Starling equation of state implementation
+#
+# All the mixture calculation are done with numpy arrays, the pure component
+# parameters are cached by component index, the mixing rules are evaluated
+# as matrix products and the volume root and fugacity coefficient accept
+# arrays of temperature and pressure so a batch of states can be calculated
+# in a single pass
 ###############################################################################
 
-from scipy import exp, log, sqrt
-from scipy import r_
-from scipy.optimize import fsolve
+from numpy import array, asarray, atleast_1d, exp, log, ones, where, zeros
 
-from lib import unidades
+from lib import sql, unidades
 from lib.eos import EoS
-from lib.EoS import cubic
 from lib.physics import R_atml
 from lib.bip import Kij
 
 
+# Generalized parameters for BWRS equation, Starling, Table 1
+_a = array([0.443690, 1.28438, 0.356306, 0.0307452, 0.006450, 0.484011,
+            0.528629, 0.504087, 0.0732828, 0.0705233, 0.544979])
+_b = array([0.115449, -0.920731, 1.70871, 0.179433, -0.022143, 0.754130,
+            0.349261, 1.32245, 0.463492, -0.044448, -0.270896])
+
+# Pure component parameters cache, indexed by component id, valid for the
+# databank generation of _generation
+_cache = {}
+_generation = None
+
+
+def _BWRS_lib(Tc, Vc, w):
+    """Pure component parameters for the Benedict-Webb-Rubin-Starling
+    equation of state, Starling generalized correlation
+
+    Parameters
+    ----------
+    Tc : array
+        Critical temperature, [K]
+    Vc : array
+        Critical molar volume, [l/mol]
+    w : array
+        Acentric factor, [-]
+
+    Returns
+    -------
+    par : array
+        Array with shape (11, n) with the parameters in order
+        Ao, Bo, Co, Do, Eo, a, b, c, d, alfa, gamma
+    """
+    Tc = asarray(Tc, dtype=float)
+    Vc = asarray(Vc, dtype=float)
+    w = asarray(w, dtype=float)
+    k = _a[:, None]+_b[:, None]*w
+    k[4] = _a[4]+_b[4]*w*exp(-3.8*w)
+
+    RT = R_atml*Tc
+    Ao = k[1]*RT*Vc
+    Bo = k[0]*Vc
+    Co = k[2]*RT*Tc**2*Vc
+    Do = k[3]*RT*Tc**3*Vc
+    Eo = k[4]*RT*Tc**4*Vc
+    a = k[5]*RT*Vc**2
+    b = k[6]*Vc**2
+    c = k[7]*RT*Tc**2*Vc**2
+    d = k[8]*RT*Tc*Vc**2
+    alfa = k[9]*Vc**3
+    gamma = k[10]*Vc**2
+    return array([Ao, Bo, Co, Do, Eo, a, b, c, d, alfa, gamma])
+
+
+def BWRS_lib(componente):
+    """Return the pure component parameters of a list of compounds as a
+    (11, n) array, the parameter of each compound is calculated only once
+    and saved in cache indexed by compound id, the cache is cleared when the
+    databank is changed"""
+    global _generation
+    if _generation != sql.generation:
+        _cache.clear()
+        _generation = sql.generation
+
+    new = []
+    for cmp in componente:
+        if cmp.id not in _cache and cmp not in new:
+            new.append(cmp)
+    if new:
+        Tc = [cmp.Tc for cmp in new]
+        Vc = [cmp.Vc*cmp.M for cmp in new]
+        w = [cmp.f_acent for cmp in new]
+        par = _BWRS_lib(Tc, Vc, w)
+        for i, cmp in enumerate(new):
+            _cache[cmp.id] = par[:, i]
+    return array([_cache[cmp.id] for cmp in componente]).T
+
+
 class BWRS(EoS):
-    """Ecuación de estado de Benedict-Webb-Rubin-Starling"""
+    """Benedict-Webb-Rubin-Starling equation of state
+
+    The pressure is calculated as:
+
+    .. math::
+        P = \\rho RT + \\left(B_oRT-A_o-\\frac{C_o}{T^2}+\\frac{D_o}{T^3}-
+        \\frac{E_o}{T^4}\\right)\\rho^2 + \\left(bRT-a-\\frac{d}{T}\\right)
+        \\rho^3 + \\alpha\\left(a+\\frac{d}{T}\\right)\\rho^6 +
+        \\frac{c\\rho^3}{T^2}\\left(1+\\gamma\\rho^2\\right)
+        \\exp\\left(-\\gamma\\rho^2\\right)
+
+    Parameters
+    ----------
+    T : float
+        Temperature, [K]
+    P : float
+        Pressure, [atm]
+    mezcla : Mezcla
+        Mixture instance
+
+    Examples
+    --------
+    Batch and single state calculation give the same result
+
+    >>> from lib.mezcla import Mezcla
+    >>> mix = Mezcla(2, ids=[2, 3, 4], caudalUnitarioMolar=[0.8, 0.15, 0.05])
+    >>> eq = BWRS(250, 20, mix)
+    >>> batch = BWRS.batch([250, 300], [20, 20], mix)
+    >>> "%0.6f %0.6f" % (eq.Z[0], batch["Z"][0, 0])
+    '0.893925 0.893925'
+    >>> batch["Z"][0, 0] < batch["Z"][0, 1] < 1
+    True
+    """
     __title__ = "Benedict-Webb-Rubin-Starling"
     __status__ = "BWRS"
 
     def __init__(self, T, P, mezcla):
         self.T = unidades.Temperature(T)
         self.P = unidades.Pressure(P, "atm")
+        self.mezcla = mezcla
         self.componente = mezcla.componente
-        self.zi = mezcla.fraccion
-        self.kij = Kij("BWRS")
-
-        Aoi = []
-        Boi = []
-        Coi = []
-        Doi = []
-        Eoi = []
-        ai = []
-        bi = []
-        ci = []
-        di = []
-        alfai = []
-        gammai = []
-        for compuesto in self.componente:
-            Ao_, Bo_, Co_, Do_, Eo_, a_, b_, c_, d_, alfa_, gamma_ = self._lib(compuesto)
-            Aoi.append(Ao_)
-            Boi.append(Bo_)
-            Coi.append(Co_)
-            Doi.append(Do_)
-            Eoi.append(Eo_)
-            ai.append(a_)
-            bi.append(b_)
-            ci.append(c_)
-            di.append(d_)
-            alfai.append(alfa_)
-            gammai.append(gamma_)
-
-        Ao = Co = Do = Eo = Bo = a = b = c = d = alfa = gamma = 0
-        for i in range(len(self.componente)):
-            Bo += self.zi[i]*Boi[i]
-            a += self.zi[i]*ai[i]**(1./3)
-            b += self.zi[i]*bi[i]**(1./3)
-            c += self.zi[i]*ci[i]**(1./3)
-            d += self.zi[i]*di[i]**(1./3)
-            alfa += self.zi[i]*alfai[i]**(1./3)
-            gamma += self.zi[i]*gammai[i]**0.5
-        a = a**3
-        b = b**3
-        c = c**3
-        d = d**3
-        alfa = alfa**3
-        gamma = gamma**2
-
-        for i in range(len(self.componente)):
-            for j in range(len(self.componente)):
-                Ao += self.zi[i]*self.zi[j]*Aoi[i]**0.5*Aoi[j]**0.5*(1-self.kij[i][j])
-                Co += self.zi[i]*self.zi[j]*Coi[i]**0.5*Coi[j]**0.5*(1-self.kij[i][j])**3
-                Do += self.zi[i]*self.zi[j]*Doi[i]**0.5*Doi[j]**0.5*(1-self.kij[i][j])**4
-                Eo += self.zi[i]*self.zi[j]*Eoi[i]**0.5*Eoi[j]**0.5*(1-self.kij[i][j])**5
-
-        self.Aoi = Aoi
-        self.Boi = Boi
-        self.Coi = Coi
-        self.Doi = Doi
-        self.Eoi = Eoi
-        self.ai = ai
-        self.bi = bi
-        self.ci = ci
-        self.di = di
-        self.alfai = alfai
-        self.gammai = gammai
-        self.Ao = Ao
-        self.Co = Co
-        self.Do = Do
-        self.Eo = Eo
-        self.Bo = Bo
-        self.a = a
-        self.b = b
-        self.c = c
-        self.d = d
-        self.alfa = alfa
-        self.gamma = gamma
-
-        Vm = lambda V: self.P.atm-R_atml*self.T/V - (Bo*R_atml*self.T-Ao-Co/self.T**2+Do/self.T**3-Eo/self.T**4)/V**2 - (b*R_atml*self.T-a-d/self.T)/V**3 - alfa*(a+d/self.T)/V**6 - c/self.T**2/V**3*(1+gamma/V**2)*exp(-gamma/V**2)
-
-        # Usamos SRK para estimar los volumenes de ambas fases usados como valores iniciales en la iteeración
-        srk=cubic.SRK(T, P, mezcla)
-        Z_srk=srk.Z
-        Vgo=Z_srk[0]*R_atml*T/P
-        Vlo=Z_srk[1]*R_atml*T/P
-        Vg=fsolve(Vm, Vgo)
-        Vl=fsolve(Vm, Vlo)
-        self.V=r_[Vg, Vl]       #mol/l
-        self.Z=P*self.V/R_atml/T
-
-        self.H_exc=(Bo*R_atml*self.T-2*Ao-4*Co/self.T**2+5*Do/self.T**3-6*Eo/self.T**4)/self.V+(2*b*R_atml*self.T-3*a-4*d/self.T)/2/self.V**2+alfa/5*(6*a+7*d/self.T)/self.V**5+c/gamma/self.T**2*(3-(3+gamma/self.V**2/2-gamma**2/self.V**4)*exp(-gamma/self.V**2))
-
-        self.x, self.xi, self.yi, self.Ki=self._Flash()
+        self.fraccion = mezcla.fraccion
+        self.zi = array(mezcla.fraccion, dtype=float)
+        self.kij = Kij(mezcla.ids, "BWRS")
+
+        self._pure(self.componente, self.kij)
+        (self.Aoi, self.Boi, self.Coi, self.Doi, self.Eoi, self.ai, self.bi,
+         self.ci, self.di, self.alfai, self.gammai) = self._par
+        mix = self._mix(self.zi)
+        (self.Ao, self.Bo, self.Co, self.Do, self.Eo, self.a, self.b, self.c,
+         self.d, self.alfa, self.gamma) = mix
+
+        rhog, rhol = self._rho(T, P, mix, self._Vc(self.zi))
+        self.V = 1/array([rhog[0], rhol[0]])                    # l/mol
+        self.Z = P*self.V/R_atml/T
+        self.H_exc = self._H_exc(T, 1/self.V, mix)
+
+        self.x, self.xi, self.yi, self.Ki = self._Flash()
+
+    def _pure(self, componente, kij):
+        """Define the pure component parameters and the interaction matrix
+        used in mixing rules"""
+        self._par = BWRS_lib(componente)
+        self._sqrt = self._par[[0, 2, 3, 4]]**0.5
+        k = 1-asarray(kij, dtype=float)
+        self._k = array([k, k**3, k**4, k**5])
+
+    def _mix(self, xi):
+        """Mixing rules for the equation parameters, return a array with
+        the 11 parameters of mixture"""
+        xi = asarray(xi, dtype=float)
+        Ao, Bo, Co, Do, Eo, a, b, c, d, alfa, gamma = self._par
+
+        # Quadratic mixing rules as matrix products
+        xs = xi*self._sqrt
+        Ao, Co, Do, Eo = [xs[i] @ self._k[i] @ xs[i] for i in range(4)]
+
+        Bo = xi @ Bo
+        a, b, c, d, alfa = (self._par[5:10]**(1/3) @ xi)**3
+        gamma = (xi @ gamma**0.5)**2
+        return array([Ao, Bo, Co, Do, Eo, a, b, c, d, alfa, gamma])
+
+    def _Vc(self, xi):
+        """Mixture critical molar volume used to start the density solve"""
+        return sum(x*cmp.Vc*cmp.M for x, cmp in zip(xi, self.componente))
 
+    @staticmethod
+    def _P(T, rho, mix):
+        """Calculate pressure and its density derivative, the input can be
+        arrays with compatible shape"""
+        Ao, Bo, Co, Do, Eo, a, b, c, d, alfa, gamma = mix
+        RT = R_atml*T
+        A = Bo*RT-Ao-Co/T**2+Do/T**3-Eo/T**4
+        B = b*RT-a-d/T
+        C = alfa*(a+d/T)
+        g = gamma*rho**2
+        e = exp(-g)
+        P = rho*RT + A*rho**2 + B*rho**3 + C*rho**6 + \
+            c*rho**3/T**2*(1+g)*e
+        dP = RT + 2*A*rho + 3*B*rho**2 + 6*C*rho**5 + \
+            c*rho**2/T**2*(3+3*g-2*g**2)*e
+        return P, dP
+
+    @classmethod
+    def _newton(cls, T, P, mix, rho):
+        """Vectorized Newton iteration for density, return the density and
+        a boolean array with the converged points"""
+        converged = zeros(rho.shape, dtype=bool)
+        for it in range(100):
+            Pi, dP = cls._P(T, rho, mix)
+            stable = dP > 0
+            step = where(stable, (Pi-P)/where(stable, dP, 1), 0)
+            rho_new = rho-step
+            rho_new = where(rho_new <= 0, rho/2, rho_new)
+            converged = stable & (abs(rho_new-rho) <= 1e-12*rho)
+            rho = rho_new
+            if (converged | ~stable).all():
+                break
+        Pi, dP = cls._P(T, rho, mix)
+        return rho, converged & (dP > 0)
+
+    @classmethod
+    def _rho(cls, T, P, mix, Vc):
+        """Calculate the density of vapor and liquid roots of equation,
+        starting from ideal gas and a dense liquid estimation. If only a
+        root is available, both phases get the same value
+
+        Parameters
+        ----------
+        T : float or array
+            Temperature, [K]
+        P : float or array
+            Pressure, [atm]
+        mix : array
+            Mixture parameters
+        Vc : float
+            Critical molar volume of mixture, [l/mol]
+
+        Returns
+        -------
+        rhog, rhol : array
+            Molar densities, [mol/l]
+        """
+        T = atleast_1d(asarray(T, dtype=float))
+        P = atleast_1d(asarray(P, dtype=float))*ones(T.shape)
+
+        rhog, okg = cls._newton(T, P, mix, P/R_atml/T)
+
+        # Liquid starting point must be over the greater root
+        rhol = 4/Vc*ones(T.shape)
+        for i in range(10):
+            Pi, dP = cls._P(T, rhol, mix)
+            low = (Pi < P) | (dP <= 0)
+            if not low.any():
+                break
+            rhol = where(low, rhol*1.5, rhol)
+        rhol, okl = cls._newton(T, P, mix, rhol)
+
+        rhog = where(okg, rhog, rhol)
+        rhol = where(okl, rhol, rhog)
+        return rhog, rhol
+
+    @staticmethod
+    def _H_exc(T, rho, mix):
+        """Departure enthalpy, [atm·l/mol]"""
+        Ao, Bo, Co, Do, Eo, a, b, c, d, alfa, gamma = mix
+        RT = R_atml*T
+        g = gamma*rho**2
+        return (Bo*RT-2*Ao-4*Co/T**2+5*Do/T**3-6*Eo/T**4)*rho + \
+            (2*b*RT-3*a-4*d/T)/2*rho**2 + alfa/5*(6*a+7*d/T)*rho**5 + \
+            c/gamma/T**2*(3-(3+g/2-g**2)*exp(-g))
+
+    def _lnphi(self, T, rho, xi, mix):
+        """Natural logarithm of fugacity coefficients
+
+        Parameters
+        ----------
+        T : float or array
+            Temperature, [K]
+        rho : float or array
+            Molar density, [mol/l]
+        xi : array
+            Molar fraction of phase
+        mix : array
+            Mixture parameter of phase composition
+
+        Returns
+        -------
+        lnphi : array
+            Array with shape (len(T), n)
+        """
+        T = atleast_1d(asarray(T, dtype=float))[:, None]
+        rho = atleast_1d(asarray(rho, dtype=float))[:, None]
+        xi = asarray(xi, dtype=float)
+        Ao, Bo, Co, Do, Eo, a, b, c, d, alfa, gamma = mix
+        Aoi, Boi, Coi, Doi, Eoi, ai, bi, ci, di, alfai, gammai = self._par
+        RT = R_atml*T
+
+        # Quadratic term, one matrix-vector product by parameter
+        xs = xi*self._sqrt
+        sA, sC, sD, sE = [self._sqrt[i]*(self._k[i] @ xs[i])
+                          for i in range(4)]
+        suma = -sA - sC/T**2 + sD/T**3 - sE/T**4
+
+        a3 = 3*(a**2*ai)**(1/3)
+        d3 = 3*(d**2*di)**(1/3)
+        g = gamma*rho**2
+        e = exp(-g)
+
+        lnf = rho*(Bo+Boi)*RT + 2*rho*suma + \
+            rho**2/2*(3*(b**2*bi)**(1/3)*RT-a3-d3/T) + \
+            alfa*rho**5/5*(a3+d3/T) + \
+            3*rho**5/5*(a+d/T)*(alfa**2*alfai)**(1/3) + \
+            3*(c**2*ci)**(1/3)*rho**2/T**2*((1-e)/g-e/2) - \
+            2*c/gamma/T**2*(gammai/gamma)**0.5*(1-e*(1+g+g**2/2))
+
+        P, dP = self._P(T, rho, mix)
+        Z = P/rho/RT
+        return lnf/RT-log(Z)
 
     def _fug(self, Z, xi):
-        rho=self.P.atm/Z/R_atml/self.T
-        tita=[]
-        for i in range(len(self.componente)):
-            suma=0
-            for j in range(len(self.componente)):
-                suma+=xi[j]*(-self.Ao**0.5*self.Aoi[i]**0.5*(1-self.kij[i][j]) \
-                                    -  self.Co**0.5*self.Coi[i]**0.5*(1-self.kij[i][j])**3/self.T**2 \
-                                    + self.Do**0.5*self.Doi[i]**0.5*(1-self.kij[i][j])**4/self.T**3 \
-                                    -  self.Eo**0.5*self.Eoi[i]**0.5*(1-self.kij[i][j])**5/self.T**4)
-#                print suma
-            lo=R_atml*self.T*log(rho*R_atml*self.T*xi[i]) \
-                    + rho*(self.Bo+self.Boi[i])*R_atml*self.T \
-                    + 2*rho*suma \
-                    + rho**2/2*(3*(self.b**2*self.bi[i])**(1./3)*R_atml*self.T-3*(self.a**2*self.ai[i])**(1./3)-3*(self.d**2*self.di[i])**(1./3)/self.T) \
-                    + self.alfa*rho**5/5*(3*(self.a**2*self.ai[i])**(1./3)+3*(self.d**2*self.di[i])**(1./3)/self.T) \
-                    + 3*rho**5/5*(self.a+self.d/self.T)*(self.alfa**2*self.alfai[i])**(1./3) \
-                    + 3*(self.c**2*self.ci[i])**(1./3)*rho**2/self.T**2*((1-exp(-self.gamma*rho**2))/self.gamma/rho**2-exp(-self.gamma*rho**2)/2) \
-                    - (2*self.c*sqrt(self.gammai[i]/self.gamma)**0.5/self.gamma/self.T**2)*((1-exp(-self.gamma*rho**2))*(1+self.gamma*rho**2+self.gamma**2*rho**4/2))
-            tita.append(exp(lo/R_atml/self.T))
-        return tita
-
-    def _lib(self, cmp):
-        """Library for parameter calculation in Benedict-Webb-Rubin-Starling"""
-        a1, b1 = 0.443690, 0.115449
-        a2, b2 = 1.28438, -0.920731
-        a3, b3 = 0.356306, 1.70871
-        a4, b4 = 0.544979, -0.270896
-        a5, b5 = 0.528629, 0.349261
-        a6, b6 = 0.484011, 0.754130
-        a7, b7 = 0.0705233, -0.044448
-        a8, b8 = 0.504087, 1.32245
-        a9, b9 = 0.0307452, 0.179433
-        a10, b10 = 0.0732828, 0.463492
-        a11, b11 = 0.006450, -0.022143
-
-        Bo = (a1+b1*cmp.f_acent)*cmp.Vc
-        Ao = (a2+b2*cmp.f_acent)*R_atml*cmp.Tc*cmp.Vc
-        Co = (a3+b3*cmp.f_acent)*R_atml*cmp.Tc**3*cmp.Vc
-        gamma = (a4+b4*cmp.f_acent)*(cmp.Vc)**2
-        b = (a5+b5*cmp.f_acent)*(cmp.Vc)**2
-        a = (a6+b6*cmp.f_acent)*R_atml*cmp.Tc*(cmp.Vc)**2
-        alfa = (a7+b7*cmp.f_acent)*(cmp.Vc)**3
-        c = (a8+b8*cmp.f_acent)*R_atml*cmp.Tc**3*(cmp.Vc)**2
-        Do = (a9+b9*cmp.f_acent)*R_atml*cmp.Tc**4*cmp.Vc
-        d = (a10+b10*cmp.f_acent)*R_atml*cmp.Tc**2*(cmp.Vc)**2
-        Eo = (a11+b11*cmp.f_acent*exp(-3.8*cmp.f_acent))*R_atml*cmp.Tc**5*cmp.Vc
-
-        return Ao, Bo, Co, Do, Eo, a, b, c, d, alfa, gamma
+        """Fugacity coefficients of phase with composition xi, the Z value
+        is used as initial guess of the phase density"""
+        xi = asarray(xi, dtype=float)
+        mix = self._mix(xi)
+        rho = self.P.atm/Z/R_atml/self.T
+        rho, ok = self._newton(
+            atleast_1d(float(self.T)), self.P.atm, mix, atleast_1d(rho))
+        return list(exp(self._lnphi(self.T, rho, xi, mix)[0]))
+
+    @classmethod
+    def batch(cls, T, P, mezcla):
+        """Calculate the equation for a batch of states with the same
+        composition, all the states are solved simultaneously as arrays
+
+        Parameters
+        ----------
+        T : array
+            Temperature, [K]
+        P : array
+            Pressure, [atm]
+        mezcla : Mezcla
+            Mixture instance
+
+        Returns
+        -------
+        prop : dict
+            Dict with the keys:
+
+                * Z: Compressibility factor, shape (2, N) with vapor and
+                  liquid roots
+                * V: Molar volume, [l/mol]
+                * H_exc: Departure enthalpy, [atm·l/mol]
+                * lnphi: Fugacity coefficient logarithm, shape (2, N, n)
+                * dlnphidT: Temperature derivative of lnphi at constant
+                  pressure, shape (2, N, n)
+        """
+        eq = cls.__new__(cls)
+        eq.componente = mezcla.componente
+        eq._pure(mezcla.componente, Kij(mezcla.ids, "BWRS"))
+        xi = array(mezcla.fraccion, dtype=float)
+        mix = eq._mix(xi)
+        Vc = eq._Vc(xi)
+
+        T = atleast_1d(asarray(T, dtype=float))
+        P = atleast_1d(asarray(P, dtype=float))*ones(T.shape)
+        N = len(T)
+
+        # Solve the states and the perturbed temperatures in one pass
+        h = 1e-5*T
+        Ts = array([T, T-h, T+h]).ravel()
+        Ps = array([P, P, P]).ravel()
+        rhos = cls._rho(Ts, Ps, mix, Vc)
+
+        Z = []
+        V = []
+        H = []
+        lnphi = []
+        dlnphi = []
+        for rho in rhos:
+            lnphi_ = eq._lnphi(Ts, rho, xi, mix)
+            V.append(1/rho[:N])
+            Z.append(P/rho[:N]/R_atml/T)
+            H.append(cls._H_exc(T, rho[:N], mix))
+            lnphi.append(lnphi_[:N])
+            dlnphi.append((lnphi_[2*N:]-lnphi_[N:2*N])/2/h[:, None])
+
+        prop = {}
+        prop["Z"] = array(Z)
+        prop["V"] = array(V)
+        prop["H_exc"] = array(H)
+        prop["lnphi"] = array(lnphi)
+        prop["dlnphidT"] = array(dlnphi)
+        return prop
+
 
 _all = [BWRS]
 
 if __name__ == "__main__":
     from lib.corriente import Mezcla
-    mezcla = Mezcla(ids=[10, 38, 22, 61], fraccionMolar=[0.3, 0.5, 0.05, 0.15])
+    mezcla = Mezcla(2, ids=[10, 38, 22, 61],
+                    caudalUnitarioMolar=[0.3, 0.5, 0.05, 0.15])
     eq = BWRS(340, 1., mezcla)
     print(eq.x)
@@ -26,9 +26,8 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 from scipy import exp, log, log10, tan, sinh, tanh, arctan, sqrt
 from scipy import roots, r_
 from scipy.constants import pi, Avogadro, R
-from scipy.optimize import fsolve
-
-from lib import unidades, config
+from lib import unidades, config, profiler
+from lib.profiler import fsolve
 from lib.physics import R_atml, factor_acentrico_octano
 
 from lib.eos import EoS
@@ -88,6 +87,7 @@ class Grayson_Streed(EoS):
         return tital, fi
 
 
+    @profiler.measure("flash")
     def _Flash(self):
         """Cálculo de los coeficientes de reparto entre fases, Ref Naji - Conventional and rapid flash claculations"""
         #Estimación inicial de K mediante correlación wilson Eq 19
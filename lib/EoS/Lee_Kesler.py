@@ -18,204 +18,459 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 
-
 ###############################################################################
-# Virial equation of state implementation
+# Lee-Kesler equation of state implementation
+#
+# The simple and reference fluid properties are tabulated in a (Tr, Pr) grid
+# for vapor and liquid roots, saved in the user config folder as a compressed
+# numpy file the first time is used and evaluated with bicubic interpolation.
+# Points out of grid or in cells without enough accuracy, near the critical
+# point or the limit of existence of a root, are solved exactly
 ###############################################################################
 
-from scipy import zeros, log, exp
-from scipy.constants import R
+import os
+from zipfile import BadZipFile
+
+from numpy import (array, asarray, atleast_1d, broadcast_arrays, concatenate,
+                   exp, linspace, log, log10, ones, savez_compressed, load,
+                   where, zeros)
+from scipy.interpolate import RectBivariateSpline
 
+from lib import unidades
+from lib.config import conf_dir
 from lib.eos import EoS
 from lib.physics import R_atml
 
+
+__doi__ = {
+    1:
+        {"autor": "Lee, B.I., Kesler, M.G.",
+         "title": "A Generalized Thermodynamic Correlation Based on "
+                  "Three-Parameter Corresponding States",
+         "ref": "AIChE Journal 21(3) (1975) 510-527",
+         "doi": "10.1002/aic.690210313"},
+}
+
+
+# Parameters for simple and reference fluid, Table 1
+b1 = 0.1181193, 0.2026579
+b2 = 0.265728, 0.331511
+b3 = 0.154790, 0.027655
+b4 = 0.030323, 0.203488
+c1 = 0.0236744, 0.0313385
+c2 = 0.0186984, 0.0503618
+c3 = 0.0, 0.016901
+c4 = 0.042724, 0.041577
+d1 = 0.155488e-4, 0.48736e-4
+d2 = 0.623689e-4, 0.0740336e-4
+beta = 0.65392, 1.226
+gamma = 0.060167, 0.03754
+
+# Acentric factor of reference fluid, n-octane
+w_ref = 0.3978
+
+# Properties tabulated
+LK_PROPERTIES = ("Vr", "Z", "H", "S", "Cv", "Cp", "phi")
+
+# Grid definition, finer near the critical point
+_version = 1
+_Tr = concatenate((linspace(0.3, 0.9, 61), linspace(0.905, 1.2, 60),
+                   linspace(1.22, 2., 40), linspace(2.05, 4., 40)))
+_logPr = linspace(-2, 1, 121)
+_tol = 1e-5
+_file = os.path.join(conf_dir, "LeeKesler.npz")
+_table = {}
+
+
+def _Pr(Tr, rho, fluid):
+    """Reduced pressure and its derivatives as function of reduced density,
+    for the simple (fluid=0) or reference (fluid=1) fluid"""
+    B = b1[fluid]-b2[fluid]/Tr-b3[fluid]/Tr**2-b4[fluid]/Tr**3
+    C = c1[fluid]-c2[fluid]/Tr+c3[fluid]/Tr**3
+    D = d1[fluid]+d2[fluid]/Tr
+    be = beta[fluid]
+    g = gamma[fluid]*rho**2
+    e = exp(-g)
+    k = c4[fluid]/Tr**3
+
+    P = Tr*rho*(1+B*rho+C*rho**2+D*rho**5+k*rho**2*(be+g)*e)
+    dPdrho = Tr*(1+2*B*rho+3*C*rho**2+6*D*rho**5 +
+                 k*rho**2*(3*be+(5-2*(be+g))*g)*e)
+    dPdT = rho*(1+(b1[fluid]+b3[fluid]/Tr**2+2*b4[fluid]/Tr**3)*rho +
+                (c1[fluid]-2*c3[fluid]/Tr**3)*rho**2+d1[fluid]*rho**5 -
+                2*k*rho**2*(be+g)*e)
+    return P, dPdrho, dPdT
+
+
+def _newton(Tr, Pr, fluid, rho):
+    """Vectorized Newton iteration for reduced density, return the solution
+    and a boolean array with the converged points"""
+    converged = zeros(rho.shape, dtype=bool)
+    for it in range(100):
+        P, dP, dT = _Pr(Tr, rho, fluid)
+        stable = dP > 0
+        step = where(stable, (P-Pr)/where(stable, dP, 1), 0)
+        rho_new = rho-step
+        rho_new = where(rho_new <= 0, rho/2, rho_new)
+        converged = stable & (abs(rho_new-rho) <= 1e-12*rho)
+        rho = rho_new
+        if (converged | ~stable).all():
+            break
+    P, dP, dT = _Pr(Tr, rho, fluid)
+    return rho, converged & (dP > 0) & (abs(P-Pr) <= 1e-8*Pr)
+
+
+def _LK_solve(Tr, Pr, fluid, fase):
+    """Exact solution of reduced volume for the simple or reference fluid
+
+    Parameters
+    ----------
+    Tr : array
+        Reduced temperature, [-]
+    Pr : array
+        Reduced pressure, [-]
+    fluid : int
+        0 for simple fluid, 1 for reference fluid
+    fase : int
+        0 for liquid root, 1 for vapor root
+
+    Returns
+    -------
+    Vr : array
+        Reduced volume, PcV/RTc, [-]
+    exist : array
+        Boolean array, False where the root of phase don't exist and the
+        returned value is the other root
+    """
+    Tr, Pr = broadcast_arrays(atleast_1d(asarray(Tr, dtype=float)),
+                              atleast_1d(asarray(Pr, dtype=float)))
+    rhog, okg = _newton(Tr, Pr, fluid, Pr/Tr)
+
+    # Liquid starting point must be over the greater root
+    rhol = 12*ones(Tr.shape)
+    for i in range(10):
+        P, dP, dT = _Pr(Tr, rhol, fluid)
+        low = (P < Pr) | (dP <= 0)
+        if not low.any():
+            break
+        rhol = where(low, rhol*1.5, rhol)
+    rhol, okl = _newton(Tr, Pr, fluid, rhol)
+
+    if fase:
+        rho = where(okg, rhog, rhol)
+        exist = okg
+    else:
+        rho = where(okl, rhol, rhog)
+        exist = okl
+    return 1/rho, exist
+
+
+def _LK_departure(Tr, Vr, fluid):
+    """Calculate the departure functions of simple or reference fluid from
+    reduced temperature and volume, Eq 5-10
+
+    Returns
+    -------
+    prop : array
+        Array with the properties in order of LK_PROPERTIES:
+
+            * Vr: Reduced volume
+            * Z: Compressibility factor
+            * H: Enthalpy departure, (H°-H)/RTc
+            * S: Entropy departure, (S°-S)/R
+            * Cv: Isochoric heat capacity departure, (Cv-Cv°)/R
+            * Cp: Isobaric heat capacity departure, (Cp-Cp°)/R
+            * phi: Fugacity coefficient logarithm, ln(f/P)
+    """
+    rho = 1/Vr
+    P, dPdrho, dPdT = _Pr(Tr, rho, fluid)
+    Z = P*Vr/Tr
+    B = b1[fluid]-b2[fluid]/Tr-b3[fluid]/Tr**2-b4[fluid]/Tr**3
+    C = c1[fluid]-c2[fluid]/Tr+c3[fluid]/Tr**3
+    D = d1[fluid]+d2[fluid]/Tr
+    g = gamma[fluid]*rho**2
+    E = c4[fluid]/2/Tr**3/gamma[fluid] * \
+        (beta[fluid]+1-(beta[fluid]+1+g)*exp(-g))
+
+    H = -Tr*(Z-1-(b2[fluid]+2*b3[fluid]/Tr+3*b4[fluid]/Tr**2)*rho/Tr -
+             (c2[fluid]-3*c3[fluid]/Tr**2)*rho**2/2/Tr +
+             d2[fluid]*rho**5/5/Tr+3*E)
+    S = -(log(Z)-(b1[fluid]+b3[fluid]/Tr**2+2*b4[fluid]/Tr**3)*rho -
+          (c1[fluid]-2*c3[fluid]/Tr**3)*rho**2/2-d1[fluid]*rho**5/5+2*E)
+    Cv = 2*(b3[fluid]+3*b4[fluid]/Tr)*rho/Tr**2-3*c3[fluid]*rho**2/Tr**3-6*E
+    Cp = Cv-1+Tr*dPdT**2/dPdrho/rho**2
+    phi = Z-1-log(Z)+B*rho+C*rho**2/2+D*rho**5/5+E
+    return array([Vr, Z, H, S, Cv, Cp, phi])
+
+
+def _build_table():
+    """Calculate the grid of properties with the exact solution, return a
+    dict with the numpy arrays to save.
+
+    Each cell of grid is checked evaluating the bicubic interpolation in the
+    cell center against the exact solution, the cells with bad accuracy,
+    near critical point or the limit of existence of a root, are marked to
+    use the exact solution"""
+    Tr, logPr = broadcast_arrays(_Tr[:, None], _logPr[None, :])
+    Trm = (_Tr[1:]+_Tr[:-1])/2
+    logPrm = (_logPr[1:]+_logPr[:-1])/2
+    Trm, logPrm = broadcast_arrays(Trm[:, None], logPrm[None, :])
+
+    data = zeros((2, 2, len(LK_PROPERTIES))+Tr.shape)
+    safe = zeros((2, 2)+Trm.shape, dtype=bool)
+    for fluid in (0, 1):
+        for fase in (0, 1):
+            Vr, exist = _LK_solve(Tr.ravel(), 10**logPr.ravel(), fluid, fase)
+            prop = _LK_departure(Tr.ravel(), Vr, fluid)
+            data[fluid, fase] = prop.reshape(data.shape[2:])
+
+            exist = exist.reshape(Tr.shape)
+            ok = exist[1:, 1:] & exist[:-1, 1:] & exist[1:, :-1] & \
+                exist[:-1, :-1]
+            Vr, e = _LK_solve(Trm.ravel(), 10**logPrm.ravel(), fluid, fase)
+            exact = _LK_departure(Trm.ravel(), Vr, fluid)
+            for i, z in enumerate(data[fluid, fase]):
+                spline = RectBivariateSpline(
+                    _Tr, _logPr, z.astype("float32"), kx=3, ky=3)
+                value = spline.ev(Trm.ravel(), logPrm.ravel())
+                error = abs(value-exact[i]) <= _tol*abs(exact[i]).clip(1)
+                ok &= error.reshape(Trm.shape)
+            safe[fluid, fase] = ok
+    return {"version": _version, "Tr": _Tr, "logPr": _logPr,
+            "data": data.astype("float32"), "safe": safe}
+
+
+def LK_table():
+    """Return the interpolation table of Lee-Kesler properties, the grid is
+    loaded from the user config folder or calculated and saved the first
+    time"""
+    if not _table:
+        data = None
+        if os.path.isfile(_file):
+            try:
+                data = dict(load(_file))
+                if data["version"] != _version:
+                    data = None
+            except (OSError, ValueError, KeyError, BadZipFile):
+                data = None
+        if data is None:
+            data = _build_table()
+            # Write to a temporal file so an interrupted save can't leave a
+            # truncated table, other processes can be saving it too
+            tmp = "%s.%i.tmp" % (_file, os.getpid())
+            try:
+                with open(tmp, "wb") as file:
+                    savez_compressed(file, **data)
+                os.replace(tmp, _file)
+            except OSError:
+                if os.path.isfile(tmp):
+                    os.remove(tmp)
+
+        Tr = data["Tr"]
+        logPr = data["logPr"]
+        splines = {}
+        for fluid in (0, 1):
+            for fase in (0, 1):
+                for i, prop in enumerate(LK_PROPERTIES):
+                    z = data["data"][fluid, fase, i]
+                    splines[(fluid, fase, prop)] = RectBivariateSpline(
+                        Tr, logPr, z, kx=3, ky=3)
+        _table["Tr"] = Tr
+        _table["logPr"] = logPr
+        _table["safe"] = data["safe"]
+        _table["splines"] = splines
+    return _table
+
+
+def _fase(Tr, Pr, w):
+    """Stable phase from Lee-Kesler vapor pressure correlation, 1 for vapor
+    and 0 for liquid"""
+    f0 = 5.92714-6.09648/Tr-1.28862*log(Tr)+0.169347*Tr**6
+    f1 = 15.2518-15.6875/Tr-13.4721*log(Tr)+0.43577*Tr**6
+    Prs = exp(f0+w*f1)
+    return where((Tr < 1) & (Pr > Prs), 0, 1)
+
+
+def Lee_Kesler_lib(Tr, Pr, fase=1, exact=False, props=LK_PROPERTIES):
+    """Properties of simple and reference fluid of Lee-Kesler correlation,
+    the values are interpolated from the tabulated grid, the point out of
+    the grid or in a cell without enough accuracy are calculated exactly
+
+    Parameters
+    ----------
+    Tr : float or array
+        Reduced temperature, [-]
+    Pr : float or array
+        Reduced pressure, [-]
+    fase : int or array
+        0 for liquid, 1 for vapor
+    exact : boolean
+        Skip the interpolation and solve the equation for all points
+    props : list
+        Properties to calculate, by default all the LK_PROPERTIES
+
+    Returns
+    -------
+    simple : dict
+        Properties of simple fluid, with the keys defined in LK_PROPERTIES
+    reference : dict
+        Properties of reference fluid
+
+    Examples
+    --------
+    Compressibility factor of simple and reference fluid
+
+    >>> simple, ref = Lee_Kesler_lib(1.5, 1, exact=True)
+    >>> "%0.4f %0.4f" % (simple["Z"][0], ref["Z"][0])
+    '0.9103 0.9447'
+
+    The interpolated values agree with the exact solution
+
+    >>> Tr, Pr = [0.7, 1.5, 3.1], [0.05, 2.3, 7.4]
+    >>> simple, ref = Lee_Kesler_lib(Tr, Pr, 1)
+    >>> s, r = Lee_Kesler_lib(Tr, Pr, 1, exact=True)
+    >>> abs(simple["H"]-s["H"]).max() < 1e-4
+    True
+    >>> abs(ref["Z"]-r["Z"]).max() < 1e-4
+    True
+    """
+    Tr, Pr, fase = broadcast_arrays(atleast_1d(asarray(Tr, dtype=float)),
+                                    atleast_1d(asarray(Pr, dtype=float)),
+                                    atleast_1d(asarray(fase, dtype=int)))
+    index = [LK_PROPERTIES.index(prop) for prop in props]
+
+    if exact:
+        grid = zeros(Tr.shape, dtype=bool)
+    else:
+        table = LK_table()
+        logPr = log10(Pr)
+        grid = (Tr >= table["Tr"][0]) & (Tr <= table["Tr"][-1]) & \
+            (logPr >= table["logPr"][0]) & (logPr <= table["logPr"][-1])
+        i = table["Tr"].searchsorted(Tr, "right")-1
+        j = table["logPr"].searchsorted(logPr, "right")-1
+        i = i.clip(0, len(table["Tr"])-2)
+        j = j.clip(0, len(table["logPr"])-2)
+
+    result = []
+    for fluid in (0, 1):
+        prop = zeros((len(LK_PROPERTIES),)+Tr.shape)
+        for f in (0, 1):
+            idx = fase == f
+            if not exact:
+                # Interpolation for points in safe cells of grid
+                interp = idx & grid & table["safe"][fluid, f][i, j]
+                if interp.any():
+                    for k in index:
+                        spline = table["splines"][(fluid, f, LK_PROPERTIES[k])]
+                        prop[k][interp] = spline.ev(Tr[interp], logPr[interp])
+                idx = idx & ~interp
+
+            # Exact calculation for the remaining points
+            if idx.any():
+                Vr, exist = _LK_solve(Tr[idx], Pr[idx], fluid, f)
+                prop[:, idx] = _LK_departure(Tr[idx], Vr, fluid)
+
+        result.append({LK_PROPERTIES[k]: prop[k] for k in index})
+    return result
+
+
+def _LK_prop(prop, Tr, Pr, w, fase=None):
+    """Generic procedure to calculate a property of a fluid with acentric
+    factor w using the Lee-Kesler interpolation between simple and
+    reference fluid"""
+    Tr, Pr = asarray(Tr, dtype=float), asarray(Pr, dtype=float)
+    if fase is None:
+        fase = _fase(Tr, Pr, w)
+    simple, ref = Lee_Kesler_lib(Tr, Pr, fase, props=(prop, ))
+    value = simple[prop]+w/w_ref*(ref[prop]-simple[prop])
+    if value.size == 1:
+        value = float(value[0])
+    return value
+
+
+def Lee_Kesler_Z(Tr, Pr, w, fase=None):
+    """Compressibility factor, API procedure 6B1.3"""
+    return _LK_prop("Z", Tr, Pr, w, fase)
+
+
+def Lee_Kesler_Entalpia_lib(Tr, Pr, w, fase=None):
+    """Dimensionless enthalpy departure, (H°-H)/RTc, API procedure 7B3.7"""
+    return _LK_prop("H", Tr, Pr, w, fase)
+
+
+def Lee_Kesler_Entropia_lib(Tr, Pr, w, fase=None):
+    """Dimensionless entropy departure, (S°-S)/R, API procedure 7F1.7"""
+    return _LK_prop("S", Tr, Pr, w, fase)
+
+
+def Lee_Kesler_Cp_lib(Tr, Pr, w, fase=None):
+    """Dimensionless isobaric heat capacity departure, (Cp-Cp°)/R,
+    API procedure 7D3.6"""
+    return _LK_prop("Cp", Tr, Pr, w, fase)
+
+
+def Lee_Kesler_Fugacidad_lib(Tr, Pr, w, fase=None):
+    """Fugacity coefficient logarithm, ln(f/P), API procedure 7G1.8"""
+    return _LK_prop("phi", Tr, Pr, w, fase)
+
+
 class Lee_Kesler(EoS):
-    """Ecuación de estado de Lee-Kesler"""
-    __title__="Lee Kesler"
-    __status__="LK"
+    """Lee-Kesler equation of state, the mixture use the pseudocritical
+    properties from Plocker-Knapp-Prausnitz mixing rules and the
+    fugacity coefficients of components in phases are calculated with the
+    Lewis rule from pure component values"""
+    __title__ = "Lee Kesler"
+    __status__ = "LK"
 
     def __init__(self, T, P, mezcla):
-        self.T=unidades.Temperature(T)
-        self.P=unidades.Pressure(P, "atm")
-        self.componente=mezcla.componente
-        self.fraccion=mezcla.fraccion
-
-        zci=[]
-        Vci=[]
-        for componente in self.componente:
-            zci.append(0.2905-0.085*componente.f_acent)
-            Vci.append(zci[-1]*R_atml*componente.Tc/componente.Pc.atm)
-
-        sumaV1=sumaV2=sumaV3=sumaT1=sumaT2=sumaT3=0
-        for i, componente in enumerate(self.componente):
-            sumaV1+=self.fraccion[i]*Vci[i]
-            sumaV2+=self.fraccion[i]*Vci[i]**(2./3)
-            sumaV3+=self.fraccion[i]*Vci[i]**(1./3)
-            sumaT1+=self.fraccion[i]*Vci[i]*componente.Tc
-            sumaT2+=self.fraccion[i]*Vci[i]**(2./3)*componente.Tc**(1./2)
-            sumaT3+=self.fraccion[i]*Vci[i]**(1./3)*componente.Tc**(1./2)
-
-        Vmc=(sumaV1+3*sumaV2*sumaV3)/4.
-        Tmc=(sumaT1+3*sumaT2*sumaT3)/4/Vmc
-        Pmc=(0.2905-0.085*mezcla.f_acent)*R_atml*Tmc/Vmc
-
-        Tr=T/Tmc
-        Pr=P/Pmc
-
-        b1=0.1181193, 0.2026579
-        b2=0.265728, 0.331511
-        b3=0.154790, 0.027655
-        b4=0.030323, 0.203488
-        c1=0.0236744, 0.0313385
-        c2=0.0186984, 0.0503618
-        c3=0.0, 0.016901
-        c4=0.042724, 0.041577
-        d1=0.155488e-4, 0.48736e-4
-        d2=0.623689e-4, 0.0740336e-4
-        beta=0.65392, 1.226
-        gamma=0.060167, 0.03754
-
-        Bo=b1[0]-b2[0]/Tr-b3[0]/Tr**2-b4[0]/Tr**3
-        Co=c1[0]-c2[0]/Tr+c3[0]/Tr**3
-        Do=d1[0]+d2[0]/Tr
-        Vr=lambda V: 1+Bo/V+Co/V**2+Do/V**5+c4[0]/Tr**3/V**2*(beta[0]+gamma[0]/V**2)*exp(-gamma[0]/V**2)-Pr*V/Tr
-
-        Bh=b1[1]-b2[1]/Tr-b3[1]/Tr**2-b4[1]/Tr**3
-        Ch=c1[1]-c2[1]/Tr+c3[1]/Tr**3
-        Dh=d1[1]+d2[1]/Tr
-        Vrh=lambda V: 1+Bh/V+Ch/V**2+Dh/V**5+c4[1]/Tr**3/V**2*(beta[1]+gamma[1]/V**2)*exp(-gamma[1]/V**2)-Pr*V/Tr
-
-        #Usamos SRK para estimar los volumenes de ambas fases usados como valores iniciales en la iteración
-        srk=SRK(T, P, mezcla)
-        Z_srk=srk.Z
-        Vgo=Z_srk[0]*R_atml*T/P
-        Vlo=Z_srk[1]*R_atml*T/P
-
-        vr0v=fsolve(Vr, Vgo)
-        vrhv=fsolve(Vrh, Vgo)
-        vr0l=fsolve(Vr, Vlo)
-        vrhl=fsolve(Vrh, Vlo)
-
-        z0l=Pr*vr0l/Tr
-        zhl=Pr*vrhl/Tr
-        z0v=Pr*vr0v/Tr
-        zhv=Pr*vrhv/Tr
-        self.Z=r_[z0v+mezcla.f_acent/factor_acentrico_octano*(zhv-z0v), z0l+mezcla.f_acent/factor_acentrico_octano*(zhl-z0l)]
-        self.V=self.Z*R_atml*self.T/self.P.atm  #mol/l
-
-        E=c4[0]/(2*Tr**3*gamma[0])*(beta[0]+1-(beta[0]+1+gamma[0]/vr0v**2)*exp(-gamma[0]/vr0v**2))
-        H0=-Tr*(z0v-1-(b2[0]+2*b3[0]/Tr+3*b4[0]/Tr**2)/Tr/vr0v-c2[0]/Tr/2/vr0v**2+d2[0]/5/Tr/vr0v**5+3*E)
-        E=c4[1]/(2*Tr**3*gamma[1])*(beta[1]+1-(beta[1]+1+gamma[1]/vrhv**2)*exp(-gamma[1]/vrhv**2))
-        Hh=-Tr*(zhv-1-(b2[1]+2*b3[1]/Tr+3*b4[1]/Tr**2)/Tr/vrhv-(c2[1]-3*c3[1]/Tr**2)/Tr/2/vrhv**2+d2[1]/5/Tr/vrhv**5+3*E)
-        Hv=H0+mezcla.f_acent/factor_acentrico_octano*(Hh-H0)
-
-        E=c4[0]/(2*Tr**3*gamma[0])*(beta[0]+1-(beta[0]+1+gamma[0]/vr0l**2)*exp(-gamma[0]/vr0l**2))
-        H0=-Tr*(z0l-1-(b2[0]+2*b3[0]/Tr+3*b4[0]/Tr**2)/Tr/vr0l-c2[0]/Tr/2/vr0l**2+d2[0]/5/Tr/vr0l**5+3*E)
-        E=c4[1]/(2*Tr**3*gamma[1])*(beta[1]+1-(beta[1]+1+gamma[1]/vrhl**2)*exp(-gamma[1]/vrhl**2))
-        Hh=-Tr*(zhl-1-(b2[1]+2*b3[1]/Tr+3*b4[1]/Tr**2)/Tr/vrhl-(c2[1]-3*c3[1]/Tr**2)/Tr/2/vrhl**2+d2[1]/5/Tr/vrhl**5+3*E)
-        Hl=H0+mezcla.f_acent/factor_acentrico_octano*(Hh-H0)
-        self.H_exc=r_[Hv, Hl]
-        self.x, self.xi, self.yi, self.Ki=srk._Flash()
-
-
-
-    # def Cp_Lee_Kesler(self, T, P, fase=None):
-        # """Método alternativo para el cálculo de la capacidad calorífica
-        # Procedure API 7D3.6 Pag.711"""
-        # Tr=self.tr(T)
-        # if fase==None:
-            # fase=self.Fase(T, P)
-        # Cv0, Cvh, vr0, vrh=eos.Lee_Kesler_lib_Cp(T, P, fase)
-
-        # B=0.1181193-0.265728/Tr-0.154790/Tr**2-0.030323/Tr**3
-        # C=0.0236744-0.0186984/Tr
-        # D=0.155488e-4+0.623689e-4/Tr
-        # dpdt_0=1/vr0*(1+(0.1181193+0.154790/Tr**2+2*0.030323/Tr**3)/vr0+0.0236744/vr0**2+0.155488e-4/vr0**5-2*0.042724/Tr**3/vr0**2*((0.65392+0.060167/vr0**2)*exp(-0.060167/vr0**2)))
-        # dpdv_0=-Tr/vr0**2*(1+2*B/vr0+3*C/vr0**2+6*D/vr0**5+0.042724/Tr**3/vr0**2*(3*0.65392+(5-2*(0.65392+0.060167/vr0**2))*0.060167/vr0**2)*exp(-0.060167/vr0**2))
-        # Cp0=1+Tr*dpdt_0**2/dpdv_0+Cv0
-
-        # B=0.2026579-0.331511/Tr-0.027655/Tr**2-0.203488/Tr**3
-        # C=0.0313385-0.0503618/Tr+0.016901/Tr**3
-        # D=0.48736e-4+0.0740336e-4/Tr
-        # dpdt_h=1/vrh*(1+(0.2026579+0.027655/Tr**2+2*0.203488/Tr**3)/vrh+(0.0313385-2*0.016901/Tr**3)/vrh**2+0.48736e-4/vrh**5-2*0.041577/Tr**3/vrh**2*((1.226+0.03754/vrh**2)*exp(-0.03754/vrh**2)))
-        # dpdv_h=-Tr/vrh**2*(1+2*B/vrh+3*C/vrh**2+6*D/vrh**5+0.041577/Tr**3/vrh**2*(3*1.226+(5-2*(1.226+0.03754/vrh**2))*0.03754/vrh**2)*exp(-0.03754/vrh**2))
-        # Cph=1+Tr*dpdt_h**2/dpdv_h+Cvh
-
-        # Cp_adimensional=Cp0+self.f_acent/factor_acentrico_octano*(Cph-Cp0)
-        # return unidades.SpecificHeat(self._Cpo(T).JgK-R/self.M*Cp_adimensional, "JgK")
-
-    # def Cv_Lee_Kesler(self, T, P, fase=None):
-        # """Método de cálculo de la capacidad calorífica a volumen constante
-        # Procedure API 7E1.6 Pag.726"""
-        # #FIXME: No sale, un factor de 100 tengo que añadir no sé de donde
-        # Pr=P/self.Pc
-        # Tr=T/self.Tc
-        # if fase==None:
-            # fase=self.Fase(T, P)
-        # Cpo=self._Cpo(T)
-        # Cv0, Cvh, vr0, vrh=eos.Lee_Kesler_lib_Cp(Tr, Pr, fase)
-        # Cv_adimensional=Cv0+self.f_acent/factor_acentrico_octano*(Cvh-Cv0)
-        # return unidades.SpecificHeat(100*(Cpo.JgK-R/self.M*(1+Cv_adimensional)), "JgK")
-
-
-    # def Cp_Cv_Lee_Kesler(self, T, P):
-        # """Método de cálculo de la capacidad calorífica a volumen constante
-        # Procedure API 7E1.6 Pag.726"""
-        # Cv=self.Cv_Lee_Kesler(T, P.atm)
-        # Cp=self.Cp_Lee_Kesler(T, P.atm)
-# #        print Cp.BtulbF, Cv
-        # return Cp/Cv
-
-
-    # def Fugacidad_Lee_Kesler(self, T, P):
-        # """Método de cálculo de la fugacidad
-        # Procedure API 7G1.8 Pag.752"""
-        # Tr=T/self.Tc
-        # Pr=P/self.Pc
-        # f=eos.Lee_Kesler_Fugacidad_lib(Tr, Pr, self.f_acent, self.Fase(T, P))
-        # return unidades.Pressure(P*exp(f), "atm")
-
-    # def Entropia_Lee_Kesler(self, T, P):
-        # """Método de cálculo de la entropia
-        # Procedure API 7F1.7 Pag.739"""
-        # Tr=T/self.Tc
-        # Pr=P/self.Pc
-        # S0=self._so(T)
-        # H_adimensional=eos.Lee_Kesler_Entalpia_lib(Tr, Pr, self.f_acent, self.Fase(T, P.atm))
-        # f=eos.Lee_Kesler_Fugacidad_lib(Tr, Pr, self.f_acent, self.Fase(T, P.atm))
-        # S=H_adimensional+f+log(P/101325)
-
-        # return unidades.SpecificHeat(S0.JgK-R*S/self.M, "JgK")
-
-    # def Hv_Lee_Kesler(self, T):
-        # """Método alternativo para el cálculo del calor de vaporización haciendo uso de las propiedades críticas
-        # Procedure API 7C1.16 Pag.680
-        # Valor en J/mol"""
-        # Pv=self.Pv_DIPPR(T)
-        # Tr=T/self.Tc
-        # Pr=Pv/self.Pc
-        # H_adimensional_vapor=eos.Lee_Kesler_Entalpia_lib(Tr, Pr, self.f_acent, 1)
-        # H_adimensional_liquido=eos.Lee_Kesler_Entalpia_lib(Tr, Pr, self.f_acent, 0)
-        # return unidades.Enthalpy(R*self.Tc/self.M*(H_adimensional_vapor-H_adimensional_liquido), "Jg")
-
-
-    # def RhoG_Lee_Kesler(self, T, P):
-        # a, b=eos.SRK_lib(self, T)
-        # Z_srk=eos.Z_Cubic_EoS(T, P, b, a, b, 0, b)
-        # Vvo=Z_srk[0]*R_atml*T/P
-
-        # vr0v, vrhv, vr0l, vrhl=eos.Lee_Kesler_lib(T/self.Tc, P/self.Pc.atm, fase=1, Vvo=Vvo)
-        # z0v=P/self.Pc.atm*vr0v/T*self.Tc
-        # zhv=P/self.Pc.atm*vrhv/T*self.Tc
-        # z=z0v+self.f_acent/factor_acentrico_octano*(zhv-z0v)
-        # return P/z/R_atml/T
+        self.T = unidades.Temperature(T)
+        self.P = unidades.Pressure(P, "atm")
+        self.mezcla = mezcla
+        self.componente = mezcla.componente
+        self.fraccion = mezcla.fraccion
+
+        xi = array(self.fraccion, dtype=float)
+        wi = array([cmp.f_acent for cmp in self.componente])
+        Tci = array([cmp.Tc for cmp in self.componente])
+        Zci = 0.2905-0.085*wi
+        Vci = Zci*R_atml*Tci/array([cmp.Pc.atm for cmp in self.componente])
+
+        Vmc = (xi @ Vci+3*(xi @ Vci**(2/3))*(xi @ Vci**(1/3)))/4
+        Tmc = (xi @ (Vci*Tci)+3*(xi @ (Vci**(2/3)*Tci**0.5)) *
+               (xi @ (Vci**(1/3)*Tci**0.5)))/4/Vmc
+        w = xi @ wi
+        Pmc = (0.2905-0.085*w)*R_atml*Tmc/Vmc
+
+        Tr = T/Tmc
+        Pr = P/Pmc
+        simple, ref = Lee_Kesler_lib(
+            [Tr, Tr], [Pr, Pr], [1, 0], props=("Z", "H"))
+        self.Z = simple["Z"]+w/w_ref*(ref["Z"]-simple["Z"])
+        self.V = self.Z*R_atml*self.T/self.P.atm  # mol/l
+        self.H_exc = simple["H"]+w/w_ref*(ref["H"]-simple["H"])
+
+        self._Tri = T/Tci
+        self._Pri = P/array([cmp.Pc.atm for cmp in self.componente])
+        self._wi = wi
+        self.x, self.xi, self.yi, self.Ki = self._Flash()
+
+    def _fug(self, Z, xi):
+        """Fugacity coefficient of components using the Lewis rule with the
+        pure components value, the phase is choosen by the Z value"""
+        if abs(Z-self.Z[0]) <= abs(Z-self.Z[1]):
+            fase = 1
+        else:
+            fase = 0
+        phi = Lee_Kesler_Fugacidad_lib(
+            self._Tri, self._Pri, self._wi, fase=fase*ones(len(xi), int))
+        return list(exp(atleast_1d(phi)))
 
 
 _all = [Lee_Kesler]
 
 if __name__ == "__main__":
     from lib.corriente import Mezcla
-    mezcla = Mezcla(1, ids=[98], caudalUnitarioMasico=[1.])
-    for T in [125, 135, 145, 165, 185, 205]:
-        eq = Virial(T, 1, mezcla)
-        print(eq.H_exc)
+    mezcla = Mezcla(2, ids=[10, 38, 22, 61],
+                    caudalUnitarioMolar=[0.3, 0.5, 0.05, 0.15])
+    eq = Lee_Kesler(340, 1., mezcla)
+    print(eq.x, eq.Ki)
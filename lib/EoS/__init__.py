@@ -18,7 +18,7 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 
-from PyQt5.QtWidgets import QApplication
+from lib.kernel import QApplication
 
 from . import BWRS
 from . import cubic
@@ -24,10 +24,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 
 from scipy import roots, r_, log, exp, sqrt
 
-from PyQt5.QtWidgets import QApplication
-
 from lib import unidades, config
 from lib.eos import EoS
+from lib.kernel import QApplication
 from lib.physics import R_atml
 from lib.bip import Kij
 
@@ -301,7 +300,7 @@ class SRK(Cubic):
         b=0.08664*R_atml*compuesto.Tc/compuesto.Pc.atm
         m=0.48+1.574*compuesto.f_acent-0.176*compuesto.f_acent**2
 
-        Config=config.getMainWindowConfig()
+        Config=config.getContext()
         Alpha_Mathias=Config.getint("Thermo","Alfa")
         if Alpha_Mathias==1 and Tr>1:
             d=1.+m/2.
@@ -358,7 +357,7 @@ class SRK_API(Cubic):
         b=0.08664*R_atml*compuesto.Tc/compuesto.Pc.atm
         m=0.48505+1.55171*compuesto.f_acent-0.15613*compuesto.f_acent**2
 
-        Config=config.getMainWindowConfig()
+        Config=config.getContext()
         Alpha_Mathias=Config.getint("Thermo","Alfa")
         if Alpha_Mathias==1 and Tr>1:
             d=1.+m/2.
@@ -459,7 +458,7 @@ class SRK_Graboski(Cubic):
         if not compuesto.SRKGraboski[1]:
             m=0.48505+1.55171*compuesto.f_acent-0.15613*compuesto.f_acent**2
 
-            Config=config.getMainWindowConfig()
+            Config=config.getContext()
             Alpha_Mathias=Config.getint("Thermo","Alfa")
             if Alpha_Mathias==1 and Tr>1:
                 d=1.+m/2.
@@ -520,7 +519,7 @@ class SRK_Mathias(Cubic):
         b=0.08664*R_atml*compuesto.Tc/compuesto.Pc.atm
         m=0.48508+1.55191*compuesto.f_acent-0.15613*compuesto.f_acent**2
 
-        Config=config.getMainWindowConfig()
+        Config=config.getContext()
         Alpha_Mathias=Config.getint("Thermo","Alfa")
         if Alpha_Mathias==1 and Tr>1:
             d=1.+m/2.+0.3*compuesto.Mathias
@@ -626,7 +625,7 @@ class SRK_Androulakis(Cubic):
         b=0.08664*R_atml*compuesto.Tc/compuesto.Pc.atm
         m=0.48508+1.55191*compuesto.f_acent-0.15613*compuesto.f_acent**2
 
-        Config=config.getMainWindowConfig()
+        Config=config.getContext()
         Alpha_Mathias=Config.getint("Thermo","Alfa")
         if Alpha_Mathias==1 and Tr>1:
             alfa=exp(compuesto.Androulakis[0]*(1-Tr**(2./3)))
@@ -680,7 +679,7 @@ class PR(Cubic):
         b=0.077796*R_atml*compuesto.Tc/compuesto.Pc.atm
         m=0.37464+1.54226*compuesto.f_acent-0.26992*compuesto.f_acent**2
 
-        Config=config.getMainWindowConfig()
+        Config=config.getContext()
         Alpha_Mathias=Config.getint("Thermo","Alfa")
         if Alpha_Mathias==1 and Tr>1:
             d=1.+m/2.
@@ -1018,7 +1017,7 @@ class PR_Mathias_Copeman(Cubic):
         a=0.457235*R_atml**2*compuesto.Tc**2/compuesto.Pc.atm
         b=0.077796*R_atml*compuesto.Tc/compuesto.Pc.atm
 
-        Config=config.getMainWindowConfig()
+        Config=config.getContext()
         Alpha_Mathias=Config.getint("Thermo","Alfa")
         if Alpha_Mathias==1 and Tr>1:
             alfa=(1+compuesto.MathiasCopeman[0]*(1-Tr**0.5))**2
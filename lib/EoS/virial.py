@@ -22,11 +22,15 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 # Virial equation of state implementation
 ###############################################################################
 
-from scipy import zeros, log, exp
+from collections import OrderedDict
+
+from numpy import (array, asarray, cbrt, einsum, exp, log, sqrt,
+                   triu_indices, where, zeros)
 from scipy.constants import R
-from scipy.misc import derivative
 
+from lib import sql
 from lib.eos import EoS
+from lib.physics import R_atml
 
 
 __doi__ = {
@@ -414,6 +418,77 @@ Bij_Database = {
         "40-38": [1.8243e3, -9.9756e5]}
 
 
+def _series(x, coef, n):
+    r"""Evaluate a sum of inverse powers and its scaled derivatives
+
+    .. math::
+        f = \sum_k c_k x^{-n_k}
+
+    Parameters
+    ----------
+    x : float or array
+        Independent variable, temperature or reduced temperature
+    coef : array
+        Coefficients, the last axis run over the terms of the sum, the other
+        axis are broadcasted with x
+    n : array
+        Exponents of terms
+
+    Returns
+    -------
+    f : array
+        Value of sum
+    f1 : array
+        x(∂f/∂x)
+    f2 : array
+        x²(∂²f/∂x²)
+    """
+    x = asarray(x, dtype=float)[..., None]
+    n = asarray(n, dtype=float)
+    t = asarray(coef, dtype=float)*x**-n
+    return t.sum(-1), (-n*t).sum(-1), (n*(n+1)*t).sum(-1)
+
+
+# Exponents and coefficients of Tsonopoulos and Meng correlations
+_nB = (0, 1, 2, 3, 6, 8)
+_Tsonopoulos = (
+    (0.1445, -0.33, -0.1385, -0.0121, 0, -0.000607),
+    (0.0637, 0, 0.331, -0.423, 0, -0.008),
+    (0, 0, 0, 0, 1, 0),
+    (0, 0, 0, 0, 0, -1))
+_Meng = (
+    (0.13356, -0.30252, -0.15668, -0.00724, 0, -0.00022),
+    (0.17404, -0.15581, 0.38183, -0.44044, 0, -0.00541),
+    (0, 0, 0, 0, 1, 0))
+
+# Exponents and coefficients of Orbey-Vera and Liu-Xiang correlations
+_nOV = (0, 2.8, 10.5, 3, 6)
+_OrbeyVera = (
+    (0.01407, 0.02432, -0.00313, 0, 0),
+    (-0.02676, 0.0177, -0.00228, 0.04, -0.003))
+_nLX = (0, 3, 6, 11)
+_LiuXiang = (
+    (0.1623538, 0.3087440, -0.01790184, -0.02789157),
+    (-0.5390344, 1.783526, -1.055391, 0.09955867),
+    (34.22804, -74.76559, 279.9220, -62.85431))
+
+
+def _coef(terms, *args):
+    """Linear combination of correlation terms with the compound parameters
+    given in args, broadcasting the parameters over the terms"""
+    c = array(terms[0], dtype=float)
+    for term, arg in zip(terms[1:], args):
+        c = c + asarray(arg, dtype=float)[..., None]*array(term)
+    return c
+
+
+# Exponents and coefficients of Meng third virial coefficient correlation
+_nC = (0, 0.1, 0.2, 0.3, 1)
+_Meng_C = (
+    (1094.051, -3334.145, 3389.848, -1149.58, 0),
+    (2.0243e-10, 0, 0, 0, -0.85902e-10))
+
+
 def B_Tsonopoulos(T, Tc, Pc, w, mu=None):
     r"""Calculate the 2nd virial coefficient using the Tsonopoulos correlation
 
@@ -482,26 +557,17 @@ def B_Tsonopoulos(T, Tc, Pc, w, mu=None):
     [3]_ Tsonopoulos, C. An empirical correlation of second virial
         coefficients. AICHE Journal 20, pp 263 (1974)
     """
-    Tr = T/Tc
-    if mu:
-        mur = mu**2*Pc/1.01325/Tc**2
-        a = -2.14e-4*mur-7.831e-21*mur**8
-        b = 0.00908+0.0006957*mur
-    else:
-        a, b = 0, 0
-
-    def f(T):
-        f0 = 0.1445-0.33/Tr-0.1385/Tr**2-0.0121/Tr**3-0.000607/Tr**8
-        f1 = 0.0637+0.331/Tr**2-0.423/Tr**3-0.008/Tr**8
-        f2 = 1/Tr**6
-        f3 = -1/Tr**8
-        f = f0 + w*f1 + a*f2 + b*f3
-        return f*R*Tc/Pc*1e3
-
-    B = f(T)
-    B1 = derivative(f, T, n=1)
-    B2 = derivative(f, T, n=2)
-    return B, B1, B2
+    Tc = asarray(Tc, dtype=float)
+    Pc = asarray(Pc, dtype=float)
+    if mu is None:
+        mu = 0
+    mur = asarray(mu, dtype=float)**2*Pc/1.01325/Tc**2
+    a = -2.14e-4*mur-7.831e-21*mur**8
+    b = where(mur > 0, 0.00908+0.0006957*mur, 0)
+
+    f, f1, f2 = _series(T/Tc, _coef(_Tsonopoulos, w, a, b), _nB)
+    k = R*Tc/Pc*1e3
+    return f*k, f1*k, f2*k
 
 
 def B_IglesiasSilva(T, Tc, Pc, Vc, w, D):
@@ -575,14 +641,24 @@ def B_IglesiasSilva(T, Tc, Pc, Vc, w, D):
     bo = Vc*(0.1368-0.4791*w+13.81*(TB/Tc)**2*exp(-1.95*TB/Tc))        # Eq 15
     Bc = Vc*(-1.1747-0.3668*w-0.00061*muR)
 
-    def f(T):
-        # Eq 12
-        return bo*(TB/T)**.2 * (1-(TB/T)**.8) * \
-            (Bc/bo/((TB/Tc)**.2-TB/Tc))**((Tc/T)**n)
-
-    B = f(T)
-    B1 = derivative(f, T, n=1)
-    B2 = derivative(f, T, n=2)
+    # Eq 12 as product of the temperature dependent factors
+    #   g1 = u^0.2(1-u^0.8), with u = TB/T
+    #   g2 = K^s, with s = (Tc/T)^n
+    # derivatives calculated with the operator D = T·∂/∂T
+    u = TB/T
+    g1 = u**.2 - u
+    Dg1 = -0.2*u**.2 + u
+    D2g1 = 0.04*u**.2 - u
+
+    s = (Tc/T)**n
+    lnK = log(Bc/bo/((TB/Tc)**.2-TB/Tc))
+    g2 = exp(s*lnK)
+    Dg2 = -n*s*lnK*g2
+    D2g2 = -n*lnK*s*(Dg2-n*g2)
+
+    B = bo*g1*g2
+    B1 = bo*(Dg1*g2 + g1*Dg2)
+    B2 = bo*(D2g1*g2 + 2*Dg1*Dg2 + g1*D2g2) - B1
 
     return B, B1, B2
 
@@ -647,19 +723,9 @@ def B_Meng(T, Tc, Pc, w, D):
     mur = D**2*Pc/1.01325/Tc**2
     a = -3.0309e-6*mur**2 + 9.503e-11*mur**4 - 1.2469e-15*mur**6
 
-    def f(T):
-        Tr = T/Tc
-        f0 = .13356 - .30252/Tr - .15668/Tr**2 - .00724/Tr**3 - .00022/Tr**8
-        f1 = .17404 - .15581/Tr + .38183/Tr**2 - .44044/Tr**3 - .00541/Tr**8
-        f2 = 1/Tr**6
-        f = f0 + w*f1 + a*f2
-        return f*R*Tc/Pc*1e3
-
-    B = f(T)
-    B1 = derivative(f, T, n=1)
-    B2 = derivative(f, T, n=2)
-
-    return B, B1, B2
+    f, f1, f2 = _series(T/Tc, _coef(_Meng, w, a), _nB)
+    k = R*Tc/Pc*1e3
+    return f*k, f1*k, f2*k
 
 
 def C_Orbey_Vera(T, Tc, Pc, w):
@@ -700,18 +766,9 @@ def C_Orbey_Vera(T, Tc, Pc, w):
     [4]_ Orbey, H., Vera, J.H.: Correlation for the third virial coefficient
         using Tc, Pc and ω as parameters, AIChE Journal 29, 107 (1983)
     """
-    def f(T):
-        Tr = T/Tc
-        g0 = 0.01407+0.02432/Tr**2.8-0.00313/Tr**10.5
-        g1 = -0.02676+0.0177/Tr**2.8+0.04/Tr**3-0.003/Tr**6-0.00228/Tr**10.5
-        g = g0+w*g1
-        return g*R**2*Tc**2/Pc**2
-
-    C = f(T)
-    C1 = derivative(f, T, n=1)
-    C2 = derivative(f, T, n=2)
-
-    return C, C1, C2
+    f, f1, f2 = _series(T/Tc, _coef(_OrbeyVera, w), _nOV)
+    k = R**2*Tc**2/Pc**2
+    return f*k, f1*k, f2*k
 
 
 def C_Liu_Xiang(T, Tc, Pc, w, Zc):
@@ -747,20 +804,9 @@ def C_Liu_Xiang(T, Tc, Pc, w, Zc):
         Issue 6, pp 1667-1680
     """
     X = (Zc-0.29)**2
-
-    def f(T):
-        Tr = T/Tc
-        g0 = 0.1623538 + 0.3087440/Tr**3 - 0.01790184/Tr**6 - 0.02789157/Tr**11
-        g1 = -0.5390344 + 1.783526/Tr**3 - 1.055391/Tr**6 + 0.09955867/Tr**11
-        g2 = 34.22804 - 74.76559/Tr**3 + 279.9220/Tr**6 - 62.85431/Tr**11
-        g = g0+w*g1+X*g2
-        return g*R**2*Tc**2/Pc**2
-
-    C = f(T)
-    C1 = derivative(f, T, n=1)
-    C2 = derivative(f, T, n=2)
-
-    return C, C1, C2
+    f, f1, f2 = _series(T/Tc, _coef(_LiuXiang, w, X), _nLX)
+    k = R**2*Tc**2/Pc**2
+    return f*k, f1*k, f2*k
 
 
 def C_Meng(T, Tc, Pc, D, B):
@@ -805,166 +851,337 @@ def C_Meng(T, Tc, Pc, D, B):
     """
     mur = D**2*Pc/1.01325/Tc**2
 
-    def f(T, *args):
-        B = args[-1]
-        Br = B*Pc/R/Tc
-        Tr = T/Tc
-        f0 = 1094.051 - 3334.145/Tr**0.1 + 3389.848/Tr**0.2 - 1149.58/Tr**0.3
-        f1 = (2.0243-0.85902/Tr)*1e-10
-        return 5.476e-3 + (Br-0.0936)**2*(f0+mur**4*f1)
+    # Reduced second virial coefficient and its derivatives, using the
+    # operator D = T·∂/∂T
+    k = Pc/R/Tc
+    Br = B[0]*k
+    DBr = B[1]*k
+    D2Br = (B[2]+B[1])*k
+
+    c = _coef(_Meng_C, mur**4)
+    h, Dh, h2 = _series(T/Tc, c, _nC)
+    D2h = h2+Dh
+
+    x = Br-0.0936
+    C = 5.476e-3 + x**2*h
+    C1 = 2*x*DBr*h + x**2*Dh
+    C2 = 2*DBr**2*h + 2*x*D2Br*h + 4*x*DBr*Dh + x**2*D2h - C1
+    return C, C1, C2
 
-    C = f(T, B[0])
-    C1 = derivative(f, T, n=1, args=(T, B[1]))
-    C2 = derivative(f, T, n=2, args=(T, B[2]))
 
-    return C, C1, C2
+# Coefficients for hydrogen and helium, with different expression below and
+# over the given temperature, ref [1]_
+_B_special = {
+    1: (60, [2.0375e1, -2.2113e3, -2.0892e4, -6.5299e4],
+        [1.7472e1, 1.2926e2, -2.6988e5, 8.0282e6]),
+    212: (35.1, [1.5943e1, -3.4601e2, -5.9545e2, 1.9929e3, 2.2269e3],
+          [9.2479, 1.0876e3, -1.088e5, 2.3869e6])}
+
+# Pair parameters of the mixtures, indexed by the tuple of compound ids
+_pairs = OrderedDict()
+_pairs_size = 128
+
+# Virial coefficients already calculated, indexed by the tuple of compound
+# ids, temperature and third virial coefficient correlation. The least
+# recently used entries of both caches are discarded when the cache is full,
+# and all when the databank generation changes from _generation
+_cache = OrderedDict()
+_cache_size = 512
+_generation = None
+
+
+def _checkGeneration():
+    """Clear the caches if the databank has changed since they were filled"""
+    global _generation
+    if _generation != sql.generation:
+        _pairs.clear()
+        _cache.clear()
+        _generation = sql.generation
+
+
+def _pair_parameters(componente):
+    """Calculate the parameters of all pure and cross interactions of a
+    mixture, the cross parameters using the combining rules of Prausnitz.
+    The interactions are saved in the upper triangle order of numpy
+    triu_indices.
+
+    The parameters only depend of the compounds so are saved in cache
+    indexed by the compound ids
+    """
+    _checkGeneration()
+    ids = tuple(cmp.id for cmp in componente)
+    if ids in _pairs:
+        _pairs.move_to_end(ids)
+        return _pairs[ids]
+
+    n = len(componente)
+    Tc = array([cmp.Tc for cmp in componente], dtype=float)
+    Pc = array([cmp.Pc for cmp in componente], dtype=float)
+    w = array([cmp.f_acent for cmp in componente], dtype=float)
+    Zc = array([cmp.Zc for cmp in componente], dtype=float)
+    mu = array([cmp.dipole.Debye for cmp in componente], dtype=float)
+
+    # Critical molar volume, [m³/mol]
+    Vc = array([cmp.Vc*cmp.M/1000 for cmp in componente], dtype=float)
+
+    i, j = triu_indices(n)
+    pure = i == j
+    Tcij = sqrt(Tc[i]*Tc[j])
+    Zcij = (Zc[i]+Zc[j])/2
+    Vcij = ((cbrt(Vc[i])+cbrt(Vc[j]))/2)**3
+    Pcij = Pc[i].copy()
+    cross = ~pure & (Vcij > 0)
+    Pcij[cross] = Zcij[cross]*R*Tcij[cross]/Vcij[cross]
+
+    # Experimental second virial coefficients, the hydrogen and helium
+    # coefficients are selected in evaluation
+    coef = zeros((len(i), 5))
+    db = zeros(len(i), dtype=bool)
+    special = {}
+    for k, (ii, jj) in enumerate(zip(i, j)):
+        if ii == jj and ids[ii] in _B_special:
+            special[k] = _B_special[ids[ii]]
+            db[k] = True
+            continue
+        elif ii == jj:
+            c = B_Database.get(ids[ii])
+        else:
+            c = Bij_Database.get("%i-%i" % (ids[ii], ids[jj]))
+            if c is None:
+                c = Bij_Database.get("%i-%i" % (ids[jj], ids[ii]))
+        if c:
+            coef[k, :len(c)] = c
+            db[k] = True
+
+    par = {"n": n, "i": i, "j": j, "Tc": Tcij, "Pc": Pcij,
+           "w": (w[i]+w[j])/2, "Zc": Zcij, "mu": where(pure, mu[i], 0),
+           "coef": coef, "db": db, "special": special}
+    _pairs[ids] = par
+    if len(_pairs) > _pairs_size:
+        _pairs.popitem(last=False)
+    return par
+
+
+def _symmetric(par, *values):
+    """Expand the pair values in the upper triangle order to symmetric
+    matrix"""
+    i, j, n = par["i"], par["j"], par["n"]
+    matrix = []
+    for value in values:
+        m = zeros((n, n))
+        m[i, j] = value
+        m[j, i] = value
+        matrix.append(m)
+    return matrix
+
+
+def virial_coefficients(componente, T, C=0):
+    r"""Calculate the second and third virial coefficients of all pure and
+    cross interactions of a mixture, with their temperature derivatives
+
+    The second virial coefficient is calculated from the experimental
+    correlations of [1]_ and [2]_ when available, else the Tsonopoulos
+    correlation is used. The third virial coefficient for pairs use the
+    Liu-Xiang or Orbey-Vera correlation, the triple coefficients are
+    calculated with the Orbey-Vera combining rule:
+
+    .. math::
+        C_{ijk} = \left(C_{ij}C_{jk}C_{ik}\right)^{1/3}
+
+    The results are saved in cache, so the calculation at the same
+    temperature of any mixture of the same compounds is immediate
+
+    Parameters
+    ----------
+    componente : list
+        List of :class:`lib.compuestos.Componente` instances
+    T : float
+        Temperature, [K]
+    C : int, optional
+        Third virial coefficient correlation
+            0 - Liu-Xiang (default)
+            1 - Orbey-Vera
+
+    Returns
+    -------
+    B : list
+        Arrays with shape (n, n) with B, T(∂B/∂T), T²(∂²B/∂T²), [l/mol]
+    C : list
+        Arrays with shape (n, n, n) with C, T(∂C/∂T), T²(∂²C/∂T²),
+        [l²/mol²]
+
+    Examples
+    --------
+    >>> from lib.compuestos import Componente
+    >>> cmp = [Componente(2), Componente(3)]
+    >>> B, C = virial_coefficients(cmp, 300)
+    >>> "%0.4f %0.4f %0.4f" % (B[0][0, 0], B[0][0, 1], B[0][1, 1])
+    '-0.0364 -0.0896 -0.1824'
+    >>> C[0].shape
+    (2, 2, 2)
+    >>> virial_coefficients(cmp, 300) is virial_coefficients(cmp, 300)
+    True
+
+    The cache is cleared when the databank changes
+
+    >>> from lib import sql
+    >>> B, C = virial_coefficients(cmp, 300)
+    >>> sql.invalidate()
+    >>> virial_coefficients(cmp, 300)[0] is B
+    False
+    """
+    _checkGeneration()
+    key = (tuple(cmp.id for cmp in componente), float(T), int(C))
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    par = _pair_parameters(componente)
+    T = float(T)
+
+    # Second virial coefficients
+    B, B1, B2 = B_Tsonopoulos(T, par["Tc"], par["Pc"], par["w"], par["mu"])
+    db = par["db"]
+    if db.any():
+        coef = par["coef"].copy()
+        for k, (Tlim, low, high) in par["special"].items():
+            c = low if T < Tlim else high
+            coef[k, :] = 0
+            coef[k, :len(c)] = c
+        Bdb = _series(T, coef[db], range(5))
+        for value, exp_value in zip((B, B1, B2), Bdb):
+            value[db] = exp_value*1e-3
+
+    # Third virial coefficients for pairs, converted to l²/mol²
+    if C:
+        Cij = C_Orbey_Vera(T, par["Tc"], par["Pc"], par["w"])
+    else:
+        Cij = C_Liu_Xiang(T, par["Tc"], par["Pc"], par["w"], par["Zc"])
+    C, C1, C2 = _symmetric(par, *[c*1e6 for c in Cij])
+
+    # Triple interactions, derivatives calculated with the operator
+    # D = T·∂/∂T, using D²C = T²(∂²C/∂T²) + D(C)
+    a, b, c = C[:, :, None], C[None, :, :], C[:, None, :]
+    Da, Db, Dc = C1[:, :, None], C1[None, :, :], C1[:, None, :]
+    D2 = C2+C1
+    D2a, D2b, D2c = D2[:, :, None], D2[None, :, :], D2[:, None, :]
+    P = a*b*c
+    DP = Da*b*c + a*Db*c + a*b*Dc
+    D2P = D2a*b*c + a*D2b*c + a*b*D2c + 2*(Da*Db*c + Da*b*Dc + a*Db*Dc)
+    Cijk = cbrt(P)
+    Cijk2 = Cijk**2
+    Cijk2[Cijk2 == 0] = 1
+    DCijk = DP/3/Cijk2
+    D2Cijk = D2P/3/Cijk2 - 2*DP**2/9/Cijk2**2/Cijk2*Cijk
+    C = [Cijk, DCijk, D2Cijk-DCijk]
+
+    B = _symmetric(par, B, B1, B2)
+    for value in B+C:
+        value.setflags(write=False)
+
+    _cache[key] = B, C
+    if len(_cache) > _cache_size:
+        _cache.popitem(last=False)
+    return B, C
 
 
 class Virial(EoS):
-    """Class to model virial equation of state"""
-
-    def __init__(self, *args, **kwargs):
-        EoS.__init__(self, *args, **kwargs)
-        self._physics(*args)
-
-    def _Bi(self):
-        """Second virial coefficient muxture contributions"""
-        B = []
-        Bt = []
-        Btt = []
-        for comp in self.componente:
-            if comp.indice in B_Database:
-                if comp.indice == 1:  # Hydrogen special case
-                    if self.T < 60:
-                        coef = [2.0375e1, -2-2113e3, -2.0892e4, -6.5299e4]
-                    else:
-                        coef = [1.7472e1, 1.2926e2, -2.6988e5, 8.0282e6]
-                elif comp.indice == 212:   # Helium special case
-                    if self.T < 35.1:
-                        coef = [1.5943e1, -3.4601e2, -5.9545e2, 1.9929e3,
-                                2.2269e3]
-                    else:
-                        coef = [9.2479, 1.0876e3, -1.088e5, 2.3869e6]
-                else:
-                    coef = B_Database[comp.indice]
-                Bi, Bit, Bitt = self._B_Database(coef)
-            else:
-                # Use general correlation
-                Bi, Bit, Bitt = B_Tsonopoulos(
-                        self.T, comp.Tc, comp.Pc, comp.f_acent,
-                        comp.dipole)
-        B.append(Bi)
-        Bt.append(Bit)
-        Btt.append(Bitt)
-        return B, Bt, Btt
-
-    def _Ci(self):
-        """Third virial coefficient mixture contributions"""
-        C = []
-        Ct = []
-        Ctt = []
-        for comp in self.componente:
-            if self.kwargs.get("C", 0):
-                Ci, Cit, Citt = C_Orbey_Vera(
-                    self.T, comp.Tc, comp.Pc, comp.f_acent)
-            else:
-                Ci, Cit, Citt = C_Liu_Xiang(
-                    self.T, comp.Tc, comp.Pc, comp.f_acent, comp.Zc)
-            C.append(Ci)
-            Ct.append(Cit)
-            Ctt.append(Citt)
-        return C, Ct, Ctt
+    r"""Virial equation of state truncated after the third coefficient,
+    only valid for gases at low and moderate pressure
+
+    .. math::
+        Z = 1 + B\frac{P}{RT} + \left(C-B^2\right)\left(\frac{P}{RT}\right)^2
+
+    .. math::
+        B = \sum_i\sum_j x_ix_jB_{ij}
+
+    .. math::
+        C = \sum_i\sum_j\sum_k x_ix_jx_kC_{ijk}
+
+    The interaction coefficients are calculated with
+    :func:`virial_coefficients`
+
+    Parameters
+    ----------
+    T : float
+        Temperature, [K]
+    P : float
+        Pressure, [atm]
+    mezcla : Mezcla
+        Mixture instance
+    C : int, optional
+        Third virial coefficient correlation, 0 Liu-Xiang, 1 Orbey-Vera
+
+    Examples
+    --------
+    >>> from lib.mezcla import Mezcla
+    >>> mix = Mezcla(2, ids=[2, 3], caudalUnitarioMolar=[0.9, 0.1])
+    >>> eq = Virial(300, 10, mix)
+    >>> "%0.4f" % eq.Z
+    '0.9860'
+    """
+    __title__ = "Virial"
+    __status__ = "Virial"
+
+    def __init__(self, T, P, mezcla, **kwargs):
+        EoS.__init__(self, T, P, mezcla, **kwargs)
+        self.x = array(self.fraccion, dtype=float)
+        self._coef = virial_coefficients(
+            self.componente, T, self.kwargs.get("C", 0))
+        self._physics(T, P, mezcla)
 
     def B(self):
-        """Second virial coefficient calculation"""
-        Bi, Bit, Bitt = self._Bi()
-        B, Bt, Btt = 0, 0, 0
-        for i, xi in enumerate(self.fraccion):
-            for j, xj in enumerate(self.fraccion):
-                if i == j:
-                    Bij = Bi[i]
-                    Bijt = Bit[i]
-                    Bijtt = Bitt[i]
-                elif "%i-%i" % (i, j) in Bij_Database:
-                    id = "%i-%i" % (i, j)
-                    coef = Bij_Database[id]
-                    Bij, Bijt, Bijtt = self._B_Database(coef)
-                elif "%i-%i" % (j, i) in Bij_Database:
-                    id = "%i-%i" % (j, i)
-                    coef = Bij_Database[id]
-                    Bij, Bijt, Bijtt = self._B_Database(coef)
-                else:
-                    ci = self.componente[i]
-                    cj = self.componente[j]
-                    Tcij = (ci.Tc*cj.Tc)**0.5
-                    Pcij = 4*Tcij*(ci.Zc+cj.Zc)/(ci.Vc**(1/3)+cj.Vc**(1/3))**3
-                    wij = 0.5*(ci.f_acent+cj.f_acent)
-                    Bij, Bijt, Bijtt = self._B_Tsonopoulos(Tcij, Pcij, wij)
-                B += xi*xj*Bij
-                Bt += xi*xj*Bijt
-                Btt += xi*xj*Bijtt
-        return B, Bt, Btt
-
-    def _B_Database(self, args):
-        """Calculate second virial coefficient, its 1st and 2nd temperature
-        derivarives from coefficient in database"""
-        B = 0
-        Bt = 0
-        Btt = 0
-        for i, a in enumerate(args):
-            B += a/self.T**i
-            Bt += -a*i*self.T**(i-1)
-            Btt += a*i*(i-1)*self.T**(i-2)
-        return B, Bt, Btt
+        """Second virial coefficient of mixture and its temperature
+        derivatives, T(∂B/∂T) and T²(∂²B/∂T²), [l/mol]"""
+        return [self.x @ B @ self.x for B in self._coef[0]]
 
     def C(self):
-        """Third virial coefficient calculation"""
-        Ci, Cit, Citt = self._Ci()
-        Cij = zeros((len(Ci), len(Ci)))
-        Cijt = zeros((len(Ci), len(Ci)))
-        Cijtt = zeros((len(Ci), len(Ci)))
-        for i, xi in enumerate(self.fraccion):
-            for j, xj in enumerate(self.fraccion):
-                if i == j:
-                    Cij[i, j] = Ci[i]
-                    Cijt[i, j] = Cit[i]
-                    Cijtt[i, j] = Citt[i]
-                else:
-                    ci = self.componente[i]
-                    cj = self.componente[j]
-                    Tcij = (ci.Tc*cj.Tc)**0.5
-                    Vcij = (ci.Vc**(1./3)+cj.Vc**(1./3))**3
-                    Pcij = 4*Tcij*(ci.Zc+cj.Zc)/Vcij
-                    wij = 0.5*(ci.f_acent+cj.f_acent)
-                    if self.kwargs.get("C", 0):
-                        Cij[i, j] = self._C_Orbey_Vera(Tcij, Pcij, wij)
-                    else:
-                        Zcij = Pcij*Vcij/R/Tcij
-                        Cij[i, j] = self._C_Liu_Xiang(Tcij, Pcij, wij, Zcij)
-
-        C, Ct, Ctt = 0, 0, 0
-        for i, xi in enumerate(self.fraccion):
-            for j, xj in enumerate(self.fraccion):
-                for k, xk in enumerate(self.fraccion):
-                    C += xi*xj*xk*(Cij[i, j]*Cij[j, k]*Cij[j, k])**(1./3)
-        return C, Ct, Ctt
+        """Third virial coefficient of mixture and its temperature
+        derivatives, T(∂C/∂T) and T²(∂²C/∂T²), [l²/mol²]"""
+        x = self.x
+        return [einsum("i,j,k,ijk", x, x, x, C) for C in self._coef[1]]
 
     def _physics(self, T, P, mezcla):
         """Properties of Gases calculation. Explanation in [1]_ section 1.4"""
         B, B1, B2 = self.B()
         C, C1, C2 = self.C()
 
-        self.Z = 1+B*(P/R/T)+(C-B**2)*(P/R/T)**2
-        V = self.Z*R*T/P
+        rho = P/R_atml/T
+        self.Z = 1+B*rho+(C-B**2)*rho**2
+        V = self.Z/rho
+        self.V = V
+        lnZ = log(self.Z)
+
+        # Residual properties, [J/mol] and [J/molK]
         self.U_exc = -R*T*(B1/V+C1/2/V**2)
         self.H_exc = R*T*((B-B1)/V+(2*C-C1)/2/V**2)
         self.Cv_exc = -R*((2*B1+B2)/V+(2*C1+C2)/2/V**2)
-        self.Cp_exc = -R*(B2/V-((B-B1)**2-(C-C1)-C2/2)/V**2)
-        self.S_exc = -R*(log(P)+B1/V+(B**2-C+C1)/2/V**2)
-        self.A_exc = R*T*(log(P)+(B**2-C/2/V**2))
-        self.G_exc = R*T*(log(P)+B/V+(B**2+C)/2/V**2)
-
-        self.fug = P*exp(B/V+(C+B**2)/2/V**2)
+        dPdT = 1+(B+B1)/V+(C+C1)/V**2
+        dPdV = 1+2*B/V+3*C/V**2
+        self.Cp_exc = self.Cv_exc + R*dPdT**2/dPdV - R
+        self.S_exc = R*(lnZ-(B+B1)/V-(C+C1)/2/V**2)
+        self.G_exc = R*T*(2*B/V+3*C/2/V**2-lnZ)
+        self.A_exc = self.G_exc - R*T*(self.Z-1)
+
+        self.phi = self._fug(self.Z, self.x)
+        self.fug = P*exp(self.G_exc/R/T)
+
+    def _fug(self, Z, xi):
+        r"""Fugacity coefficient of components in gas phase
+
+        .. math::
+            \ln\phi_i = \frac{2}{V}\sum_j x_jB_{ij} +
+            \frac{3}{2V^2}\sum_j\sum_k x_jx_kC_{ijk} - \ln Z
+        """
+        x = asarray(xi, dtype=float)
+        V = Z*R_atml*self.T/self.P.atm
+        Bij = self._coef[0][0]
+        Cijk = self._coef[1][0]
+        lnphi = 2*Bij@x/V + 1.5*einsum("ijk,j,k", Cijk, x, x)/V**2 - log(Z)
+        return list(exp(lnphi))
+
+
+_all = [Virial]
 
 
 if __name__ == "__main__":
@@ -25,10 +25,21 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 
 import glob
+from importlib import import_module
 import os
 
 
-files = sorted(glob.glob(os.path.join("lib", "*.py")))
+# Environment defined at start of graphical interface, default values for
+# the use of library without it, the optional modules are disabled unless it
+# are enabled in the environment
+os.environ.setdefault("CheProcess", os.path.dirname(
+    os.path.dirname(os.path.abspath(__file__))) + os.sep)
+for module in ("freesteam", "CoolProp", "refprop", "pybel", "ezodf",
+               "openpyxl", "xlwt", "icu", "reportlab", "pyarrow"):
+    os.environ.setdefault(module, "")
+
+
+files = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py")))
 __all__ = ["EoS", "mEoS"]
 
 for file in files:
@@ -36,6 +47,10 @@ for file in files:
     if fname != "__init__":
         __all__.append(fname)
 
-for module in __all__:
-    child_module = "lib." + module
-    __import__(child_module)
+
+def __getattr__(name):
+    """Import the submodules on first access, so a calculation module can be
+    imported without loading the graphical modules of library"""
+    if name in __all__:
+        return import_module("lib." + name)
+    raise AttributeError("module 'lib' has no attribute '%s'" % name)
@@ -0,0 +1,296 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the batch solution of project files without graphical
+interface, used by the --batch option of cheprocess:
+
+  * :func:`loadProject`: Load a project file
+  * :func:`results`: Tables with the results of streams and equipments
+  * :func:`solveFile`: Solve a project file and save its results
+  * :func:`runBatch`: Solve several project files in parallel
+"""
+
+
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from importlib import import_module
+import json
+import logging
+from numbers import Number
+import os
+
+from numpy import ndarray
+
+from lib import profiler, projectFile
+from lib.config import configContext
+from lib.corriente import Corriente
+from lib.kernel import QApplication
+
+
+# Exit codes of batch solution
+SOLVED = 0
+FAILED = 1
+LOAD_ERROR = 2
+
+
+def _available(module):
+    """Check if the optional module is available, the environment variable
+    is defined for the graphical interface, else the module is imported"""
+    if os.environ.get(module) == "True":
+        return True
+    try:
+        import_module(module)
+    except ImportError:
+        return False
+    os.environ[module] = "True"
+    return True
+
+
+def loadProject(fname):
+    """Load the project file fname, without change the configuration files of
+    graphical interface"""
+    data = projectFile.readData(fname)
+
+    missing = [dep for dep in data.get("external_dependences", ())
+               if not _available(dep)]
+    if missing:
+        msg = QApplication.translate("pychemqt", "This project require")
+        raise ImportError("%s: %s" % (msg, ", ".join(missing)))
+
+    return projectFile.load(fname, data, temporal=False)
+
+
+def _value(value):
+    """Convert the property value to a json serializable value, the
+    magnitudes as float in base unit"""
+    if isinstance(value, ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_value(x) for x in value]
+    if isinstance(value, Number):
+        return float(value)
+    if value is None or isinstance(value, str):
+        return value
+    return str(value)
+
+
+def _properties(entity):
+    """Return a dict with the status and the properties of entity"""
+    values = {"status": entity.status, "msg": entity.msg}
+    if not entity.status:
+        return values
+    for name, attr, unit in entity.propertiesNames():
+        if not isinstance(attr, str):
+            continue
+        try:
+            value = entity._prop(attr)
+        except (AttributeError, KeyError, IndexError, NameError):
+            # Property not calculated for the entity options
+            continue
+        values[attr] = _value(value)
+    return values
+
+
+def results(project):
+    """Return the results of project as dicts of streams and equipments
+    properties, indexed by its id
+
+    >>> from tools import firstrun
+    >>> from lib.project import Project
+    >>> from equipment.heatExchanger import Heat_Exchanger
+    >>> cfg = firstrun.config()
+    >>> cfg.set("Components", "Components", "[2]")
+    >>> cfg.set("Thermo", "MEoS", "True")
+    >>> with configContext(cfg):
+    ...     project = Project(items={}, streams={}, config=cfg)
+    ...     project.addItem("i1", Corriente(
+    ...         T=300, P=1e5, caudalMasico=1, fraccionMolar=[1]))
+    ...     project.addItem("e1", Heat_Exchanger(Tout=350))
+    ...     project.addItem("o1", Corriente())
+    ...     project.addStream(1, "i1", "e1")
+    ...     project.addStream(2, "e1", "o1")
+    ...     convergence = project.solve()
+    ...     streams, equipment = results(project)
+    >>> streams["s2"]["up"], streams["s2"]["T"]
+    ('e1', 350.0)
+    >>> equipment["e1"]["status"], equipment["e1"]["className"]
+    (1, 'Heat_Exchanger')
+    """
+    streams = {}
+    for id, (up, down, ind_up, ind_down, obj) in sorted(
+            project.streams.items()):
+        stream = {"up": up, "down": down}
+        stream.update(_properties(obj))
+        streams["s%i" % id] = stream
+
+    equipment = {}
+    for key, equip in sorted(project.items.items()):
+        if key[0] == "e":
+            equipment[key] = _properties(equip)
+    return streams, equipment
+
+
+def _writeCSV(base, streams, equipment):
+    """Write the results tables of streams and equipments to csv files, the
+    streams with a column by property and the equipments with a row by
+    property"""
+    header = ["id", "up", "down", "status", "msg"]
+    header += [attr for name, attr, unit in Corriente.propertiesNames()
+               if isinstance(attr, str) and attr not in header]
+    with open(base + "_streams.csv", "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for id, stream in streams.items():
+            row = [id] + [stream.get(attr) for attr in header[1:]]
+            writer.writerow(row)
+
+    with open(base + "_equipment.csv", "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["id", "property", "value"])
+        for id, equip in equipment.items():
+            for attr, value in equip.items():
+                writer.writerow([id, attr, value])
+
+
+def solveFile(fname, output=None, formats=("json", "csv"), tol=1e-6,
+              profile=False):
+    """Solve the project file fname and save the results in the output
+    directory, by default the file directory
+
+    Parameters
+    ----------
+    fname : str
+        Path of project file
+    output : str, optional
+        Directory to save the results
+    formats : list, optional
+        Formats of results files, json and csv
+    tol : float, optional
+        Tolerance of recycles convergence
+    profile : bool, optional
+        Save the profiling report and chrome trace of the solution
+
+    Returns
+    -------
+    code : int
+        Status of solution, SOLVED, FAILED if any equipment isn't solved or
+        any recycle don't converge, or LOAD_ERROR
+    msg : str
+        Description of errors
+    """
+    try:
+        project = loadProject(fname)
+    except Exception as error:
+        logging.exception("Failed to load %s" % fname)
+        return LOAD_ERROR, str(error)
+
+    if output is None:
+        output = os.path.dirname(os.path.abspath(fname))
+    base = os.path.join(output, os.path.splitext(os.path.basename(fname))[0])
+
+    with configContext(project.config):
+        if profile:
+            profiler.reset()
+            profiler.enable(trace=True)
+        try:
+            project.solve(tol=tol)
+        except Exception as error:
+            logging.exception("Failed to solve %s" % fname)
+            return FAILED, str(error)
+        finally:
+            if profile:
+                profiler.disable()
+                with open(base + "_profile.txt", "w") as file:
+                    file.write(profiler.report() + os.linesep)
+                profiler.writeTrace(base + "_trace.json")
+        streams, equipment = results(project)
+
+    # Last iteration of each recycle
+    recycles = {}
+    for record in project.convergence:
+        recycles[record.section] = record
+    errors = ["recycle %s not converged: %s" % (
+        ", ".join(map(str, section)), reason)
+        for section, reason in project.unconverged.items()]
+    for key, equip in equipment.items():
+        if equip["status"] not in (1, 3):
+            errors.append("%s not solved: %s" % (key, equip["msg"]))
+
+    if "json" in formats:
+        data = {"file": os.path.abspath(fname),
+                "status": FAILED if errors else SOLVED,
+                "errors": errors,
+                "recycles": [
+                    {"streams": list(section), "iterations": r.iteration,
+                     "residual": r.residual}
+                    for section, r in recycles.items()],
+                "streams": streams,
+                "equipment": equipment}
+        with open(base + ".json", "w") as file:
+            json.dump(data, file, indent=4)
+    if "csv" in formats:
+        _writeCSV(base, streams, equipment)
+
+    return (FAILED, "; ".join(errors)) if errors else (SOLVED, "")
+
+
+def _solve(args):
+    return solveFile(*args)
+
+
+def runBatch(files, output=None, processes=None, formats=("json", "csv"),
+             profile=False):
+    """Solve the project files in parallel worker processes and report its
+    status, return the exit code, the worst status of files
+
+    Parameters
+    ----------
+    files : list
+        Paths of project files
+    output : str, optional
+        Directory to save the results, by default each file directory
+    processes : int, optional
+        Number of worker processes, by default all the cores
+    formats : list, optional
+        Formats of results files, json and csv
+    profile : bool, optional
+        Save the profiling report and chrome trace of each project
+    """
+    if output is not None and not os.path.isdir(output):
+        os.makedirs(output)
+
+    tasks = [(fname, output, formats, 1e-6, profile) for fname in files]
+    if processes == 1 or len(files) < 2:
+        status = map(_solve, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(processes)
+        status = pool.map(_solve, tasks)
+
+    code = SOLVED
+    try:
+        for fname, (st, msg) in zip(files, status):
+            text = ("solved", "failed", "load error")[st]
+            print("%s: %s" % (fname, text) + (" (%s)" % msg if msg else ""))
+            code = max(code, st)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return code
@@ -172,5 +172,5 @@ def Mix_Melhem(parameters, kij):
 
 
 mixing = [Mix_vdW1f, Mix_Stryjek_Vera, Mix_Panagiotopoulos, Mix_Melhem]
-conf = config.getMainWindowConfig().getint("Thermo", "Mixing")
+conf = config.getContext().getint("Thermo", "Mixing")
 Mixing_Rule = mixing[conf]
@@ -0,0 +1,298 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the case study of projects, the parametric evaluation of a
+project in a grid of values of its input variables:
+
+  * :class:`CaseStudy`: Case study definition and running
+"""
+
+
+from concurrent.futures import ProcessPoolExecutor
+import csv
+from functools import partial
+from itertools import product
+import logging
+from numbers import Number
+import os
+import pickle
+
+from lib.config import getContext, setContext
+from lib.kernel import QApplication
+
+
+# Project of worker process, each worker has its own copy of project
+_project = None
+
+
+def _initWorker(project, context):
+    """Define the project and the configuration context of worker"""
+    global _project
+    _project = project
+    setContext(context)
+
+
+def _evaluateWorker(variables, outputs, values):
+    """Calculate a case with the project of worker"""
+    return _evaluate(_project, variables, outputs, values)
+
+
+def _evaluate(project, variables, outputs, values):
+    """Calculate the project with the values of variables and return the
+    values of outputs properties"""
+    changed = []
+    for (item, key), value in zip(variables, values):
+        _setVariable(project, item, key, value)
+        changed.append(item)
+
+    try:
+        project.run(changed)
+    except Exception:
+        logging.exception("Case %s failed" % repr(values))
+        return list(values) + [None]*len(outputs)
+
+    row = list(values)
+    for item, attr in outputs:
+        row.append(_getOutput(project, item, attr))
+    return row
+
+
+def _setVariable(project, item, key, value):
+    """Change the kwarg key of item of project, an equipment or stream id,
+    without calculate it"""
+    if item[0] == "e":
+        project.items[item].cleanOldValues(**{key: value})
+        return
+
+    if item[0] == "s":
+        ids = [int(item[1:])]
+    else:
+        ids = [id for id, stream in project.getDownToEquip(item)]
+    for id in ids:
+        up, down, ind_up, ind_down, obj = project.streams[id]
+        obj = obj.clone(**{key: value})
+        project.streams[id] = (up, down, ind_up, ind_down, obj)
+    if item[0] == "i":
+        project.items[item] = obj
+
+
+def _getOutput(project, item, attr):
+    """Return the value of property attr of item as float, None if item is
+    not calculated"""
+    obj = project.getObject(item)
+    if not obj or not obj.status:
+        return None
+    if isinstance(attr, str) and hasattr(obj, attr):
+        value = getattr(obj, attr)
+    else:
+        value = obj._prop(attr)
+    return _float(value)
+
+
+def _float(value):
+    """Convert the value, magnitude or list of magnitudes, to float values in
+    the base unit"""
+    if isinstance(value, (list, tuple)):
+        return [_float(x) for x in value]
+    if isinstance(value, Number):
+        return float(value)
+    return value
+
+
+def _arrowType(pyarrow, values):
+    """Return the pyarrow type of a column of results, float for numbers or
+    columns without values and list of float for lists of numbers"""
+    values = [value for value in values if value is not None]
+    if all(isinstance(value, Number) and not isinstance(value, bool)
+           for value in values):
+        return pyarrow.float64()
+    if all(isinstance(value, list) and all(
+            isinstance(x, Number) and not isinstance(x, bool) for x in value)
+            for value in values):
+        return pyarrow.list_(pyarrow.float64())
+    return pyarrow.array(values).type
+
+
+class CaseStudy(object):
+    """Parametric study of a project, the project is calculated for each
+    combination of values of its input variables and the output properties
+    are saved as rows of a table. The cases are calculated in a process
+    pool, each worker with its own copy of project, calculated incrementally
+    from the previous case
+
+    Parameters
+    ----------
+    project : Project
+        Project to study, it isn't modified
+    variables : list
+        Input variables as (item, kwarg, values) tuples, with item the id of
+        equipment, input or stream of project, kwarg any of its kwargs and
+        values the list, range or array of values to study
+    outputs : list
+        Output properties as (item, attr) tuples, with attr any attribute of
+        propertiesNames of item
+
+    Examples
+    --------
+    Outlet temperature of a heater with several outlet temperatures and feed
+    flows
+
+    >>> from tools import firstrun
+    >>> from lib.config import configContext
+    >>> from lib.corriente import Corriente
+    >>> from lib.project import Project
+    >>> from equipment.heatExchanger import Heat_Exchanger
+    >>> cfg = firstrun.config()
+    >>> cfg.set("Components", "Components", "[2]")
+    >>> cfg.set("Thermo", "MEoS", "True")
+    >>> with configContext(cfg):
+    ...     project = Project(items={}, streams={}, config=cfg)
+    ...     project.addItem("i1", Corriente(
+    ...         T=300, P=1e5, caudalMasico=1, fraccionMolar=[1]))
+    ...     project.addItem("e1", Heat_Exchanger(Tout=350))
+    ...     project.addItem("o1", Corriente())
+    ...     project.addStream(1, "i1", "e1")
+    ...     project.addStream(2, "e1", "o1")
+    ...     study = CaseStudy(
+    ...         project,
+    ...         [("e1", "Tout", [320, 340]), ("i1", "caudalMasico", [1, 2])],
+    ...         [("s2", "T"), ("s2", "caudalmasico")])
+    ...     rows = list(study.run(processes=1))
+    >>> study.header
+    ['e1.Tout', 'i1.caudalMasico', 's2.T', 's2.caudalmasico']
+    >>> for row in rows:
+    ...     print(row)
+    [320, 1, 320.0, 1.0]
+    [320, 2, 320.0, 2.0]
+    [340, 1, 340.0, 1.0]
+    [340, 2, 340.0, 2.0]
+    """
+
+    def __init__(self, project, variables, outputs):
+        self.project = project
+        self.variables = [(item, key) for item, key, values in variables]
+        self.values = [list(values) for item, key, values in variables]
+        self.outputs = list(outputs)
+
+    @property
+    def header(self):
+        """Names of columns of results, item.kwarg of variables and
+        item.attr of outputs"""
+        header = ["%s.%s" % variable for variable in self.variables]
+        for item, attr in self.outputs:
+            if not isinstance(attr, str):
+                attr = attr[0]
+            header.append("%s.%s" % (item, attr))
+        return header
+
+    def __len__(self):
+        count = 1
+        for values in self.values:
+            count *= len(values)
+        return count
+
+    def cases(self):
+        """Iterator over the combinations of values of variables"""
+        return product(*self.values)
+
+    def run(self, processes=None):
+        """Calculate the cases, return a iterator over the rows of results in
+        the order of cases
+
+        Parameters
+        ----------
+        processes : int, optional
+            Number of worker processes, by default all the cores, with 1 the
+            cases are calculated in the current process
+        """
+        if processes == 1:
+            # Copy of project, so the study don't change it
+            project = pickle.loads(pickle.dumps(self.project))
+            for values in self.cases():
+                yield _evaluate(project, self.variables, self.outputs, values)
+            return
+
+        workers = processes or os.cpu_count()
+        chunksize = max(1, len(self)//(4*workers))
+        evaluate = partial(_evaluateWorker, self.variables, self.outputs)
+        with ProcessPoolExecutor(
+                workers, initializer=_initWorker,
+                initargs=(self.project, getContext())) as pool:
+            for row in pool.map(evaluate, self.cases(), chunksize=chunksize):
+                yield row
+
+    def toCSV(self, path, processes=None):
+        """Run the study and write the results to a csv file as the cases are
+        calculated"""
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(self.header)
+            for row in self.run(processes):
+                writer.writerow(row)
+                file.flush()
+
+    def toParquet(self, path, processes=None, batch=1024):
+        """Run the study and write the results to a parquet file, in groups
+        of batch rows as the cases are calculated. It needs pyarrow"""
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            msg = QApplication.translate(
+                "pychemqt", "pyarrow could not be found, parquet output "
+                "disabled")
+            raise ImportError(msg)
+
+        header = self.header
+        writer = None
+        rows = []
+        try:
+            for row in self.run(processes):
+                rows.append(row)
+                if len(rows) < batch:
+                    continue
+                writer = self._writeBatch(pyarrow, path, writer, header, rows)
+                rows = []
+            if rows or writer is None:
+                writer = self._writeBatch(pyarrow, path, writer, header, rows)
+        finally:
+            if writer is not None:
+                writer.close()
+
+    @staticmethod
+    def _writeBatch(pyarrow, path, writer, header, rows):
+        """Write the rows to the parquet writer, created with the schema of
+        first rows. The numeric columns and the columns without values are
+        saved as float, and the lists of numbers as lists of float. The
+        values are cast safely to the schema, a value that doesn't fit it
+        raises an error instead of being truncated"""
+        columns = [_float([row[i] for row in rows])
+                   for i in range(len(header))]
+        if writer is None:
+            fields = []
+            for name, values in zip(header, columns):
+                fields.append(pyarrow.field(name, _arrowType(pyarrow, values)))
+            schema = pyarrow.schema(fields)
+            writer = pyarrow.parquet.ParquetWriter(path, schema)
+        arrays = [pyarrow.array(values).cast(field.type)
+                  for values, field in zip(columns, writer.schema)]
+        writer.write_table(pyarrow.Table.from_arrays(
+            arrays, schema=writer.schema))
+        return writer
@@ -24,6 +24,13 @@ This module implement pure component properties
 properties in database and calculate state properties with the methods chossen
 in configuration
 
+:func:`DIPPR_array`: Evaluation of DIPPR equations for several compounds and
+temperatures at once
+
+The correlations accept numpy arrays for temperature, pressure and compound
+parameters, with array input the result is a ndarray in SI units instead of
+the unidades instance
+
 Liquid density calculation methods:
     * :func:`DIPPR`
     * :func:`RhoL_Rackett`
@@ -123,18 +130,24 @@ Others method:
 '''
 
 
+from collections import OrderedDict
+from functools import wraps
 import math
 import os
 import re
 import tempfile
+from threading import RLock
 
-from scipy import exp, cosh, sinh, tanh, log, log10, roots, absolute, array
+from numpy import (asarray, atleast_1d, atleast_2d, broadcast_arrays,
+                   copysign, errstate, full, nan, ndim, ones, select, sqrt,
+                   unique, where)
+from scipy import exp, cosh, sinh, tanh, log, log10, absolute, array
 from scipy.optimize import fsolve
 from scipy.constants import R, Avogadro, Boltzmann
-from scipy.interpolate import interp1d, interp2d
+from scipy.interpolate import interp1d, RegularGridInterpolator
 
 from lib.physics import R_atml, Collision_Neufeld
-from lib import unidades, config, sql
+from lib import unidades, config, sql, databankMatrix
 from lib.utilities import refDoc
 
 
@@ -595,27 +608,7 @@ def DIPPR(prop, T, args, Tc=None, M=None):
     This parameters are available in the pychemqt database for many compounds
     Some equation as 7 and 9 need aditional parameter Tc of compound
     """
-    # Multiplier for return the properties in mass base
-    mul = 1
-
-    # Select unit of property to return
-    if "rho" in prop:
-        unit = unidades.Density
-        mul = M
-    elif prop == "Pv":
-        unit = unidades.Pressure
-    elif prop == "Hv":
-        unit = unidades.MolarEnthalpy
-        mul = 1/M
-    elif "cp" in prop:
-        unit = unidades.SpecificHeat
-        mul = 1/M
-    elif "mu" in prop:
-        unit = unidades.Viscosity
-    elif "k" in prop:
-        unit = unidades.ThermalConductivity
-    elif prop == "sigma":
-        unit = unidades.Tension
+    unit, mul = _DIPPR_unit(prop, M)
 
     eq, A, B, C, D, E = args
     if eq == 1:
@@ -643,6 +636,139 @@ def DIPPR(prop, T, args, Tc=None, M=None):
     return unit(value*mul)
 
 
+def _DIPPR_unit(prop, M=None):
+    """Return the unit class of property calculated with DIPPR equations and
+    the multiplier to return the property in mass base"""
+    mul = 1
+    if "rho" in prop:
+        unit = unidades.Density
+        mul = M
+    elif prop == "Pv":
+        unit = unidades.Pressure
+    elif prop == "Hv":
+        unit = unidades.MolarEnthalpy
+        mul = 1/M
+    elif "cp" in prop:
+        unit = unidades.SpecificHeat
+        mul = 1/M
+    elif "mu" in prop:
+        unit = unidades.Viscosity
+    elif "k" in prop:
+        unit = unidades.ThermalConductivity
+    elif prop == "sigma":
+        unit = unidades.Tension
+    return unit, mul
+
+
+def DIPPR_array(prop, T, args, Tc=None, M=None, unit=False):
+    """Evaluate the DIPPR equations for several compounds and temperatures
+    at once. The compounds are grouped by equation number and each group is
+    calculated with array operations
+
+    Parameters
+    ----------
+    prop : string
+        Property to calculate, any of:
+        rhoS, rhoL, Hv, Pv, cpS, cpL, cpG, muL, muG, kL, kG, sigma
+    T : float or array
+        Temperatures, [K]
+    args : array
+        Coefficients for DIPPR equation, each row is a compound with
+        [eq, A, B, C, D, E], additional columns as tmin, tmax are ignored
+    Tc : array, optional
+        Critical temperature of compounds, [K]
+    M : array, optional
+        Molecular weight of compounds, [g/mol], if it isn't defined the
+        properties are returned in molar base
+    unit : boolean, optional
+        Return the values as a :class:`lib.unidades.unidadArray` of the
+        property unit
+
+    Returns
+    -------
+    value : array
+        Property values with shape (compounds, temperatures) in SI units, the
+        compounds without equation return nan
+
+    Examples
+    --------
+    >>> cmp = [Componente(2), Componente(3)]
+    >>> args = [c._dipprPv for c in cmp]
+    >>> Pv = DIPPR_array("Pv", [100, 150, 180], args)
+    >>> Pv.shape
+    (2, 3)
+    >>> "%0.1f %0.1f" % (Pv[0, 0], DIPPR("Pv", 100, cmp[0]._dipprPv[:-2]))
+    '34536.3 34536.3'
+    """
+    T = atleast_1d(asarray(T, dtype=float))
+    args = atleast_2d(asarray(args, dtype=float))
+    eqs = args[:, 0]
+    A, B, C, D, E = args[:, 1:6].T[..., None]
+    if Tc is not None:
+        Tc = asarray(Tc, dtype=float).reshape(-1, 1)*ones(len(args))[:, None]
+
+    value = full((len(args), len(T)), nan)
+    with errstate(all="ignore"):
+        for eq in unique(eqs):
+            i = eqs == eq
+            a, b, c, d, e = A[i], B[i], C[i], D[i], E[i]
+            if eq == 1:
+                v = a + b*T + c*T**2 + d*T**3 + e*T**4
+            elif eq == 2:
+                v = exp(a + b/T + c*log(T) + d*T**e)
+            elif eq == 3:
+                v = a*T**b/(1+c/T+d/T**2)
+            elif eq == 4:
+                v = a + b*exp(-c/T**d)
+            elif eq == 5:
+                v = a + b/T + c/T**3 + d/T**8 + e/T**9
+            elif eq == 6:
+                v = a/(b**(1+((1-T/c)**d)))
+            elif eq == 7:
+                Tr = T/Tc[i]
+                v = a*(1-Tr)**(b+c*Tr + d*Tr**2 + e*Tr**3)
+            elif eq == 8:
+                v = a + b*(c/T/sinh(c/T))**2 + d*(e/T/cosh(e/T))**2
+            elif eq == 9:
+                Tr = T/Tc[i]
+                v = a**2/Tr + b - 2*a*c*Tr - a*d*Tr**2 - c**2*Tr**3/3 - \
+                    c*d*Tr**4/2 - d**2*Tr**5/5
+            else:
+                continue
+            value[i] = v
+
+    if M is None:
+        M = 1
+    else:
+        M = asarray(M, dtype=float).reshape(-1, 1)
+    magnitud, mul = _DIPPR_unit(prop, M)
+    value *= mul
+
+    if unit:
+        return magnitud.array(value)
+    return value
+
+
+def _unit(magnitud, value, unit=""):
+    """Wrap the value calculated in a correlation with its unit class. The
+    correlations are written to broadcast over arrays of temperature, pressure
+    or compound parameters, with scalar input the result is the unidades
+    instance and with array input the result is a unit array with the values
+    saved in SI units
+
+    >>> _unit(unidades.Pressure, 760, "mmHg").atm
+    1.0
+    >>> _unit(unidades.Pressure, [760, 1520], "mmHg").atm
+    array([1., 2.])
+    """
+    value = asarray(value, dtype=float)
+    if value.ndim == 0:
+        if unit:
+            return magnitud(float(value), unit)
+        return magnitud(float(value))
+    return magnitud.array(value, unit)
+
+
 # Liquid density correlations
 @refDoc(__doi__, [21, 35, 5])
 def RhoL_Rackett(T, Tc, Pc, Zra, M):
@@ -683,7 +809,7 @@ def RhoL_Rackett(T, Tc, Pc, Zra, M):
     Pc_atm = Pc/101325
     Tr = T/Tc
     V = R_atml*Tc/Pc_atm*Zra**(1+(1-Tr)**(2/7))
-    return unidades.Density(M/V)
+    return _unit(unidades.Density, M/V)
 
 
 @refDoc(__doi__, [20, 5])
@@ -744,7 +870,7 @@ def RhoL_Costald(T, Tc, w, Vc):
 
     # TODO: Add V* to the database
     V = Vc*Vr0*(1-w*Vr1)                                               # Eq 16
-    return unidades.Density(1/V)
+    return _unit(unidades.Density, 1/V)
 
 
 def RhoL_Cavett(T, Tc, M, Vliq):
@@ -774,7 +900,7 @@ def RhoL_Cavett(T, Tc, M, Vliq):
     """
     Tr = T/Tc
     V = Vliq*(5.7+3*Tr)/M
-    return unidades.Density(1/V, "gcc")
+    return _unit(unidades.Density, 1/V, "gcc")
 
 
 @refDoc(__doi__, [26])
@@ -816,15 +942,15 @@ def RhoL_YenWoods(T, Tc, Vc, Zc):
     """
     Tr = T/Tc
     A = 17.4425 - 214.578*Zc + 989.625*Zc**2 - 1522.06*Zc**3           # Eq 4
-    if Zc <= 0.26:
-        B = -3.28257 + 13.6377*Zc + 107.4844*Zc**2 - 384.211*Zc**3     # Eq 5A
-    else:
-        B = 60.2091 - 402.063*Zc + 501.0*Zc**2 + 641.0*Zc**3           # Eq 5B
+    B = where(
+        Zc <= 0.26,
+        -3.28257 + 13.6377*Zc + 107.4844*Zc**2 - 384.211*Zc**3,        # Eq 5A
+        60.2091 - 402.063*Zc + 501.0*Zc**2 + 641.0*Zc**3)              # Eq 5B
     D = 0.93 - B                                                       # Eq 6
 
     # Eq 2
     rhos = (1 + A*(1-Tr)**(1/3) + B*(1-Tr)**(2/3) + D*(1-Tr)**(4/3))/Vc
-    return unidades.Density(rhos)
+    return _unit(unidades.Density, rhos)
 
 
 @refDoc(__doi__, [23, 27])
@@ -856,16 +982,16 @@ def RhoL_YamadaGunn(T, Tc, Pc, w, M):
     -----
     The equation is defined in [27]_ in volumen terms.
     """
-    Tr = T/Tc
+    Tr = asarray(T/Tc, dtype=float)
 
-    if Tr < 0.8:
-        # Eq 3
-        Vr = 0.33593-0.33953*Tr+1.51941*Tr**2-2.02512*Tr**3+1.11422*Tr**4
-    elif Tr < 1:
-        # Eq 4
-        Vr = 1+1.3*(1-Tr)**0.5*log10(1-Tr)-0.50879*(1-Tr)-0.91534*(1-Tr)**2
-    elif Tr == 1:
-        Vr = 1
+    with errstate(invalid="ignore", divide="ignore"):
+        Vr = select([
+            Tr < 0.8, Tr < 1, Tr == 1], [
+            # Eq 3
+            0.33593-0.33953*Tr+1.51941*Tr**2-2.02512*Tr**3+1.11422*Tr**4,
+            # Eq 4
+            1+1.3*(1-Tr)**0.5*log10(1-Tr)-0.50879*(1-Tr)-0.91534*(1-Tr)**2,
+            1], nan)
 
     # Eq 5
     d = 0.29607-0.09045*Tr-0.04842*Tr**2
@@ -874,7 +1000,7 @@ def RhoL_YamadaGunn(T, Tc, Pc, w, M):
     Vsc = Zsc*R*Tc/Pc
 
     V = Vsc*Vr*(1-w*d)                                                  # Eq 1
-    return unidades.Density(M/V, "gm3")
+    return _unit(unidades.Density, M/V, "gm3")
 
 
 @refDoc(__doi__, [28])
@@ -915,29 +1041,29 @@ def RhoL_Bhirud(T, Tc, Pc, w, M):
     Raise :class:`NotImplementedError` if Tr is > 1
     """
     Tr = T/Tc
-    if Tr <= 0.98:
-        lnU0 = 1.39644 - 24.076*Tr + 102.615*Tr**2 - 255.719*Tr**3 \
-            + 355.805*Tr**4 - 256.671*Tr**5 + 75.1088*Tr**6            # Eq 9
-        lnU1 = 13.4412 - 135.7437*Tr + 533.380*Tr**2 - 1091.453*Tr**3 \
-            + 1231.43*Tr**4 - 728.227*Tr**5 + 176.737*Tr**6            # Eq 10
-    elif Tr < 1:
-        # Interpolation data from Table 1
-        Trs_ = [0.98, 0.982, 0.984, 0.986, 0.988, 0.99, 0.992, 0.994, 0.996,
-                0.998, 0.999, 1]
-        lnU0_ = [-1.6198, -1.604, -1.59, -1.578, -1.564, -1.548, -1.533,
-                 -1.515, -1.489, -1.454, -1.425, -1.243]
-        lnU1_ = [-0.4626, -0.459, -0.451, -0.441, -0.428, -0.412, -0.392,
-                 -0.367, -0.337, -0.302, -0.283, -0.2629]
-
-        lnU0 = interp1d(Trs_, lnU0_, kind='cubic')(Tr)
-        lnU1 = interp1d(Trs_, lnU1_, kind='cubic')(Tr)
-    else:
+    if (asarray(Tr) >= 1).any():
         raise NotImplementedError("Input out of bound")
 
+    lnU0 = 1.39644 - 24.076*Tr + 102.615*Tr**2 - 255.719*Tr**3 \
+        + 355.805*Tr**4 - 256.671*Tr**5 + 75.1088*Tr**6                # Eq 9
+    lnU1 = 13.4412 - 135.7437*Tr + 533.380*Tr**2 - 1091.453*Tr**3 \
+        + 1231.43*Tr**4 - 728.227*Tr**5 + 176.737*Tr**6                # Eq 10
+
+    # Interpolation data from Table 1 near the critical point
+    Trs_ = [0.98, 0.982, 0.984, 0.986, 0.988, 0.99, 0.992, 0.994, 0.996,
+            0.998, 0.999, 1]
+    lnU0_ = [-1.6198, -1.604, -1.59, -1.578, -1.564, -1.548, -1.533,
+             -1.515, -1.489, -1.454, -1.425, -1.243]
+    lnU1_ = [-0.4626, -0.459, -0.451, -0.441, -0.428, -0.412, -0.392,
+             -0.367, -0.337, -0.302, -0.283, -0.2629]
+    Tri = asarray(Tr).clip(0.98, 1)
+    lnU0 = where(Tr <= 0.98, lnU0, interp1d(Trs_, lnU0_, kind='cubic')(Tri))
+    lnU1 = where(Tr <= 0.98, lnU1, interp1d(Trs_, lnU1_, kind='cubic')(Tri))
+
     # Eq 8
     U = exp(lnU0 + w*lnU1)
     Vs = U*R*T/Pc
-    return unidades.Density(M/Vs, "gm3")
+    return _unit(unidades.Density, M/Vs, "gm3")
 
 
 @refDoc(__doi__, [29])
@@ -988,7 +1114,7 @@ def RhoL_Mchaweh(T, Tc, Vc, w, delta):
         2.161*tau**(4/3)                                               # Eq 16
 
     rhos = rho0/Vc*(1+delta*(alpha-1)**(1/3))           # Eq 15
-    return unidades.Density(rhos)
+    return _unit(unidades.Density, rhos)
 
 
 Mchaweh_d = {28: 0.57510,
@@ -1096,7 +1222,7 @@ def RhoL_Riedel(T, Tc, Vc, w):
     Tr = T/Tc
 
     rhos = (1+0.85*(1-Tr)+(1.6916+0.984*w)*(1-Tr)**(1/3))/Vc
-    return unidades.Density(rhos)
+    return _unit(unidades.Density, rhos)
 
 
 @refDoc(__doi__, [33])
@@ -1144,7 +1270,7 @@ def RhoL_ChuehPrausnitz(T, Tc, Vc, w):
 
     # Eq 5
     Vr = v0 + w*v1 + w**2*v2
-    return unidades.Density(1/Vr/Vc)
+    return _unit(unidades.Density, 1/Vr/Vc)
 
 
 @refDoc(__doi__, [22, 5])
@@ -1210,7 +1336,7 @@ def RhoL_TaitCostald(T, P, Tc, Pc, w, Ps, rhos):
 
     # Eq 5
     rho = rhos/(1-C*log((B+P)/(B+Ps)))
-    return unidades.Density(rho, "gl")
+    return _unit(unidades.Density, rho, "gl")
 
 
 @refDoc(__doi__, [30])
@@ -1262,7 +1388,7 @@ def RhoL_ChangZhao(T, P, Tc, Pc, w, Ps, rhos):
 
     # Eq 5
     rho = rhos*(A+2.81*(Pr-Psr))/(A+2.81**(1.1-Tr)**B*(Pr-Psr))         # Eq 9
-    return unidades.Density(rho)
+    return _unit(unidades.Density, rho)
 
 
 @refDoc(__doi__, [31, 1])
@@ -1346,7 +1472,7 @@ def RhoL_AaltoKeskinen(T, P, Tc, Pc, w, Ps, rhos):
 
     # Eq 5
     rho = rhos*(A+C*(Pr-Psr))/(A+C**(1.00588-Tr)**B*(Pr-Psr))          # Eq 14
-    return unidades.Density(rho)
+    return _unit(unidades.Density, rho)
 
 
 @refDoc(__doi__, [37, 38])
@@ -1431,7 +1557,7 @@ def RhoL_AaltoKeskinen2(T, P, Tc, Pc, w, Ps, rhos):
 
     # Eq 4
     rho = rhos*(A+C*(Pr-Psr)**E)/(A+C**(1.00001-Tr)**B*(Pr-Psr)**E)    # Eq 14
-    return unidades.Density(rho)
+    return _unit(unidades.Density, rho)
 
 
 @refDoc(__doi__, [36])
@@ -1509,7 +1635,7 @@ def RhoL_Nasrifar(T, P, Tc, Pc, w, M, Ps, rhos):
 
     # Eq 9
     v = C*tanh(phi)*(v_inf-vs)+vs
-    return unidades.Density(1/v)
+    return _unit(unidades.Density, 1/v)
 
 
 @refDoc(__doi__, [33, 5])
@@ -1563,7 +1689,7 @@ def RhoL_API(T, P, Tc, Pc, SG, rhos):
 
     # Eq 1
     d2 = rhos*C2/SG
-    return unidades.Density(d2)
+    return _unit(unidades.Density, d2)
 
 
 # Vapor pressure correlations
@@ -1627,12 +1753,12 @@ def Pv_Antoine(T, args, Tc=None, base=math.e, Punit="mmHg"):
         Pv = base**(A-B/(T+C))
     elif len(args) == 7 and args[3] is not None and Tc is not None:
         A, B, C, n, E, F, to = args
-        x = (T-to)/Tc
-        if x <= 0:
-            Pv = base**(A-B/(T+C))
-        else:
-            Pv = base**(A - B/(T+C) + 0.43429*x**n + E*x**8 + F*x**12)
-    return unidades.Pressure(Pv, Punit)
+        x = asarray((T-to)/Tc, dtype=float)
+        with errstate(invalid="ignore"):
+            # Compounds without the extended coefficients have nan values
+            ext = where(x > 0, 0.43429*x**n + E*x**8 + F*x**12, 0)
+        Pv = base**(A - B/(T+C) + ext)
+    return _unit(unidades.Pressure, Pv, Punit)
 
 
 @refDoc(__doi__, [4, 2])
@@ -1680,7 +1806,7 @@ def Pv_Lee_Kesler(T, Tc, Pc, w):
     Tr = T/Tc
     f0 = 5.92714 - 6.09648/Tr - 1.28862*log(Tr) + 0.169347*Tr**6
     f1 = 15.2518 - 15.6875/Tr - 13.4721*log(Tr) + 0.43577*Tr**6
-    return unidades.Pressure(exp(f0 + w*f1)*Pc)
+    return _unit(unidades.Pressure, exp(f0 + w*f1)*Pc)
 
 
 @refDoc(__doi__, [6, 1, 5, 7])
@@ -1720,7 +1846,7 @@ def Pv_Wagner(T, args, Tc, Pc):
     Tr = T/Tc
     tau = 1-Tr
     Pv = Pc/Tr*exp(a*tau + b*tau**1.5 + c*tau**3 + d*tau**6)            # Eq 14
-    return unidades.Pressure(Pv)
+    return _unit(unidades.Pressure, Pv)
 
 
 @refDoc(__doi__, [8, 1])
@@ -1779,7 +1905,7 @@ def Pv_AmbroseWalton(T, Tc, Pc, w):
 
     # Eq 8
     Pv = Pc*exp(f0 + w*f1 + w**2*f2)
-    return unidades.Pressure(Pv)
+    return _unit(unidades.Pressure, Pv)
 
 
 @refDoc(__doi__, [1])
@@ -1825,7 +1951,7 @@ def Pv_Riedel(T, Tc, Pc, Tb):
     alfa_c = (3.758*K*fib+log(Pc*1e-5/1.01325))/(K*fib-log(Tbr))
     Q = K*(3.758-alfa_c)
     Pv = Pc*exp(-35*Q + 36*Q/Tr + (42*Q+alfa_c)*log(Tr) - Q*Tr**6)
-    return unidades.Pressure(Pv)
+    return _unit(unidades.Pressure, Pv)
 
 
 @refDoc(__doi__, [5])
@@ -1862,31 +1988,29 @@ def Pv_MaxwellBonnel(T, Tb, Kw):
     >>> "%0.1f" % Pv.psi
     '3.1'
     """
+    # The points are solved together as a system of independent equations
+    T, Tb, Kw = broadcast_arrays(
+        *[asarray(x, dtype=float) for x in (T, Tb, Kw)])
+    shape = T.shape
+    T, Tb, Kw = T.ravel(), Tb.ravel(), Kw.ravel()
+
     # Convert input Tb in Kelvin to Fahrenheit to use in the correlation
     Tb_F = unidades.K2F(Tb)
     Tb_R = unidades.K2R(Tb)
     T_R = unidades.K2R(T)
 
-    if Tb_F > 400:
-        f = 1.0
-    elif Tb_F < 200:
-        f = 0.0
-    else:
-        f = (Tb_R-659.7)/200
+    f = select([Tb_F > 400, Tb_F < 200], [1.0, 0.0], (Tb_R-659.7)/200)
 
     def P(Tb):
         X = (Tb/T_R-0.0002867*Tb)/(748.1-0.2145*Tb)
-        if X > 0.0022:
-            p = 10**((3000.538*X-6.761560)/(43*X-0.987672))
-        elif X < 0.0013:
-            p = 10**((2770.085*X-6.412631)/(36*X-0.989679))
-        else:
-            p = 10**((2663.129*X-5.994296)/(95.76*X-0.972546))
-        return p
+        return 10**select([X > 0.0022, X < 0.0013], [
+            (3000.538*X-6.761560)/(43*X-0.987672),
+            (2770.085*X-6.412631)/(36*X-0.989679)],
+            (2663.129*X-5.994296)/(95.76*X-0.972546))
 
     Tb = fsolve(lambda Tb: Tb-Tb_R+2.5*f*(Kw-12)*log10(P(Tb)/760), Tb)
-    p = P(Tb)
-    return unidades.Pressure(p, "mmHg")
+    p = P(Tb).reshape(shape)
+    return _unit(unidades.Pressure, p, "mmHg")
 
 
 @refDoc(__doi__, [9])
@@ -1938,7 +2062,7 @@ def Pv_Sanjari(T, Tc, Pc, w):
     f1 = a[5] + a[6]/Tr + a[7]*log(Tr) + a[8]*Tr**1.9
     f2 = a[9] + a[10]/Tr + a[11]*log(Tr) + a[12]*Tr**1.9
     Pv = Pc*exp(f0 + w*f1 + w**2*f2)
-    return unidades.Pressure(Pv)
+    return _unit(unidades.Pressure, Pv)
 
 
 # Liquid viscosity correlations
@@ -1966,7 +2090,7 @@ def MuL_Parametric(T, args):
     """
     A, B = args
     mu = 10**(A*(1/T-1/B))
-    return unidades.Viscosity(mu, "cP")
+    return _unit(unidades.Viscosity, mu, "cP")
 
 
 @refDoc(__doi__, [10])
@@ -2002,14 +2126,14 @@ def MuL_LetsouStiel(T, M, Tc, Pc, w):
     >>> "%0.3f" % MuL_LetsouStiel(433.2, 60.10, 536.8, 51.7e5, 0.623).cP
     '0.171'
     """
-    Pc_atm = unidades.Pressure(Pc).atm
+    Pc_atm = Pc/101325
     Tr = T/Tc
 
     x = Tc**(1/6)/M**0.5/Pc_atm**(2/3)
     x0 = 0.015178 - 0.021351*Tr + 0.007503*Tr**2
     x1 = 0.042559 - 0.07675*Tr + 0.034007*Tr**2
     mu = (x0+w*x1)/x
-    return unidades.Viscosity(mu, "cP")
+    return _unit(unidades.Viscosity, mu, "cP")
 
 
 @refDoc(__doi__, [45, 1])
@@ -2103,7 +2227,7 @@ def MuL_PrzedzieckiSridhar(T, Tc, Pc, Vc, w, M, Tf, Vr=None, Tv=None):
 
     # Eq 4
     mu = Vo/B/(V-Vo)
-    return unidades.Viscosity(mu, "cP")
+    return _unit(unidades.Viscosity, mu, "cP")
 
 
 @refDoc(__doi__, [46, 1])
@@ -2177,10 +2301,7 @@ def MuL_Lucas(T, P, Tc, Pc, w, Ps, mus):
     """
     Tr = T/Tc
     # Discard point in gas phase
-    if P < Ps:
-        dPr = 0
-    else:
-        dPr = P/Pc-Ps/Pc
+    dPr = where(P < Ps, 0, P/Pc-Ps/Pc)
 
     f1 = 0.9990614 - 4.6739e-4/(1.052278*Tr**-0.03876963 - 1.05134195)  # Eq 4
     # Eq 5
@@ -2192,7 +2313,7 @@ def MuL_Lucas(T, P, Tc, Pc, w, Ps, mus):
     Fp = Fpr/(1+Fs*dPr)                                                 # Eq 2
 
     mu = mus*Fp                                                         # Eq 1
-    return unidades.Viscosity(mu)
+    return _unit(unidades.Viscosity, mu)
 
 
 @refDoc(__doi__, [5])
@@ -2253,23 +2374,25 @@ def MuL_API(T, P, Tc, Pc, w, muc):
     mur0 = A1*log10(Pr) + A2*log10(Pr)**2 + A3*Pr + A4*Pr**2 + A5
 
     # Eqs 11A5.1-5
-    if Pr <= 0.75:
-        B1 = -0.2462*Tr**0.0484 - 0.7275*log(Tr) - 0.0588*Tr + 0.0079
-        B2 = -0.3199*Tr**17.0626 - 0.0695*log(Tr) + 0.1267*Tr - 0.0101
-        B3 = 4.7217*Tr**-1.9831 + 19.2008*Tr**-1.7595 + 65.5728*log(Tr) + \
-            0.6110*Tr-19.1590
-    else:
-        B1 = -0.0214*Tr**0.0484 - 0.1827*log(Tr)-0.0183*Tr + 0.0090
-        B2 = -0.3588*Tr**5.0537 - 0.1321*log(Tr)+0.0204*Tr - 0.0075
-        B3 = 3.7266*Tr**-2.5689 + 52.1358*Tr**0.3514 - 13.0750*log(Tr) + \
-            0.6358*Tr-56.6687
+    low = Pr <= 0.75
+    B1 = where(
+        low, -0.2462*Tr**0.0484 - 0.7275*log(Tr) - 0.0588*Tr + 0.0079,
+        -0.0214*Tr**0.0484 - 0.1827*log(Tr)-0.0183*Tr + 0.0090)
+    B2 = where(
+        low, -0.3199*Tr**17.0626 - 0.0695*log(Tr) + 0.1267*Tr - 0.0101,
+        -0.3588*Tr**5.0537 - 0.1321*log(Tr)+0.0204*Tr - 0.0075)
+    B3 = where(
+        low, 4.7217*Tr**-1.9831 + 19.2008*Tr**-1.7595 + 65.5728*log(Tr) +
+        0.6110*Tr-19.1590,
+        3.7266*Tr**-2.5689 + 52.1358*Tr**0.3514 - 13.0750*log(Tr) +
+        0.6358*Tr-56.6687)
 
     # Eqs 11A5.1-4
     mur1 = B1*Pr + B2*log(Pr) + B3
 
     # Eqs 11A5.1-1
     mur = mur0 + w*mur1
-    return unidades.Viscosity(mur*muc)
+    return _unit(unidades.Viscosity, mur*muc)
 
 
 @refDoc(__doi__, [5])
@@ -2306,13 +2429,13 @@ def MuL_Kouzel(T, P, muo):
     '277.2'
     """
     # Unit conversion
-    psig = unidades.Pressure(P).psig
-    muocp = unidades.Viscosity(muo).cP
+    psig = (P-101325)/unidades.Pressure.rates["psi"]
+    muocp = muo/unidades.Viscosity.rates["cP"]
 
     # Eq 11A5.5-1
     mu = muocp*10**(psig/1000*(-0.0102+0.04042*muocp**0.181))
 
-    return unidades.Viscosity(mu, "cP")
+    return _unit(unidades.Viscosity, mu, "cP")
 
 
 # Vas viscosity correlations
@@ -2340,7 +2463,7 @@ def MuG_ChapmanEnskog(T, M, sigma, omega):
         Viscosity of gas, [Pa·s]
     """
     mu = 26.69*M**0.5*T**0.5/sigma**2/omega
-    return unidades.Viscosity(mu, "microP")
+    return _unit(unidades.Viscosity, mu, "microP")
 
 
 @refDoc(__doi__, [24, 5])
@@ -2395,23 +2518,19 @@ def MuG_StielThodos(T, Tc, Pc, M):
     '0.0176'
     """
     Pc_atm = Pc/101325
-    Tr = T/Tc
-    T_R = unidades.K2R(T)
+    Tr = asarray(T/Tc, dtype=float)
+    T_R = unidades.K2R(asarray(T, dtype=float))
 
-    if M < 2:
+    with errstate(invalid="ignore"):
         # Special case for hydrogen
-        if Tr <= 1.5:
-            mu = 3.7e-5*T_R**0.94
-        else:
-            mu = 9.071e-4*(7.639e-2*T_R-1.67)**0.625
-    else:
-        if Tr <= 1.5:
-            N = 3.5e-4*Tr**0.94
-        else:
-            N = 1.778e-4*(4.58*Tr-1.67)**0.625
-        x = Tc**(1/6)/M**0.5/Pc_atm**(2/3)
-        mu = N/x
-    return unidades.Viscosity(mu, "cP")
+        muH2 = where(Tr <= 1.5, 3.7e-5*T_R**0.94,
+                     9.071e-4*(7.639e-2*T_R-1.67)**0.625)
+
+        N = where(Tr <= 1.5, 3.5e-4*Tr**0.94,
+                  1.778e-4*(4.58*Tr-1.67)**0.625)
+    x = Tc**(1/6)/M**0.5/Pc_atm**(2/3)
+    mu = where(M < 2, muH2, N/x)
+    return _unit(unidades.Viscosity, mu, "cP")
 
 
 @refDoc(__doi__, [57])
@@ -2457,7 +2576,7 @@ def MuG_Gharagheizi(T, Tc, Pc, M):
     # Eq 4
     mu = 1e-5*Pc*Tr + (0.091-0.477/M)*T + \
         M*(1e-5*Pc-8*M**2/T**2)*(10.7639/Tc - 4.1929/T)
-    return unidades.Viscosity(mu*1e-7)
+    return _unit(unidades.Viscosity, mu*1e-7)
 
 
 @refDoc(__doi__, [56])
@@ -2492,17 +2611,15 @@ def MuG_YoonThodos(T, Tc, Pc, M):
     Tr = T/Tc
     x = Tc**(1/6)/M**0.5/Pc_atm**(2/3)
 
-    if M == 2.0158:
+    mur = select([M == 2.0158, M == 4.0026], [
         # Eq 3, Hydrogen case
-        mur = 47.65*Tr**0.657 - 20*exp(-0.858*Tr) + 19*exp(-3.995*Tr) + 1
-    elif M == 4.0026:
+        47.65*Tr**0.657 - 20*exp(-0.858*Tr) + 19*exp(-3.995*Tr) + 1,
         # Eq 4, Helium case
-        mur = 52.57*Tr**0.656 - 18.9*exp(-1.144*Tr) + 17.9*exp(-5.182*Tr) + 1
-    else:
+        52.57*Tr**0.656 - 18.9*exp(-1.144*Tr) + 17.9*exp(-5.182*Tr) + 1],
         # Eq 2, General case for nonpolar gases
-        mur = 46.1*Tr**0.618 - 20.4*exp(-0.449*Tr) + 19.4*exp(-4.058*Tr) + 1
+        46.1*Tr**0.618 - 20.4*exp(-0.449*Tr) + 19.4*exp(-4.058*Tr) + 1)
 
-    return unidades.Viscosity(mur*1e-5/x, "cP")
+    return _unit(unidades.Viscosity, mur*1e-5/x, "cP")
 
 
 @refDoc(__doi__, [49, 50, 1])
@@ -2550,7 +2667,7 @@ def MuG_Chung(T, Tc, Vc, M, w, D, k=0):
     mur = 131.3*D/(Vc*Tc)**0.5                                          # Eq 8
     Fc = 1 - 0.2756*w + 0.059035*mur**4 + k                             # Eq 7
     mu = 40.785*Fc*M**0.5*T**0.5/Vc**(2/3)/omega                        # Eq 6
-    return unidades.Viscosity(mu, "microP")
+    return _unit(unidades.Viscosity, mu, "microP")
 
 
 @refDoc(__doi__, [49, 50, 1])
@@ -2629,7 +2746,7 @@ def MuG_P_Chung(T, Tc, Vc, M, w, D, k, rho, muo):
     muk = 10*muo*(1/G2 + A6*Y)
     mup = (36.344e-6*(M*Tc)**0.5/Vc**(2/3))*A7*Y**2*G2*exp(A8+A9/T_+A10/T_**2)
 
-    return unidades.Viscosity(muk+mup, "P")
+    return _unit(unidades.Viscosity, muk+mup, "P")
 
 
 @refDoc(__doi__, [1])
@@ -2671,12 +2788,12 @@ def MuG_Reichenberg(T, P, Tc, Pc, Vc, M, D, muo):
     '520'
     """
     # units in molar base
-    if D:
-        Vc = Vc*M/1000
-        mu_r = 131.3*D/(Vc*Tc)**0.5
-        Q = 1-5.655*mu_r
-    else:
-        Q = 1
+    if D is None:
+        D = 0
+    Vc = Vc*M/1000
+    with errstate(all="ignore"):
+        mu_r = 131.3*D/sqrt(asarray(Vc*Tc, dtype=float))
+    Q = where(D, 1-5.655*mu_r, 1)
 
     Tr = T/Tc
     Pr = P/Pc
@@ -2687,7 +2804,7 @@ def MuG_Reichenberg(T, P, Tc, Pc, Vc, M, D, muo):
     D = 2.9496/Tr*exp(2.9190*Tr**-16.6169)
 
     mur = 1+Q*A*Pr**1.5/(B*Pr+1/(1+C*Pr**D))
-    return unidades.Viscosity(mur*muo)
+    return _unit(unidades.Viscosity, mur*muo)
 
 
 @refDoc(__doi__, [1])
@@ -2734,64 +2851,51 @@ def MuG_Lucas(T, P, Tc, Pc, Zc, M, D):
     >>> "%0.0f" % mu.microP
     '603'
     """
-    Tr = T/Tc
-    Pr = P/Pc
+    Tr = asarray(T/Tc, dtype=float)
+    Pr = asarray(P/Pc, dtype=float)
+    Zc = asarray(Zc, dtype=float)
 
     Pc_bar = Pc*1e-5
     xi = 0.176*Tc**(1/6)/M**0.5/Pc_bar**(2/3)
 
     # Polarity and quantum effects correction factors
     mur = 52.46*D**2*Pc_bar/Tc**2
-    if mur < 0.022:
-        Fpo = 1
-    elif mur < 0.075:
-        Fpo = 1 + 30.55*(0.292-Zc)**1.72
-    else:
-        Fpo = 1 + 30.55*(0.292-Zc)**1.72*abs(0.96+0.1*(Tr-0.7))
+    with errstate(invalid="ignore"):
+        Fpo = select([mur < 0.022, mur < 0.075], [
+            1, 1 + 30.55*(0.292-Zc)**1.72],
+            1 + 30.55*(0.292-Zc)**1.72*abs(0.96+0.1*(Tr-0.7)))
 
-    if Tr < 12:
-        sign = -1
-    else:
-        sign = 1
-
-    if M == 2.0158:
-        Q = 0.76  # Hydrogen
-        Fqo = 1.22*Q**0.15*(1+0.00385*((Tr-12)**2)**(1/M)*sign)
-    elif M == 4.0026:
-        Q = 1.38  # Helium
-        Fqo = 1.22*Q**0.15*(1+0.00385*((Tr-12)**2)**(1/M)*sign)
-    else:
-        Fqo = 1
+    sign = where(Tr < 12, -1, 1)
+
+    # Hydrogen and helium
+    Q = select([M == 2.0158, M == 4.0026], [0.76, 1.38], 0)
+    Fqo = where(Q, 1.22*Q**0.15*(1+0.00385*((Tr-12)**2)**(1/M)*sign), 1)
 
     Z1 = Fpo*Fqo*(0.807*Tr**0.618 - 0.357*exp(-0.449*Tr) +
                   0.34*exp(-4.058*Tr) + 0.018)
 
-    if Pr < 0.6:
-        # Low pressure correlation
-        mu = Z1/xi
-
-    else:
-        # High pressure correlation
-
-        if Tr <= 1:
-            alfa = 3.262 + 14.98*Pr**5.508
-            beta = 1.39 + 14.98*Pr
-            Z2 = 0.6 + 0.76*Pr**alfa + (6.99*Pr**beta-0.6)*(1-Tr)
-        else:
-            a = 1.245e-3/Tr*exp(5.1726*Tr**-0.3286)
-            b = a*(1.6553*Tr-1.2723)
-            c = 0.4489/Tr*exp(3.0578*Tr**-37.7332)
-            d = 1.7368/Tr*exp(2.231*Tr**-7.6351)
-            e = 1.3088
-            f = 0.9425*exp(-0.1853*Tr**0.4489)
-            Z2 = Z1*(1+a*Pr**e/(b*Pr**f+1/(1+c*Pr**d)))
+    # High pressure correlation
+    with errstate(all="ignore"):
+        alfa = 3.262 + 14.98*Pr**5.508
+        beta = 1.39 + 14.98*Pr
+        Z2_l = 0.6 + 0.76*Pr**alfa + (6.99*Pr**beta-0.6)*(1-Tr)
+
+        a = 1.245e-3/Tr*exp(5.1726*Tr**-0.3286)
+        b = a*(1.6553*Tr-1.2723)
+        c = 0.4489/Tr*exp(3.0578*Tr**-37.7332)
+        d = 1.7368/Tr*exp(2.231*Tr**-7.6351)
+        e = 1.3088
+        f = 0.9425*exp(-0.1853*Tr**0.4489)
+        Z2_g = Z1*(1+a*Pr**e/(b*Pr**f+1/(1+c*Pr**d)))
+        Z2 = where(Tr <= 1, Z2_l, Z2_g)
 
         Y = Z2/Z1
         Fp = (1+(Fpo-1)/Y**3)/Fpo
         Fq = (1+(Fqo-1)*(1/Y-0.007*log(Y)**4))/Fqo
-        mu = Z2*Fp*Fq/xi
 
-    return unidades.Viscosity(mu, "microP")
+    # Low pressure correlation
+    mu = where(Pr < 0.6, Z1/xi, Z2*Fp*Fq/xi)
+    return _unit(unidades.Viscosity, mu, "microP")
 
 
 @refDoc(__doi__, [51])
@@ -2848,7 +2952,7 @@ def MuG_Jossi(Tc, Pc, rhoc, M, rho, muo):
     mur = 0.1023 + 0.023364*rhor + 0.058533*rhor**2 - 0.040758*rhor**3 + \
         0.0093324*rhor**4
     mu = (mur**4-1e-4)/x+muo*1e3
-    return unidades.Viscosity(mu, "cP")
+    return _unit(unidades.Viscosity, mu, "cP")
 
 
 @refDoc(__doi__, [52])
@@ -2893,17 +2997,12 @@ def MuG_P_StielThodos(Tc, Pc, rhoc, M, rho, muo):
     x = Tc**(1/6)/M**0.5/Pc_atm**(2/3)
     rhor = rho/rhoc
 
-    if rhor <= 0.1:
-        mur = 1.656e-5*rhor**1.111                                       # Eq 4
-    elif 0.1 < rhor <= 0.9:
-        mur = 0.607e-5*(9.045*rhor+0.63)**1.739                          # Eq 5
-    else:
-        if rhor < 2.2:
-            D = 0
-        else:
-            D = 4.75e-4*(rhor**3-10.65)**2
-        mur = 10**(4-10**(0.6439-0.1005*rhor-D))                         # Eq 6
-    return unidades.Viscosity(mur/x+muo*1e7, "microP")
+    D = where(rhor < 2.2, 0, 4.75e-4*(rhor**3-10.65)**2)
+    mur = select([rhor <= 0.1, rhor <= 0.9], [
+        1.656e-5*rhor**1.111,                                           # Eq 4
+        0.607e-5*(9.045*rhor+0.63)**1.739],                             # Eq 5
+        10**(4-10**(0.6439-0.1005*rhor-D)))                             # Eq 6
+    return _unit(unidades.Viscosity, mur/x+muo*1e7, "microP")
 
 
 @refDoc(__doi__, [1, 61, 53])
@@ -2974,7 +3073,7 @@ def MuG_TRAPP(T, Tc, Vc, Zc, M, w, rho, muo):
     G3 = 0.0168910864 + 43.527109444/To + 7659.4543472/To**2
     F = G + G2*rho0**0.1+G3*H
     muR = exp(F)-exp(G)
-    return unidades.Viscosity(Fn*muR*1e-6 + muo)
+    return _unit(unidades.Viscosity, Fn*muR*1e-6 + muo)
 
 
 @refDoc(__doi__, [54])
@@ -3039,7 +3138,7 @@ def MuG_Brule(T, Tc, Vc, M, w, rho, muo):
     muk = muo*(1/G2 + E6*Y)
     mup = (36.344e-6*(M*Tc)**0.5/Vc**(2/3))*E7*Y**2*G2*exp(E8+E9/T_+E10/T_**2)
 
-    return unidades.Viscosity(muk+mup, "P")
+    return _unit(unidades.Viscosity, muk+mup, "P")
 
 
 @refDoc(__doi__, [55, 5])
@@ -3087,7 +3186,7 @@ def MuG_DeanStiel(Tc, Pc, rhoc, M, rho, muo):
 
     # Eq 13
     mur = 10.8e-5*(exp(1.439*rhor)-exp(-1.11*rhor**1.858))
-    return unidades.Viscosity(muo*1e3 + mur/x, "cP")
+    return _unit(unidades.Viscosity, muo*1e3 + mur/x, "cP")
 
 
 @refDoc(__doi__, [5])
@@ -3140,7 +3239,7 @@ def MuG_API(T, P, Tc, Pc, muo):
     A2 = 1.514*Tr**-11.3036 + 0.3018*Tr**-0.6856 + 2.0636*Tr**-2.7611
     mur = A1*1.5071*Pr**-0.4487 + A2*(
         11.4789*Pr**0.2606 - 12.6843*Pr**0.1773 + 1.6953*Pr**-0.1052)
-    return unidades.Viscosity(muo*mur)
+    return _unit(unidades.Viscosity, muo*mur)
 
 
 # Liquid thermal conductivity correlations
@@ -3189,7 +3288,7 @@ def ThL_RiaziFaghri(T, Tb, SG):
     B = 0.3003+0.0918*t+0.0195*t**2                                    # Eq 10
     C = 0.1029+0.0894*t+0.0292*t**2                                    # Eq 11
     k = A*Tb_R**B*SG**C                                                # Eq 7
-    return unidades.ThermalConductivity(k, "BtuhftF")
+    return _unit(unidades.ThermalConductivity, k, "BtuhftF")
 
 
 @refDoc(__doi__, [12])
@@ -3231,7 +3330,7 @@ def ThL_Gharagheizi(T, Pc, Tb, M, w):
     A = 3.8588*M**8*(1.0045*B + 6.5152*M - 8.9756)                      # Eq 5
     k = 1e-4*(10*w + 2*Pc_bar - 2*T + 4 + 1.908*(Tb+1.009*B**2/M**2) +
               3.9287*M**4/B**4 + A/B**8)                                # Eq 4
-    return unidades.ThermalConductivity(k)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 @refDoc(__doi__, [13])
@@ -3256,7 +3355,7 @@ def ThL_LakshmiPrasad(T, M):
     """
     # Eq 5
     k = 0.0655 + (1.3855 - 0.00197*T)/M**0.5 - 0.00005*T
-    return unidades.ThermalConductivity(k)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 @refDoc(__doi__, [14])
@@ -3292,14 +3391,15 @@ def ThL_Nicola(T, M, Tc, Pc, w, mu=None):
     k : float
         Thermal conductivity [W/m·k]
     """
-    Pc_bar = unidades.Pressure(Pc).bar
-    if mu:
+    Pc_bar = Pc*1e-5
+    # Eq 3
+    k = 0.5147*(-0.2537*T/Tc+0.0017*Pc_bar+0.1501*w+(1/M)**-0.2999)
+    if mu is not None:
         # Eq 4 using dipole moment of compound
-        k = 0.6542*(-0.2034*T/Tc+0.0013*Pc_bar+0.1714*w+(1/M)**0.3539-0.007*mu)
-    else:
-        # Eq 3
-        k = 0.5147*(-0.2537*T/Tc+0.0017*Pc_bar+0.1501*w+(1/M)**-0.2999)
-    return unidades.ThermalConductivity(k)
+        k = where(
+            mu, 0.6542*(-0.2034*T/Tc+0.0013*Pc_bar+0.1714*w+(1/M)**0.3539 -
+                        0.007*mu), k)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 @refDoc(__doi__, [1])
@@ -3337,7 +3437,7 @@ def ThL_SatoRiedel(T, Tc, M, Tb):
     Tr = T/Tc
     Tbr = Tb/Tc
     k = 1.1053152/M**0.5*(3+20*(1-Tr)**(2/3))/(3+20*(1-Tbr)**(2/3))
-    return unidades.ThermalConductivity(k)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 @refDoc(__doi__, [15, 5])
@@ -3388,10 +3488,10 @@ def ThL_Pachaiyappan(T, Tc, M, rho, branched=True):
 
     Tr = T/Tc
     Tc_R = unidades.K2R(Tc)
-    rhom = unidades.Density(rho/M).lbft3
+    rhom = rho/M/unidades.Density.rates["lbft3"]
     Vm = 1/rhom
     k = C*M**n/Vm*(3+20*(1-Tr)**(2./3))/(3+20*(1-527.67/Tc_R)**(2./3))
-    return unidades.ThermalConductivity(k, "BtuhftF")
+    return _unit(unidades.ThermalConductivity, k, "BtuhftF")
 
 
 @refDoc(__doi__, [16, 5])
@@ -3463,7 +3563,7 @@ def ThL_KanitkarThodos(T, P, Tc, Pc, Vc, M, rho):
     b = 0.4 + 0.986/exp(0.58*l)                                         # Eq 8
     alfa = 7.137e-3/b**3.322                                            # Eq 7
     k = (-1.884e-6*Pr**2+1.442e-3*Pr+alfa*exp(b*rhor))/l                # Eq 6
-    return unidades.ThermalConductivity(k, "BtuhftF")
+    return _unit(unidades.ThermalConductivity, k, "BtuhftF")
 
 
 @refDoc(__doi__, [59, 1, 5])
@@ -3537,12 +3637,13 @@ def ThL_Lenoir(T, P, Tc, Pc, ko, To=None, Po=None):
     Pr1 = Po/Pc
 
     Pmin = unidades.Pressure(500, "psi")
-    if Tr2 < 0.4 or Tr2 > 0.8 or P < Pmin:
+    if (asarray(Tr2) < 0.4).any() or (asarray(Tr2) > 0.8).any() or \
+            (asarray(P) < Pmin).any():
         raise NotImplementedError("Input out of bound")
 
     C1 = 17.77 + 0.065*Pr1 - 7.764*Tr1 - 2.054*Tr1**2/exp(0.2*Pr1)
     C2 = 17.77 + 0.065*Pr2 - 7.764*Tr2 - 2.054*Tr2**2/exp(0.2*Pr2)
-    return unidades.ThermalConductivity(ko*C2/C1)
+    return _unit(unidades.ThermalConductivity, ko*C2/C1)
 
 
 @refDoc(__doi__, [1])
@@ -3585,25 +3686,26 @@ def ThL_Missenard(T, P, Tc, Pc, ko):
     >>> "%0.3f" % ThL_Missenard(304, 6330e5, 591.75, 41.08e5, 0.129)
     '0.220'
     """
-    Tr = T/Tc
-    Pr = P/Pc
+    Tr, Pr = broadcast_arrays(asarray(T/Tc, dtype=float),
+                              asarray(P/Pc, dtype=float))
 
     # Check range of validity
-    if Tr < 0.5 or Tr > 0.8 or Pr < 1 or Pr > 200:
+    if (Tr < 0.5).any() or (Tr > 0.8).any() or (Pr < 1).any() or \
+            (Pr > 200).any():
         raise NotImplementedError("Input out of bound")
 
     # Interpolate over table to get the Q parameter
-    Tri = [0.8, 0.7, 0.6, 0.5]
+    Tri = [0.5, 0.6, 0.7, 0.8]
     Pri = [1, 5, 10, 50, 100, 200]
-    Qi = array([[0.036, 0.038, 0.038, 0.038, 0.038, 0.038],
-                [0.018, 0.025, 0.027, 0.031, 0.032, 0.032],
+    Qi = array([[0.012, 0.0165, 0.017, 0.019, 0.020, 0.020],
                 [0.015, 0.020, 0.022, 0.024, 0.025, 0.025],
-                [0.012, 0.0165, 0.017, 0.019, 0.020, 0.020]])
-    f_Q = interp2d(Pri, Tri, Qi)
-    Q = f_Q(Pr, Tr)
+                [0.018, 0.025, 0.027, 0.031, 0.032, 0.032],
+                [0.036, 0.038, 0.038, 0.038, 0.038, 0.038]])
+    f_Q = RegularGridInterpolator((Tri, Pri), Qi)
+    Q = f_Q((Tr, Pr))
 
     k = ko*(1 + Q*Pr**0.7)
-    return unidades.ThermalConductivity(k)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 # Gas Thermal conductivity
@@ -3658,15 +3760,15 @@ def ThG_MisicThodos(T, Tc, Pc, M, Cp):
     '0.013'
     """
     Pc_atm = Pc/101325
-    Tr = T/Tc
-    cp = unidades.MolarSpecificHeat(Cp*M).calmolK
+    Tr = asarray(T/Tc, dtype=float)
+    cp = Cp*M/unidades.MolarSpecificHeat.rates["calmolK"]
 
     l = Tc**(1/6)*M**0.5/Pc_atm**(2/3)
-    if Tr < 1:
-        k = 0.445e-5*Tr*cp/l                                            # Eq 6
-    else:
-        k = 1e-6*(14.52*Tr-5.14)**(2/3)*cp/l                            # Eq 7
-    return unidades.ThermalConductivity(k, "calscmK")
+    with errstate(invalid="ignore"):
+        k = where(Tr < 1,
+                  0.445e-5*Tr*cp/l,                                     # Eq 6
+                  1e-6*(14.52*Tr-5.14)**(2/3)*cp/l)                     # Eq 7
+    return _unit(unidades.ThermalConductivity, k, "calscmK")
 
 
 @refDoc(__doi__, [11])
@@ -3716,7 +3818,7 @@ def ThG_RiaziFaghri(T, Tb, SG):
     B = -4.13948+1.29924*t-0.17813*t**2+0.00833*t**3                   # Eq 17
     C = 0.19876-0.0313*t-0.00567*t**2                                  # Eq 18
     k = A*Tb_R**B*SG**C                                                # Eq 7
-    return unidades.ThermalConductivity(k, "BtuhftF")
+    return _unit(unidades.ThermalConductivity, k, "BtuhftF")
 
 
 @refDoc(__doi__, [1])
@@ -3752,7 +3854,7 @@ def ThG_Eucken(M, Cv, mu):
     Cvm = Cv*M/1000
     M = M/1000.
     k = (1 + 9/4/(Cvm/R))*mu*Cvm/M
-    return unidades.ThermalConductivity(k)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 @refDoc(__doi__, [1])
@@ -3787,7 +3889,7 @@ def ThG_EuckenMod(M, Cv, mu):
     Cvm = Cv*M/1000
     M = M/1000.
     k = (1.32 + 1.77/(Cvm/R))*mu*Cvm/M
-    return unidades.ThermalConductivity(k)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 @refDoc(__doi__, [49, 1])
@@ -3850,7 +3952,7 @@ def ThG_Chung(T, Tc, M, w, Cv, mu):
 
     # Eq 9
     k = 7.452*mu*10/M*phi   # Viscosity in P
-    return unidades.ThermalConductivity(k, "calscmK")
+    return _unit(unidades.ThermalConductivity, k, "calscmK")
 
 
 @refDoc(__doi__, [5])
@@ -3922,8 +4024,8 @@ def ThG_NonHydrocarbon(T, P, id):
         raise NotImplementedError("Compound don't supported")
 
     # Convert input T in Kelvin to Rankine to use in the correlation
-    t = unidades.K2R(T)
-    p = unidades.Pressure(P).psi
+    t = unidades.K2R(asarray(T, dtype=float))
+    p = asarray(P, dtype=float)/unidades.Pressure.rates["psi"]
 
     # Check input parameter
     if id == 1:
@@ -3951,12 +4053,13 @@ def ThG_NonHydrocarbon(T, P, id):
         tmax = 2460
         pmin = 1
         pmax = 100
-    if t < tmin or t > tmax or p < pmin or p > pmax:
+    if (t < tmin).any() or (t > tmax).any() or (p < pmin).any() or \
+            (p > pmax).any():
         raise NotImplementedError("Input out of bound")
 
     A, B, C, D, E, F, G = dat[id]
     k = A + B*t + C*t**2 + D*p + E*p/t**1.2 + F/(.4*p-.001*t)**.015 + G*log(p)
-    return unidades.ThermalConductivity(k, "BtuhftF")
+    return _unit(unidades.ThermalConductivity, k, "BtuhftF")
 
 
 @refDoc(__doi__, [58, 1])
@@ -4000,20 +4103,18 @@ def ThG_StielThodos(T, Tc, Pc, Vc, M, V, ko):
     Zc = Pc*1e-3*Vc*M/Tc/R
 
     # The thermal conductivity in the paper define in cal/s·cm·K
-    ko = unidades.ThermalConductivity(ko).calscmK
+    ko = ko/unidades.ThermalConductivity.rates["calscmK"]
 
     rhor = Vc/V
     gamma = (Tc*M**3/(Pc/101325)**4)**(1/6)
 
-    if rhor < 0.5:
-        lr = 14*(exp(0.535*rhor) - 1)                                   # Eq 3
-    elif rhor < 2:
-        lr = 13.1*(exp(0.67*rhor) - 1.069)                              # Eq 4
-    else:
-        lr = 2.976*(exp(1.155*rhor) + 2.016)                            # Eq 5
+    lr = select([rhor < 0.5, rhor < 2], [
+        14*(exp(0.535*rhor) - 1),                                       # Eq 3
+        13.1*(exp(0.67*rhor) - 1.069)],                                 # Eq 4
+        2.976*(exp(1.155*rhor) + 2.016))                                # Eq 5
 
     k = ko + lr*1e-8/Zc**5/gamma
-    return unidades.ThermalConductivity(k, "calscmK")
+    return _unit(unidades.ThermalConductivity, k, "calscmK")
 
 
 @refDoc(__doi__, [49, 1])
@@ -4078,7 +4179,7 @@ def ThG_P_Chung(T, Tc, Vc, M, w, D, k, rho, ko):
     rho = rho/M/1000
 
     # Thermal conductivity in procedure in cal/s·cm·K
-    ko = unidades.ThermalConductivity(ko).calscmK
+    ko = ko/unidades.ThermalConductivity.rates["calscmK"]
 
     Tr = T/Tc
     mur = 131.3*D/(Vc*Tc)**0.5                                          # Eq 8
@@ -4107,7 +4208,7 @@ def ThG_P_Chung(T, Tc, Vc, M, w, D, k, rho, ko):
     kk = ko*(1/H2 + B6*Y)
     kp = (3.039e-4*(Tc/M)**0.5/Vc**(2/3))*B7*Y**2*H2*Tr**0.5
 
-    return unidades.ThermalConductivity(kk+kp, "calscmK")
+    return _unit(unidades.ThermalConductivity, kk+kp, "calscmK")
 
 
 @refDoc(__doi__, [61, 1])
@@ -4180,7 +4281,7 @@ def ThG_TRAPP(T, Tc, Vc, Zc, M, w, rho, ko):
         (-3.05330414748+0.450477583739/TrR)*rhorR**4 + \
         (1.03144050679-0.185480417707/TrR)*rhorR**5
 
-    return unidades.ThermalConductivity(Fl*Xl*lR*1e-3 + ko)
+    return _unit(unidades.ThermalConductivity, Fl*Xl*lR*1e-3 + ko)
 
 
 # Liquid surface tension
@@ -4214,7 +4315,7 @@ def Tension_Parametric(T, args, Tc):
     A, B = args
     Tr = T/Tc
     sigma = A*(1-Tr)**B
-    return unidades.Tension(sigma)
+    return _unit(unidades.Tension, sigma)
 
 
 @refDoc(__doi__, [39, 40, 1])
@@ -4265,7 +4366,7 @@ def Tension_BlockBird(T, Tc, Pc, Tb):
 
     # Eq 5 in 39_
     sigma = sr*Pc_bar**(2/3)*Tc**(1/3)
-    return unidades.Tension(sigma, "dyncm")
+    return _unit(unidades.Tension, sigma, "dyncm")
 
 
 @refDoc(__doi__, [1])
@@ -4306,7 +4407,7 @@ def Tension_Pitzer(T, Tc, Pc, w):
 
     sigma = Pc_bar**(2/3)*Tc**(1/3)*(1.86+1.18*w)/19.05 * \
         ((3.75+0.91*w)/(0.291-0.08*w))**(2/3)*(1-Tr)**(11/9)
-    return unidades.Tension(sigma, "dyncm")
+    return _unit(unidades.Tension, sigma, "dyncm")
 
 
 @refDoc(__doi__, [41])
@@ -4366,7 +4467,7 @@ def Tension_ZuoStenby(T, Tc, Pc, w):
 
     # Eq 2 for desired fluid
     sigma = Tc**(1/3)*Pc_bar**(2/3)*(exp(sr)-1)
-    return unidades.Tension(sigma, "dyncm")
+    return _unit(unidades.Tension, sigma, "dyncm")
 
 
 @refDoc(__doi__, [42])
@@ -4421,7 +4522,7 @@ def Tension_SastriRao(T, Tc, Pc, Tb, alcohol=False, acid=False):
 
     # Eq 3
     sigma = K * Tb**x * Pc_bar**y * Tbr**z * ((Tc-T)/(Tc-Tb))**m
-    return unidades.Tension(sigma, "dyncm")
+    return _unit(unidades.Tension, sigma, "dyncm")
 
 
 @refDoc(__doi__, [43, 42])
@@ -4477,7 +4578,7 @@ def Tension_Hakim(T, Tc, Pc, w, X):
     # Eq 8
     sigma = Pc_atm**(2/3)*Tc**(1/3)*sr06*((1-Tr)/0.4)**m
 
-    return unidades.Tension(sigma, "dyncm")
+    return _unit(unidades.Tension, sigma, "dyncm")
 
 
 @refDoc(__doi__, [44])
@@ -4512,7 +4613,7 @@ def Tension_Miqueu(T, Tc, Vc, M, w):
     # Eq 13
     sigma = Boltzmann * Tc * (Avogadro/Vc/1000/M)**(2/3) * (4.35+4.14*w) * \
         t**1.26 * (1+0.19*t**0.5-0.25*t)
-    return unidades.Tension(sigma, "mNm")
+    return _unit(unidades.Tension, sigma, "mNm")
 
 
 # Acentric factor
@@ -4539,7 +4640,7 @@ def facent_LeeKesler(Tb, Tc, Pc):
     w = (log(Pr) - 5.92714 + 6.09648/Tr + 1.28862*log(Tr) - 0.169347*Tr**6)/(
         15.2518 - 15.6875/Tr - 13.4721*log(Tr) + 0.43577*Tr**6)
 
-    return unidades.Dimensionless(w)
+    return _unit(unidades.Dimensionless, w)
 
 
 @refDoc(__doi__, [19])
@@ -4562,47 +4663,42 @@ def prop_Edmister(**kwargs):
     -------
     prop : Dict with the input parameter and the missing parameter in input
     """
-    count_available = 0
-    if "Tc" in kwargs and kwargs["Tc"]:
-        count_available += 1
-        Tc = unidades.Temperature(kwargs["Tc"])
-    else:
-        unknown = "Tc"
-
-    if "Pc" in kwargs and kwargs["Pc"]:
-        count_available += 1
-        Pc = unidades.Pressure(kwargs["Pc"])
-    else:
-        unknown = "Pc"
+    def given(key, zero=False):
+        value = kwargs.get(key)
+        if value is None:
+            return False
+        return zero or ndim(value) > 0 or bool(value)
 
-    if "Tb" in kwargs and kwargs["Tb"]:
-        count_available += 1
-        Tb = unidades.Temperature(kwargs["Tb"])
-    else:
-        unknown = "Tb"
-    if "w" in kwargs:
-        count_available += 1
-        w = unidades.Dimensionless(kwargs["w"])
-    else:
-        unknown = "w"
+    count_available = 0
+    prop = {}
+    for key in ("Tc", "Pc", "Tb", "w"):
+        if given(key, zero=key == "w"):
+            count_available += 1
+            prop[key] = asarray(kwargs[key], dtype=float)
+        else:
+            unknown = key
 
     if count_available != 3:
         raise ValueError("Bad incoming variables input")
 
+    # Calculation in ºR, psi and atm
+    Tc = unidades.K2R(prop.get("Tc", 0))
+    Tb = unidades.K2R(prop.get("Tb", 0))
+    Pc = prop.get("Pc")
+    w = prop.get("w")
     if unknown == "Tc":
-        Tc = unidades.Temperature(Tb.R*(3*log10(Pc.psi)/7/(w+1)+1), "R")
+        prop["Tc"] = Tb*(3*log10(Pc/6894.757293168361)/7/(w+1)+1)/1.8
     elif unknown == "Pc":
-        Pc = unidades.Pressure(10**(7/3.*(w+1)*(Tc.R/Tb.R-1)), "atm")
+        prop["Pc"] = 10**(7/3.*(w+1)*(Tc/Tb-1))*101325
     elif unknown == "Tb":
-        Tb = unidades.Temperature(Tb.R/(3*log10(Pc.atm)/7/(w+1)+1), "R")
+        prop["Tb"] = Tc/(3*log10(Pc/101325)/7/(w+1)+1)/1.8
     elif unknown == "w":
-        w = unidades.Dimensionless(3/7*log10(Pc.atm)/(Tc.R/Tb.R-1)-1)
+        prop["w"] = 3/7*log10(Pc/101325)/(Tc/Tb-1)-1
 
-    prop = {}
-    prop["Tc"] = Tc
-    prop["Pc"] = Pc
-    prop["Tb"] = Tb
-    prop["w"] = w
+    prop["Tc"] = _unit(unidades.Temperature, prop["Tc"])
+    prop["Pc"] = _unit(unidades.Pressure, prop["Pc"])
+    prop["Tb"] = _unit(unidades.Temperature, prop["Tb"])
+    prop["w"] = _unit(unidades.Dimensionless, prop["w"])
     return prop
 
 
@@ -4626,12 +4722,14 @@ def facent_AmbroseWalton(Pvr):
     f0 = (-5.97616*t + 1.29874*t**1.5 - 0.60394*t**2.5 - 1.06841*t**5)/Tr
     f1 = (-5.03365*t + 1.11505*t**1.5 - 5.41217*t**2.5 - 7.46628*t**5)/Tr
     f2 = (-0.64771*t + 2.41539*t**1.5 - 4.26979*t**2.5 + 3.25259*t**5)/Tr
-    coef = roots([f2, f1, f0-log(Pvr)])
 
-    if absolute(coef[0]) < absolute(coef[1]):
-        return coef[0]
-    else:
-        return coef[1]
+    # Solve the quadratic equation, using the root with lowest absolute value
+    c = f0-log(Pvr)
+    with errstate(invalid="ignore"):
+        q = -(f1+copysign(sqrt(f1**2-4*f2*c), f1))/2
+    w1 = q/f2
+    w2 = c/q
+    return where(absolute(w1) < absolute(w2), w1, w2)[()]
 
 
 # Other properties
@@ -4669,7 +4767,7 @@ def Vc_Riedel(Tc, Pc, w, M):
     alfa = 5.811 + 4.919*w
 
     Vc = R*1000*Tc/Pc/(3.72+0.26*(alfa-7))/M
-    return unidades.SpecificVolume(Vc, "lg")
+    return _unit(unidades.SpecificVolume, Vc, "lg")
 
 
 @refDoc(__doi__, [23])
@@ -4731,7 +4829,97 @@ def Henry(T, args):
     T_R = unidades.K2R(T)
     B1, B2, B3, B4 = args
     H = exp(B1/T_R + B2*log(T_R) + B3*T_R + B4)
-    return unidades.Pressure(H, "psi")
+    return _unit(unidades.Pressure, H, "psi")
+
+
+# Check the correlations evaluation with array input, the result must be the
+# same of the point by point evaluation with scalar input
+__test__ = {"broadcast": """
+>>> from inspect import signature
+>>> from numpy import allclose
+>>> values = {
+...     "T": (300, 350), "P": (5e6, 8e6), "Tc": (507.6, 540.2),
+...     "Pc": (30.25e5, 27.4e5), "Zra": (0.2635, 0.2611),
+...     "M": (86.18, 100.2), "w": (0.301, 0.35), "Vc": (4.27e-3, 4.28e-3),
+...     "Vliq": (0.295, 0.31), "Zc": (0.266, 0.261), "delta": (0.8, 0.9),
+...     "Ps": (2.5e4, 1e4), "rhos": (650, 670), "SG": (0.66, 0.69),
+...     "Tb": (341.9, 371.6), "Kw": (12.8, 12.7), "Tf": (177.8, 182.6),
+...     "mus": (3e-4, 4e-4), "muc": (2.5e-5, 2.4e-5), "muo": (1e-5, 1.1e-5),
+...     "sigma": (5.9, 6.2), "omega": (1.2, 1.3), "D": (0, 0.1),
+...     "k": (0, 0.01), "rho": (20, 35), "rhoc": (233, 235),
+...     "ko": (0.12, 0.11), "Cp": (1.7e3, 1.8e3), "Cv": (1.5e3, 1.6e3),
+...     "mu": (1e-5, 1.2e-5), "V": (0.2, 0.25), "X": (0, 0.01),
+...     "Pvr": (0.05, 0.1)}
+>>> fixed = {
+...     "Pv_Antoine": {"args": (15.8366, 2697.55, -48.78)},
+...     "Pv_Wagner": {"args": (-7.46765, 1.44211, -3.28222, -2.50941)},
+...     "MuL_Parametric": {"args": (362.79, 207.09)},
+...     "Tension_Parametric": {"args": (0.055003, 1.2674)},
+...     "Henry": {"args": (-65864.7, -215.127, 0.185874, 1384.15)},
+...     "ThG_NonHydrocarbon": {"id": 46}}
+>>> states = {"MuG_Lucas": {"T": (600, 650)}}
+>>> prefix = ("RhoL_", "Pv_", "MuL_", "MuG_", "ThL_", "ThG_", "Tension_",
+...           "facent_", "Vc_", "Rackett", "Henry")
+>>> wrong = []
+>>> with errstate(all="ignore"):
+...     for name, func in sorted(globals().items()):
+...         if not name.startswith(prefix) or name == "prop_Edmister":
+...             continue
+...         kw1, kw2, kwa = {}, {}, {}
+...         for par in signature(func).parameters.values():
+...             if par.name in fixed.get(name, {}):
+...                 kw1[par.name] = kw2[par.name] = kwa[par.name] = \\
+...                     fixed[name][par.name]
+...             elif par.name in values:
+...                 value = states.get(name, values).get(
+...                     par.name, values[par.name])
+...                 kw1[par.name], kw2[par.name] = value
+...                 kwa[par.name] = array(value)
+...         scalar = [float(func(**kw1)), float(func(**kw2))]
+...         vector = asarray(func(**kwa))
+...         if vector.shape != (2, ) or \\
+...                 not allclose(vector, scalar, rtol=1e-10, atol=0):
+...             wrong.append(name)
+>>> wrong
+[]
+"""}
+
+
+def _memoize(method):
+    """Decorator to save the results of a :class:`Componente` method in a
+    bounded least recently used cache of the instance, indexed by the
+    arguments. Calls with unhashable arguments, like arrays, are not cached
+    """
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if kwargs:
+            return method(self, *args, **kwargs)
+        memo = self.__dict__.setdefault("_memo", {})
+        cache = memo.get(name)
+        if cache is None:
+            cache = memo[name] = OrderedDict()
+        try:
+            value = cache[args]
+        except KeyError:
+            value = method(self, *args)
+            cache[args] = value
+            if len(cache) > Componente._memo_size:
+                cache.popitem(last=False)
+        except TypeError:
+            return method(self, *args)
+        else:
+            cache.move_to_end(args)
+        return value
+    return wrapper
+
+
+def _shared(cls, id, context, kwargs):
+    """Return the shared compound instance of the current process, used to
+    unpickle the compounds by reference"""
+    with config.configContext(context):
+        return cls(id, **kwargs)
 
 
 class Componente(object):
@@ -4762,8 +4950,20 @@ class Componente(object):
     for now only in API usage. Not custom stream property definition in main
     program
 
+    The instances are shared, any call with the same id and correlation
+    methods return the same object, so the compound is read from database only
+    once. The shared instances are discarded when the databank or the project
+    configuration change. The results of properties methods are saved by
+    temperature and pressure in a bounded cache of each instance, so the
+    instances must be considered immutable.
+
     Examples
     --------
+    >>> Componente(2) is Componente(2, caudalMolar=1)
+    True
+    >>> Componente(2) is Componente(2, Pv=1)
+    False
+
     This are several ejemples of usage of this class with several configuration
     definition, obviously not all correlation return valid values.
 
@@ -5013,16 +5213,63 @@ class Componente(object):
     METHODS_Tension = ["DIPPR", "Parametric", "Block-Bird", "Pitzer",
                        "Zuo-Stenby", "Sastri-Rao", "Hakim", "Miqueu"]
 
-    def __init__(self, id=None, **kwargs):
+    # Shared instances indexed by class, id, correlation methods and
+    # configuration context
+    _instances = {}
+    _generation = None
+    _lock = RLock()
+
+    # Size of cache of properties methods results
+    _memo_size = 128
+
+    def __new__(cls, id=None, **kwargs):
         if not id:
+            return object.__new__(cls)
+
+        # Only the correlation methods parameters and the configuration define
+        # the instance
+        context = config.getContext()
+        key = (cls, id, context) + tuple(
+            kwargs.get(k) for k in Componente.kwargs)
+        with Componente._lock:
+            if Componente._generation != sql.generation:
+                Componente._instances.clear()
+                Componente._generation = sql.generation
+
+            try:
+                instance = Componente._instances.get(key)
+            except TypeError:
+                instance = object.__new__(cls)
+                instance._reference = (cls, id, context, kwargs)
+                return instance
+
+            if instance is None:
+                instance = object.__new__(cls)
+                instance._reference = (cls, id, context, kwargs)
+                instance.__init__(id, **kwargs)
+                Componente._instances[key] = instance
+        return instance
+
+    def __reduce_ex__(self, protocol):
+        """The compounds loaded from database are pickled by reference, so
+        in other process they are loaded again from its database"""
+        reference = self.__dict__.get("_reference")
+        if reference is None:
+            return object.__reduce_ex__(self, protocol)
+        return (_shared, reference)
+
+    def __init__(self, id=None, **kwargs):
+        if not id or self._bool:
             return
 
         self._bool = True
         self.id = id
         self.kwargs = Componente.kwargs.copy()
-        self.kwargs.update(kwargs)
-        self.Config = config.getMainWindowConfig()
-        cmp = sql.getElement(id)
+        for key in Componente.kwargs:
+            if key in kwargs:
+                self.kwargs[key] = kwargs[key]
+        self.Config = config.getContext()
+        cmp = databankMatrix.row(id)
         self.formula = cmp[1]
         self.name = cmp[2]
         self.M = cmp[3]
@@ -5245,6 +5492,7 @@ class Componente(object):
         return unidades.Viscosity(muc, "cP")
 
     # Ideal properties
+    @_memoize
     @refDoc(__doi__, [5], tab=8)
     def _Cpo(self, T):
         """Ideal gas specific heat calculation procedure from polinomial
@@ -5267,6 +5515,7 @@ class Componente(object):
         cp = A + B*T + C*T**2 + D*T**3 + E*T**4 + F*T**5
         return unidades.SpecificHeat(cp/self.M, "calgK")
 
+    @_memoize
     @refDoc(__doi__, [5], tab=8)
     def _Ho(self, T):
         """Ideal gas enthalpy calculation from polinomial coefficient of
@@ -5293,6 +5542,7 @@ class Componente(object):
         Ho = B*To + C/2*To**2 + D/3*To**3 + E/4*To**4 + F/5*To**5
         return unidades.Enthalpy((H-Ho)/self.M, "calg")
 
+    @_memoize
     @refDoc(__doi__, [5], tab=8)
     def _so(self, T):
         """Ideal gas entropy calculation from polinomial coefficient of
@@ -5318,10 +5568,12 @@ class Componente(object):
         return unidades.SpecificHeat(so/self.M, "calgK")
 
     # Physical properties
+    @_memoize
     def RhoS(self, T):
         """Calculate the density of solid phase using the DIPPR equations"""
         return DIPPR("rhoS", T, self._dipprRhoS[:-2], M=self.M, Tc=self.Tc)
 
+    @_memoize
     def RhoL(self, T, P):
         """Calculate the density of liquid phase using any of available
         correlation"""
@@ -5420,6 +5672,7 @@ class Componente(object):
 
         return rho
 
+    @_memoize
     def Pv(self, T):
         """Vapor pressure calculation procedure using the method defined in
         preferences"""
@@ -5458,6 +5711,7 @@ class Componente(object):
             elif self.Kw and self.Tb:
                 return Pv_MaxwellBonnel(T, self.Tb, self.Kw)
 
+    @_memoize
     def ThCond_Liquido(self, T, P, rho):
         """Liquid thermal conductivity procedure using the method defined in
         preferences, use the decision diagram in 5_ Figure 12-0.2 pag 1135"""
@@ -5512,6 +5766,7 @@ class Componente(object):
 
         return k
 
+    @_memoize
     def ThCond_Gas(self, T, P, rho):
         """Vapor thermal conductivity calculation procedure using the method
         defined in preferences, decision diagram in API Databook, pag. 1136"""
@@ -5567,6 +5822,7 @@ class Componente(object):
                 T, self.Tc, self.Vc, self.Zc, self.M, self.f_acent, rho, ko)
         return k
 
+    @_memoize
     def Mu_Gas(self, T, P, rho):
         """Vapor viscosity calculation procedure using the method defined in
         preferences, decision diagram in API Databook, pag. 1026"""
@@ -5687,6 +5943,7 @@ class Componente(object):
             omega += 0.2*self.PolarParameter**2/T_
         return omega
 
+    @_memoize
     def Mu_Liquido(self, T, P):
         """Liquid viscosity calculation procedure using the method defined in
         preferences, decision diagram in API Databook, pag. 1026"""
@@ -5745,6 +6002,7 @@ class Componente(object):
 
         return mu
 
+    @_memoize
     def Tension(self, T):
         """Liquid surface tension procedure using the method defined in
         preferences"""
@@ -5790,18 +6048,22 @@ class Componente(object):
             else:
                 return Tension_Pitzer(T, self.Tc, self.Pc, self.f_acent)
 
+    @_memoize
     def Hv_DIPPR(self, T):
         """Calculate the heat of vaporization using the DIPPR equations"""
         return DIPPR("Hv", T, self._dipprHv[:-2], M=self.M, Tc=self.Tc)
 
+    @_memoize
     def Cp_Solido_DIPPR(self, T):
         """Calculate the specific heat of solid using the DIPPR equations"""
         return DIPPR("cpS", T, self._dipprCpS[:-2], M=self.M, Tc=self.Tc)
 
+    @_memoize
     def Cp_Liquido_DIPPR(self, T):
         """Calculate the specific heat of liquid using the DIPPR equations"""
         return DIPPR("cpL", T, self._dipprCpL[:-2], M=self.M, Tc=self.Tc)
 
+    @_memoize
     def Cp_Gas_DIPPR(self, T):
         """Calculate the specific heat of gas using the DIPPR equations"""
         if self._dipprCpG:
@@ -5809,6 +6071,7 @@ class Componente(object):
         else:
             return self._Cpo(T)
 
+    @_memoize
     def Cv(self, T):
         """Isochoric specific heat"""
         cp = self.Cp_Gas_DIPPR(T)
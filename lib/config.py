@@ -26,19 +26,39 @@ Variables:
   * :const:`Preferences`: ConfigParser instance with pychemqt preferences
   * :const:`currentConfig`: ConfigParser instance with the configuration of
     current pychemqt project open or the last open project
+  * :const:`generation`: Counter of changes of current project configuration
+  * :const:`indiceBase`, :const:`indiceActual`: Base and current cost index
 
 Configuration tools
 
   * :func:`getComponents`: Get component list from project
+  * :func:`loadPreferences`: Return the preferences of pychemqt
   * :func:`getMainWindowConfig`: Return config of current project
-  * :func:`setMainWindowConfig`: Update currentconfig variable
+  * :func:`setMainWindowConfig`: Update currentconfig variable, without
+    graphical interface the config must be set explicitly
+
+Calculation configuration context, the calculations use a immutable parsed
+copy of configuration, by default the current project configuration, it can
+be changed for the calculations in a thread or asyncio task
+
+  * :class:`Context`: Immutable parsed configuration
+  * :func:`getContext`: Return the configuration of calculations
+  * :func:`setContext`: Set the configuration of calculations
+  * :func:`resetContext`: Restore the previous configuration of calculations
+  * :func:`configContext`: Context manager to calculate with a configuration
+
+Model
+
   * :class:`Entity`: General class for model object
 """
 
-from configparser import ConfigParser
+from ast import literal_eval
+from configparser import ConfigParser, NoOptionError, NoSectionError
+from contextlib import contextmanager
+from contextvars import ContextVar
 import os
-
-from PyQt5 import QtWidgets
+import sys
+from types import MappingProxyType
 
 # TODO: Delete when it isn´t necessary debug
 # os.environ["CheProcess"] = "/home/jjgomera/Programacion/pychemqt/"
@@ -55,18 +75,49 @@ from PyQt5 import QtWidgets
 
 
 from lib.sql import databank
+from tools import firstrun
 
 
 conf_dir = os.path.expanduser('~') + os.sep + ".CheProcess" + os.sep
 IMAGE_PATH = os.path.join(os.environ["CheProcess"], "images") + os.sep
 
-Preferences = ConfigParser()
-Preferences.read(conf_dir + "CheProcessrc")
+
+def loadPreferences():
+    """Return a ConfigParser instance with the pychemqt preferences, without
+    preferences file, as in headless use without first run, the default
+    preferences are returned"""
+    config = ConfigParser()
+    if not config.read(conf_dir + "CheProcessrc"):
+        config = firstrun.Preferences()
+    return config
+
+
+Preferences = loadPreferences()
 # FIXME: This instance is not updated when preferences are changed
 
+# Without project configuration file, as in headless use without first run,
+# the default configuration is used
 global currentConfig
 currentConfig = ConfigParser()
-currentConfig.read(conf_dir + "CheProcessrc_temporal")
+if not currentConfig.read(conf_dir + "CheProcessrc_temporal"):
+    currentConfig = firstrun.config()
+generation = 0
+
+# Cost index, the current values are configured in CostIndex.dat
+indiceBase = ["Jan-1982", 313.95, 336.19, 326.01, 312.03, 383.18, 297.63,
+              421.1, 235.42, 338.2, 263.92, 290.13, 303.26]
+indiceActual = []
+if os.path.isfile(conf_dir + "CostIndex.dat"):
+    with open(conf_dir + "CostIndex.dat", "r") as archivo:
+        indiceActual.append(archivo.readline()[:-1])
+        while True:
+            data = archivo.readline().rstrip("\n")
+            if data:
+                indiceActual.append(float(data))
+                if len(indiceActual) == 13:
+                    break
+else:
+    indiceActual = indiceBase[:]
 
 
 def getComponents(solidos=False, config=None, name=True):
@@ -122,12 +173,16 @@ def getMainWindowConfig():
 
 
 def setMainWindowConfig(config=None):
-    """Set config as current project"""
-    global currentConfig
+    """Set config as current project, without config it's searched in the
+    main window of graphical interface if it's running"""
+    global currentConfig, generation
+    generation += 1
     if config:
         currentConfig = config
         return
-    else:
+
+    QtWidgets = sys.modules.get("PyQt5.QtWidgets")
+    if QtWidgets is not None:
         widget = QtWidgets.QApplication.activeWindow()
         if isinstance(widget, QtWidgets.QMainWindow) and \
            widget.__class__.__name__ == "UI_pychemqt":
@@ -141,6 +196,191 @@ def setMainWindowConfig(config=None):
                     break
 
 
+def _parse(value):
+    """Convert a configuration string value to a hashable python value"""
+    try:
+        value = literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+    if isinstance(value, (list, tuple)):
+        try:
+            hash(tuple(value))
+        except TypeError:
+            return repr(value)
+        return tuple(value)
+    if isinstance(value, (dict, set)):
+        return repr(value)
+    return value
+
+
+class Context(object):
+    """Immutable configuration of calculations, with the values of a
+    configuration parsed once to python types: the lists as tuples, the
+    options as booleans and the methods index as integers.
+
+    It has the read interface of ConfigParser returning the parsed values.
+    The instances are hashable and equal when the configuration is the same,
+    so they can be used as key of calculation caches
+
+    Parameters
+    ----------
+    config : ConfigParser
+        Configuration to parse
+
+    Examples
+    --------
+    >>> cfg = ConfigParser()
+    >>> cfg.read_dict({"Thermo": {"K": "1", "MEoS": "True"},
+    ...                "Components": {"Components": "[2, 3]"}})
+    >>> ctx = Context(cfg)
+    >>> ctx.getint("Thermo", "K"), ctx.getboolean("Thermo", "MEoS")
+    (1, True)
+    >>> ctx.get("Components", "Components")
+    (2, 3)
+    >>> ctx == Context(cfg), ctx.has_option("Thermo", "H")
+    (True, False)
+    >>> import pickle
+    >>> pickle.loads(pickle.dumps(ctx)) == ctx
+    True
+    """
+    __slots__ = ("_sections", "_key")
+
+    def __init__(self, config):
+        sections = {}
+        for section in config.sections():
+            values = {}
+            for option in config.options(section):
+                values[option] = _parse(config.get(section, option, raw=True))
+            sections[section] = MappingProxyType(values)
+
+        key = tuple(sorted(
+            (section, tuple(sorted(values.items())))
+            for section, values in sections.items()))
+        object.__setattr__(self, "_sections", MappingProxyType(sections))
+        object.__setattr__(self, "_key", key)
+
+    @classmethod
+    def _fromKey(cls, key):
+        """Rebuild the context from its key, used to unpickle it"""
+        context = object.__new__(cls)
+        sections = {section: MappingProxyType(dict(values))
+                    for section, values in key}
+        object.__setattr__(context, "_sections", MappingProxyType(sections))
+        object.__setattr__(context, "_key", key)
+        return context
+
+    def __reduce__(self):
+        return (self._fromKey, (self._key, ))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Context is immutable")
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __eq__(self, other):
+        return isinstance(other, Context) and self._key == other._key
+
+    def __getitem__(self, section):
+        return self._sections[section]
+
+    def sections(self):
+        """Return the list of sections"""
+        return list(self._sections)
+
+    def has_section(self, section):
+        """Return if the section is defined"""
+        return section in self._sections
+
+    def has_option(self, section, option):
+        """Return if the option is defined in section"""
+        return section in self._sections and \
+            option.lower() in self._sections[section]
+
+    def items(self, section):
+        """Return a list of (option, value) of section"""
+        return list(self[section].items())
+
+    def get(self, section, option):
+        """Return the parsed value of option in section"""
+        if section not in self._sections:
+            raise NoSectionError(section)
+        try:
+            return self._sections[section][option.lower()]
+        except KeyError:
+            raise NoOptionError(option, section)
+
+    def getint(self, section, option):
+        """Return the value of option in section as integer"""
+        return int(self.get(section, option))
+
+    def getfloat(self, section, option):
+        """Return the value of option in section as float"""
+        return float(self.get(section, option))
+
+    def getboolean(self, section, option):
+        """Return the value of option in section as boolean"""
+        value = self.get(section, option)
+        if isinstance(value, str):
+            return ConfigParser.BOOLEAN_STATES[value.lower()]
+        return bool(value)
+
+
+_context = ContextVar("config", default=None)
+_current = None
+
+
+def getContext():
+    """Return the configuration context of calculations, the context set in
+    the current thread or asyncio task or else the parsed current project
+    configuration"""
+    global _current
+    context = _context.get()
+    if context is not None:
+        return context
+
+    current = _current
+    if current is None or current[0] != generation or \
+            current[1] is not currentConfig:
+        current = (generation, currentConfig, Context(currentConfig))
+        _current = current
+    return current[2]
+
+
+def setContext(config):
+    """Set the configuration of calculations in the current thread or asyncio
+    task, config can be a ConfigParser or a Context instance. Return a token
+    to restore the previous configuration with resetContext"""
+    if not isinstance(config, Context):
+        config = Context(config)
+    return _context.set(config)
+
+
+def resetContext(token):
+    """Restore the configuration of calculations changed by setContext"""
+    _context.reset(token)
+
+
+@contextmanager
+def configContext(config):
+    """Context manager to run calculations with the configuration config,
+    a ConfigParser or Context instance
+
+    >>> cfg = firstrun.config()
+    >>> cfg.set("Thermo", "MEoS", "True")
+    >>> with configContext(cfg) as ctx:
+    ...     getContext().getboolean("Thermo", "MEoS")
+    True
+    >>> getContext() is ctx
+    False
+    """
+    token = setContext(config)
+    try:
+        yield _context.get()
+    finally:
+        resetContext(token)
+
+
 class Entity(object):
     """General class for model object, with basic functionality:
 
@@ -28,14 +28,13 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 import os
 from math import exp, log
 
-from PyQt5.QtWidgets import QApplication
-
 try:
     import CoolProp as CP
 except ImportError as e:
     pass
 
 from lib import unidades, mEoS
+from lib.kernel import QApplication
 from lib.thermo import ThermoAdvanced
 from lib.compuestos import Componente
 
@@ -22,23 +22,166 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 # Module with stream definition
 #   -Corriente: Stream general class model
 #   -PsyStream: Stream specified as psychrometric state
+#   -StreamCache: Cache of calculated stream states
+#   -CompactStream: Memory efficient representation of a calculated stream
 ###############################################################################
 
 
+from collections import namedtuple, OrderedDict
+from copy import copy
 import logging
 import os
+from threading import RLock
+import weakref
 
-from PyQt5.QtWidgets import QApplication
+from numpy import array, nan, isnan, zeros
 
+from lib.kernel import QApplication, progress
 from lib.physics import R_atml, R
-from lib import unidades, config
+from lib import unidades, config, profiler, sql
 from lib import EoS, mEoS, gerg, iapws97, freeSteam, refProp, coolProp
 from lib.solids import Solid
-from lib.mezcla import Mezcla, mix_molarflow_molarfraction
+from lib.mezcla import Mezcla, ComponentSet, mix_molarflow_molarfraction
 from lib.psycrometry import PsychroState
 from lib.thermo import ThermoWater, ThermoAdvanced, ThermoRefProp
 
 
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+class StreamCache(object):
+    """Process wide least recently used cache of calculated streams, indexed
+    by the canonicalized definition of stream state: compounds, composition,
+    flow, thermodynamic specification, thermodynamic method and configuration
+    options
+
+    The saved state is a snapshot of the stream, and each stream with a cache
+    hit gets its own copy of the mixture and phases objects, so the changes of
+    a stream aren't seen by the other streams. The other values are shared
+    and must be considered read-only
+
+    Parameters
+    ----------
+    maxsize : int
+        Maximum number of saved states, 0 to disable the cache
+
+    Examples
+    --------
+    >>> cache.clear()
+    >>> kw = {"T": 300, "P": 1e5, "caudalMasico": 1, "ids": [2],
+    ...       "fraccionMolar": [1], "MEoS": True}
+    >>> st1 = Corriente(**kw)
+    >>> st2 = Corriente(**kw)
+    >>> cache.info()
+    CacheInfo(hits=1, misses=1, maxsize=128, currsize=1)
+    >>> st1.h == st2.h, st1 is st2
+    (True, False)
+    >>> st2.Gas.rho = 0
+    >>> Corriente(**kw).Gas.rho == st1.Gas.rho != 0
+    True
+    """
+
+    # Instance attributes not saved, own of each stream
+    _private = ("kwargs", "_oldkwargs", "kwargsInteger", "notas",
+                "notasPlain")
+
+    # Mutable objects of state copied for each stream
+    _objects = ("mezcla", "Liquido", "Gas")
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._states = OrderedDict()
+        self._lock = RLock()
+
+    def __len__(self):
+        return len(self._states)
+
+    def get(self, key):
+        """Return the saved state with the key index, None if it isn't
+        available"""
+        if key is None or not self.maxsize:
+            return None
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._states.move_to_end(key)
+        if state is not None:
+            state = self._copy(state)
+        return state
+
+    def add(self, key, stream):
+        """Save the calculated state of stream with the key index"""
+        if key is None or not self.maxsize:
+            return
+        state = {}
+        for attr, value in stream.__dict__.items():
+            if attr not in self._private:
+                state[attr] = value
+        state = self._copy(state)
+        with self._lock:
+            self._states[key] = state
+            while len(self._states) > self.maxsize:
+                self._states.popitem(last=False)
+
+    def _copy(self, state):
+        """Return a copy of state with shallow copies of the mixture and
+        phases objects, keeping the same object shared by several attributes
+        as a single copy"""
+        state = state.copy()
+        copies = {}
+        for attr in self._objects:
+            value = state.get(attr)
+            if value is not None:
+                if id(value) not in copies:
+                    copies[id(value)] = copy(value)
+                state[attr] = copies[id(value)]
+        return state
+
+    def clear(self):
+        """Delete all saved states and reset the statistics"""
+        with self._lock:
+            self._states.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return the statistics of cache usage"""
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+
+def _canonical(value):
+    """Round a float value to use it as index in the stream cache"""
+    return float("%.12g" % value)
+
+
+cache = StreamCache()
+
+
+# Extensive magnitudes, proportional to the stream flow
+_EXTENSIVE = (unidades.MassFlow, unidades.MolarFlow, unidades.VolFlow,
+              unidades.Power, unidades.Entropy)
+
+
+def _scaledCopy(entity, split):
+    """Return a shallow copy of entity with the extensive properties scaled by
+    the split factor"""
+    new = copy(entity)
+    for attr, value in entity.__dict__.items():
+        if isinstance(value, _EXTENSIVE):
+            new.__dict__[attr] = value.__class__(value*split)
+        elif isinstance(value, list) and value and \
+                isinstance(value[0], _EXTENSIVE):
+            new.__dict__[attr] = [v.__class__(v*split) for v in value]
+    if "_caudalmolar" in entity.__dict__:
+        new._caudalmolar = entity._caudalmolar*split
+    return new
+
+
 class Corriente(config.Entity):
     """ Class to model a stream object
     Parameters:
@@ -123,6 +266,11 @@ class Corriente(config.Entity):
     status = 0
     msg = QApplication.translate("pychemqt", "Unknown variables")
     kwargs_forbidden = ["entrada", "mezcla", "solido"]
+
+    # kwargs defining the mixture composition
+    _composition = ("caudalMasico", "caudalVolumetrico", "caudalMolar",
+                    "caudalUnitarioMolar", "caudalUnitarioMasico",
+                    "fraccionMolar", "fraccionMasica", "mezcla", "ids")
     solido = None
 
     def __init__(self, **kwargs):
@@ -255,7 +403,7 @@ class Corriente(config.Entity):
                 QApplication.translate("pychemqt", "Error"))
             status = statusmsg[self.status]
             logging.debug('%s %s' % (status, self.msg))
-            QApplication.processEvents()
+            progress(self)
 
             self.status = 1
             self.calculo()
@@ -331,9 +479,15 @@ class Corriente(config.Entity):
         return self.tipoTermodinamica and self.tipoFlujo
 
     def calculo(self):
-        Config = config.getMainWindowConfig()
+        """Calculate the stream, reusing the saved state in the stream cache
+        if it's available"""
+        # Mixture shared by the parent stream in clone
+        mezcla = self.__dict__.pop("_mezcla", None)
+
         if self.kwargs["mezcla"]:
             self.mezcla = self.kwargs["mezcla"]
+        elif mezcla is not None:
+            self.mezcla = mezcla
         else:
             self.mezcla = Mezcla(self.tipoFlujo, **self.kwargs)
 
@@ -346,11 +500,48 @@ class Corriente(config.Entity):
         self.caudalunitariomasico = self.mezcla.caudalunitariomasico
         self.caudalunitariomolar = self.mezcla.caudalunitariomolar
 
+        self._method()
+
+        key = self._cacheKey()
+        state = cache.get(key)
+        if key is not None:
+            profiler.cache(state is not None, "stream", self._thermo)
+        if state is not None:
+            self.__dict__.update(state)
+            return
+
+        with profiler.frame("stream", self._thermo):
+            self._calculo()
+        cache.add(key, self)
+
+    def _cacheKey(self):
+        """Return the canonicalized stream state definition used as index in
+        the stream cache, None when the stream can't be cached"""
+        if self.kwargs["caudalVolumetrico"] or self.kwargs["solido"] or \
+                sum(self.kwargs["caudalSolido"]) > 0:
+            return None
+
+        spec = []
+        for var in self.tipoTermodinamica:
+            spec.append(_canonical(self.kwargs[var]))
+
+        options = []
+        for key in ("K", "alfa", "mix", "H", "Cp_ideal", "MEoS", "iapws",
+                    "GERG", "freesteam", "coolProp", "refprop"):
+            options.append(self.kwargs[key])
+
+        xi = tuple(_canonical(x) for x in self.mezcla._xi)
+        flow = _canonical(self.mezcla._caudalmolar)
+        return (tuple(self.ids), xi, flow, self.tipoTermodinamica,
+                tuple(spec), self._thermo, tuple(options),
+                config.getContext(), sql.generation)
+
+    def _calculo(self):
+        """Calculate the thermodynamic state of stream"""
+        Config = config.getContext()
         T = unidades.Temperature(self.kwargs.get("T", None))
         P = unidades.Pressure(self.kwargs.get("P", None))
         x = self.kwargs.get("x", None)
-
-        self._method()
         setData = True
 
         if self._thermo == "freesteam":
@@ -418,14 +609,17 @@ class Corriente(config.Entity):
 #            self.mezcla.recallZeros(eos.Ki, 1.)
 
             if 0. < self.x < 1.:
-                self.Liquido = Mezcla(tipo=5, fraccionMolar=eos.xi, caudalMolar=self.caudalmolar*(1-self.x))
-                self.Gas = Mezcla(tipo=5, fraccionMolar=eos.yi, caudalMolar=self.caudalmolar*self.x)
+                self.Liquido = self.mezcla.clone(
+                    fraccionMolar=eos.xi,
+                    caudalMolar=self.caudalmolar*(1-self.x))
+                self.Gas = self.mezcla.clone(
+                    fraccionMolar=eos.yi, caudalMolar=self.caudalmolar*self.x)
             elif self.x <= 0:
-                self.Liquido = self.mezcla
+                self.Liquido = self.mezcla.clone()
                 self.Gas = Mezcla()
             else:
                 self.Liquido = Mezcla()
-                self.Gas = self.mezcla
+                self.Gas = self.mezcla.clone()
             self.Gas.Z = unidades.Dimensionless(float(eos.Z[0]))
             self.Liquido.Z = unidades.Dimensionless(float(eos.Z[1]))
 
@@ -539,7 +733,9 @@ class Corriente(config.Entity):
                 self.Liquido.sigma = compuesto.sigma
                 self.Liquido.ids = self.ids
 
-        if Config.get("Components", "Solids"):
+        # The solid phase is defined whenever the configuration has the
+        # Solids option, even without solid components
+        if Config.has_option("Components", "Solids"):
             if self.kwargs["solido"]:
                 self.solido = self.kwargs["solido"]
             else:
@@ -559,7 +755,7 @@ class Corriente(config.Entity):
 
     def _method(self):
         """Find the thermodynamic method to use"""
-        Config = config.getMainWindowConfig()
+        Config = config.getContext()
 
         # MEoS availability,
         if self.kwargs["MEoS"] is not None:
@@ -647,11 +843,57 @@ class Corriente(config.Entity):
         return psystream
 
     def clone(self, **kwargs):
-        """Create a new stream instance with change only kwags new values"""
+        """Create a new stream instance with change only kwags new values
+
+        The calculated results of stream are reused when possible:
+
+            * With only the split kwarg the extensive properties are scaled,
+              without any thermodynamic calculation
+            * Without composition changes the compounds of mixture are
+              shared, the clone has its own mixture object
+
+        The thermodynamic state is always solved from scratch, the state of
+        parent isn't a safe initial value across a phase boundary.
+
+        >>> st = Corriente(T=300, P=1e5, caudalMasico=1, ids=[2],
+        ...                fraccionMolar=[1], MEoS=True)
+        >>> half = st.clone(split=0.5)
+        >>> "%0.2f %0.2f %0.2f" % (half.caudalmasico, half.h/st.h, half.T)
+        '0.50 0.50 300.00'
+        >>> hot = half.clone(T=350)
+        >>> hot.mezcla.core is half.mezcla.core, hot.mezcla is half.mezcla
+        (True, False)
+
+        The calculation of clone doesn't change the phases of parent stream
+
+        >>> from tools import firstrun
+        >>> from lib.EoS.BWRS import BWRS
+        >>> cfg = firstrun.config()
+        >>> cfg.set("Components", "Components", "[3, 4]")
+        >>> cfg.set("Thermo", "K", str(EoS.K.index(BWRS)))
+        >>> cfg.set("Thermo", "H", str(EoS.H.index(BWRS)))
+        >>> with config.configContext(cfg):
+        ...     gas = Corriente(T=300, P=1e5, caudalMasico=1, ids=[3, 4],
+        ...                     fraccionMolar=[0.5, 0.5])
+        ...     hot = gas.clone(T=500)
+        >>> "%0.3f %0.3f" % (gas.Gas.rho, hot.Gas.rho)
+        '1.504 0.894'
+
+        The cloned state can be in other phase
+
+        >>> "%0.1f" % st.clone(T=100, P=1e6).rho
+        '707.6'
+        """
+        split = kwargs.pop("split", None)
+        solid = self.solido is not None and self.solido.status
+        solved = self.status == 1 and "mezcla" in self.__dict__ and \
+            not self.kwargs["caudalVolumetrico"] and not solid
+        if solved and split is not None and not kwargs:
+            return self._split(split)
+
+        composition = set(kwargs).intersection(Corriente._composition)
         old_kwargs = self.kwargs.copy()
-        if "split" in kwargs:
-            split = kwargs["split"]
-            del kwargs["split"]
+        if split is not None:
             if self.kwargs["caudalUnitarioMasico"]:
                 kwargs["caudalUnitarioMasico"] = []
                 for caudal in self.kwargs["caudalUnitarioMasico"]:
@@ -670,7 +912,44 @@ class Corriente(config.Entity):
             old_kwargs.update(kwargs["mezcla"].kwargs)
             del kwargs["mezcla"]
         old_kwargs.update(kwargs)
-        return Corriente(**old_kwargs)
+
+        stream = object.__new__(Corriente)
+        if solved and not composition and not old_kwargs["mezcla"]:
+            if split is None:
+                stream._mezcla = self.mezcla.clone()
+            else:
+                stream._mezcla = self.mezcla.clone(split=split)
+        stream.__init__(**old_kwargs)
+        return stream
+
+    def _split(self, split):
+        """Return a copy of stream with the flows multiplied by split, the
+        intensive state is the same so the thermodynamic results are kept and
+        only the extensive properties are scaled"""
+        stream = _scaledCopy(self, split)
+        stream.kwargs = self.kwargs.copy()
+        for key in ("caudalUnitarioMasico", "caudalUnitarioMolar"):
+            if self.kwargs[key]:
+                stream.kwargs[key] = [split*q for q in self.kwargs[key]]
+        for key in ("caudalMasico", "caudalMolar"):
+            if self.kwargs[key]:
+                stream.kwargs[key] = split*self.kwargs[key]
+
+        # Phases can be the same object than mixture
+        copies = {}
+        for attr in ("mezcla", "Liquido", "Gas"):
+            entity = self.__dict__.get(attr)
+            if entity is None:
+                continue
+            if id(entity) not in copies:
+                copies[id(entity)] = _scaledCopy(entity, split)
+            stream.__dict__[attr] = copies[id(entity)]
+        return stream
+
+    def compact(self):
+        """Return a memory efficient representation of the calculated stream,
+        see :class:`CompactStream`"""
+        return CompactStream(self)
 
     def __repr__(self):
         if self.status:
@@ -1049,6 +1328,261 @@ class Corriente(config.Entity):
             self.Liquido.sigma = unidades.Tension(state["liquid"]["sigma"])
 
 
+class _Scalar(object):
+    """Descriptor of a scalar property saved in the float buffer of
+    :class:`CompactStream`, the unit instance is created in each access"""
+    __slots__ = ("name", "index")
+
+    def __init__(self, name, index):
+        self.name = name
+        self.index = index
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        return obj._value(self.name, self.index)
+
+
+class CompactPhase(object):
+    """Phase view of a :class:`CompactStream`, created on demand"""
+    __slots__ = ("_stream", "_row")
+
+    _names = {1: "Liquido", 2: "Gas"}
+
+    def __init__(self, stream, row):
+        self._stream = stream
+        self._row = row
+
+    def __bool__(self):
+        return self._stream._bools[self._row-1]
+
+    def __getattr__(self, name):
+        # Properties not saved are got from the full stream phase
+        if name.startswith("_"):
+            raise AttributeError(name)
+        phase = getattr(self._stream.corriente(), self._names[self._row])
+        return getattr(phase, name)
+
+    def _value(self, name, index):
+        offset = len(CompactStream._scalars) + \
+            (self._row-1)*len(CompactStream._phaseScalars)
+        return self._stream._value(name, offset+index)
+
+    @property
+    def ids(self):
+        return self._stream.ids
+
+    @property
+    def componente(self):
+        return self._stream.componente
+
+    @property
+    def fraccion(self):
+        return self._stream._fraction(self._row)
+
+    @property
+    def fraccion_masica(self):
+        return self._stream._fraction(self._row, mass=True)
+
+    @property
+    def caudalunitariomolar(self):
+        return self._stream._unitFlow(self._row)
+
+    @property
+    def caudalunitariomasico(self):
+        return self._stream._unitFlow(self._row, mass=True)
+
+
+class CompactStream(object):
+    """
+    Memory efficient representation of a calculated :class:`Corriente`,
+    useful to keep the streams of large flowsheets. The scalar properties of
+    stream and phases are saved in a float buffer, the component flows of
+    stream, liquid and gas phases as rows of an array and the compounds are
+    shared with the mixtures with same compounds. The unit instances are
+    created only when the properties are accessed.
+
+    The properties not saved in the compact representation are got from the
+    full stream, recalculated on demand in the configuration context of
+    compaction and referenced weakly
+
+    Parameters
+    ----------
+    stream : Corriente
+        Calculated stream to represent
+
+    Examples
+    --------
+    >>> st = Corriente(T=300, P=1e5, caudalMasico=1, ids=[2],
+    ...                fraccionMolar=[1], MEoS=True)
+    >>> cst = st.compact()
+    >>> cst.T == st.T, cst.h == st.h, "%0.1f" % cst.P.bar
+    (True, True, '1.0')
+    >>> "%0.4f %0.1f" % (cst.caudalunitariomasico[0], cst.Gas.fraccion[0])
+    '1.0000 1.0'
+    >>> cst.clone(T=350).T
+    350.0
+
+    The full stream is recalculated with the configuration of compaction
+
+    >>> from tools import firstrun
+    >>> cfg = firstrun.config()
+    >>> cfg.set("Components", "Components", "[2]")
+    >>> cfg.set("Thermo", "MEoS", "True")
+    >>> with config.configContext(cfg):
+    ...     cst = Corriente(T=300, P=1e5, caudalMasico=1, ids=[2],
+    ...                     fraccionMolar=[1]).compact()
+    >>> with config.configContext(firstrun.config()):
+    ...     cst.corriente()._thermo
+    'meos'
+    """
+
+    __slots__ = ("core", "kwargs", "status", "solido", "_data", "_units",
+                 "_bools", "_flows", "_full", "_context")
+
+    # Saved scalar properties of stream and phases
+    _scalars = ("T", "P", "x", "M", "Tc", "Pc", "SG", "caudalmasico",
+                "caudalmolar", "Q", "h", "s", "rho")
+    _phaseScalars = ("M", "Q", "rho", "h", "s", "cp", "cv", "cp_cv", "mu",
+                     "k", "sigma", "Prandt", "Z", "caudalmasico",
+                     "caudalmolar")
+
+    # Shared tuples of property unit classes
+    _layouts = {}
+
+    def __init__(self, stream):
+        self.kwargs = {}
+        for key, value in stream.kwargs.items():
+            default = Corriente.kwargs[key]
+            try:
+                changed = bool(value != default)
+            except ValueError:
+                changed = True
+            if changed:
+                self.kwargs[key] = value
+        self.status = stream.status
+        self.solido = stream.solido
+        self._full = weakref.ref(stream)
+        self._context = config.getContext()
+        self.core = ComponentSet(stream.ids)
+
+        entities = [(stream, self._scalars)]
+        bools = []
+        for phase in ("Liquido", "Gas"):
+            entity = getattr(stream, phase, None)
+            entities.append((entity, self._phaseScalars))
+            bools.append(bool(entity))
+        self._bools = tuple(bools)
+
+        data = []
+        units = []
+        for entity, scalars in entities:
+            for attr in scalars:
+                value = getattr(entity, attr, None)
+                if isinstance(value, (float, int)):
+                    data.append(value)
+                    units.append(value.__class__)
+                else:
+                    data.append(nan)
+                    units.append(None)
+        self._data = array(data, dtype=float)
+        units = tuple(units)
+        self._units = CompactStream._layouts.setdefault(units, units)
+
+        self._flows = zeros((3, len(self.core)))
+        for row, (entity, scalars) in enumerate(entities):
+            flows = getattr(entity, "caudalunitariomolar", None)
+            if flows and len(flows) == len(self.core):
+                self._flows[row] = flows
+
+    def __getattr__(self, name):
+        # Properties not saved are got from the full stream
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.corriente(), name)
+
+    def __repr__(self):
+        if self.status:
+            return "CompactStream at %0.2fK and %0.2fatm" % (
+                self.T, self.P.atm)
+        else:
+            return "%s empty" % (self.__class__)
+
+    def _value(self, name, index):
+        unit = self._units[index]
+        value = self._data[index]
+        if unit is None or isnan(value):
+            raise AttributeError(name)
+        return unit(value)
+
+    def _fraction(self, row, mass=False):
+        xi = self._flows[row]
+        if mass:
+            xi = xi*self.core.M
+        suma = xi.sum()
+        if not suma:
+            raise AttributeError("fraccion")
+        return [unidades.Dimensionless(x) for x in xi/suma]
+
+    def _unitFlow(self, row, mass=False):
+        if mass:
+            return [unidades.MassFlow(q) for q in self._flows[row]*self.core.M]
+        return [unidades.MolarFlow(q) for q in self._flows[row]]
+
+    def corriente(self):
+        """Return the full :class:`Corriente` instance of stream, the
+        recalculated stream uses the configuration of compaction"""
+        stream = self._full()
+        if stream is None:
+            with config.configContext(self._context):
+                stream = Corriente(**self.kwargs)
+            self._full = weakref.ref(stream)
+        return stream
+
+    def clone(self, **kwargs):
+        """Create a new full stream instance with change only kwags new
+        values"""
+        return self.corriente().clone(**kwargs)
+
+    @property
+    def ids(self):
+        return list(self.core.ids)
+
+    @property
+    def componente(self):
+        return list(self.core.componente)
+
+    @property
+    def Liquido(self):
+        return CompactPhase(self, 1)
+
+    @property
+    def Gas(self):
+        return CompactPhase(self, 2)
+
+    @property
+    def fraccion(self):
+        return self._fraction(0)
+
+    @property
+    def fraccion_masica(self):
+        return self._fraction(0, mass=True)
+
+    @property
+    def caudalunitariomolar(self):
+        return self._unitFlow(0)
+
+    @property
+    def caudalunitariomasico(self):
+        return self._unitFlow(0, mass=True)
+
+
+for i, attr in enumerate(CompactStream._scalars):
+    setattr(CompactStream, attr, _Scalar(attr, i))
+for i, attr in enumerate(CompactStream._phaseScalars):
+    setattr(CompactPhase, attr, _Scalar(attr, i))
+
+
 class PsyStream(config.Entity):
     """
     Class to model a stream as psychrometric state
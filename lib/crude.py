@@ -26,10 +26,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 import warnings
 
-from PyQt5.QtWidgets import QApplication
 from scipy import pi, exp, log10, log, sin
 from scipy.optimize import fsolve
 
+from lib.kernel import QApplication
 from lib.physics import R_atml
 
 from lib import unidades
@@ -0,0 +1,255 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+'''Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
+
+
+###############################################################################
+# Columnar read-only copy of compounds databank
+#   -matrix: Structured array with all compounds of main and custom database
+#   -column: Array with a property of all compounds
+#   -block: 2D array with a group of coefficients of all compounds
+#   -hasDIPPR: Mask of compounds with a DIPPR correlation defined
+#   -query: Select the compounds ids that fulfill the conditions
+#   -search: Select the compounds ids with a text in name or formula
+#   -index: Position in matrix of compounds
+#   -row: Row of compound with the same format of sql.getElement
+#
+# The matrix is built from databases in the first use and saved in the user
+# config directory, it's rebuilt when any database change
+###############################################################################
+
+
+import os
+import sqlite3
+from threading import RLock
+from zipfile import BadZipFile
+
+from numpy import array, char, empty, isnan, load, ones, savez, searchsorted
+
+from lib import sql
+from lib.config import conf_dir
+
+
+# Groups of columns with the coefficients of a correlation
+BLOCKS = {
+    "Cp_ideal": ["Cp_ideal_%s" % c for c in "ABCDEF"],
+    "antoine": ["antoine_A", "antoine_B", "antoine_C", "antoine_to",
+                "antoine_n", "antoine_E", "antoine_F"],
+    "wagner": ["wagner_a", "wagner_b", "wagner_c", "wagner_d"],
+    "henry": ["henry_%s" % c for c in "ABCD"],
+    "MSRK": ["MSRK_A", "MSRK_B"]}
+
+DIPPR = ["rhoS", "rhoL", "Pv", "Hv", "CpS", "CpL", "CpG", "muL", "muG",
+         "ThcondL", "ThcondG", "tension"]
+for prop in DIPPR:
+    BLOCKS["DIPPR_"+prop] = ["%s_DIPPR_%s" % (prop, c) for c in
+                             ("EQ", "A", "B", "C", "D", "E", "tmin", "tmax")]
+
+_version = 1
+_file = os.path.join(conf_dir, "databank.npz")
+_lock = RLock()
+_matrix = None
+_nullable = ()
+_generation = None
+
+
+def _signature():
+    """Identification of the state of databases files"""
+    sign = ["%i" % _version]
+    for name in (sql.databank_name, sql.databank_Custom_name):
+        if os.path.isfile(name):
+            stat = os.stat(name)
+            sign.append("%s %i %i" % (name, stat.st_mtime_ns, stat.st_size))
+    return "|".join(sign)
+
+
+def _build():
+    """Build the structured array from the rows of databases"""
+    conn = sqlite3.connect(sql.databank_name)
+    columns = [c[1] for c in conn.execute("PRAGMA table_info(compuestos)")]
+    conn.close()
+
+    rows = [sql.store()[id] for id in sorted(sql.store())]
+    dtype = []
+    nullable = []
+    for i, name in enumerate(columns):
+        values = [r[i] for r in rows]
+        if any(isinstance(v, str) for v in values):
+            width = max(len(v) for v in values if isinstance(v, str))
+            dtype.append((name, "U%i" % max(width, 1)))
+        elif all(type(v) is int for v in values):
+            dtype.append((name, "i8"))
+        else:
+            dtype.append((name, "f8"))
+            nullable.append(any(v is None for v in values))
+            continue
+        nullable.append(False)
+
+    matrix = empty(len(rows), dtype=dtype)
+    for i, name in enumerate(columns):
+        values = [r[i] for r in rows]
+        if matrix.dtype[name].kind == "U":
+            values = ["" if v is None else str(v) for v in values]
+        elif matrix.dtype[name].kind == "f":
+            values = [float("nan") if v is None else v for v in values]
+        matrix[name] = values
+    return matrix, array(nullable)
+
+
+def _load():
+    """Load the matrix from the sidecar file if it's updated, else build it
+    and save it"""
+    sign = _signature()
+    if os.path.isfile(_file):
+        try:
+            with load(_file) as data:
+                if str(data["signature"]) == sign:
+                    return data["matrix"], data["nullable"]
+        except (OSError, KeyError, ValueError, BadZipFile):
+            pass
+
+    matrix, nullable = _build()
+    # Write to a temporal file so an interrupted save can't leave a truncated
+    # sidecar, other processes can be saving it too
+    tmp = "%s.%i.tmp" % (_file, os.getpid())
+    try:
+        with open(tmp, "wb") as f:
+            savez(f, matrix=matrix, nullable=nullable, signature=sign)
+        os.replace(tmp, _file)
+    except OSError:
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+    return matrix, nullable
+
+
+def matrix():
+    """Return the structured array with all compounds, sorted by id. Each
+    field of array is a column of database. Missing values in numeric columns
+    are nan, in text columns are empty strings
+
+    Examples
+    --------
+    >>> data = matrix()
+    >>> int(data["id"][1]), data["name"][1]
+    (2, 'Methane')
+    """
+    global _matrix, _nullable, _generation
+    with _lock:
+        if _matrix is None or _generation != sql.generation:
+            data, nullable = _load()
+            data.setflags(write=False)
+            _nullable = tuple(i for i, null in enumerate(nullable) if null)
+            _matrix = data
+            _generation = sql.generation
+        return _matrix
+
+
+def column(name):
+    """Return the array with the value of the property name for all compounds
+
+    >>> "%0.2f" % column("tc")[index(2)]
+    '190.63'
+    """
+    return matrix()[name]
+
+
+def block(name):
+    """Return a 2D array with the coefficients of the correlation name for all
+    compounds, with shape (n, k), name can be any key of BLOCKS"""
+    data = matrix()
+    return array([data[c] for c in BLOCKS[name]], dtype=float).T
+
+
+def hasDIPPR(prop):
+    """Return a boolean array with the compounds with the DIPPR correlation
+    of prop defined"""
+    return column("%s_DIPPR_EQ" % prop) != 0
+
+
+def index(ids):
+    """Return the position in matrix of the compounds with id"""
+    return searchsorted(matrix()["id"], ids)
+
+
+def query(*masks, **conditions):
+    """Return the ids of compounds that fulfill all the conditions
+
+    Parameters
+    ----------
+    masks : array
+        Boolean arrays with the compounds selected
+    conditions : dict
+        Conditions for columns, the value can be a tuple with the lower and
+        upper limits, None to leave the limit open, or the exact value
+
+    Examples
+    --------
+    Compounds with boiling temperature between 300K and 310K and the DIPPR
+    vapor pressure correlation
+
+    >>> ids = query(hasDIPPR("Pv"), Tb=(300, 310))
+    >>> 8 in ids, 2 in ids
+    (True, False)
+    """
+    data = matrix()
+    mask = ones(len(data), dtype=bool)
+    for m in masks:
+        mask &= m
+    for name, value in conditions.items():
+        values = data[name]
+        if isinstance(value, tuple):
+            low, high = value
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        else:
+            mask &= values == value
+    return data["id"][mask]
+
+
+def search(text):
+    """Return the ids of compounds with text in name or formula, case
+    insensitive"""
+    data = matrix()
+    text = text.lower()
+    mask = char.find(char.lower(data["name"]), text) >= 0
+    mask |= char.find(char.lower(data["formula"]), text) >= 0
+    return data["id"][mask]
+
+
+def row(id):
+    """Return the data of compound id as tuple, with the same format of
+    :func:`lib.sql.getElement`, so it can be used as backing store of
+    :class:`lib.compuestos.Componente`
+
+    >>> row(2) == sql.getElement(2)
+    True
+    """
+    data = matrix()
+    i = index(id)
+    if i >= len(data) or data["id"][i] != id:
+        return None
+    values = data[i].tolist()
+    if _nullable:
+        values = list(values)
+        for j in _nullable:
+            if isnan(values[j]):
+                values[j] = None
+        values = tuple(values)
+    return values
@@ -67,8 +67,8 @@ import os
 import sqlite3
 
 from numpy import linspace, logspace, log
-from PyQt5.QtCore import QLocale
 
+from lib.kernel import systemLocale
 from lib.utilities import colors
 
 
@@ -78,7 +78,7 @@ connection = sqlite3.connect(os.path.join(
 databank = connection.cursor()
 
 # Load system locale to implement a custon translation system (non qt)
-locale = QLocale.system().name().upper()
+locale = systemLocale().upper()
 if "_" in locale:
     locale = locale.split("_")[0]
 
@@ -26,10 +26,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 from scipy import exp, log, log10, tan, sinh, tanh, arctan, sqrt
 from scipy import roots, r_
 from scipy.constants import pi, Avogadro, R
-from scipy.optimize import fsolve
-
 from . import unidades
 from . import config
+from . import profiler
+from .profiler import fsolve
 from .physics import R_atml, factor_acentrico_octano
 
 #from EoS import *
@@ -45,7 +45,7 @@ def Alfa(Tr, m, f_acent, EOS="SRK", alfa=None):
         Boston, J.F.; Mathias, P.M. Phase Equilibria in a Third-Generation Process Simulator. Proc. 2nd. Int. Conf. On Phase Equilibria and Fluid Properties in the Chemical Process Industries, Berlin, Germany 17.-21.3.1980, p. 823.
         """
     if not alfa:
-        Config=config.getMainWindowConfig()
+        Config=config.getContext()
         alfa=Config.getint("Thermo","Alfa")
 
     if alfa==2: #Función alfa de Twu et Alt.
@@ -110,6 +110,7 @@ class EoS(object):
         self.fraccion = mezcla.fraccion
         self.kwargs = kwargs
 
+    @profiler.measure("flash")
     def _Flash(self):
         """Cálculo de los coeficientes de reparto entre fases, Ref Naji - Conventional and rapid flash claculations"""
         #Estimación inicial de K mediante correlación wilson Eq 19
@@ -149,7 +150,7 @@ class EoS(object):
                     fiv=[z*t*self.P for z, t in zip(yi, titav)]
                     fil=[z*t*self.P for z, t in zip(xi, tital)]
                     #criterio de convergencia Eq 21
-                    if sum([abs(l/v-1) for l, v in zip(fil, fiv)])< 1e-14 and abs(x-xo) < 1e-10:
+                    if sum([abs(l/v-1) for l, v in zip(fil, fiv)])< 1e-10 and abs(x-xo) < 1e-10:
                         break
                     else:
                         Ki=[l/v for l, v in zip(tital, titav)]
@@ -0,0 +1,415 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the tools for the sequential modular solution of flowsheets, the
+graph analysis to define the calculation order and the recycle convergence:
+
+  * :func:`stronglyConnected`: Strongly connected components of a graph
+  * :func:`levels`: Groups of independent components of a graph
+  * :func:`tearStreams`: Selection of tear streams of a recycle section
+  * :func:`changed`: Comparison of values with a relative tolerance
+  * :class:`Direct`: Direct substitution
+  * :class:`Wegstein`: Bounded Wegstein acceleration
+  * :class:`Broyden`: Broyden quasi-Newton acceleration
+  * :class:`Iteration`: Record of the convergence of a recycle iteration
+"""
+
+
+from collections import namedtuple
+from numbers import Number
+
+from numpy import asarray, clip, dot, errstate, eye, isfinite, outer, where
+
+from lib.utilities import refDoc
+
+
+__doi__ = {
+    1:
+        {"autor": "Wegstein, J.H.",
+         "title": "Accelerating Convergence of Iterative Processes",
+         "ref": "Communications of the ACM 1(6) (1958) 9-13",
+         "doi": "10.1145/368861.368871"},
+    2:
+        {"autor": "Broyden, C.G.",
+         "title": "A Class of Methods for Solving Nonlinear Simultaneous "
+                  "Equations",
+         "ref": "Mathematics of Computation 19(92) (1965) 577-593",
+         "doi": "10.1090/S0025-5718-1965-0198670-6"},
+    3:
+        {"autor": "Tarjan, R.",
+         "title": "Depth-First Search and Linear Graph Algorithms",
+         "ref": "SIAM J. Comput. 1(2) (1972) 146-160",
+         "doi": "10.1137/0201010"},
+    4:
+        {"autor": "Biegler, L.T., Grossmann, I.E., Westerberg, A.W.",
+         "title": "Systematic Methods of Chemical Process Design",
+         "ref": "Prentice Hall, 1997",
+         "doi": ""},
+}
+
+
+Iteration = namedtuple("Iteration", ["section", "iteration", "residual"])
+Iteration.__doc__ = """Convergence record of a recycle iteration, section is
+the tuple of tear streams of recycle, and residual the maximum relative change
+of tear streams variables"""
+
+
+@refDoc(__doi__, [3])
+def stronglyConnected(graph):
+    """Calculate the strongly connected components of a directed graph with
+    the Tarjan algorithm, each component is a group of nodes in a recycle or a
+    single node without recycle
+
+    Parameters
+    ----------
+    graph : dict
+        Successors list of each node of graph
+
+    Returns
+    -------
+    components : list
+        Lists of nodes of each component, in topological order, so each
+        component only depends of the previous ones
+
+    Examples
+    --------
+    >>> graph = {"e1": ["e2"], "e2": ["e3", "e4"], "e3": ["e2"], "e4": []}
+    >>> stronglyConnected(graph)
+    [['e1'], ['e2', 'e3'], ['e4']]
+    """
+    index = {}
+    low = {}
+    stack = []
+    onstack = set()
+    components = []
+
+    for root in graph:
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        onstack.add(root)
+        work = [(root, iter(graph.get(root, ())))]
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = len(index)
+                    stack.append(succ)
+                    onstack.add(succ)
+                    work.append((succ, iter(graph.get(succ, ()))))
+                    break
+                elif succ in onstack:
+                    low[node] = min(low[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        item = stack.pop()
+                        onstack.discard(item)
+                        component.append(item)
+                        if item == node:
+                            break
+                    components.append(component[::-1])
+
+    components.reverse()
+    return components
+
+
+def levels(graph):
+    """Group the strongly connected components of a directed graph in levels,
+    each component only depends of components of previous levels, so the
+    components of a level are independent and can be calculated in parallel
+
+    Parameters
+    ----------
+    graph : dict
+        Successors list of each node of graph
+
+    Returns
+    -------
+    levels : list
+        Lists of components of each level
+
+    Examples
+    --------
+    Two parallel trains fed by the same unit
+
+    >>> graph = {"e1": ["e2", "e4"], "e2": ["e3"], "e3": [], "e4": ["e5"],
+    ...          "e5": ["e4"]}
+    >>> levels(graph)
+    [[['e1']], [['e4', 'e5'], ['e2']], [['e3']]]
+    """
+    components = stronglyConnected(graph)
+    owner = {}
+    for i, component in enumerate(components):
+        for node in component:
+            owner[node] = i
+
+    # The components are in topological order, so the level of each
+    # component is known before updating its successors
+    level = [0]*len(components)
+    for i, component in enumerate(components):
+        for node in component:
+            for succ in graph.get(node, ()):
+                j = owner[succ]
+                if j != i:
+                    level[j] = max(level[j], level[i]+1)
+
+    groups = [[] for i in range(max(level, default=-1)+1)]
+    for component, i in zip(components, level):
+        groups[i].append(component)
+    return groups
+
+
+@refDoc(__doi__, [4])
+def tearStreams(nodes, edges, start=None):
+    """Select the tear streams of a recycle section of flowsheet and the
+    calculation order of its units. The tear streams are the back edges of a
+    depth-first search from the start unit, so the section without them has
+    not any recycle
+
+    Parameters
+    ----------
+    nodes : list
+        Units of section
+    edges : list
+        Streams of section as (key, up, down) tuples
+    start : str, optional
+        Unit to start the search, it can be the unit with feed from outside
+        of section, by default the first unit
+
+    Returns
+    -------
+    tears : list
+        Keys of tear streams
+    order : list
+        Calculation order of units
+
+    Examples
+    --------
+    >>> nodes = ["e1", "e2", "e3"]
+    >>> edges = [(1, "e1", "e2"), (2, "e2", "e3"), (3, "e3", "e1"),
+    ...          (4, "e2", "e1")]
+    >>> tearStreams(nodes, edges)
+    ([3, 4], ['e1', 'e2', 'e3'])
+    """
+    successors = {node: [] for node in nodes}
+    for key, up, down in edges:
+        successors[up].append((key, down))
+
+    roots = list(nodes)
+    if start is not None:
+        roots.remove(start)
+        roots.insert(0, start)
+
+    # Depth first search, the edges to a node in current path are back edges
+    tears = []
+    state = {}
+    for root in roots:
+        if root in state:
+            continue
+        state[root] = 1
+        work = [(root, iter(successors[root]))]
+        while work:
+            node, succ = work[-1]
+            for key, down in succ:
+                if state.get(down) == 1:
+                    tears.append(key)
+                elif down not in state:
+                    state[down] = 1
+                    work.append((down, iter(successors[down])))
+                    break
+            else:
+                state[node] = 2
+                work.pop()
+
+    # Topological order of section without tear streams
+    indegree = {node: 0 for node in nodes}
+    for key, up, down in edges:
+        if key not in tears:
+            indegree[down] += 1
+    order = []
+    ready = [node for node in roots if not indegree[node]]
+    while ready:
+        node = ready.pop(0)
+        order.append(node)
+        for key, down in successors[node]:
+            if key not in tears:
+                indegree[down] -= 1
+                if not indegree[down]:
+                    ready.append(down)
+    return sorted(tears), order
+
+
+def changed(old, new, tol=1e-6):
+    """Check if a value, as the parameters of equipments, has changed beyond
+    the relative tolerance tol, the lists and dicts are compared by items
+
+    Examples
+    --------
+    >>> changed(100, 100.00001), changed([1, 2], [1, 2.1]), changed("a", "a")
+    (False, True, False)
+    >>> changed({"T": 300, "split": [0.5, 0.5]}, {"T": 300, "split": [0.5]})
+    True
+    """
+    if isinstance(old, bool) or isinstance(new, bool):
+        return old is not new
+    if isinstance(old, Number) and isinstance(new, Number):
+        return abs(new-old) > tol*max(abs(old), abs(new))
+    if isinstance(old, dict) and isinstance(new, dict):
+        if old.keys() != new.keys():
+            return True
+        return any(changed(old[key], new[key], tol) for key in old)
+    if isinstance(old, (list, tuple)) and isinstance(new, (list, tuple)):
+        if len(old) != len(new):
+            return True
+        return any(changed(a, b, tol) for a, b in zip(old, new))
+    try:
+        return bool(old != new)
+    except ValueError:
+        return True
+
+
+class Direct(object):
+    """Direct substitution of fixed point iteration x = g(x)
+
+    >>> Direct()([1, 2], [3, 4])
+    array([3., 4.])
+    """
+
+    def __call__(self, x, g):
+        """Return the next estimation of variables from the current values x
+        and its calculated values g"""
+        return asarray(g, dtype=float)
+
+
+@refDoc(__doi__, [1, 4])
+class Wegstein(Direct):
+    r"""Bounded Wegstein acceleration of fixed point iteration x = g(x), each
+    variable is extrapolated with the secant slope of its last iterations
+
+    .. math::
+        \begin{array}[t]{l}
+        s = \frac{g(x_k)-g(x_{k-1})}{x_k-x_{k-1}}\\
+        q = \frac{s}{s-1}\\
+        x_{k+1} = qx_k + \left(1-q\right)g(x_k)\\
+        \end{array}
+
+    Parameters
+    ----------
+    qmin : float, optional
+        Lower bound of q acceleration parameter, default -5
+    qmax : float, optional
+        Upper bound of q acceleration parameter, default 0, without damping
+    delay : int, optional
+        Direct substitution iterations before the first acceleration
+
+    Examples
+    --------
+    A linear recycle converges in few iterations
+
+    >>> wegstein = Wegstein()
+    >>> x = 0
+    >>> for i in range(4):
+    ...     x = wegstein([x], [1 + 0.8*x])[0]
+    >>> "%0.6f" % x
+    '5.000000'
+    """
+
+    def __init__(self, qmin=-5, qmax=0, delay=1):
+        self.qmin = qmin
+        self.qmax = qmax
+        self.delay = delay
+        self._iteration = 0
+        self._x = None
+        self._g = None
+
+    def __call__(self, x, g):
+        x = asarray(x, dtype=float)
+        g = asarray(g, dtype=float)
+        self._iteration += 1
+        if self._x is None or self._iteration <= self.delay:
+            new = g
+        else:
+            dx = x - self._x
+            dg = g - self._g
+            with errstate(all="ignore"):
+                s = where(dx != 0, dg/dx, 0)
+                q = s/(s-1)
+            q = clip(where(isfinite(q), q, 0), self.qmin, self.qmax)
+            new = q*x + (1-q)*g
+        self._x = x
+        self._g = g
+        return new
+
+
+@refDoc(__doi__, [2, 4])
+class Broyden(Direct):
+    r"""Broyden quasi-Newton acceleration of fixed point iteration x = g(x),
+    solving :math:`f(x) = g(x)-x = 0` with a rank one update of the inverse
+    jacobian, initialized as the direct substitution
+
+    .. math::
+        \begin{array}[t]{l}
+        x_{k+1} = x_k - H_kf(x_k)\\
+        H_{k+1} = H_k + \frac{\left(\Delta x-H_k\Delta f\right)\Delta x^T H_k}
+        {\Delta x^T H_k \Delta f}\\
+        \end{array}
+
+    Examples
+    --------
+    >>> broyden = Broyden()
+    >>> x = [0, 0]
+    >>> for i in range(4):
+    ...     x = broyden(x, [1 + 0.5*x[1], 2 + 0.5*x[0]])
+    >>> "%0.6f %0.6f" % tuple(x)
+    '2.666667 3.333333'
+    """
+
+    def __init__(self):
+        self._x = None
+        self._f = None
+        self._H = None
+
+    def __call__(self, x, g):
+        x = asarray(x, dtype=float)
+        f = asarray(g, dtype=float) - x
+        if self._H is None:
+            self._H = -eye(len(x))
+        else:
+            dx = x - self._x
+            df = f - self._f
+            Hdf = dot(self._H, df)
+            denom = dot(dx, Hdf)
+            if denom and isfinite(denom):
+                self._H += outer(dx-Hdf, dot(dx, self._H))/denom
+        self._x = x
+        self._f = f
+        return x - dot(self._H, f)
+
+
+# Recycle convergence methods available
+methods = {"direct": Direct, "wegstein": Wegstein, "broyden": Broyden}
@@ -0,0 +1,391 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the calculation service, a queue of calculation jobs executed in
+a pool of worker processes, so the graphical interface stays responsive and
+the calculations aren't limited by the GIL:
+
+  * :class:`JobQueue`: Queue of jobs with priorities, cancellation and
+    coalescing of jobs of the same entity
+  * :class:`Job`: Calculation job submitted to the queue
+  * :class:`Event`: Notification of the progress of a job
+  * :class:`Cancelled`: Exception of cancelled jobs
+
+Any picklable function can be a job, as a diagram build, the module define
+the jobs of kernel entities:
+
+  * :func:`calculate`: Calculate a stream or equipment
+  * :func:`solve`: Solve a project
+
+The cancellation is cooperative, the running jobs check its cancellation
+token in each call to :func:`lib.kernel.progress`, before the calculation of
+each stream and equipment, which is reported as a progress event too.
+"""
+
+
+from collections import deque, namedtuple
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import partial
+from heapq import heappop, heappush
+import multiprocessing
+import os
+import queue
+import threading
+
+from lib.config import configContext
+from lib.kernel import setProgress
+
+
+class Cancelled(BaseException):
+    """Exception of a cancelled job, it's derived from BaseException so the
+    error handling of calculation procedures don't catch it"""
+
+
+Event = namedtuple("Event", ["job", "kind", "data"])
+Event.__doc__ = """Notification of a job, kind can be started, progress,
+finished, error or cancelled, data is the class name of entity calculated
+for the progress events, the job kind for the started events and the
+exception text for the error events"""
+
+
+def calculate(context, entity, kwargs):
+    """Job to calculate a stream or equipment with the input kwargs in the
+    configuration context, return the calculated entity"""
+    with configContext(context):
+        entity(**kwargs)
+    return entity
+
+
+def solve(context, project, start=None, **kwargs):
+    """Job to solve a project in the configuration context, only the
+    equipments affected by the change of item start if it's defined, return
+    the solved project"""
+    with configContext(context):
+        if start is None:
+            project.solve(**kwargs)
+        else:
+            project.run(start)
+    return project
+
+
+def _execute(id, channel, token, func, args, kwargs):
+    """Run the job id in a worker, reporting the progress to channel and
+    checking the cancellation token in each progress call"""
+    def report(entity=None):
+        if token.is_set():
+            raise Cancelled()
+        data = None if entity is None else entity.__class__.__name__
+        try:
+            channel.put_nowait(Event(id, "progress", data))
+        except queue.Full:
+            pass
+
+    setProgress(report, thread=True)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        setProgress(None, thread=True)
+
+
+class Job(object):
+    """Calculation job submitted to a :class:`JobQueue`, with the interface of
+    concurrent.futures.Future to get its result
+
+    Attributes
+    ----------
+    id : int
+        Identifier of job in its queue, used in the events
+    kind : str
+        Description of job
+    key : hashable
+        Entity calculated, a new job with the same key supersedes this job
+    priority : int
+        Priority, the jobs with greater priority are started first
+    token : Event
+        Cancellation token, it can be shared with other jobs
+    """
+
+    def __init__(self, service, id, func, args, kwargs, priority=0,
+                 key=None, kind=None, token=None):
+        self._service = service
+        self.id = id
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.key = key
+        self.kind = kind
+        self.token = token
+        self.future = Future()
+
+    def cancel(self):
+        """Cancel the job, a pending job is never started and a running job
+        is stopped in its next progress report"""
+        self._service.cancel(self)
+
+    def cancelled(self):
+        """Check if the job was cancelled or superseded"""
+        if self.future.cancelled():
+            return True
+        return self.future.done() and \
+            isinstance(self.future.exception(), Cancelled)
+
+    def done(self):
+        """Check if the job is finished, calculated, failed or cancelled"""
+        return self.future.done()
+
+    def result(self, timeout=None):
+        """Return the result of job, waiting until timeout seconds"""
+        return self.future.result(timeout)
+
+    def exception(self, timeout=None):
+        """Return the exception raised by the job, waiting until timeout
+        seconds"""
+        return self.future.exception(timeout)
+
+
+class JobQueue(object):
+    """Queue of calculation jobs executed in a pool of worker processes
+
+    The jobs are started by priority, and in submit order with the same
+    priority. A job submitted with the key of a previous unfinished job
+    supersedes it, the previous job is cancelled. The events of jobs are put
+    in the channel queue and read with :meth:`events`, the progress events
+    are discarded when the channel is full, the other events are kept until
+    there are room in channel
+
+    Parameters
+    ----------
+    processes : int, optional
+        Number of worker processes, by default the number of cores
+    executor : Executor, optional
+        Executor to run the jobs instead of a process pool, as a
+        ThreadPoolExecutor
+    maxsize : int, optional
+        Maximum number of events not read in channel
+    context : multiprocessing context, optional
+        Start method of the worker processes and of the manager of shared
+        channel and tokens, by default the platform default. The spawn and
+        forkserver workers import the main module of program
+
+    Examples
+    --------
+    >>> from concurrent.futures import ThreadPoolExecutor
+    >>> service = JobQueue(executor=ThreadPoolExecutor(1))
+
+    The first job blocks the only worker until the gate is open
+
+    >>> gate = threading.Event()
+    >>> first = service.submit(gate.wait)
+    >>> low = service.submit(pow, 2, 3)
+    >>> high = service.submit(pow, 2, 4, priority=10)
+    >>> old = service.submit(pow, 3, 2, key="e1")
+    >>> new = service.submit(pow, 3, 3, key="e1")
+    >>> old.cancelled()
+    True
+    >>> gate.set()
+    >>> high.result(), low.result(), new.result()
+    (16, 8, 27)
+    >>> started = [e.job for e in service.events() if e.kind == "started"]
+    >>> started == [first.id, high.id, low.id, new.id]
+    True
+
+    The running jobs are cancelled in its next progress report
+
+    >>> from lib.kernel import progress
+    >>> running = threading.Event()
+    >>> def work():
+    ...     running.set()
+    ...     while True:
+    ...         progress()
+    ...         running.wait(0.01)
+    >>> job = service.submit(work)
+    >>> running.wait(5)
+    True
+    >>> job.cancel()
+    >>> job.exception(5)
+    Cancelled()
+    >>> service.shutdown()
+    """
+
+    def __init__(self, processes=None, executor=None, maxsize=1000,
+                 context=None):
+        if executor is None:
+            executor = ProcessPoolExecutor(processes, mp_context=context)
+        self._executor = executor
+        self._workers = getattr(executor, "_max_workers", None) or \
+            processes or os.cpu_count()
+
+        # The channel and tokens must be shared with the worker processes
+        if isinstance(executor, ProcessPoolExecutor):
+            self._manager = (context or multiprocessing).Manager()
+            self.channel = self._manager.Queue(maxsize)
+            self._token = self._manager.Event
+        else:
+            self._manager = None
+            self.channel = queue.Queue(maxsize)
+            self._token = threading.Event
+
+        # Events without room in channel, never discarded
+        self._overflow = deque()
+
+        self._lock = threading.RLock()
+        self._count = 0
+        self._pending = []
+        self._running = {}
+        self._keys = {}
+
+    def token(self):
+        """Return a new cancellation token, to cancel several jobs"""
+        return self._token()
+
+    def submit(self, func, *args, priority=0, key=None, kind=None, token=None,
+               callback=None, **kwargs):
+        """Add a job to the queue to call func with args and kwargs
+
+        Parameters
+        ----------
+        func : callable
+            Function to run, it and its arguments must be picklable for a
+            process pool
+        priority : int, optional
+            Priority of job, the jobs with greater priority are started first
+        key : hashable, optional
+            Entity calculated by the job, it supersedes the unfinished job of
+            the entity
+        kind : str, optional
+            Description of job, by default the function name
+        token : Event, optional
+            Cancellation token, by default a new token
+        callback : callable, optional
+            Function called with the job as argument when it's finished, in
+            a thread of queue
+
+        Returns
+        -------
+        job : Job
+            The submitted job
+        """
+        if kind is None:
+            kind = getattr(func, "__name__", "job")
+        if token is None:
+            token = self.token()
+
+        with self._lock:
+            self._count += 1
+            job = Job(self, self._count, func, args, kwargs, priority, key,
+                      kind, token)
+            if callback is not None:
+                job.future.add_done_callback(lambda future: callback(job))
+            if key is not None:
+                old = self._keys.get(key)
+                if old is not None:
+                    self._cancel(old)
+                self._keys[key] = job
+            heappush(self._pending, (-priority, job.id, job))
+            self._dispatch()
+        return job
+
+    def cancel(self, job):
+        """Cancel the job"""
+        with self._lock:
+            self._cancel(job)
+
+    def _cancel(self, job):
+        job.token.set()
+        if self._keys.get(job.key) is job:
+            del self._keys[job.key]
+        if job.future.cancel():
+            self._put(job.id, "cancelled")
+
+    def _dispatch(self):
+        """Start the pending jobs by priority while there are free workers"""
+        while self._pending and len(self._running) < self._workers:
+            priority, id, job = heappop(self._pending)
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            self._running[id] = job
+            self._put(id, "started", job.kind)
+            future = self._executor.submit(
+                _execute, id, self.channel, job.token, job.func, job.args,
+                job.kwargs)
+            future.add_done_callback(partial(self._done, job))
+
+    def _done(self, job, future):
+        """Save the result of job finished in worker and start the next"""
+        with self._lock:
+            self._running.pop(job.id, None)
+            if self._keys.get(job.key) is job:
+                del self._keys[job.key]
+            self._dispatch()
+
+        error = future.exception()
+        if isinstance(error, Cancelled) or job.token.is_set():
+            job.future.set_exception(Cancelled())
+            self._put(job.id, "cancelled")
+        elif error is not None:
+            job.future.set_exception(error)
+            self._put(job.id, "error", str(error))
+        else:
+            job.future.set_result(future.result())
+            self._put(job.id, "finished")
+
+    def _put(self, id, kind, data=None):
+        """Put the event in channel, or in the overflow buffer when the
+        channel is full, so the lock of queue is never held waiting to the
+        reader of channel"""
+        event = Event(id, kind, data)
+        if self._overflow:
+            self._overflow.append(event)
+            return
+        try:
+            self.channel.put_nowait(event)
+        except queue.Full:
+            self._overflow.append(event)
+
+    def events(self):
+        """Return the events of jobs not read yet
+
+        >>> from concurrent.futures import ThreadPoolExecutor
+        >>> service = JobQueue(executor=ThreadPoolExecutor(1), maxsize=1)
+        >>> results = [service.submit(abs, i).result() for i in range(3)]
+        >>> [e.kind for e in service.events()].count("finished")
+        3
+        >>> service.shutdown()
+        """
+        events = []
+        while True:
+            try:
+                events.append(self.channel.get_nowait())
+            except queue.Empty:
+                break
+        while self._overflow:
+            events.append(self._overflow.popleft())
+        return events
+
+    def shutdown(self, wait=True):
+        """Cancel the pending jobs and stop the workers"""
+        with self._lock:
+            for priority, id, job in self._pending:
+                self._cancel(job)
+            self._pending = []
+        self._executor.shutdown(wait)
+        if self._manager is not None:
+            self._manager.shutdown()
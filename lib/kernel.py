@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the services of the calculation kernel independent of Qt, so
+the lib and equipment calculation modules can run in a process without
+graphical interface, as multiprocessing or server workers, even without
+PyQt5 installed. The kernel never import Qt by itself, it use it only when
+the graphical interface has loaded it.
+
+  * :class:`QApplication`: Replacement of QApplication for calculation
+    modules, with the translate method
+  * :func:`setProgress`: Define the progress callback of calculations
+  * :func:`progress`: Call the progress callback
+  * :func:`systemLocale`: Return the name of system locale
+"""
+
+
+import os
+import sys
+from threading import local
+
+
+def _QtWidgets():
+    """Return the QtWidgets module if it's loaded, else None"""
+    return sys.modules.get("PyQt5.QtWidgets")
+
+
+class QApplication(object):
+    """Translation stub with the QApplication.translate interface, the text
+    is translated with Qt when the graphical interface is running, and
+    returned untranslated in headless mode
+
+    >>> QApplication.translate("pychemqt", "Solved")
+    'Solved'
+    """
+
+    @staticmethod
+    def translate(context, sourceText, disambiguation=None, n=-1):
+        """Return the translation of sourceText in context"""
+        QtWidgets = _QtWidgets()
+        if QtWidgets is None:
+            return sourceText
+        return QtWidgets.QApplication.translate(
+            context, sourceText, disambiguation, n)
+
+
+_progress = None
+_thread = local()
+
+
+def setProgress(callback, thread=False):
+    """Define the function called by the kernel before each calculation of
+    streams and equipments, with the entity to calculate as argument. It can
+    be used to report progress or to yield control to a event loop. With None
+    restore the default behaviour, process the pending Qt events when the
+    graphical interface is running. With thread the callback is defined only
+    for the current thread, with preference over the global callback, as
+    used by the calculation jobs
+
+    >>> calculated = []
+    >>> setProgress(calculated.append)
+    >>> progress("entity")
+    >>> calculated
+    ['entity']
+    >>> setProgress(None)
+    """
+    global _progress
+    if thread:
+        _thread.progress = callback
+    else:
+        _progress = callback
+
+
+def progress(entity=None):
+    """Call the progress callback defined with :func:`setProgress`"""
+    callback = getattr(_thread, "progress", None) or _progress
+    if callback is not None:
+        callback(entity)
+        return
+
+    QtWidgets = _QtWidgets()
+    if QtWidgets is not None and QtWidgets.QApplication.instance():
+        QtWidgets.QApplication.processEvents()
+
+
+def systemLocale():
+    """Return the name of system locale in language_country format, from Qt
+    when it's loaded or from the environment variables in headless mode"""
+    QtCore = sys.modules.get("PyQt5.QtCore")
+    if QtCore is not None:
+        return QtCore.QLocale.system().name()
+    for var in ("LC_ALL", "LC_MESSAGES", "LANG"):
+        value = os.environ.get(var)
+        if value:
+            return value.split(".")[0].split("@")[0]
+    return "C"
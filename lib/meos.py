@@ -159,13 +159,12 @@ import json
 import logging
 import os
 
-from PyQt5.QtWidgets import QApplication
 from scipy import exp, log, sinh, cosh, tanh, arctan
 from scipy.constants import Boltzmann, pi, Avogadro, R, u
-from scipy.optimize import fsolve
-
-from lib import unidades
+from lib import profiler, unidades
 from lib.config import conf_dir
+from lib.kernel import QApplication
+from lib.profiler import fsolve
 from lib.utilities import SimpleEq
 from lib.physics import R_atml, Collision_Neufeld
 from lib.thermo import ThermoAdvanced
@@ -1309,6 +1308,7 @@ class MEoS(ThermoAdvanced):
 
         return bool(self._mode)
 
+    @profiler.measure("meos")
     def calculo(self):
         """Calculate procedure"""
 
@@ -24,6 +24,10 @@ This module implement mixture component properties
 properties in database and calculate state properties with the methods chosen
 in configuration
 
+:class:`ComponentSet`: The shared set of compounds of mixtures, with the
+compounds constant properties as arrays, so a new composition over the same
+compounds is cheap, see :meth:`Mezcla.clone`
+
 Liquid density calculation methods:
     * :func:`RhoL_RackettMix`
     * :func:`RhoL_CostaldMix`
@@ -62,6 +66,10 @@ Gas thermal conductivity calculation methods:
 Surface tension calculation methods:
     * :func:`Tension`
 
+The gas transport mixing rules are evaluated over arrays with the components
+in the last axis, any leading axis define a batch of states with its own
+composition, temperature or density
+
 Mixture mass definition:
     * :func:`mix_unitmassflow`
     * :func:`mix_unitmolarflow`
@@ -72,16 +80,20 @@ Mixture mass definition:
 """
 
 
+from functools import cached_property
 from math import pi
+from threading import RLock
 
+from numpy import (asarray, broadcast_to, einsum, errstate, eye, select,
+                   take_along_axis, tri, where)
 from numpy.linalg import solve
 from scipy import log, log10, exp
 
 from lib.compuestos import (Componente, RhoL_Costald, RhoL_AaltoKeskinen,
                             RhoL_TaitCostald, RhoL_Nasrifar, MuG_DeanStiel,
-                            MuG_API, ThG_StielThodos)
+                            MuG_API, ThG_StielThodos, _unit)
 from lib.physics import R_atml, R, Collision_Neufeld
-from lib import unidades, config
+from lib import unidades, config, sql
 from lib.utilities import refDoc
 
 
@@ -208,6 +220,136 @@ __doi__ = {
 }
 
 
+def _array(*args):
+    """Convert the component properties input to float arrays, the last axis
+    of arrays is the component, other leading axis can be used to define
+    several states"""
+    return [asarray(a, dtype=float) for a in args]
+
+
+def _ij(ai):
+    """Return the component property prepared to broadcast as the rows and
+    the columns of the binary interaction matrix"""
+    ai = asarray(ai, dtype=float)
+    return ai[..., :, None], ai[..., None, :]
+
+
+def _xx(xi, aij):
+    """Quadratic mixing rule, Σi Σj xi·xj·aij"""
+    return einsum("...i,...j,...ij->...", xi, xi, aij)
+
+
+def _sumphi(xi, ai, phij):
+    r"""Mixing rule of Wilke type with the phi interaction matrix
+
+    .. math::
+        a_m = \sum_i \frac{x_ia_i}{x_i+\sum_{j≠i}x_j\phi_{ij}}
+    """
+    phij = phij*(1-eye(xi.shape[-1]))
+    return (xi*ai/(xi+(phij*xi[..., None, :]).sum(axis=-1))).sum(axis=-1)
+
+
+def _mix_Chung(xi, Tci, Vci, Mi, wi, Di=None, ki=None):
+    """Mixing rules of the Chung method for the potential parameters, in [15]_
+
+    Returns
+    -------
+    sm : float
+        Molecular diameter of mixture, [Å]
+    ekm : float
+        Energy parameter of mixture, ε/k, [K]
+    wm : float
+        Acentric factor of mixture, [-]
+    Mm : float
+        Molecular weight of mixture, [g/mol]
+    Dm : float
+        Dipole moment of mixture, [Debye]
+    km : float
+        Association factor of mixture, [-]
+    """
+    xi, Tci, Vci, Mi, wi = _array(xi, Tci, Vci, Mi, wi)
+
+    # Use critical volume in molar base
+    Vci = Vci*Mi*1000
+
+    sigmai = 0.809*Vci**(1/3)                                           # Eq 4
+    eki = Tci/1.2593                                                    # Eq 5
+
+    s_i, s_j = _ij(sigmai)
+    sigmaij = (s_i*s_j)**0.5                                           # Eq 23
+    ek_i, ek_j = _ij(eki)
+    ekij = (ek_i*ek_j)**0.5                                            # Eq 24
+    w_i, w_j = _ij(wi)
+    wij = (w_i+w_j)/2                                                  # Eq 25
+    M_i, M_j = _ij(Mi)
+    Mij = 2*M_i*M_j/(M_i+M_j)                                          # Eq 26
+
+    sm = _xx(xi, sigmaij**3)**(1/3)                                    # Eq 14
+    ekm = _xx(xi, ekij*sigmaij**3)/sm**3                               # Eq 15
+    wm = _xx(xi, wij*sigmaij**3)/sm**3                                 # Eq 18
+
+    # Eq 19
+    Mm = (_xx(xi, ekij*sigmaij**2*Mij**0.5)/(ekm*sm**2))**2
+
+    # Eq 20
+    if Di is None:
+        Dm = 0
+    else:
+        D_i, D_j = _ij(Di)
+        Dm = (_xx(xi, (D_i*D_j)**2/ekij/sigmaij**3)*ekm*sm**3)**0.25
+
+    # Eq 21
+    if ki is None:
+        km = 0
+    else:
+        k_i, k_j = _ij(ki)
+        km = _xx(xi, (k_i*k_j)**0.5)
+    return sm, ekm, wm, Mm, Dm, km
+
+
+def _mix_TRAPP(T, xi, Tci, Vci, Zci, wi, Mi):
+    """Shape factors and mixing rules of the TRAPP method, in [1]_
+
+    Returns
+    -------
+    hi : array
+        Shape factor of components, [-]
+    fij, hij : array
+        Binary interaction of shape factors, [-]
+    hm, fm : float
+        Shape factor of mixture, [-]
+    Mij : array
+        Binary molecular weight, [g/mol]
+    """
+    # Reference fluid properties, propane
+    TcR = 369.83
+    rhocR = 1/200  # mol/cm³
+    ZcR = 0.276
+    wR = 0.152
+
+    T = asarray(T, dtype=float)[..., None]
+    xi, Tci, Vci, Zci, wi, Mi = _array(xi, Tci, Vci, Zci, wi, Mi)
+
+    # Convert volume to molar base
+    Vci = Vci*Mi*1000
+
+    # Calculate shape factor for components
+    fi = Tci/TcR*(1+(wi-wR)*(0.05203-0.7498*log(T/Tci)))
+    hi = rhocR*Vci*ZcR/Zci*(1-(wi-wR)*(0.1436-0.2822*log(T/Tci)))
+
+    f_i, f_j = _ij(fi)
+    fij = (f_i*f_j)**0.5                                            # Eq 9-7.5
+    h_i, h_j = _ij(hi)
+    hij = (h_i**(1/3)+h_j**(1/3))**3/8                              # Eq 9-7.4
+
+    hm = _xx(xi, hij)                                               # Eq 9-7.2
+    fm = _xx(xi, fij*hij)/hm                                        # Eq 9-7.3
+
+    M_i, M_j = _ij(Mi)
+    Mij = 2*M_i*M_j/(M_i+M_j)                                       # Eq 9-7.9
+    return hi, fij, hij, hm, fm, Mij
+
+
 def mix_unitmassflow(unitMassFlow, cmps):
     """Calculate mixture composition properties with known unitMassFlow"""
     massFlow = sum(unitMassFlow)
@@ -367,49 +509,30 @@ def Vc_ChuehPrausnitz(xi, Vci, Mi, hydrocarbon=None):
     >>> "%0.2f" % (Vc_ChuehPrausnitz([0.63, 0.37], [Vc1, Vc2], Mi).ft3lb*Mm)
     '4.35'
     """
+    xi, Vci, Mi = _array(xi, Vci, Mi)
+
     # Define default C parameters:
     if hydrocarbon is None:
-        hydrocarbon = [True]*len(xi)
+        hydrocarbon = [True]*xi.shape[-1]
+    hc = asarray(hydrocarbon, dtype=bool)
+    C = where(hc[..., :, None] & hc[..., None, :], 0, 0.1559)
 
     # Convert critical volumes to molar base
-    Vci = [Vc*M for Vc, M in zip(Vci, Mi)]
+    Vci = Vci*Mi
+    Mm = (Mi*xi).sum(axis=-1)
 
-    Mm = sum([M*x for M, x in zip(Mi, xi)])
-
-    Vij = []
-    for Vc_i, C_i in zip(Vci, hydrocarbon):
-        Viji = []
-        for Vc_j, C_j in zip(Vci, hydrocarbon):
-            if C_i and C_j:
-                C = 0
-            else:
-                C = 0.1559
-            mu = abs((Vc_i-Vc_j)/(Vc_i+Vc_j))
-            Viji.append(-1.4684*mu + C)
-        Vij.append(Viji)
-
-    nuij = []
-    for Viji, Vc_i in zip(Vij, Vci):
-        nuiji = []
-        for V, Vc_j in zip(Viji, Vci):
-            nuiji.append(V*(Vc_i+Vc_j)/2)
-        nuij.append(nuiji)
+    Vc_i, Vc_j = _ij(Vci)
+    Vij = -1.4684*abs((Vc_i-Vc_j)/(Vc_i+Vc_j)) + C
+    nuij = Vij*(Vc_i+Vc_j)/2
 
     # Eq 2
-    phii = []
-    for x_j, Vc_j in zip(xi, Vci):
-        suma = sum([x_i*Vc_i**(2/3) for x_i, Vc_i in zip(xi, Vci)])
-        phii.append(x_j*Vc_j**(2/3)/suma)
+    phii = xi*Vci**(2/3)
+    phii = phii/phii.sum(axis=-1)[..., None]
 
     # Eq 4 generalized
-    sum1 = sum([phi*Vc for phi, Vc in zip(phii, Vci)])
-    sum2 = 0
-    for phi_i, nuiji in zip(phii, nuij):
-        for phi_j, nu in zip(phii, nuiji):
-            sum2 += phi_i*phi_j*nu
-    Vcm = sum1 + sum2
+    Vcm = (phii*Vci).sum(axis=-1) + _xx(phii, nuij)
 
-    return unidades.SpecificVolume(Vcm/Mm)
+    return _unit(unidades.SpecificVolume, Vcm/Mm)
 
 
 # Liquid density correlations
@@ -1223,78 +1346,47 @@ def MuG_Reichenberg(T, xi, Tci, Pci, Mi, mui, Di):
     >>> "%0.1f" % MuG_Reichenberg(T, x, Tc, Pc, M, mu, D).microP
     '146.2'
     """
+    T = asarray(T, dtype=float)
+    xi, Tci, Pci, Mi, mui, Di = _array(xi, Tci, Pci, Mi, mui, Di)
+    Tc_i, Tc_j = _ij(Tci)
+    M_i, M_j = _ij(Mi)
+
     # Calculate reduced temperatures
-    Tri = [T/Tc for Tc in Tci]
-    Trij = []
-    for Tc_i in Tci:
-        Triji = []
-        for Tc_j in Tci:
-            Triji.append(T/(Tc_i*Tc_j)**0.5)
-        Trij.append(Triji)
+    Tri = T[..., None]/Tci
+    Trij = T[..., None, None]/(Tc_i*Tc_j)**0.5
 
     # Calculate reduced viscosity
-    muri = [52.46*D**2*Pc*1e-5/Tc**2 for D, Pc, Tc in zip(Di, Pci, Tci)]
-    murij = []
-    for mur_i in muri:
-        muriji = []
-        for mur_j in muri:
-            muriji.append((mur_i*mur_j)**0.5)
-        murij.append(muriji)
+    muri = 52.46*Di**2*Pci*1e-5/Tci**2
+    mur_i, mur_j = _ij(muri)
+    murij = (mur_i*mur_j)**0.5
 
     # Polar correction, Eq 9-5.5
-    Fri = []
-    for Tr, mur in zip(Tri, muri):
-        Fri.append((Tr**3.5+(10*mur)**7)/Tr**3.5/(1+(10*mur)**7))
-    Frij = []
-    for Triji, muriji in zip(Trij, murij):
-        Friji = []
-        for Tr, mur in zip(Triji, muriji):
-            Friji.append((Tr**3.5+(10*mur)**7)/Tr**3.5/(1+(10*mur)**7))
-        Frij.append(Friji)
+    Fri = (Tri**3.5+(10*muri)**7)/Tri**3.5/(1+(10*muri)**7)
+    Frij = (Trij**3.5+(10*murij)**7)/Trij**3.5/(1+(10*murij)**7)
 
     # Eq 9-5.3
-    Ui = []
-    for Tr, Fr in zip(Tri, Fri):
-        Ui.append((1+0.36*Tr*(Tr-1))**(1/6)*Fr/Tr**0.5)
+    Ui = (1+0.36*Tri*(Tri-1))**(1/6)*Fri/Tri**0.5
 
     # Eq 9-5.4
-    Ci = [M**0.25/(mu*U)**0.5 for M, mu, U in zip(Mi, mui, Ui)]
+    Ci = Mi**0.25/(mui*Ui)**0.5
+    C_i, C_j = _ij(Ci)
 
     # Eq 9-5.6
-    Hij = []
-    for M_i, C_i, Triji, Friji in zip(Mi, Ci, Trij, Frij):
-        Hiji = []
-        for M_j, C_j, Tr, Fr in zip(Mi, Ci, Triji, Friji):
-            Hiji.append((M_i*M_j/32/(M_i+M_j)**3)**0.5*(C_i+C_j)**2*(
-                        1+0.36*Tr*(Tr-1))**(1/6)*Fr/Tr**0.5)
-        Hij.append(Hiji)
+    Hij = (M_i*M_j/32/(M_i+M_j)**3)**0.5*(C_i+C_j)**2*(
+        1+0.36*Trij*(Trij-1))**(1/6)*Frij/Trij**0.5
 
     # Eq 9-5.2
-    sumai = []
-    for i, M_i in enumerate(Mi):
-        sumaij = 0
-        for j, M_j in enumerate(Mi):
-            if i != j:
-                sumaij += xi[j]*Hij[i][j]*(3+2*M_j/M_i)
-        sumai.append(sumaij)
-    Ki = [x*mu/(x+mu*suma) for x, mu, suma in zip(xi, mui, sumai)]
+    n = xi.shape[-1]
+    Hij_ = Hij*(1-eye(n))
+    sumai = (Hij_*xi[..., None, :]*(3+2*M_j/M_i)).sum(axis=-1)
+    Ki = xi*mui/(xi+mui*sumai)
 
     # Eq 9-5.1
-    mu = 0
-    for i, K_i in enumerate(Ki):
-        sum1 = 0
-        for H, K_j in zip(Hij[i], Ki[:i]):
-            sum1 += H*K_j
-
-        sum2 = 0
-        for j, K_j in enumerate(Ki):
-            for k, K_k in enumerate(Ki):
-                if j != i and k != i:
-                    sum2 += Hij[i][j]*Hij[i][k]*K_j*K_k
-
-        mu += K_i*(1+2*sum1+sum2)
-
-    return unidades.Viscosity(mu)
+    K_j = Ki[..., None, :]
+    sum1 = (Hij*tri(n, k=-1)*K_j).sum(axis=-1)
+    sum2 = (Hij_*K_j).sum(axis=-1)**2
+    mu = (Ki*(1+2*sum1+sum2)).sum(axis=-1)
+    return _unit(unidades.Viscosity, mu)
 
 
 @refDoc(__doi__, [1, 2, 3])
@@ -1357,33 +1449,25 @@ def MuG_Wilke(xi, Mi, mui):
     >>> mui = [109.4e-7, 72.74e-7]
     >>> "%0.2f" % MuG_Wilke([0.697, 0.303], [16.043, 58.123], mui).microP
     '92.25'
+
+    Several states can be calculated at once, the result is an array in SI
+    units
+
+    >>> x = [[0.697, 0.303], [0.303, 0.697]]
+    >>> mu = MuG_Wilke(x, [16.043, 58.123], mui)
+    >>> " ".join(["%0.2f" % m for m in mu*1e7])
+    '92.25 79.19'
     """
+    xi, Mi, mui = _array(xi, Mi, mui)
+    M_i, M_j = _ij(Mi)
+    mu_i, mu_j = _ij(mui)
+
     # Eq 4
-    kij = []
-    for i, mi in enumerate(Mi):
-        kiji = []
-        for j, mj in enumerate(Mi):
-            if i == j:
-                kiji.append(0)
-            else:
-                kiji.append((1+(mui[i]/mui[j])**0.5*(mj/mi)**0.25)**2 /
-                            8**0.5/(1+mi/mj)**0.5)
-        kij.append(kiji)
+    kij = (1+(mu_i/mu_j)**0.5*(M_j/M_i)**0.25)**2/8**0.5/(1+M_i/M_j)**0.5
 
     # Eq 13
-    # Precalculate of internal sum
-    suma = []
-    for i, Xi in enumerate(xi):
-        sumai = 0
-        if Xi != 0:
-            for j, Xj in enumerate(xi):
-                sumai += kij[i][j]*Xj/Xi
-        suma.append(sumai)
-
-    mu = 0
-    for mu_i, sumai in zip(mui, suma):
-        mu += mu_i/(1+sumai)
-    return unidades.Viscosity(mu)
+    mu = _sumphi(xi, mui, kij)
+    return _unit(unidades.Viscosity, mu)
 
 
 @refDoc(__doi__, [3])
@@ -1420,28 +1504,11 @@ def MuG_Herning(xi, Mi, mui):
     >>> "%0.1f" % MuG_Herning([0.697, 0.303], [16.043, 58.123], mui).microP
     '92.8'
     """
-    kij = []
-    for i, mi in enumerate(Mi):
-        kiji = []
-        for j, mj in enumerate(Mi):
-            if i == j:
-                kiji.append(0)
-            else:
-                kiji.append((mj/mi)**0.5)
-        kij.append(kiji)
-
-    suma = []
-    for i, Xi in enumerate(xi):
-        sumai = 0
-        if Xi != 0:
-            for j, Xj in enumerate(xi):
-                sumai += kij[i][j]*Xj/Xi
-        suma.append(sumai)
-
-    mu = 0
-    for mu_i, sumai in zip(mui, suma):
-        mu += mu_i/(1+sumai)
-    return unidades.Viscosity(mu)
+    xi, Mi, mui = _array(xi, Mi, mui)
+    M_i, M_j = _ij(Mi)
+    kij = (M_j/M_i)**0.5
+    mu = _sumphi(xi, mui, kij)
+    return _unit(unidades.Viscosity, mu)
 
 
 @refDoc(__doi__, [3])
@@ -1507,14 +1574,17 @@ def MuG_Lucas(T, P, xi, Tci, Pci, Vci, Zci, Mi, Di):
     >>> "%0.1f" % mu.microP
     '116.3'
     """
+    T = asarray(T, dtype=float)
+    xi, Tci, Pci, Vci, Zci, Mi, Di = _array(xi, Tci, Pci, Vci, Zci, Mi, Di)
+
     # Use critical volume in molar base
-    Vci = [Vc*M*1000 for Vc, M in zip(Vci, Mi)]
+    Vci = Vci*Mi*1000
 
     # Calculate critical properties of mixture
-    Tcm = sum([x*Tc for x, Tc in zip(xi, Tci)])
-    Zcm = sum([x*Zc for x, Zc in zip(xi, Zci)])
-    Vcm = sum([x*Vc for x, Vc in zip(xi, Vci)])
-    Mm = sum([x*M for x, M in zip(xi, Mi)])
+    Tcm = (xi*Tci).sum(axis=-1)
+    Zcm = (xi*Zci).sum(axis=-1)
+    Vcm = (xi*Vci).sum(axis=-1)
+    Mm = (xi*Mi).sum(axis=-1)
 
     Pcm = R*Tcm*Zcm/Vcm*1e6
 
@@ -1525,73 +1595,56 @@ def MuG_Lucas(T, P, xi, Tci, Pci, Vci, Zci, Mi, Di):
     X = 0.176*Tcm**(1/6)/Mm**0.5/Pcm_bar**(2/3)
 
     # Polarity and quantum effects correction factors
-    Fpoi = []
-    Fqoi = []
-    for Tc, Pc, Zc, M, D in zip(Tci, Pci, Zci, Mi, Di):
-        Tr = T/Tc
-        Pc_bar = Pc*1e-5
-        mur = 52.46*D**2*Pc_bar/Tc**2
-        if mur < 0.022:
-            Fpoi.append(1)
-        elif mur < 0.075:
-            Fpoi.append(1 + 30.55*(0.292-Zc)**1.72)
-        else:
-            Fpoi.append(1 + 30.55*(0.292-Zc)**1.72*abs(0.96+0.1*(Tr-0.7)))
+    Tr = T[..., None]/Tci
+    mur = 52.46*Di**2*Pci*1e-5/Tci**2
+    with errstate(invalid="ignore"):
+        Fpoi = select([mur < 0.022, mur < 0.075], [
+            1, 1 + 30.55*(0.292-Zci)**1.72],
+            1 + 30.55*(0.292-Zci)**1.72*abs(0.96+0.1*(Tr-0.7)))
 
-        if Tr < 12:
-            sign = -1
-        else:
-            sign = 1
-        if M == 2.0158:
-            Q = 0.76  # Hydrogen
-            Fqoi.append(1.22*Q**0.15*(1+0.00385*((Tr-12)**2)**(1/M)*sign))
-        elif M == 4.0026:
-            Q = 1.38  # Helium
-            Fqoi.append(1.22*Q**0.15*(1+0.00385*((Tr-12)**2)**(1/M)*sign))
-        else:
-            Fqoi.append(1)
+    sign = where(Tr < 12, -1, 1)
+    # Hydrogen and helium
+    Q = select([Mi == 2.0158, Mi == 4.0026], [0.76, 1.38], 0)
+    Fqoi = where(Q, 1.22*Q**0.15*(1+0.00385*((Tr-12)**2)**(1/Mi)*sign), 1)
 
-    Fpom = sum([x*Fpo for x, Fpo in zip(xi, Fpoi)])
-    Fqom = sum([x*Fqo for x, Fqo in zip(xi, Fqoi)])
+    Fpom = (xi*Fpoi).sum(axis=-1)
+    Fqom = (xi*Fqoi).sum(axis=-1)
 
     # Calculate A factor
-    Mh = max(Mi)
-    Ml = min(Mi)
-    xh = xi[Mi.index(Mh)]
-    if Mh/Ml > 9 and 0.05 < xh < 0.7:
-        A = 1 - 0.01*(Mh/Ml)**0.87
-    else:
-        A = 1
-    Fqom *= A
+    Mb = broadcast_to(Mi, xi.shape)
+    Mh = Mb.max(axis=-1)
+    Ml = Mb.min(axis=-1)
+    h = Mb.argmax(axis=-1)[..., None]
+    xh = take_along_axis(xi, h, axis=-1)[..., 0]
+    A = where((Mh/Ml > 9) & (0.05 < xh) & (xh < 0.7),
+              1 - 0.01*(Mh/Ml)**0.87, 1)
+    Fqom = Fqom*A
 
     Z1 = Fpom*Fqom*(0.807*Trm**0.618 - 0.357*exp(-0.449*Trm) +
                     0.34*exp(-4.058*Trm) + 0.018)
 
-    if Prm < 0.6:
-        # Low pressure correlation
-        mu = Z1/X
-
-    else:
-        # High pressure correlation
-        if Trm <= 1:
-            alfa = 3.262 + 14.98*Prm**5.508
-            beta = 1.39 + 14.98*Prm
-            Z2 = 0.6 + 0.76*Prm**alfa + (6.99*Prm**beta-0.6)*(1-Trm)
-        else:
-            a = 1.245e-3/Trm*exp(5.1726*Trm**-0.3286)
-            b = a*(1.6553*Trm-1.2723)
-            c = 0.4489/Trm*exp(3.0578*Trm**-37.7332)
-            d = 1.7368/Trm*exp(2.231*Trm**-7.6351)
-            e = 1.3088
-            f = 0.9425*exp(-0.1853*Trm**0.4489)
-            Z2 = Z1*(1+a*Prm**e/(b*Prm**f+1/(1+c*Prm**d)))
+    # High pressure correlation
+    with errstate(all="ignore"):
+        alfa = 3.262 + 14.98*Prm**5.508
+        beta = 1.39 + 14.98*Prm
+        Z2_l = 0.6 + 0.76*Prm**alfa + (6.99*Prm**beta-0.6)*(1-Trm)
+
+        a = 1.245e-3/Trm*exp(5.1726*Trm**-0.3286)
+        b = a*(1.6553*Trm-1.2723)
+        c = 0.4489/Trm*exp(3.0578*Trm**-37.7332)
+        d = 1.7368/Trm*exp(2.231*Trm**-7.6351)
+        e = 1.3088
+        f = 0.9425*exp(-0.1853*Trm**0.4489)
+        Z2_g = Z1*(1+a*Prm**e/(b*Prm**f+1/(1+c*Prm**d)))
+        Z2 = where(Trm <= 1, Z2_l, Z2_g)
 
         Y = Z2/Z1
         Fp = (1+(Fpom-1)/Y**3)/Fpom
         Fq = (1+(Fqom-1)*(1/Y-0.007*log(Y)**4))/Fqom
-        mu = Z2*Fp*Fq/X
 
-    return unidades.Viscosity(mu, "microP")
+    # Low pressure correlation
+    mu = where(Prm < 0.6, Z1/X, Z2*Fp*Fq/X)
+    return _unit(unidades.Viscosity, mu, "microP")
 
 
 @refDoc(__doi__, [15, 3])
@@ -1700,92 +1753,8 @@ def MuG_Chung(T, xi, Tci, Vci, Mi, wi, Di, ki):
     >>> "%0.1f" % MuG_Chung(331, x, Tc, Vc, M, w, mu, k).microP
     '87.6'
     """
-    # Use critical volume in molar base
-    Vci = [Vc*M*1000 for Vc, M in zip(Vci, Mi)]
-
-    sigmai = [0.809*Vc**(1/3) for Vc in Vci]                            # Eq 4
-    eki = [Tc/1.2593 for Tc in Tci]                                     # Eq 5
-
-    # Eq 23
-    sigmaij = []
-    for s_i in sigmai:
-        sigmaiji = []
-        for s_j in sigmai:
-            sigmaiji.append((s_i*s_j)**0.5)
-        sigmaij.append(sigmaiji)
-
-    # Eq 24
-    ekij = []
-    for ek_i in eki:
-        ekiji = []
-        for ek_j in eki:
-            ekiji.append((ek_i*ek_j)**0.5)
-        ekij.append(ekiji)
-
-    # Eq 25
-    wij = []
-    for w_i in wi:
-        wiji = []
-        for w_j in wi:
-            wiji.append((w_i+w_j)/2)
-        wij.append(wiji)
-
-    # Eq 26
-    Mij = []
-    for M_i in Mi:
-        Miji = []
-        for M_j in Mi:
-            Miji.append(2*M_i*M_j/(M_i+M_j))
-        Mij.append(Miji)
-
-    # Eq 27
-    kij = []
-    for k_i in ki:
-        kiji = []
-        for k_j in ki:
-            kiji.append((k_i*k_j)**0.5)
-        kij.append(kiji)
-
-    # Eq 14
-    sm = 0
-    for x_i, sigmaiji in zip(xi, sigmaij):
-        for x_j, sij in zip(xi, sigmaiji):
-            sm += x_i*x_j*sij**3
-    sm = sm**(1/3)
-
-    # Eq 15
-    ekm = 0
-    for x_i, sigmaiji, ekiji in zip(xi, sigmaij, ekij):
-        for x_j, sij, ek in zip(xi, sigmaiji, ekiji):
-            ekm += x_i*x_j*ek*sij**3
-    ekm /= sm**3
-
-    # Eq 18
-    wm = 0
-    for x_i, sigmaiji, wiji in zip(xi, sigmaij, wij):
-        for x_j, sij, w in zip(xi, sigmaiji, wiji):
-            wm += x_i*x_j*w*sij**3
-    wm /= sm**3
-
-    # Eq 19
-    Mm = 0
-    for x_i, sigmaiji, ekiji, Miji in zip(xi, sigmaij, ekij, Mij):
-        for x_j, s, ek, M in zip(xi, sigmaiji, ekiji, Miji):
-            Mm += x_i*x_j*ek*s**2*M**0.5
-    Mm = (Mm/(ekm*sm**2))**2
-
-    # Eq 20
-    Dm = 0
-    for x_i, sigmaiji, ekiji, D_i in zip(xi, sigmaij, ekij, Di):
-        for x_j, s, ek, D_j in zip(xi, sigmaiji, ekiji, Di):
-            Dm += x_i*x_j*(D_i*D_j)**2/ek/s**3
-    Dm = (Dm*ekm*sm**3)**0.25
-
-    # Eq 21
-    km = 0
-    for x_i, kiji in zip(xi, kij):
-        for x_j, k in zip(xi, kiji):
-            km += x_i*x_j*k
+    T = asarray(T, dtype=float)
+    sm, ekm, wm, Mm, Dm, km = _mix_Chung(xi, Tci, Vci, Mi, wi, Di, ki)
 
     Vcm = (sm/0.809)**3                                                # Eq 16
     Tcm = 1.2593*ekm                                                   # Eq 17
@@ -1796,7 +1765,7 @@ def MuG_Chung(T, xi, Tci, Vci, Mi, wi, Di, ki):
 
     Fcm = 1 - 0.2756*wm + 0.059035*murm**4 + km                         # Eq 7
     mu = 40.785*Fcm*Mm**0.5*T**0.5/Vcm**(2/3)/omega                     # Eq 6
-    return unidades.Viscosity(mu, "microP")
+    return _unit(unidades.Viscosity, mu, "microP")
 
 
 @refDoc(__doi__, [15, 1])
@@ -1834,92 +1803,8 @@ def MuG_P_Chung(T, xi, Tci, Vci, Mi, wi, Di, ki, rho, muo):
     mu : float
         Viscosity of gas mixture, [Pa·s]
     """
-    # Use critical volume in molar base
-    Vci = [Vc*M*1000 for Vc, M in zip(Vci, Mi)]
-
-    sigmai = [0.809*Vc**(1/3) for Vc in Vci]                            # Eq 4
-    eki = [Tc/1.2593 for Tc in Tci]                                     # Eq 5
-
-    # Eq 23
-    sigmaij = []
-    for s_i in sigmai:
-        sigmaiji = []
-        for s_j in sigmai:
-            sigmaiji.append((s_i*s_j)**0.5)
-        sigmaij.append(sigmaiji)
-
-    # Eq 24
-    ekij = []
-    for ek_i in eki:
-        ekiji = []
-        for ek_j in eki:
-            ekiji.append((ek_i*ek_j)**0.5)
-        ekij.append(ekiji)
-
-    # Eq 25
-    wij = []
-    for w_i in wi:
-        wiji = []
-        for w_j in wi:
-            wiji.append((w_i+w_j)/2)
-        wij.append(wiji)
-
-    # Eq 26
-    Mij = []
-    for M_i in Mi:
-        Miji = []
-        for M_j in Mi:
-            Miji.append(2*M_i*M_j/(M_i+M_j))
-        Mij.append(Miji)
-
-    # Eq 27
-    kij = []
-    for k_i in ki:
-        kiji = []
-        for k_j in ki:
-            kiji.append((k_i*k_j)**0.5)
-        kij.append(kiji)
-
-    # Eq 14
-    sm = 0
-    for x_i, sigmaiji in zip(xi, sigmaij):
-        for x_j, sij in zip(xi, sigmaiji):
-            sm += x_i*x_j*sij**3
-    sm = sm**(1/3)
-
-    # Eq 15
-    ekm = 0
-    for x_i, sigmaiji, ekiji in zip(xi, sigmaij, ekij):
-        for x_j, sij, ek in zip(xi, sigmaiji, ekiji):
-            ekm += x_i*x_j*ek*sij**3
-    ekm /= sm**3
-
-    # Eq 18
-    wm = 0
-    for x_i, sigmaiji, wiji in zip(xi, sigmaij, wij):
-        for x_j, sij, w in zip(xi, sigmaiji, wiji):
-            wm += x_i*x_j*w*sij**3
-    wm /= sm**3
-
-    # Eq 19
-    Mm = 0
-    for x_i, sigmaiji, ekiji, Miji in zip(xi, sigmaij, ekij, Mij):
-        for x_j, s, ek, M in zip(xi, sigmaiji, ekiji, Miji):
-            Mm += x_i*x_j*ek*s**2*M**0.5
-    Mm = (Mm/(ekm*sm**2))**2
-
-    # Eq 20
-    Dm = 0
-    for x_i, sigmaiji, ekiji, D_i in zip(xi, sigmaij, ekij, Di):
-        for x_j, s, ek, D_j in zip(xi, sigmaiji, ekiji, Di):
-            Dm += x_i*x_j*(D_i*D_j)**2/ek/s**3
-    Dm = (Dm*ekm*sm**3)**0.25
-
-    # Eq 21
-    km = 0
-    for x_i, kiji in zip(xi, kij):
-        for x_j, k in zip(xi, kiji):
-            km += x_i*x_j*k
+    T = asarray(T, dtype=float)
+    sm, ekm, wm, Mm, Dm, km = _mix_Chung(xi, Tci, Vci, Mi, wi, Di, ki)
 
     rho = rho/Mm/1000
     Vcm = (sm/0.809)**3                                                # Eq 16
@@ -1955,7 +1840,7 @@ def MuG_P_Chung(T, xi, Tci, Vci, Mi, wi, Di, ki, rho, muo):
     mup = (36.344e-6*(Mm*Tcm)**0.5/Vcm**(2/3))*A7*Y**2*G2*exp(
         A8+A9/T_+A10/T_**2)
 
-    return unidades.Viscosity(muk+mup, "P")
+    return _unit(unidades.Viscosity, muk+mup, "P")
 
 
 @refDoc(__doi__, [1, 21, 16, 17])
@@ -2077,68 +1962,21 @@ def MuG_TRAPP(T, P, xi, Tci, Vci, Zci, Mi, wi, rho, muo):
     '82.6'
     """
     # Reference fluid properties, propane
-    TcR = 369.83
     rhocR = 1/200  # mol/cm³
-    ZcR = 0.276
-    wR = 0.152
 
-    # Convert volume to molar base
-    Vci = [Vc*M*1000 for Vc, M in zip(Vci, Mi)]
-    Mm = sum([x*M for x, M in zip(xi, Mi)])
-    rho = rho/Mm
-
-    # Calculate shape factor for mixture
-    fi = []
-    hi = []
-    for Tc, Vc, Zc, w in zip(Tci, Vci, Zci, wi):
-        fi.append(Tc/TcR*(1+(w-wR)*(0.05203-0.7498*log(T/Tc))))
-        hi.append(rhocR*Vc*ZcR/Zc*(1-(w-wR)*(0.1436-0.2822*log(T/Tc))))
-
-    # Eq 9-7.5
-    fij = []
-    for f_i in fi:
-        fiji = []
-        for f_j in fi:
-            fiji.append((f_i*f_j)**0.5)
-        fij.append(fiji)
-
-    # Eq 9-7.4
-    hij = []
-    for h_i in hi:
-        hiji = []
-        for h_j in hi:
-            hiji.append((h_i**(1/3)+h_j**(1/3))**3/8)
-        hij.append(hiji)
-
-    # Eq 9-7.2
-    hm = 0
-    for x_i, hiji in zip(xi, hij):
-        for x_j, h in zip(xi, hiji):
-            hm += x_i*x_j*h
-
-    # Eq 9-7.3
-    fm = 0
-    for x_i, hiji, fiji in zip(xi, hij, fij):
-        for x_j, h, f in zip(xi, hiji, fiji):
-            fm += x_i*x_j*f*h/hm
-
-    # Eq 9-7.9
-    Mij = []
-    for M_i in Mi:
-        Miji = []
-        for M_j in Mi:
-            Miji.append(2*M_i*M_j/(M_i+M_j))
-        Mij.append(Miji)
+    T = asarray(T, dtype=float)
+    xi, Mi = _array(xi, Mi)
+    Mm = (xi*Mi).sum(axis=-1)
+    rho = asarray(rho/Mm)
+
+    # Shape factors for mixture, Eq 9-7.2 to 9-7.5 and 9-7.9
+    hi, fij, hij, hm, fm, Mij = _mix_TRAPP(T, xi, Tci, Vci, Zci, wi, Mi)
 
     To = T/fm                                                       # Eq 9-7.6
     rho0 = rho/1000*hm                                              # Eq 9-7.7
 
     # Eq 9-7.8
-    suma = 0
-    for x_i, fiji, Miji, hiji in zip(xi, fij, Mij, hij):
-        for x_j, f, M, h in zip(xi, fiji, Miji, hiji):
-            suma += x_i*x_j*(f*M)**0.5*h**(4/3)
-    Fnm = 44.094**-0.5/hm**2*suma
+    Fnm = 44.094**-0.5/hm**2*_xx(xi, (fij*Mij)**0.5*hij**(4/3))
 
     # Calculation of reference residual viscosity
     # Coefficients in [16]_, pag 796
@@ -2153,98 +1991,51 @@ def MuG_TRAPP(T, P, xi, Tci, Vci, Zci, Mi, wi, rho, muo):
     muR = exp(F)-exp(G)
 
     # Calculate of Δη
-    sigmai = [4.771*h**(1/3) for h in hi]
-    sigmaij = []
-    for s_i in sigmai:
-        sigmaiji = []
-        for s_j in sigmai:
-            sigmaiji.append((s_i+s_j)/2)
-        sigmaij.append(sigmaiji)
+    sigmai = 4.771*hi**(1/3)
+    s_i, s_j = _ij(sigmai)
+    sigmaij = (s_i+s_j)/2
 
     # Eq 9-7.16
-    X = 6.023e-4*pi/6*rho*sum([x*s**3 for x, s in zip(xi, sigmai)])
+    sum3 = (xi*sigmai**3).sum(axis=-1)
+    X = 6.023e-4*pi/6*rho*sum3
 
     # Eq 9-7.15
-    sum2 = sum([x*s**2 for x, s in zip(xi, sigmai)])
-    sum3 = sum([x*s**3 for x, s in zip(xi, sigmai)])
-    titaij = []
-    for s_i, siji in zip(sigmai, sigmaij):
-        titaiji = []
-        for s_j, sij in zip(sigmai, siji):
-            titaiji.append(s_i*s_j/2/sij*sum2/sum3)
-        titaij.append(titaiji)
+    sum2 = (xi*sigmai**2).sum(axis=-1)
+    titaij = s_i*s_j/2/sigmaij*(sum2/sum3)[..., None, None]
 
     # Eq 9-7.14
-    gij = []
-    for titaiji in titaij:
-        giji = []
-        for tij in titaiji:
-            giji.append(1/(1-X)+3*X/(1-X)**2*tij+2*X**2/(1-X)**3*tij**2)
-        gij.append(giji)
+    X_ = X[..., None, None]
+    gij = 1/(1-X_)+3*X_/(1-X_)**2*titaij+2*X_**2/(1-X_)**3*titaij**2
 
     # Eq 9-3.8
-    muij = []
-    for miji, siji in zip(Mij, sigmaij):
-        muiji = []
-        for m, s in zip(miji, siji):
-            muiji.append(2.669*(m*T)**0.5/s**2)
-        muij.append(muiji)
+    muij = 2.669*(Mij*T[..., None, None])**0.5/sigmaij**2
 
     # Eq 9-7.19
-    Bij = []
-    for i, M_i in enumerate(Mi):
-        Biji = []
-        for j, M_j in enumerate(Mi):
-            B = 0
-            for k, M_k in enumerate(Mi):
-                if i == j:
-                    dij = 1
-                else:
-                    dij = 0
-                if j == k:
-                    djk = 1
-                else:
-                    djk = 0
-                B += xi[i]*xi[k]*gij[i][k]/muij[i][k]*(M_k/(M_i+M_k))**2*(
-                    (1+5/3*M_i/M_k)*dij - 2/3*M_i/M_k*djk)
-            B *= 2e-1
-            Biji.append(B)
-        Bij.append(Biji)
+    M_i, M_k = _ij(Mi)
+    Wik = xi[..., :, None]*xi[..., None, :]*gij/muij*(M_k/(M_i+M_k))**2
+    Bij = -2/3*Wik*M_i/M_k
+    Bij += eye(xi.shape[-1])*(Wik*(1+5/3*M_i/M_k)).sum(axis=-1)[..., None]
+    Bij *= 2e-1
 
     # Eq 9-7.17
-    Yi = []
-    for x_i, M_i, siji, giji in zip(xi, Mi, sigmaij, gij):
-        suma = 0
-        for x_j, M_j, s, g in zip(xi, Mi, siji, giji):
-            suma += x_j*M_j/(M_i+M_j)*s**3*g
-        Yi.append(x_i*(1+8*pi/15*6.023e-4*rho*suma))
+    suma = (xi[..., None, :]*M_k/(M_i+M_k)*sigmaij**3*gij).sum(axis=-1)
+    Yi = xi*(1+8*pi/15*6.023e-4*rho[..., None]*suma)
 
     # Eq 9-7.18
-    betai = solve(Bij, Yi)
+    betai = solve(Bij, Yi[..., None])[..., 0]
 
     # Eq 9-7.11
-    sum1 = sum([b*Y for b, Y in zip(betai, Yi)])
-    sum2 = 0
-    for x_i, siji, muiji, giji in zip(xi, sigmaij, muij, gij):
-        for x_j, s, mu, g in zip(xi, siji, muiji, giji):
-            sum2 += x_i*x_j*s**6*mu*g
+    sum1 = (betai*Yi).sum(axis=-1)
+    sum2 = _xx(xi, sigmaij**6*muij*gij)
     alfa = 48/25/pi*(2*pi/3*6.023e-4)**2
     eta_m = sum1 + alfa*10*rho**2*sum2
 
     # ηx for pure hypothethical fluid
     # Eq 9-7.20
-    sigmax = 0
-    for x_i, siji in zip(xi, sigmaij):
-        for x_j, s in zip(xi, siji):
-            sigmax += x_i*x_j*s**3
-    sigmax = sigmax**(1/3)
+    sigmax = _xx(xi, sigmaij**3)**(1/3)
 
     # Eq 9-7.21
-    Mx = 0
-    for x_i, siji, Miji in zip(xi, sigmaij, Mij):
-        for x_j, s, M in zip(xi, siji, Miji):
-            Mx += x_i*x_j*M**0.5*s**4
-    Mx = Mx**2/sigmax**8
+    Mx = _xx(xi, Mij**0.5*sigmaij**4)**2/sigmax**8
 
     X = 6.023e-4*pi/6*rho*sigmax**3
     gxx = 1/(1-X)+3*X/(1-X)**2*0.5+2*X**2/(1-X)**3*0.25
@@ -2257,7 +2048,7 @@ def MuG_TRAPP(T, P, xi, Tci, Vci, Zci, Mi, wi, rho, muo):
     # Eq 9-7.10
     # The 0.1 factor because this values are im μP, to convert to μPa·s
     Dmu = (eta_m-eta_x)*0.1
-    return unidades.Viscosity(Fnm*muR + Dmu + muo*1e6, "muPas")
+    return _unit(unidades.Viscosity, Fnm*muR + Dmu + muo*1e6, "muPas")
 
 
 @refDoc(__doi__, [19, 2])
@@ -2536,43 +2327,27 @@ def ThG_LindsayBromley(T, xi, Mi, Tbi, mui, ki):
     >>> "%0.5f" % k.BtuhftF
     '0.01197'
     """
+    T = asarray(T, dtype=float)
+    xi, Mi, Tbi, mui, ki = _array(xi, Mi, Tbi, mui, ki)
+
     # Calculation of Sutherland constants, Eq 14
-    S = []
-    for Tb, M in zip(Tbi, Mi):
-        if M == 2.0158 or M == 4.0026:
-            # Hydrogen or helium case
-            S.append(79)
-        else:
-            S.append(1.5*Tb)
+    # Hydrogen or helium case
+    S = where((Mi == 2.0158) | (Mi == 4.0026), 79, 1.5*Tbi)
 
     # Geometric mean of collision Sutherland constants, Eq 15
-    Sij = []
-    for Si in S:
-        Siji = []
-        for Sj in S:
-            Siji.append((Si*Sj)**0.5)
-        Sij.append(Siji)
+    S_i, S_j = _ij(S)
+    Sij = (S_i*S_j)**0.5
 
     # Eq 12
-    Aij = []
-    for mu_i, M_i, Si, Siji in zip(mui, Mi, S, Sij):
-        Aiji = []
-        for mu_j, M_j, Sj, S_ij in zip(mui, Mi, S, Siji):
-            Aiji.append(0.25*(1+(mu_i/mu_j*(M_j/M_i)**0.75*(1+Si/T)/(
-                1+Sj/T))**0.5)**2 * (1+S_ij/T)/(1+Si/T))
-        Aij.append(Aiji)
+    T_ = T[..., None, None]
+    M_i, M_j = _ij(Mi)
+    mu_i, mu_j = _ij(mui)
+    Aij = 0.25*(1+(mu_i/mu_j*(M_j/M_i)**0.75*(1+S_i/T_)/(1+S_j/T_))**0.5)**2 \
+        * (1+Sij/T_)/(1+S_i/T_)
 
     # Calculate thermal conductivity, Eq 11
-    sumaj = []
-    for Aiji in Aij:
-        suma = 0
-        for xj, A_ij in zip(xi, Aiji):
-            suma += A_ij*xj
-        sumaj.append(suma)
-    k = 0
-    for x_i, k_i, si in zip(xi, ki, sumaj):
-        k += k_i*x_i/si
-    return unidades.ThermalConductivity(k)
+    k = (ki*xi/(Aij*xi[..., None, :]).sum(axis=-1)).sum(axis=-1)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 @refDoc(__doi__, [6, 3])
@@ -2618,27 +2393,18 @@ def ThG_MasonSaxena(xi, Mi, mui, ki):
     >>> "%0.4f" % ThG_MasonSaxena(xi, Mi, mui, ki)
     '0.0184'
     """
+    xi, Mi, mui, ki = _array(xi, Mi, mui, ki)
+    M_i, M_j = _ij(Mi)
+    mu_i, mu_j = _ij(mui)
+
     # Aij coefficient with ε=1 as explain in [3]_, Eq 21
-    Aij = []
-    for mu_i, M_i in zip(mui, Mi):
-        Aiji = []
-        for mu_j, M_j in zip(mui, Mi):
-            # Monatomic value of thermal conductivity ratio, Eq 22
-            lt_ij = mu_i*M_j/mu_j/M_i
-            Aiji.append((1+lt_ij**0.5*(M_i/M_j)**0.25)**2/(8*(1+M_i/M_j))**0.5)
-        Aij.append(Aiji)
+    # Monatomic value of thermal conductivity ratio, Eq 22
+    lt_ij = mu_i*M_j/mu_j/M_i
+    Aij = (1+lt_ij**0.5*(M_i/M_j)**0.25)**2/(8*(1+M_i/M_j))**0.5
 
     # Calculate thermal conductivity, Eq 20
-    sumaj = []
-    for Aiji in Aij:
-        suma = 0
-        for xj, A_ij in zip(xi, Aiji):
-            suma += A_ij*xj
-        sumaj.append(suma)
-    k = 0
-    for x_i, k_i, si in zip(xi, ki, sumaj):
-        k += k_i*x_i/si
-    return unidades.ThermalConductivity(k)
+    k = (ki*xi/(Aij*xi[..., None, :]).sum(axis=-1)).sum(axis=-1)
+    return _unit(unidades.ThermalConductivity, k)
 
 
 @refDoc(__doi__, [15, 1])
@@ -2705,73 +2471,12 @@ def ThG_Chung(T, xi, Tci, Vci, Mi, wi, Cvi, mu):
     >>> "%0.4f" % ThG_Chung(T, xi, Tci, Vci, Mi, wi, Cvi, mu)
     '0.0222'
     """
-    # Molar values
-    Vci = [Vc*M*1000 for Vc, M in zip(Vci, Mi)]
-    Cvi = [Cv*M/1000 for Cv, M in zip(Cvi, Mi)]
-    Cvm = sum([x*Cv for x, Cv in zip(xi, Cvi)])
+    T = asarray(T, dtype=float)
+    xi, Mi, Cvi = _array(xi, Mi, Cvi)
 
-    sigmai = [0.809*Vc**(1/3) for Vc in Vci]                            # Eq 4
-    eki = [Tc/1.2593 for Tc in Tci]                                     # Eq 5
-
-    # Eq 23
-    sigmaij = []
-    for s_i in sigmai:
-        sigmaiji = []
-        for s_j in sigmai:
-            sigmaiji.append((s_i*s_j)**0.5)
-        sigmaij.append(sigmaiji)
-
-    # Eq 24
-    ekij = []
-    for ek_i in eki:
-        ekiji = []
-        for ek_j in eki:
-            ekiji.append((ek_i*ek_j)**0.5)
-        ekij.append(ekiji)
-
-    # Eq 25
-    wij = []
-    for w_i in wi:
-        wiji = []
-        for w_j in wi:
-            wiji.append((w_i+w_j)/2)
-        wij.append(wiji)
-
-    # Eq 26
-    Mij = []
-    for M_i in Mi:
-        Miji = []
-        for M_j in Mi:
-            Miji.append(2*M_i*M_j/(M_i+M_j))
-        Mij.append(Miji)
-
-    # Eq 14
-    sm = 0
-    for x_i, sigmaiji in zip(xi, sigmaij):
-        for x_j, sij in zip(xi, sigmaiji):
-            sm += x_i*x_j*sij**3
-    sm = sm**(1/3)
-
-    # Eq 15
-    ekm = 0
-    for x_i, sigmaiji, ekiji in zip(xi, sigmaij, ekij):
-        for x_j, sij, ek in zip(xi, sigmaiji, ekiji):
-            ekm += x_i*x_j*ek*sij**3
-    ekm /= sm**3
-
-    # Eq 18
-    wm = 0
-    for x_i, sigmaiji, wiji in zip(xi, sigmaij, wij):
-        for x_j, sij, w in zip(xi, sigmaiji, wiji):
-            wm += x_i*x_j*w*sij**3
-    wm /= sm**3
-
-    # Eq 19
-    Mm = 0
-    for x_i, sigmaiji, ekiji, Miji in zip(xi, sigmaij, ekij, Mij):
-        for x_j, s, ek, M in zip(xi, sigmaiji, ekiji, Miji):
-            Mm += x_i*x_j*ek*s**2*M**0.5
-    Mm = (Mm/(ekm*sm**2))**2
+    # Molar values
+    Cvm = (xi*Cvi*Mi/1000).sum(axis=-1)
+    sm, ekm, wm, Mm, Dm, km = _mix_Chung(xi, Tci, Vci, Mi, wi)
 
     Tcm = 1.2593*ekm
     Trm = T/Tcm
@@ -2784,7 +2489,7 @@ def ThG_Chung(T, xi, Tci, Vci, Mi, wi, Cvi, mu):
 
     # Eq 9
     k = 7.452*mu*10/Mm*phi   # Viscosity in P
-    return unidades.ThermalConductivity(k, "calscmK")
+    return _unit(unidades.ThermalConductivity, k, "calscmK")
 
 
 @refDoc(__doi__, [15, 1])
@@ -2839,94 +2544,10 @@ def ThG_P_Chung(T, xi, Tci, Vci, Mi, wi, Di, ki, rho, ko):
     '0.058'
     """
     # Thermal conductivity in procedure in cal/s·cm·K
-    ko = unidades.ThermalConductivity(ko).calscmK
-
-    # Use critical volume in molar base
-    Vci = [Vc*M*1000 for Vc, M in zip(Vci, Mi)]
-
-    sigmai = [0.809*Vc**(1/3) for Vc in Vci]                            # Eq 4
-    eki = [Tc/1.2593 for Tc in Tci]                                     # Eq 5
+    ko = ko/unidades.ThermalConductivity.rates["calscmK"]
 
-    # Eq 23
-    sigmaij = []
-    for s_i in sigmai:
-        sigmaiji = []
-        for s_j in sigmai:
-            sigmaiji.append((s_i*s_j)**0.5)
-        sigmaij.append(sigmaiji)
-
-    # Eq 24
-    ekij = []
-    for ek_i in eki:
-        ekiji = []
-        for ek_j in eki:
-            ekiji.append((ek_i*ek_j)**0.5)
-        ekij.append(ekiji)
-
-    # Eq 25
-    wij = []
-    for w_i in wi:
-        wiji = []
-        for w_j in wi:
-            wiji.append((w_i+w_j)/2)
-        wij.append(wiji)
-
-    # Eq 26
-    Mij = []
-    for M_i in Mi:
-        Miji = []
-        for M_j in Mi:
-            Miji.append(2*M_i*M_j/(M_i+M_j))
-        Mij.append(Miji)
-
-    # Eq 27
-    kij = []
-    for k_i in ki:
-        kiji = []
-        for k_j in ki:
-            kiji.append((k_i*k_j)**0.5)
-        kij.append(kiji)
-
-    # Eq 14
-    sm = 0
-    for x_i, sigmaiji in zip(xi, sigmaij):
-        for x_j, sij in zip(xi, sigmaiji):
-            sm += x_i*x_j*sij**3
-    sm = sm**(1/3)
-
-    # Eq 15
-    ekm = 0
-    for x_i, sigmaiji, ekiji in zip(xi, sigmaij, ekij):
-        for x_j, sij, ek in zip(xi, sigmaiji, ekiji):
-            ekm += x_i*x_j*ek*sij**3
-    ekm /= sm**3
-
-    # Eq 18
-    wm = 0
-    for x_i, sigmaiji, wiji in zip(xi, sigmaij, wij):
-        for x_j, sij, w in zip(xi, sigmaiji, wiji):
-            wm += x_i*x_j*w*sij**3
-    wm /= sm**3
-
-    # Eq 19
-    Mm = 0
-    for x_i, sigmaiji, ekiji, Miji in zip(xi, sigmaij, ekij, Mij):
-        for x_j, s, ek, M in zip(xi, sigmaiji, ekiji, Miji):
-            Mm += x_i*x_j*ek*s**2*M**0.5
-    Mm = (Mm/(ekm*sm**2))**2
-
-    # Eq 20
-    Dm = 0
-    for x_i, sigmaiji, ekiji, D_i in zip(xi, sigmaij, ekij, Di):
-        for x_j, s, ek, D_j in zip(xi, sigmaiji, ekiji, Di):
-            Dm += x_i*x_j*(D_i*D_j)**2/ek/s**3
-    Dm = (Dm*ekm*sm**3)**0.25
-
-    # Eq 21
-    km = 0
-    for x_i, kiji in zip(xi, kij):
-        for x_j, k in zip(xi, kiji):
-            km += x_i*x_j*k
+    T = asarray(T, dtype=float)
+    sm, ekm, wm, Mm, Dm, km = _mix_Chung(xi, Tci, Vci, Mi, wi, Di, ki)
 
     rho = rho/Mm/1000
     Vcm = (sm/0.809)**3                                                # Eq 16
@@ -2959,7 +2580,7 @@ def ThG_P_Chung(T, xi, Tci, Vci, Mi, wi, Di, ki, rho, ko):
     kk = ko*(1/H2 + B6*Y)
     kp = (3.039e-4*(Tcm/Mm)**0.5/Vcm**(2/3))*B7*Y**2*H2*T_**0.5
 
-    return unidades.ThermalConductivity(kk+kp, "calscmK")
+    return _unit(unidades.ThermalConductivity, kk+kp, "calscmK")
 
 
 @refDoc(__doi__, [7, 3])
@@ -3032,43 +2653,29 @@ def ThG_StielThodosYorizane(T, xi, Tci, Pci, Vci, wi, Mi, V, ko):
     >>> "%0.4f" % ThG_StielThodosYorizane(*args)
     '0.0527'
     """
+    xi, Tci, Vci, wi, Mi = _array(xi, Tci, Vci, wi, Mi)
+
     # Use critical volume in molar base
-    Vci = [Vc*M*1000 for Vc, M in zip(Vci, Mi)]
+    Vci = Vci*Mi*1000
 
     # Eq 8; missing rules for critical properties
-    wm = sum([x*w for x, w in zip(xi, wi)])
-    Mm = sum([x*M for x, M in zip(xi, Mi)])
+    wm = (xi*wi).sum(axis=-1)
+    Mm = (xi*Mi).sum(axis=-1)
     Zcm = 0.291-0.08*wm
 
-    Vcij = []
-    for Vc_i in Vci:
-        Vciji = []
-        for Vc_j in Vci:
-            Vciji.append((Vc_i**(1/3)+Vc_j**(1/3))**3/8)
-        Vcij.append(Vciji)
-
-    Vcm = 0
-    for x_i, Vciji in zip(xi, Vcij):
-        for x_j, Vc in zip(xi, Vciji):
-            Vcm += x_i*x_j*Vc
-
-    Tcij = []
-    for Tc_i in Tci:
-        Tciji = []
-        for Tc_j in Tci:
-            Tciji.append((Tc_i*Tc_j)**0.5)
-        Tcij.append(Tciji)
+    Vc_i, Vc_j = _ij(Vci)
+    Vcij = (Vc_i**(1/3)+Vc_j**(1/3))**3/8
+    Vcm = _xx(xi, Vcij)
 
-    Tcm = 0
-    for x_i, Vciji, Tciji in zip(xi, Vcij, Tcij):
-        for x_j, Vc, Tc in zip(xi, Vciji, Tciji):
-            Tcm += x_i*x_j*Vc*Tc/Vcm
+    Tc_i, Tc_j = _ij(Tci)
+    Tcij = (Tc_i*Tc_j)**0.5
+    Tcm = _xx(xi, Vcij*Tcij)/Vcm
 
     Pcm = Zcm*R*Tcm/Vcm*1e6
     Vcm = Vcm/Mm/1000
 
     km = ThG_StielThodos(T, Tcm, Pcm, Vcm, Mm, V, ko)
-    return unidades.ThermalConductivity(km)
+    return _unit(unidades.ThermalConductivity, km)
 
 
 @refDoc(__doi__, [1, 21])
@@ -3155,62 +2762,22 @@ def ThG_TRAPP(T, xi, Tci, Vci, Zci, wi, Mi, rho, ko):
     # Reference fluid properties, propane
     TcR = 369.83
     rhocR = 1/200  # mol/cm³
-    ZcR = 0.276
     wR = 0.152
 
-    # Convert volume to molar base
-    Vci = [Vc*M*1000 for Vc, M in zip(Vci, Mi)]
-    Mm = sum([x*M for x, M in zip(xi, Mi)])
+    T = asarray(T, dtype=float)
+    xi, Mi, wi = _array(xi, Mi, wi)
+    Mm = (xi*Mi).sum(axis=-1)
     rho = rho/Mm/1000
 
-    # Calculate shape factor for mixture
-    fi = []
-    hi = []
-    for Tc, Vc, Zc, w in zip(Tci, Vci, Zci, wi):
-        fi.append(Tc/TcR*(1+(w-wR)*(0.05203-0.7498*log(T/Tc))))
-        hi.append(rhocR*Vc*ZcR/Zc*(1-(w-wR)*(0.1436-0.2822*log(T/Tc))))
-
-    fij = []
-    for f_i in fi:
-        fiji = []
-        for f_j in fi:
-            fiji.append((f_i*f_j)**0.5)
-        fij.append(fiji)
-
-    hij = []
-    for h_i in hi:
-        hiji = []
-        for h_j in hi:
-            hiji.append((h_i**(1/3)+h_j**(1/3))**3/8)
-        hij.append(hiji)
-
-    hm = 0
-    for x_i, hiji in zip(xi, hij):
-        for x_j, h in zip(xi, hiji):
-            hm += x_i*x_j*h
-
-    fm = 0
-    for x_i, hiji, fiji in zip(xi, hij, fij):
-        for x_j, h, f in zip(xi, hiji, fiji):
-            fm += x_i*x_j*f*h/hm
+    # Shape factors for mixture
+    hi, fij, hij, hm, fm, Mij = _mix_TRAPP(T, xi, Tci, Vci, Zci, wi, Mi)
 
     To = T/fm
     rho0 = rho*hm
 
-    Mij = []
-    for M_i in Mi:
-        Miji = []
-        for M_j in Mi:
-            Miji.append(1/(1/2/M_i+1/2/M_j))
-        Mij.append(Miji)
-
-    suma = 0
-    for x_i, fiji, Miji, hiji in zip(xi, fij, Mij, hij):
-        for x_j, f, M, h in zip(xi, fiji, Miji, hiji):
-            suma += x_i*x_j*(f/M)**0.5*h**(4/3)
-    Flm = 44.094**0.5/hm**2*suma
+    Flm = 44.094**0.5/hm**2*_xx(xi, (fij/Mij)**0.5*hij**(4/3))
 
-    wm = sum([x*w for x, w in zip(xi, wi)])
+    wm = (xi*wi).sum(axis=-1)
     Xlm = (1+2.1866*(wm-wR)/(1-0.505*(wm-wR)))**0.5
 
     # Coefficients in [53]_, pag 796
@@ -3224,7 +2791,7 @@ def ThG_TRAPP(T, xi, Tci, Vci, Zci, wi, Mi, rho, ko):
         (-3.05330414748+0.450477583739/TrR)*rhorR**4 + \
         (1.03144050679-0.185480417707/TrR)*rhorR**5
 
-    return unidades.ThermalConductivity(Flm*Xlm*lR*1e-3 + ko)
+    return _unit(unidades.ThermalConductivity, Flm*Xlm*lR*1e-3 + ko)
 
 
 @refDoc(__doi__, [8, 2])
@@ -3262,6 +2829,113 @@ def Tension(xi, sigmai):
     return unidades.Tension(sigma)
 
 
+def _sharedSet(ids, context, kwargs):
+    """Return the shared compound set instance of the current process, used
+    to unpickle the compound sets by reference"""
+    with config.configContext(context):
+        return ComponentSet(ids, **kwargs)
+
+
+class ComponentSet(object):
+    """
+    Immutable set of compounds of a mixture, with the constant properties of
+    compounds saved as arrays. The instances are shared by all the
+    :class:`Mezcla` with the same compounds and correlation methods, so a new
+    composition don't need to load the compounds again
+
+    Parameters
+    ----------
+    ids : list
+        List with component index of mixture
+
+    Notes
+    -----
+    The correlation methods parameters of :class:`Componente` can be used too.
+    The instances are cleared when the configuration or the database changes
+
+    Examples
+    --------
+    >>> ComponentSet([2, 3]) is ComponentSet((2, 3))
+    True
+    >>> "%0.3f %0.3f" % tuple(ComponentSet([2, 3]).M)
+    '16.043 30.070'
+    >>> import pickle
+    >>> cmps = ComponentSet([2, 3])
+    >>> pickle.loads(pickle.dumps(cmps)) is cmps
+    True
+    """
+
+    # Shared instances indexed by ids, correlation methods and configuration
+    # context
+    _instances = {}
+    _generation = None
+    _lock = RLock()
+
+    def __new__(cls, ids, **kwargs):
+        ids = tuple(int(i) for i in ids)
+        context = config.getContext()
+        key = (ids, context) + tuple(
+            kwargs.get(k) for k in Componente.kwargs)
+        with ComponentSet._lock:
+            if ComponentSet._generation != sql.generation:
+                ComponentSet._instances.clear()
+                ComponentSet._generation = sql.generation
+
+            try:
+                instance = ComponentSet._instances.get(key)
+            except TypeError:
+                instance = object.__new__(cls)
+                instance._reference = (ids, context, kwargs)
+                instance.__init__(ids, **kwargs)
+                return instance
+
+            if instance is None:
+                instance = object.__new__(cls)
+                instance._reference = (ids, context, kwargs)
+                instance.__init__(ids, **kwargs)
+                ComponentSet._instances[key] = instance
+        return instance
+
+    def __reduce__(self):
+        # Pickled by reference, loaded again in the receiving process
+        return (_sharedSet, self._reference)
+
+    def __init__(self, ids, **kwargs):
+        if "ids" in self.__dict__:
+            return
+        self.ids = tuple(int(i) for i in ids)
+        self.componente = tuple(Componente(i, **kwargs) for i in self.ids)
+        self._arrays = {}
+        self.M = self.array("M")
+
+    def __len__(self):
+        return len(self.ids)
+
+    def array(self, prop, unit=None):
+        """Get the compounds property prop as a read-only array
+
+        Parameters
+        ----------
+        prop : str
+            Code of property to return, f_acent, M, Vc, Tc,...
+        unit : str, optional
+            Unit code of property to return
+        """
+        try:
+            return self._arrays[prop, unit]
+        except KeyError:
+            values = []
+            for cmp in self.componente:
+                value = getattr(cmp, prop)
+                if unit:
+                    value = getattr(value, unit)
+                values.append(value)
+            array = asarray(values, dtype=float)
+            array.flags.writeable = False
+            self._arrays[prop, unit] = array
+            return array
+
+
 class Mezcla(config.Entity):
     """
     Class to model mixture calculation, components, physics properties, mixing
@@ -3455,142 +3129,184 @@ class Mezcla(config.Entity):
 
         self.kwargs = Mezcla.kwargs.copy()
         self.kwargs.update(kwargs)
-        self.Config = config.getMainWindowConfig()
-        if self.kwargs["ids"]:
-            self.ids = self.kwargs.get("ids")
+        self.Config = config.getContext()
+        if self.kwargs.get("ids"):
+            ids = self.kwargs.get("ids")
         else:
-            txt = self.Config.get("Components", "Components")
-            if isinstance(txt, str):
-                self.ids = eval(txt)
+            ids = self.Config.get("Components", "Components")
+        kw = {k: v for k, v in kwargs.items() if k in Componente.kwargs}
+        self.core = ComponentSet(ids, **kw)
+        self.ids = list(self.core.ids)
+        self.componente = list(self.core.componente)
+        self._composicion(tipo, self.kwargs)
+        self.status = 1
+
+    def _composicion(self, tipo, kwargs):
+        """Define the composition state of mixture from the input kwargs, saved
+        as the molar fraction array and the total molar flow"""
+        Mi = self.core.M
+        if tipo in (1, 2):
+            if tipo == 1:
+                ni = asarray(kwargs["caudalUnitarioMasico"], dtype=float)/Mi
             else:
-                self.ids = txt
-        self.componente = [Componente(int(i), **kwargs) for i in self.ids]
-        fraccionMolar = self.kwargs.get("fraccionMolar", None)
-        fraccionMasica = self.kwargs.get("fraccionMasica", None)
-        caudalMasico = self.kwargs.get("caudalMasico", None)
-        caudalMolar = self.kwargs.get("caudalMolar", None)
-        caudalUnitarioMasico = self.kwargs.get("caudalUnitarioMasico", None)
-        caudalUnitarioMolar = self.kwargs.get("caudalUnitarioMolar", None)
-
-        # normalizce fractions to unit
-        if fraccionMolar:
-            suma = float(sum(fraccionMolar))
-            fraccionMolar = [x/suma for x in fraccionMolar]
-        if fraccionMasica:
-            suma = float(sum(fraccionMasica))
-            fraccionMasica = [x/suma for x in fraccionMasica]
-
-        # calculate all concentration units
-        if tipo == 1:
-            kw = mix_unitmassflow(caudalUnitarioMasico, self.componente)
-        elif tipo == 2:
-            kw = mix_unitmolarflow(caudalUnitarioMolar, self.componente)
-        elif tipo == 3:
-            kw = mix_massflow_molarfraction(
-                caudalMasico, fraccionMolar, self.componente)
-        elif tipo == 4:
-            kw = mix_massflow_massfraction(
-                caudalMasico, fraccionMasica, self.componente)
-        elif tipo == 5:
-            kw = mix_molarflow_molarfraction(
-                caudalMolar, fraccionMolar, self.componente)
-        elif tipo == 6:
-            kw = mix_molarflow_massfraction(
-                caudalMolar, fraccionMasica, self.componente)
-
-        caudalMolar = kw["molarFlow"]
-        caudalMasico = kw["massFlow"]
-        caudalUnitarioMasico = kw["unitMassFlow"]
-        caudalUnitarioMolar = kw["unitMolarFlow"]
-        fraccionMolar = kw["molarFraction"]
-        fraccionMasica = kw["massFraction"]
-
-#        # Clean component with null composition
-#        self.zeros = []
-#        for i, x in enumerate(fraccionMolar):
-#            if not x:
-#                self.zeros.append(i)
-#
-#        for i in self.zeros[::-1]:
-#            del self.ids[i]
-#            del self.componente[i]
-#            del fraccionMolar[i]
-#            del fraccionMasica[i]
-#            del caudalUnitarioMasico[i]
-#            del caudalUnitarioMolar[i]
-
-        self.fraccion = [unidades.Dimensionless(f) for f in fraccionMolar]
-        self.caudalmasico = unidades.MassFlow(caudalMasico)
-        self.caudalmolar = unidades.MolarFlow(caudalMolar)
-        self.fraccion_masica = [unidades.Dimensionless(f)
-                                for f in fraccionMasica]
-        self.caudalunitariomasico = [unidades.MassFlow(q)
-                                     for q in caudalUnitarioMasico]
-        self.caudalunitariomolar = [unidades.MolarFlow(q)
-                                    for q in caudalUnitarioMolar]
-        self.M = unidades.Dimensionless(caudalMasico/caudalMolar)
-
-        if tipo == 0:
-            self._bool = False
-            self.status = 0
-            return
+                ni = asarray(kwargs["caudalUnitarioMolar"], dtype=float)
+            caudalMolar = float(ni.sum())
+            if not caudalMolar:
+                raise ZeroDivisionError("Mixture without flow")
+            xi = ni/caudalMolar
         else:
-            self._bool = True
-            self.status = 1
-
-        # Calculate critic temperature, API procedure 4B1.1 pag 304
-        V = sum([xi*cmp.Vc for xi, cmp in zip(self.fraccion, self.componente)])
-        k = [xi*cmp.Vc/V for xi, cmp in zip(self.fraccion, self.componente)]
-        Tcm = sum([ki*cmp.Tc for ki, cmp in zip(k, self.componente)])
-        self.Tc = unidades.Temperature(Tcm)
-
-        # Calculate pseudocritic temperature
-        t = sum([xi*cmp.Tc for xi, cmp in zip(self.fraccion, self.componente)])
-        self.tpc = unidades.Temperature(t)
-
-        # Calculate pseudocritic pressure
-        p = sum([xi*cmp.Pc for xi, cmp in zip(self.fraccion, self.componente)])
-        self.ppc = unidades.Pressure(p)
-
-        # Calculate critic pressure, API procedure 4B2.1 pag 307
-        sumaw = 0
-        for xi, cmp in zip(self.fraccion, self.componente):
-            sumaw += xi*cmp.f_acent
-        pc = self.ppc+self.ppc*(5.808+4.93*sumaw)*(self.Tc-self.tpc)/self.tpc
-        self.Pc = unidades.Pressure(pc)
-
-        # Calculate acentric factor, API procedure 6B2.2-6 pag 523
-        self.f_acent = sum([xi*cmp.f_acent for xi, cmp in
-                            zip(self.fraccion, self.componente)])
-        self.f_acent_mod = sum([xi*cmp.f_acent_mod for xi, cmp in
-                                zip(self.fraccion, self.componente)])
-
-        # Calculate critic volume
-        Vci = self._arraylize("Vc")
-        Mi = self._arraylize("M")
-        hc = self._arraylize("isHydrocarbon")
-        self.Vc = Vc_ChuehPrausnitz(self.fraccion, Vci, Mi, hydrocarbon=hc)
-
-        tb = [xi*cmp.Tb for xi, cmp in zip(self.fraccion, self.componente)]
-        self.Tb = unidades.Temperature(sum(tb))
-        self.SG = sum([xi*cmp.SG for xi, cmp in
-                       zip(self.fraccion, self.componente)])
+            if tipo in (3, 5):
+                xi = asarray(kwargs["fraccionMolar"], dtype=float)
+            else:
+                xi = asarray(kwargs["fraccionMasica"], dtype=float)/Mi
+            xi = xi/float(xi.sum())
+            if tipo in (3, 4):
+                caudalMolar = kwargs["caudalMasico"]/float((xi*Mi).sum())
+            else:
+                caudalMolar = kwargs["caudalMolar"]
+        self._xi = xi
+        self._caudalmolar = float(caudalMolar)
+
+    def clone(self, **kwargs):
+        """Create a new mixture with the same compounds and correlation
+        methods changing only the composition or flow kwargs. The compounds
+        are shared so it's a cheap operation, useful for flash products or
+        split streams. Without new composition the molar fractions are kept,
+        and without new flow the molar flow is kept, optionally multiplied by
+        the *split* kwarg
+
+        Examples
+        --------
+        >>> mez = Mezcla(2, ids=[2, 3], caudalUnitarioMolar=[1, 3])
+        >>> split = mez.clone(split=0.5)
+        >>> "%0.2f %0.2f" % (split.caudalmolar, split.fraccion[0])
+        '2.00 0.25'
+        >>> liq = mez.clone(fraccionMolar=[0.5, 0.5], caudalMasico=46.113)
+        >>> "%0.3f %0.3f" % (liq.caudalmolar, liq.M)
+        '2.000 23.056'
+        """
+        split = kwargs.pop("split", 1)
+        new = object.__new__(Mezcla)
+        new._bool = True
+        new.status = 1
+        new.kwargs = self.kwargs.copy()
+        new.kwargs.update(kwargs)
+        new.Config = self.Config
+        new.core = self.core
+        new.ids = self.ids[:]
+        new.componente = self.componente[:]
+
+        if kwargs.get("caudalUnitarioMasico") is not None:
+            new._composicion(1, kwargs)
+        elif kwargs.get("caudalUnitarioMolar") is not None:
+            new._composicion(2, kwargs)
+        else:
+            kw = {"fraccionMolar": self._xi,
+                  "caudalMolar": self._caudalmolar*split}
+            kw.update(kwargs)
+            if kwargs.get("fraccionMasica") is not None:
+                tipo = 4
+            else:
+                tipo = 3
+            if "caudalMasico" not in kwargs:
+                tipo += 2
+            new._composicion(tipo, kw)
+        return new
 
     def __call__(self):
         pass
 
     def _arraylize(self, prop, unit=None):
-        """Get the compounds property prop as list
+        """Get the compounds property prop as array
         prop: a string code with the property to return
             f_acent, M, Vc, Tc,...
         """
-        array = []
-        for cmp in self.componente:
-            value = cmp.__getattribute__(prop)
-            if unit:
-                value = value.__getattribute__(unit)
-            array.append(value)
-        return array
+        return self.core.array(prop, unit)
+
+    # Composition properties, calculated on demand from the molar fraction
+    # array and the molar flow and cached
+    @cached_property
+    def _xw(self):
+        xw = self._xi*self.core.M
+        return xw/float(xw.sum())
+
+    @cached_property
+    def fraccion(self):
+        return [unidades.Dimensionless(x) for x in self._xi]
+
+    @cached_property
+    def fraccion_masica(self):
+        return [unidades.Dimensionless(x) for x in self._xw]
+
+    @cached_property
+    def caudalmolar(self):
+        return unidades.MolarFlow(self._caudalmolar)
+
+    @cached_property
+    def caudalmasico(self):
+        return unidades.MassFlow(self._caudalmolar*self.M)
+
+    @cached_property
+    def caudalunitariomolar(self):
+        return [unidades.MolarFlow(q) for q in self._xi*self._caudalmolar]
+
+    @cached_property
+    def caudalunitariomasico(self):
+        qi = self._xi*self.core.M*self._caudalmolar
+        return [unidades.MassFlow(q) for q in qi]
+
+    @cached_property
+    def M(self):
+        return unidades.Dimensionless(float((self._xi*self.core.M).sum()))
+
+    # Pseudocritic properties
+    @cached_property
+    def Tc(self):
+        """Critic temperature, API procedure 4B1.1 pag 304"""
+        k = self._xi*self.core.array("Vc")
+        Tcm = (k*self.core.array("Tc")).sum()/k.sum()
+        return unidades.Temperature(Tcm)
+
+    @cached_property
+    def tpc(self):
+        """Pseudocritic temperature"""
+        return unidades.Temperature((self._xi*self.core.array("Tc")).sum())
+
+    @cached_property
+    def ppc(self):
+        """Pseudocritic pressure"""
+        return unidades.Pressure((self._xi*self.core.array("Pc")).sum())
+
+    @cached_property
+    def Pc(self):
+        """Critic pressure, API procedure 4B2.1 pag 307"""
+        pc = self.ppc+self.ppc*(5.808+4.93*self.f_acent) * \
+            (self.Tc-self.tpc)/self.tpc
+        return unidades.Pressure(pc)
+
+    @cached_property
+    def f_acent(self):
+        """Acentric factor, API procedure 6B2.2-6 pag 523"""
+        return float((self._xi*self.core.array("f_acent")).sum())
+
+    @cached_property
+    def f_acent_mod(self):
+        return float((self._xi*self.core.array("f_acent_mod")).sum())
+
+    @cached_property
+    def Vc(self):
+        """Critic volume"""
+        Vci = self.core.array("Vc")
+        hc = self.core.array("isHydrocarbon")
+        return Vc_ChuehPrausnitz(self._xi, Vci, self.core.M, hydrocarbon=hc)
+
+    @cached_property
+    def Tb(self):
+        return unidades.Temperature((self._xi*self.core.array("Tb")).sum())
+
+    @cached_property
+    def SG(self):
+        return float((self._xi*self.core.array("SG")).sum())
 
     def _Ho(self, T):
         """Ideal gas enthalpy"""
@@ -3642,13 +3358,13 @@ class Mezcla(config.Entity):
             Vci = self._arraylize("Vc")
             Zrai = self._arraylize("rackett")
             Mi = self._arraylize("M")
-            rhos = RhoL_RackettMix(T, self.fraccion, Tci, Pci, Vci, Zrai, Mi)
+            rhos = RhoL_RackettMix(T, self._xi, Tci, Pci, Vci, Zrai, Mi)
         elif method == 1:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
             wi = self._arraylize("f_acent")
             Mi = self._arraylize("M")
-            rhos = RhoL_CostaldMix(T, self.fraccion, Tci, wi, Vci, Mi)
+            rhos = RhoL_CostaldMix(T, self._xi, Tci, wi, Vci, Mi)
 
         # Add correction factor for high pressure
         if P < 1e6:
@@ -3661,7 +3377,7 @@ class Mezcla(config.Entity):
             wi = self._arraylize("f_acent")
             Mi = self._arraylize("M")
             rho = RhoL_AaltoKeskinenMix(
-                T, P, self.fraccion, Tci, Pci, Vci, wi, Mi, rhos)
+                T, P, self._xi, Tci, Pci, Vci, wi, Mi, rhos)
         elif Pcorr == 1:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
@@ -3669,20 +3385,20 @@ class Mezcla(config.Entity):
             wi = self._arraylize("f_acent")
             Mi = self._arraylize("M")
             rho = RhoL_TaitCostaldMix(
-                T, P, self.fraccion, Tci, Vci, wi, Mi, rhos)
+                T, P, self._xi, Tci, Vci, wi, Mi, rhos)
         elif Pcorr == 2:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
             Mi = self._arraylize("M")
             wi = self._arraylize("f_acent")
             Mi = self._arraylize("M")
-            rho = RhoL_NasrifarMix(T, P, self.fraccion, Tci, Vci, wi, Mi, rhos)
+            rho = RhoL_NasrifarMix(T, P, self._xi, Tci, Vci, wi, Mi, rhos)
         elif Pcorr == 3:
             Tci = self._arraylize("Tc")
             Mi = self._arraylize("M")
             wi = self._arraylize("f_acent")
             Mi = self._arraylize("M")
-            rho = RhoL_APIMix(T, P, self.fraccion, Tci, Pci, rhos)
+            rho = RhoL_APIMix(T, P, self._xi, Tci, Pci, rhos)
 
         return rho
 
@@ -3703,7 +3419,7 @@ class Mezcla(config.Entity):
             Mi = self._arraylize("M")
             Di = self._arraylize("dipole", "Debye")
             mui = [cmp.Mu_Gas(T, 101325, rho) for cmp in self.componente]
-            muo = MuG_Reichenberg(T, self.fraccion, Tci, Pci, Mi, mui, Di)
+            muo = MuG_Reichenberg(T, self._xi, Tci, Pci, Mi, mui, Di)
         elif method == 1:
             Tci = self._arraylize("Tc")
             Pci = self._arraylize("Pc")
@@ -3712,7 +3428,7 @@ class Mezcla(config.Entity):
             Mi = self._arraylize("M")
             Di = self._arraylize("dipole", "Debye")
             muo = MuG_Lucas(
-                T, 101325, self.fraccion, Tci, Pci, Vci, Zci, Mi, Di)
+                T, 101325, self._xi, Tci, Pci, Vci, Zci, Mi, Di)
         elif method == 2:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
@@ -3720,15 +3436,15 @@ class Mezcla(config.Entity):
             wi = self._arraylize("f_acent")
             Di = self._arraylize("dipole", "Debye")
             ki = [cmp._K_Chung() for cmp in self.componente]
-            muo = MuG_Chung(T, self.fraccion, Tci, Vci, Mi, wi, Di, ki)
+            muo = MuG_Chung(T, self._xi, Tci, Vci, Mi, wi, Di, ki)
         elif method == 3:
             Mi = self._arraylize("M")
             mui = [cmp.Mu_Gas(T, 101325, None) for cmp in self.componente]
-            muo = MuG_Wilke(self.fraccion, Mi, mui)
+            muo = MuG_Wilke(self._xi, Mi, mui)
         elif method == 4:
             Mi = self._arraylize("M")
             mui = [cmp.Mu_Gas(T, 101325, None) for cmp in self.componente]
-            muo = MuG_Herning(self.fraccion, Mi, mui)
+            muo = MuG_Herning(self._xi, Mi, mui)
 
         # Add correction factor for high pressure
         if P < 1e6:
@@ -3740,7 +3456,7 @@ class Mezcla(config.Entity):
             Zci = self._arraylize("Zc")
             Mi = self._arraylize("M")
             Di = self._arraylize("dipole", "Debye")
-            mu = MuG_Lucas(T, P, self.fraccion, Tci, Pci, Vci, Zci, Mi, Di)
+            mu = MuG_Lucas(T, P, self._xi, Tci, Pci, Vci, Zci, Mi, Di)
         elif Pcorr == 1:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
@@ -3749,7 +3465,7 @@ class Mezcla(config.Entity):
             Di = self._arraylize("dipole", "Debye")
             ki = [cmp._K_Chung() for cmp in self.componente]
             mu = MuG_P_Chung(
-                T, self.fraccion, Tci, Vci, Mi, wi, Di, ki, rho, muo)
+                T, self._xi, Tci, Vci, Mi, wi, Di, ki, rho, muo)
         elif Pcorr == 2:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
@@ -3757,18 +3473,18 @@ class Mezcla(config.Entity):
             Mi = self._arraylize("M")
             wi = self._arraylize("f_acent")
             mu = MuG_TRAPP(
-                T, P, self.fraccion, Tci, Vci, Zci, Mi, wi, rho, muo)
+                T, P, self._xi, Tci, Vci, Zci, Mi, wi, rho, muo)
         elif Pcorr == 3:
             Tci = self._arraylize("Tc")
             Pci = self._arraylize("Pc")
             Vci = self._arraylize("Vc")
             Mi = self._arraylize("M")
-            rhoc = 1/Vc_ChuehPrausnitz(self.fraccion, Vci, Mi)
-            mu = MuG_DeanStielMix(self.fraccion, Tci, Pci, Mi, rhoc, rho, muo)
+            rhoc = 1/Vc_ChuehPrausnitz(self._xi, Vci, Mi)
+            mu = MuG_DeanStielMix(self._xi, Tci, Pci, Mi, rhoc, rho, muo)
         elif Pcorr == 4:
             Tci = self._arraylize("Tc")
             Pci = self._arraylize("Pc")
-            mu = MuG_APIMix(T, P, self.fraccion, Tci, Pci, muo)
+            mu = MuG_APIMix(T, P, self._xi, Tci, Pci, muo)
 
         return mu
 
@@ -3780,18 +3496,18 @@ class Mezcla(config.Entity):
 
         if method == 0:
             mui = [cmp.Mu_Liquido(T, P) for cmp in self.componente]
-            mu = MuL_KendallMonroe(self.fraccion, mui)
+            mu = MuL_KendallMonroe(self._xi, mui)
         elif method == 1:
             Mi = self._arraylize("M")
             mui = [cmp.Mu_Liquido(T, P) for cmp in self.componente]
-            mu = MuL_Chemcad(self.fraccion, Mi, mui)
+            mu = MuL_Chemcad(self._xi, Mi, mui)
 
         return mu
 
     def Tension(self, T):
         """General method for calculate surface tension"""
         sigmai = [cmp.Tension(T) for cmp in self.componente]
-        tension = Tension(self.fraccion, sigmai)
+        tension = Tension(self._xi, sigmai)
         return unidades.Tension(tension)
 
     def ThCond_Liquido(self, T, P, rho):
@@ -3804,10 +3520,10 @@ class Mezcla(config.Entity):
             Vi = [1/cmp.RhoL(T, P) for cmp in self.componente]
             Mi = self._arraylize("M")
             ki = [cmp.ThCond_Liquido(T, P, rho) for cmp in self.componente]
-            k = ThL_Li(self.fraccion, Vi, Mi, ki)
+            k = ThL_Li(self._xi, Vi, Mi, ki)
         elif method == 1:
             ki = [cmp.ThCond_Liquido(T, P, rho) for cmp in self.componente]
-            k = ThL_Power(self.fraccion_masica, ki)
+            k = ThL_Power(self._xw, ki)
 
         return k
 
@@ -3825,13 +3541,13 @@ class Mezcla(config.Entity):
             Mi = self._arraylize("M")
             mui = [cmp.Mu_Gas(T, 101325, rho) for cmp in self.componente]
             ki = [cmp.ThCond_Gas(T, P, rho) for cmp in self.componente]
-            ko = ThG_MasonSaxena(self.fraccion, Mi, mui, ki)
+            ko = ThG_MasonSaxena(self._xi, Mi, mui, ki)
         elif method == 1:
             Mi = self._arraylize("M")
             Tbi = self._arraylize("Tb")
             mui = [cmp.Mu_Gas(T, 101325, rho) for cmp in self.componente]
             ki = [cmp.ThCond_Gas(T, P, rho) for cmp in self.componente]
-            ko = ThG_LindsayBromley(T, self.fraccion, Mi, Tbi, mui, ki)
+            ko = ThG_LindsayBromley(T, self._xi, Mi, Tbi, mui, ki)
         elif method == 2:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
@@ -3840,8 +3556,8 @@ class Mezcla(config.Entity):
             Cvi = [cmp.Cv(T) for cmp in self.componente]
             Di = self._arraylize("dipole", "Debye")
             ki = [cmp._K_Chung() for cmp in self.componente]
-            mu = MuG_Chung(T, self.fraccion, Tci, Vci, Mi, wi, Di, ki)
-            ko = ThG_Chung(T, self.fraccion, Tci, Vci, Mi, wi, Cvi, mu)
+            mu = MuG_Chung(T, self._xi, Tci, Vci, Mi, wi, Di, ki)
+            ko = ThG_Chung(T, self._xi, Tci, Vci, Mi, wi, Cvi, mu)
 
         # Add correction factor for high pressure
         if P < 1e6:
@@ -3853,14 +3569,14 @@ class Mezcla(config.Entity):
             wi = self._arraylize("f_acent")
             Mi = self._arraylize("M")
             k = ThG_StielThodosYorizane(
-                T, self.fraccion, Tci, Pci, Vci, wi, Mi, 1/rho, ko)
+                T, self._xi, Tci, Pci, Vci, wi, Mi, 1/rho, ko)
         elif Pcorr == 1:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
             Zci = self._arraylize("Zc")
             wi = self._arraylize("f_acent")
             Mi = self._arraylize("M")
-            k = ThG_TRAPP(T, self.fraccion, Tci, Vci, Zci, wi, Mi, rho, ko)
+            k = ThG_TRAPP(T, self._xi, Tci, Vci, Zci, wi, Mi, rho, ko)
         elif Pcorr == 2:
             Tci = self._arraylize("Tc")
             Vci = self._arraylize("Vc")
@@ -3869,7 +3585,7 @@ class Mezcla(config.Entity):
             Di = self._arraylize("dipole", "Debye")
             ki = [cmp._K_Chung() for cmp in self.componente]
             k = ThG_P_Chung(
-                T, self.fraccion, Tci, Vci, Mi, wi, Di, ki, rho, ko)
+                T, self._xi, Tci, Vci, Mi, wi, Di, ki, rho, ko)
 
         return k
 
@@ -3900,8 +3616,13 @@ class Mezcla(config.Entity):
     def readStatefromJSON(self, mezcla):
         if mezcla:
             self._bool = True
+            self.kwargs = Mezcla.kwargs.copy()
+            self.Config = config.getContext()
             self.ids = mezcla["ids"]
-            self.componente = [Componente(int(i)) for i in self.ids]
+            self.core = ComponentSet(self.ids)
+            self.componente = list(self.core.componente)
+            self._xi = asarray(mezcla["fraction"], dtype=float)
+            self._caudalmolar = float(mezcla["molarFlow"])
             self.fraccion = [
                 unidades.Dimensionless(x) for x in mezcla["fraction"]]
             self.fraccion_masica = [
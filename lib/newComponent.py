@@ -45,10 +45,10 @@ import time
 
 from scipy import exp, log
 from scipy.constants import R
-from PyQt5.QtWidgets import QApplication
 
 from lib import unidades
 from lib.compuestos import atomic_decomposition, facent_LeeKesler, RhoL_Rackett
+from lib.kernel import QApplication
 from lib.physics import R_atml, R_cal
 from lib.elemental import databank
 from lib.utilities import refDoc
@@ -90,9 +90,6 @@ PNA decomposition procedures:
 '''
 
 
-from configparser import ConfigParser
-
-from PyQt5.QtWidgets import QApplication
 from scipy import exp, sqrt, log10, log
 from scipy.interpolate import interp1d
 from scipy.optimize import fsolve, leastsq, newton
@@ -100,9 +97,12 @@ from numpy.linalg import solve
 from numpy import array
 
 from lib import unidades
+from lib.kernel import QApplication
 from lib.physics import R_atml, R_Btu
+from lib.EoS.Lee_Kesler import (Lee_Kesler_lib, Lee_Kesler_Entalpia_lib,
+                                w_ref)
 from lib.newComponent import newComponente
-from lib.config import conf_dir
+from lib.config import loadPreferences
 from lib.compuestos import prop_Edmister
 from lib.utilities import refDoc
 
@@ -3479,8 +3479,7 @@ class Petroleo(newComponente):
                   "Hougen (1952)"]
 
     def __init__(self, **kwargs):
-        self.Preferences = ConfigParser()
-        self.Preferences.read(conf_dir+"CheProcessrc")
+        self.Preferences = loadPreferences()
         self.__call__(**kwargs)
 
     def __call__(self, **kwargs):
@@ -4266,30 +4265,21 @@ class Petroleo(newComponente):
 
     def Lee_Kesler_lib_Cp(self, T, P):
         """Librería para el cálculo de capacidades calorificas, usada a continuación en diferentes funciones
-        Procedure API 7E1.6 Pag.726"""
-        #FIXME: No concuerdan mucho los valores de cp y cv con los valores por DIPPR
-        Tr=self.tr(T)
-        vr0, vrh=self.Lee_Kesler_lib(T, P.atm, "gas")
-        E=0.042724/2/Tr**3/0.060167*(0.65392+1-(0.65392+1+0.060167/vr0**2)*exp(-0.060167/vr0**2))
-        Cv0=-2*(0.154790+3*0.030323/Tr)/Tr**2/vr0+6*E
-
-        E=0.041577/2/Tr**3/0.03754*(1.226+1-(1.226+1+0.03754/vrh**2)*exp(-0.03754/vrh**2))
-        Cvh=-2*(0.027655+3*0.203488/Tr)/Tr**2/vrh+3*0.016901/Tr**3/vrh**2+6*E
-
-        return Cv0, Cvh
+        Procedure API 7D3.6 Pag.711, return (Cp°-Cp)/R for simple and reference fluid"""
+        simple, ref = Lee_Kesler_lib(self.tr(T), self.pr(P.atm), 1, props=("Cp", ))
+        return -simple["Cp"][0], -ref["Cp"][0]
 
     def Cp_gas(self, T, P):
         """Cálculo de la capacidad calorífica isobárica de la fase vapor de fracciones petrolíferas, API procedure 7D4.2, pag 717"""
+        t=unidades.Temperature(T)
         if 10.<=self.watson<=12.8 and 0.70<self.SG<=0.885:
             A4=((12.8/self.watson-1.)*(1.-10/self.watson)*(self.SG-0.885)*(self.SG-0.7)*1e4)**2
         else: A4=0
         A1=-0.35644+0.02972*self.watson+A4*(0.29502-0.24846/self.SG)
         A2=-1e-4*(2.9247-(1.5524-0.05543*self.watson)*self.watson+A4*(6.0283-5.0694/self.SG))
         A3=-1e-7*(1.6946+0.0844*A4)
-        #TODO: calculo factor cp adimensional
         Cp0, Cph=self.Lee_Kesler_lib_Cp(T, P)
-#        Cp_adimensional=-1.107
-        Cp_adimensional=Cp0+self.f_acent/0.3978*(Cph-Cp0)
+        Cp_adimensional=Cp0+self.f_acent/w_ref*(Cph-Cp0)
         return unidades.SpecificHeat(A1+A2*t.R+A3*t.R**2-R_Btu/self.M*Cp_adimensional, "BtulbF")
 
 
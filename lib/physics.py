@@ -31,8 +31,9 @@ Module for implement physics correlation:
 '''
 
 
-from math import exp, pi, cos, acos, sin
+from math import pi, cos, acos
 
+from numpy import exp, sin
 from scipy.constants import R, calorie, liter, atm, Btu, lb
 from scipy.special import cbrt
 
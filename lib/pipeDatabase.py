@@ -27,8 +27,7 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 import os
 import sqlite3
 
-from PyQt5.QtWidgets import QApplication
-
+from lib.kernel import QApplication
 
 # Standard pipe database
 
@@ -0,0 +1,342 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the profiling instrumentation of calculation kernel, to find the
+slow entities of a project. The instrumented procedures record its wall time,
+calls count, solver iterations and stream cache hits by category and name:
+
+  * entity: Calculation of each equipment of project, by its id
+  * equipment: Calculation of equipments, by its class
+  * stream: Calculation of streams, by its thermodynamic method
+  * meos: Calculation of multiparameter equation of state, by compound
+  * flash: Flash calculation of equations of state, by equation
+  * fsolve: Iterative solutions, by the procedure calling it
+
+The solver iterations and cache hits are added too to all the procedures in
+progress, so each entity includes the iterations of its streams. The
+profiling is disabled by default, then the instrumentation only check a
+flag. The calculations in worker processes aren't recorded.
+
+  * :func:`enable`: Start the profiling
+  * :func:`disable`: Stop the profiling
+  * :func:`profiling`: Context manager to profile a block of code
+  * :func:`reset`: Delete the recorded data
+  * :func:`frame`: Context manager to instrument a block of code
+  * :func:`measure`: Decorator to instrument a method
+  * :func:`fsolve`: scipy fsolve counting the function evaluations
+  * :func:`cache`: Record a cache hit or miss
+  * :func:`stats`: Recorded data
+  * :func:`report`: Summary report of recorded data
+  * :func:`writeTrace`: Save the recorded calls in chrome trace format
+"""
+
+
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import wraps
+import json
+import os
+from threading import Lock, get_ident, local
+from time import perf_counter
+
+from scipy.optimize import fsolve as _fsolve
+
+
+Stats = namedtuple("Stats", ["category", "name", "calls", "time", "selftime",
+                             "iterations", "hits", "misses"])
+Stats.__doc__ = """Profiling data of a procedure, the wall time in seconds
+including the called procedures and the selftime without them"""
+
+
+# Profiling status, checked by the instrumentation before any other work
+_active = False
+_trace = False
+
+_records = {}
+_events = []
+_lock = Lock()
+_thread = local()
+_origin = perf_counter()
+
+
+class _Record(object):
+    """Accumulated profiling data of a procedure"""
+    __slots__ = ("calls", "time", "selftime", "iterations", "hits", "misses")
+
+    def __init__(self):
+        self.calls = 0
+        self.time = 0
+        self.selftime = 0
+        self.iterations = 0
+        self.hits = 0
+        self.misses = 0
+
+
+class _Frame(object):
+    """Procedure in progress, with the time of its called procedures"""
+    __slots__ = ("key", "start", "children")
+
+    def __init__(self, key):
+        self.key = key
+        self.start = perf_counter()
+        self.children = 0
+
+
+class _Null(object):
+    """Context manager doing nothing, used with the profiling disabled"""
+
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc):
+        return False
+
+
+_null = _Null()
+
+
+def _stack():
+    """Return the procedures in progress of the current thread"""
+    try:
+        return _thread.stack
+    except AttributeError:
+        _thread.stack = []
+        return _thread.stack
+
+
+def _record(key):
+    """Return the record of key, created if necessary"""
+    record = _records.get(key)
+    if record is None:
+        record = _records[key] = _Record()
+    return record
+
+
+def enable(trace=False):
+    """Start the profiling, with trace the calls are saved to export them
+    with :func:`writeTrace`"""
+    global _active, _trace
+    _trace = trace
+    _active = True
+
+
+def disable():
+    """Stop the profiling, the recorded data are kept"""
+    global _active
+    _active = False
+
+
+def reset():
+    """Delete all the recorded data"""
+    with _lock:
+        _records.clear()
+        del _events[:]
+
+
+@contextmanager
+def profiling(trace=False):
+    """Context manager to profile a block of code, the previous recorded data
+    are deleted
+
+    >>> with profiling():
+    ...     with frame("entity", "e1"):
+    ...         cache(True, "stream", "eos")
+    ...         cache(False, "stream", "eos")
+    ...         with frame("stream", "eos"):
+    ...             pass
+    >>> [(s.category, s.name, s.calls, s.hits, s.misses) for s in stats()]
+    [('entity', 'e1', 1, 1, 1), ('stream', 'eos', 1, 1, 1)]
+    """
+    reset()
+    enable(trace)
+    try:
+        yield
+    finally:
+        disable()
+
+
+def _enter(key):
+    _stack().append(_Frame(key))
+
+
+def _exit():
+    frame = _stack().pop()
+    end = perf_counter()
+    elapsed = end - frame.start
+    stack = _stack()
+    if stack:
+        stack[-1].children += elapsed
+    with _lock:
+        record = _record(frame.key)
+        record.calls += 1
+        record.time += elapsed
+        record.selftime += elapsed - frame.children
+        if _trace:
+            _events.append({
+                "name": frame.key[1], "cat": frame.key[0], "ph": "X",
+                "ts": (frame.start-_origin)*1e6, "dur": elapsed*1e6,
+                "pid": os.getpid(), "tid": get_ident()})
+
+
+class _Measure(object):
+    """Context manager to record a procedure"""
+    __slots__ = ("key", )
+
+    def __init__(self, key):
+        self.key = key
+
+    def __enter__(self):
+        _enter(self.key)
+
+    def __exit__(self, *exc):
+        _exit()
+        return False
+
+
+def frame(category, name):
+    """Context manager to record the calculation in its block as a call of
+    procedure name of category. Name can be a string or the instance
+    calculated, recorded by its class name"""
+    if not _active:
+        return _null
+    if not isinstance(name, str):
+        name = name.__class__.__name__
+    return _Measure((category, name))
+
+
+def measure(category, name=None):
+    """Decorator to record the calls of method as procedure of category, name
+    is a function returning the name of procedure from the instance, by
+    default its class name"""
+    def decorator(method):
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not _active:
+                return method(self, *args, **kwargs)
+            if name is None:
+                label = self.__class__.__name__
+            else:
+                label = name(self)
+            _enter((category, label))
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                _exit()
+        return wrapper
+    return decorator
+
+
+def _count(attr, value=1, key=None):
+    """Add value to the attr count of the procedures in progress and of the
+    procedure key if it's defined"""
+    keys = {frame.key for frame in _stack()}
+    if key is not None:
+        keys.add(key)
+    with _lock:
+        for key in keys:
+            record = _record(key)
+            setattr(record, attr, getattr(record, attr)+value)
+
+
+def cache(hit, category=None, name=None):
+    """Record a cache hit or miss in the procedures in progress and in the
+    procedure name of category if it's defined, the procedure with the
+    cached calculation"""
+    if _active:
+        key = (category, name) if category else None
+        _count("hits" if hit else "misses", key=key)
+
+
+def fsolve(func, x0, *args, **kwargs):
+    """scipy.optimize.fsolve, when the profiling is enabled the function
+    evaluations are recorded as iterations of the procedures in progress and
+    the call as a fsolve procedure named as the calling procedure
+
+    >>> with profiling():
+    ...     with frame("flash", "SRK"):
+    ...         x = fsolve(lambda x: x**2-4, 1)
+    >>> "%0.4f" % x[0]
+    '2.0000'
+    >>> fsolve_stats = stats()[1]
+    >>> fsolve_stats.category, fsolve_stats.name
+    ('fsolve', 'SRK')
+    >>> stats()[0].iterations == fsolve_stats.iterations > 0
+    True
+    """
+    if not _active:
+        return _fsolve(func, x0, *args, **kwargs)
+
+    evaluations = [0]
+
+    def counted(*arg):
+        evaluations[0] += 1
+        return func(*arg)
+
+    stack = _stack()
+    name = stack[-1].key[1] if stack else "fsolve"
+    _enter(("fsolve", name))
+    try:
+        return _fsolve(counted, x0, *args, **kwargs)
+    finally:
+        _count("iterations", evaluations[0])
+        _exit()
+
+
+def stats():
+    """Return the list of recorded data of procedures, sorted by its wall
+    time"""
+    with _lock:
+        data = [Stats(key[0], key[1], r.calls, r.time, r.selftime,
+                      r.iterations, r.hits, r.misses)
+                for key, r in _records.items()]
+    data.sort(key=lambda s: s.time, reverse=True)
+    return data
+
+
+def report(limit=None, category=None):
+    """Return a text table with the recorded data of procedures sorted by its
+    wall time
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of procedures to show
+    category : str, optional
+        Show only the procedures of category
+    """
+    data = [s for s in stats() if category in (None, s.category)]
+    if limit is not None:
+        data = data[:limit]
+    lines = ["%-10s %-24s %8s %10s %10s %10s %8s %8s" % (
+        "category", "name", "calls", "time [s]", "self [s]", "iterations",
+        "hits", "misses")]
+    for s in data:
+        lines.append("%-10s %-24s %8i %10.4f %10.4f %10i %8i %8i" % s)
+    return os.linesep.join(lines)
+
+
+def writeTrace(path):
+    """Save the recorded calls in chrome trace format, the profiling must be
+    enabled with trace option. The file can be viewed with chrome://tracing
+    or Perfetto"""
+    with _lock:
+        events = list(_events)
+    with open(path, "w") as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
@@ -22,9 +22,16 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 # Module for project definition (pdf of equipment, configuration and many more)
 ###############################################################################
 
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from copy import deepcopy
+import logging
 import os
 from configparser import ConfigParser
 
+from numpy import abs as absolute
+from numpy import clip, maximum
+
 # from pygraph.classes.graph import graph
 # from pygraph.algorithms.cycles import find_cycle
 # try:
@@ -32,8 +39,11 @@ from configparser import ConfigParser
 # except:
 # from pygraph.readwrite.markup import write
 
-from lib.config import conf_dir
+from lib import jobs, profiler
+from lib.config import conf_dir, configContext, getContext
 from lib.corriente import Corriente
+from lib.flowsheet import Iteration, changed, levels, methods, tearStreams
+from lib.kernel import QApplication
 from equipment import equipments
 from equipment.flux import Mixer
 
@@ -42,6 +52,10 @@ class Project(object):
     MAGIC_NUMBER = 0x3051E
     FILE_VERSION = 10
 
+    # Relative change of input streams or parameters of equipment needed to
+    # calculate it again in the incremental solution of project
+    tolerance = 1e-6
+
     def __init__(self, items={}, streams={}, config=None):
         """
         items: diccionario con los equipos
@@ -57,6 +71,11 @@ class Project(object):
         # self.graph = self.calGraph()
 
         self.downToStream = {}
+        self.convergence = []
+        self.unconverged = {}
+        self._parameters = {}
+        # Entries of the project container file, for incremental save
+        self._container = None
 #        import gv
 #        for item in items:
 #           print gv.tailof(item)
@@ -110,8 +129,11 @@ class Project(object):
         return self.items["e%i" % id]
 
     def setInput(self, id, obj):
-        self.items["i%i" % id] = obj
-        self.run("i%i" % id)
+        name = "i%i" % id
+        self.items[name] = obj
+        for key, stream in self.getDownToEquip(name):
+            self.streams[key] = stream[0:4]+(obj, )
+        self.run(name)
 
     def getInput(self, id):
         return self.items["i%i" % id]
@@ -150,7 +172,7 @@ class Project(object):
     def getDownToStream(self, id):
         up, down, ind_up, ind_down, obj = self.streams[id]
         if down[0] == "e":
-            return self.getItem(int(down[1]))
+            return self.items[down]
         else:
             return obj
 
@@ -162,38 +184,437 @@ class Project(object):
         return lista
 
     def run(self, name):
-        """Ejecuta el projecto de forma recursiva hasta que encuentra un equipo no resuelto"""
-        tipo = name[0]
-        ind = int(name[1])
-
-        if tipo == "i":
-            obj = self.getInput(ind)
-            if obj.status:
-                key, (up, down, ind_up, ind_down,
-                      oldobj) = self.getDownToEquip(name)[0]
-                self.setStream(key, obj)
-                self.run("s%i" % key)
-
-        elif tipo == "e":
-            obj = self.getItem(ind)
-            if obj.status:
-                for key, (up, down, ind_up, ind_down, oldobj) in self.getDownToEquip(name):
-                    self.setStream(key, obj.salida[ind_up])
-                    self.run("s%i" % key)
-
-        elif tipo == "s":
-            up, down, ind_up, ind_down, stream = self.streams[ind]
-            if stream.status:
-                if down[0] == "e":
-                    equip = self.items[down]
-                    if isinstance(equip, Mixer):
-                        kwargs = {"entrada": stream, "id_entrada": ind_down}
+        """Calculate the project after the change of item name, an input,
+        equipment or stream id. Only the downstream equipments with input
+        streams or parameters changed beyond the tolerance are calculated, so
+        the propagation stop when the outputs of an equipment don't change"""
+        return self.solve(start=name)
+
+    def solve(self, start=None, method="wegstein", tol=1e-6, maxiter=50,
+              callback=None, processes=1, executor=None):
+        """Solve the project in sequential modular mode. The equipments are
+        calculated in the topological order of the flowsheet, and each
+        recycle is converged iterating in its tear streams. The independent
+        equipments, as parallel trains, can be calculated in a process pool
+
+        Parameters
+        ----------
+        start : str or list, optional
+            Id of changed items, only its downstream equipments with changed
+            inputs or parameters are calculated, by default all the project is
+            calculated
+        method : str, optional
+            Recycle convergence method, direct, wegstein or broyden
+        tol : float, optional
+            Tolerance of maximum relative change of tear streams variables
+        maxiter : int, optional
+            Maximum number of iterations of each recycle
+        callback : function, optional
+            Function called with the Iteration record after each iteration
+        processes : int, optional
+            Number of worker processes, None to use all the cores, by default
+            the project is calculated in the current process
+        executor : concurrent.futures.Executor, optional
+            Pool of workers to use instead of create a new one
+
+        Returns
+        -------
+        convergence : list
+            Iteration records of recycles, saved too in convergence attribute
+
+        The recycles not converged are saved in the unconverged attribute, a
+        dict with the reason by its tuple of tear streams, and its equipments
+        are marked as solved with warning
+
+        Examples
+        --------
+        A methane feed mixed with the 30% recycle of the divider outlet, the
+        recycle converge to 0.3/0.7 of feed
+
+        >>> from tools import firstrun
+        >>> from lib.config import configContext
+        >>> from equipment.flux import Divider
+        >>> cfg = firstrun.config()
+        >>> cfg.set("Components", "Components", "[2]")
+        >>> cfg.set("Thermo", "MEoS", "True")
+        >>> with configContext(cfg):
+        ...     project = Project(items={}, streams={}, config=cfg)
+        ...     project.addItem("i1", Corriente(
+        ...         T=300, P=1e5, caudalMasico=1, fraccionMolar=[1]))
+        ...     project.addItem("e1", Mixer())
+        ...     project.addItem("e2", Divider(salidas=2, split=[0.7, 0.3]))
+        ...     project.addItem("o1", Corriente())
+        ...     project.addStream(1, "i1", "e1", ind_down=0)
+        ...     project.addStream(2, "e1", "e2")
+        ...     project.addStream(3, "e2", "o1", ind_up=0)
+        ...     project.addStream(4, "e2", "e1", ind_up=1, ind_down=1)
+        ...     records = project.solve()
+        >>> "%0.5f" % (project.getStream(4).caudalmasico/0.3*0.7)
+        '1.00000'
+        >>> "%0.5f" % project.getOutput(1).caudalmasico
+        '1.00000'
+        >>> records[-1].section, records[-1].residual < 1e-6
+        ((4,), True)
+        >>> project.unconverged
+        {}
+
+        A recycle not converged in the maximum iterations is reported
+
+        >>> with configContext(cfg):
+        ...     records = project.solve(tol=0, maxiter=2)
+        >>> project.unconverged
+        {(4,): 'maximum iterations reached'}
+        >>> project.getItem(1).status, project.getItem(1).msg
+        (3, 'recycle not converged')
+
+        A change of divider parameters below the tolerance don't calculate
+        again the project
+
+        >>> with configContext(cfg):
+        ...     project.getItem(2).kwargs["split"] = [0.7, 0.3+1e-9]
+        ...     project.run("e2")
+        []
+
+        The independent equipments calculated in worker processes keep the
+        project streams as inputs
+
+        >>> from equipment.heatExchanger import Heat_Exchanger
+        >>> with configContext(cfg):
+        ...     project = Project(items={}, streams={}, config=cfg)
+        ...     for i in (1, 2):
+        ...         project.addItem("i%i" % i, Corriente(
+        ...             T=300, P=1e5, caudalMasico=i, fraccionMolar=[1]))
+        ...         project.addItem("e%i" % i, Heat_Exchanger(Tout=350))
+        ...         project.addItem("o%i" % i, Corriente())
+        ...         project.addStream(2*i-1, "i%i" % i, "e%i" % i)
+        ...         project.addStream(2*i, "e%i" % i, "o%i" % i)
+        ...     records = project.solve(processes=2)
+        >>> project.getStream(3) is project.getItem(2).kwargs["entrada"]
+        True
+        >>> project.getOutput(2).T
+        350.0
+        """
+        graph = {key: [] for key in self.items if key[0] == "e"}
+        for up, down, ind_up, ind_down, obj in self.streams.values():
+            if up[0] == "e" and down[0] == "e":
+                graph[up].append(down)
+
+        # Equipments to calculate, all or the downstream of start items
+        if start is None:
+            nodes = set(graph)
+        else:
+            if isinstance(start, str):
+                start = [start]
+            nodes = set()
+            for name in start:
+                if name[0] == "e":
+                    nodes.add(name)
+                elif name[0] == "s":
+                    nodes.add(self.streams[int(name[1:])][1])
+                else:
+                    nodes.update(
+                        value[1] for key, value in self.getDownToEquip(name))
+                self.items.update(self._outputs(name))
+            pending = [node for node in nodes if node in graph]
+            nodes = set(pending)
+            while pending:
+                for down in graph[pending.pop()]:
+                    if down not in nodes:
+                        nodes.add(down)
+                        pending.append(down)
+        calculate = set(nodes) if start is None else \
+            {name for name in nodes if self._changed(name)}
+
+        subgraph = {key: [down for down in succ if down in nodes]
+                    for key, succ in graph.items() if key in nodes}
+
+        self.convergence = []
+        self.unconverged = {}
+        pool = executor
+        if pool is None and processes != 1 and len(subgraph) > 1:
+            pool = ProcessPoolExecutor(processes)
+        try:
+            for level in levels(subgraph):
+                single = []
+                for section in level:
+                    name = section[0]
+                    if calculate.isdisjoint(section):
+                        continue
+                    elif len(section) == 1 and name not in subgraph[name]:
+                        single.append(name)
                     else:
-                        kwargs = {equip.kwargsInput[ind_down]: stream}
-                    equip(**kwargs)
-                    self.run(down)
-                elif down[0] == "o":
-                    self.setOutput(int(down[1]), stream)
+                        self._recycle(section, methods[method](), tol,
+                                      maxiter, callback)
+                        calculate.update(self._downstream(section, subgraph))
+
+                if pool is not None and len(single) > 1:
+                    self._calculateParallel(single, pool)
+                else:
+                    for name in single:
+                        self._calculate(name)
+                calculate.update(self._downstream(single, subgraph))
+        finally:
+            if executor is None and pool is not None:
+                pool.shutdown()
+        return self.convergence
+
+    def _calculateParallel(self, names, pool):
+        """Calculate the independent equipments names in the process pool"""
+        context = getContext()
+        futures = {}
+        for name in names:
+            kwargs = self._inputs(name)
+            if kwargs:
+                future = pool.submit(
+                    jobs.calculate, context, self.items[name], kwargs)
+                futures[name] = (future, kwargs)
+
+        for name, (future, kwargs) in futures.items():
+            # Update the equipment instance, it can be referenced elsewhere,
+            # with the project streams as inputs instead of the worker copies
+            equip = self.items[name]
+            equip.__dict__.update(future.result().__dict__)
+            equip.kwargs.update(kwargs)
+            self._parameters[name] = self._snapshot(name)
+            self._propagate(name)
+
+    def _outputs(self, start):
+        """Return the project outputs fed directly from item start"""
+        outputs = {}
+        for key, (up, down, ind_up, ind_down, obj) in self.streams.items():
+            if start in (up, "s%i" % key) and down[0] == "o":
+                outputs[down] = obj
+        return outputs
+
+    def _downstream(self, names, graph):
+        """Return the equipments downstream of the calculated equipments
+        names with changed inputs"""
+        downstream = set()
+        for name in names:
+            downstream.update(graph[name])
+        return {name for name in downstream if self._changed(name)}
+
+    def _snapshot(self, name):
+        """Return the class and a copy of parameters of equipment name"""
+        equip = self.items[name]
+        kwargs = {key: value for key, value in equip.kwargs.items()
+                  if key not in equip.kwargs_forbidden}
+        return equip.__class__, deepcopy(kwargs)
+
+    def _changed(self, name):
+        """Check if the equipment name has to be calculated again, with
+        parameters or input streams changed since its last calculation"""
+        equip = self.items[name]
+        if name not in self._parameters:
+            return True
+        cls, kwargs = self._parameters[name]
+        new_cls, new_kwargs = self._snapshot(name)
+        if cls is not new_cls or changed(kwargs, new_kwargs, self.tolerance):
+            return True
+
+        # Compare the current input streams with the used in calculation
+        for key, (up, down, ind_up, ind_down, obj) in self.streams.items():
+            if down != name:
+                continue
+            if isinstance(equip, Mixer):
+                used = equip.kwargs["entrada"]
+                used = used[ind_down] if ind_down < len(used) else None
+            else:
+                used = equip.kwargs.get(equip.kwargsInput[ind_down])
+            if self._streamChanged(used, obj):
+                return True
+        return False
+
+    def _streamChanged(self, old, new):
+        """Check if the stream new is different of old beyond the tolerance
+        in temperature, pressure or molar flows, or in its thermodynamic
+        method and the other definition kwargs
+
+        >>> from tools import firstrun
+        >>> project = Project(items={}, streams={}, config=firstrun.config())
+        >>> st = Corriente(T=300, P=1e5, caudalMasico=1, ids=[2],
+        ...                fraccionMolar=[1], MEoS=True)
+        >>> project._streamChanged(st, st.clone(T=300+1e-5))
+        False
+        >>> project._streamChanged(st, st.clone(H=1))
+        True
+        """
+        if old is new:
+            return False
+        if old is None or new is None:
+            return True
+        if not old.status or not new.status:
+            return old.status != new.status
+        if list(old.ids) != list(new.ids):
+            return True
+        if changed(self._definition(old), self._definition(new),
+                   self.tolerance):
+            return True
+        x = self._variables(old)
+        g = self._variables(new)
+        return self._residual(x, g) > self.tolerance
+
+    def _inputs(self, name):
+        """Return the kwargs with the inputs streams of equipment name"""
+        equip = self.items[name]
+        streams = [(value[3], value[4]) for value in self.streams.values()
+                   if value[1] == name]
+        if not streams:
+            return {}
+        if isinstance(equip, Mixer):
+            entrada = equip.kwargs["entrada"][:]
+            while len(entrada) <= max(ind for ind, obj in streams):
+                entrada.append(Corriente())
+            for ind, obj in streams:
+                entrada[ind] = obj
+            return {"entrada": entrada}
+        return {equip.kwargsInput[ind]: obj for ind, obj in streams}
+
+    def _calculate(self, name, tears=()):
+        """Calculate the equipment name with all its inputs and update its
+        output streams, except the tear streams of a recycle"""
+        kwargs = self._inputs(name)
+        if kwargs:
+            with profiler.frame("entity", name):
+                self.items[name](**kwargs)
+            self._parameters[name] = self._snapshot(name)
+            self._propagate(name, tears)
+
+    def _propagate(self, name, tears=()):
+        """Update the output streams of the calculated equipment name,
+        except the tear streams of a recycle"""
+        equip = self.items[name]
+        if not equip.status:
+            return
+        for key, (up, down, ind_up, ind_down, obj) in \
+                self.getDownToEquip(name):
+            if key in tears:
+                continue
+            obj = equip.salida[ind_up]
+            self.streams[key] = (up, down, ind_up, ind_down, obj)
+            if down[0] == "o":
+                self.items[down] = obj
+
+    def _recycle(self, section, accelerator, tol, maxiter, callback):
+        """Converge the recycle of the equipments in section"""
+        edges = []
+        feed = None
+        entry = None
+        for key, (up, down, ind_up, ind_down, obj) in self.streams.items():
+            if up in section and down in section:
+                edges.append((key, up, down))
+            elif down in section and entry is None and obj.status:
+                feed = obj
+                entry = down
+        tears, order = tearStreams(section, edges, entry)
+
+        # Initial guess of tear streams, the feed to recycle if unknown
+        x = []
+        for key in tears:
+            obj = self.streams[key][4]
+            if not obj.status:
+                obj = feed
+            if obj is None:
+                self._unconverged(section, tears, "undefined feed")
+                return
+            x.append(self._variables(obj))
+        size = [len(xi) for xi in x]
+
+        for iteration in range(1, maxiter+1):
+            for key, xi in zip(tears, x):
+                up, down, ind_up, ind_down, obj = self.streams[key]
+                obj = self._tearStream(obj.status and obj or feed, xi)
+                self.streams[key] = (up, down, ind_up, ind_down, obj)
+            for name in order:
+                self._calculate(name, tears)
+
+            g = []
+            for key in tears:
+                up, down, ind_up, ind_down, obj = self.streams[key]
+                equip = self.items[up]
+                if not equip.status:
+                    self._unconverged(
+                        section, tears, "%s not solved: %s" % (up, equip.msg))
+                    return
+                g.append(self._variables(equip.salida[ind_up]))
+
+            residual = max(self._residual(xi, gi) for xi, gi in zip(x, g))
+            record = Iteration(tuple(tears), iteration, residual)
+            self.convergence.append(record)
+            logging.info("Recycle %s, iteration %i: %g" % record)
+            if callback is not None:
+                callback(record)
+            if residual < tol:
+                break
+            elif iteration == maxiter:
+                self._unconverged(section, tears, "maximum iterations reached")
+                break
+
+            new = accelerator(sum(x, []), sum(g, []))
+            x = []
+            for n in size:
+                xi = list(new[:n])
+                xi[2:] = clip(xi[2:], 0, None)
+                x.append(xi)
+                new = new[n:]
+
+        # Save the last calculated tear streams
+        for key in tears:
+            up, down, ind_up, ind_down, obj = self.streams[key]
+            obj = self.items[up].salida[ind_up]
+            self.streams[key] = (up, down, ind_up, ind_down, obj)
+
+    def _unconverged(self, section, tears, reason):
+        """Record the recycle of equipments in section as not converged,
+        its solved equipments are marked with warning"""
+        tears = tuple(tears)
+        self.unconverged[tears] = reason
+        logging.warning("Recycle %s not converged, %s" % (tears, reason))
+        for name in section:
+            equip = self.items[name]
+            if equip.status == 1:
+                equip.status = 3
+                equip.msg = QApplication.translate(
+                    "pychemqt", "recycle not converged")
+
+    @staticmethod
+    def _definition(stream):
+        """Stream definition kwargs other than the tear stream variables,
+        with the thermodynamic method used in its calculation"""
+        kwargs = {key: value for key, value in stream.kwargs.items()
+                  if key not in Corriente._composition and
+                  key not in ("T", "P", "x", "solido")}
+        kwargs["thermo"] = getattr(stream, "_thermo", None)
+        return kwargs
+
+    @staticmethod
+    def _variables(stream):
+        """Tear stream variables, temperature, pressure and molar flows"""
+        flows = [float(q) for q in stream.caudalunitariomolar]
+        return [float(stream.T), float(stream.P)] + flows
+
+    @staticmethod
+    def _residual(x, g):
+        """Maximum relative change of tear stream variables, the molar
+        flows relative to total flow"""
+        scale = absolute(x)
+        scale[2:] = sum(scale[2:])
+        change = absolute([gi-xi for xi, gi in zip(x, g)])
+        return max(change/maximum(scale, 1e-10))
+
+    @staticmethod
+    def _tearStream(stream, x):
+        """Create the tear stream with the variables x and the definition
+        of stream"""
+        kwargs = {}
+        for key, value in stream.kwargs.items():
+            if key not in Corriente._composition and key not in "TPx":
+                kwargs[key] = value
+        kwargs["T"] = x[0]
+        kwargs["P"] = x[1]
+        kwargs["ids"] = stream.ids
+        kwargs["caudalUnitarioMolar"] = list(x[2:])
+        return Corriente(**kwargs)
 
     def writeToJSON(self, data):
         """Write the project to a dictionary to save to file in json format"""
@@ -236,22 +657,41 @@ class Project(object):
         # write external dependences necessaries for the project
         data["external_dependences"] = dependences
 
-    def readFromJSON(self, data, huella=True):
+    def readFromJSON(self, data, huella=True, temporal=True):
         """Read project from stream
-        huella: boolean to save project file to pychemqt_temporal"""
-        # read configuration
+        huella: boolean to save project file to pychemqt_temporal
+        temporal: boolean to write the project configuration to the
+        CheProcessrc_temporal file of graphical interface"""
+        # The entities are defined with the project configuration
+        with self._readConfig(data["config"], huella, temporal):
+            self._readEntities(data, huella)
+
+    @contextmanager
+    def _readConfig(self, data, huella=True, temporal=True):
+        """Define the project configuration from its dict in file, used as
+        context to read the entities of project"""
         config = ConfigParser()
-        for section, options in data["config"].items():
+        for section, options in data.items():
             config.add_section(section)
             for option, value in options.items():
                 config.set(section, option, value)
 
         self.setConfig(config)
-        if not huella:
-            os.rename(conf_dir+"CheProcessrc_temporal",
-                      conf_dir+"CheProcessrc_temporal_bak")
-        config.write(open(conf_dir+"CheProcessrc_temporal", "w"))
+        if temporal:
+            if not huella:
+                os.rename(conf_dir+"CheProcessrc_temporal",
+                          conf_dir+"CheProcessrc_temporal_bak")
+            config.write(open(conf_dir+"CheProcessrc_temporal", "w"))
+
+        with configContext(config):
+            yield
 
+        if temporal and not huella:
+            os.rename(conf_dir+"CheProcessrc_temporal_bak",
+                      conf_dir+"CheProcessrc_temporal")
+
+    def _readEntities(self, data, huella):
+        """Read the equipments and streams of project"""
         # read equipments
         items = {}
         for id, equip in data["equipment"].items():
@@ -275,26 +715,29 @@ class Project(object):
             obj = Corriente()
             obj.readFromJSON(stream)
             streams[id] = (up, down, ind_up, ind_down, obj)
-            if huella:
-                if down[0] == "e":
-                    equip = self.items[down]
-                    if isinstance(equip, Mixer):
-                        kwargs = {"entrada": obj, "id_entrada": ind_down}
-                        equip.cleanOldValues(**kwargs)
-                    else:
-                        kwargs = {equip.kwargsInput[ind_down]: obj}
-                        equip.kwargs.update(kwargs)
-                if up[0] == "e":
-                    equip = self.items[up]
-                    # Equipment with variable output streams must be corrected
-                    while len(equip.salida) <= ind_up:
-                        equip.salida.append(None)
-                    equip.salida[ind_up] = obj
         self.setStreams(streams)
 
-        if not huella:
-            os.rename(conf_dir+"CheProcessrc_temporal_bak",
-                      conf_dir+"CheProcessrc_temporal")
+        if huella:
+            for id, equip in items.items():
+                if equip is not None:
+                    self._connect(id, equip)
+
+    def _connect(self, name, equip):
+        """Define the streams of project as the input and output streams of
+        the equipment name after reading it"""
+        for up, down, ind_up, ind_down, obj in self.streams.values():
+            if down == name:
+                if isinstance(equip, Mixer):
+                    kwargs = {"entrada": obj, "id_entrada": ind_down}
+                    equip.cleanOldValues(**kwargs)
+                else:
+                    kwargs = {equip.kwargsInput[ind_down]: obj}
+                    equip.kwargs.update(kwargs)
+            if up == name:
+                # Equipment with variable output streams must be corrected
+                while len(equip.salida) <= ind_up:
+                    equip.salida.append(None)
+                equip.salida[ind_up] = obj
 
     # def printer(self):
         # # Draw as PNG
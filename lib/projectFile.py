@@ -0,0 +1,493 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+
+"""Pychemqt, Chemical Engineering Process simulator
+Copyright (C) 2009-2017, Juan José Gómez Romera <jjgomera@gmail.com>
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+Module with the binary container format of project files, a zip file with:
+
+  * manifest-<revision>.json: Configuration, topology and graphical data of
+    project, the file is read with the manifest of last revision
+  * equipment/<id>-<revision>.json: State of each equipment, decoded when
+    the equipment is used the first time
+  * streams-<revision>.npy: Float values of states of a block of streams, as
+    a array with a column by property
+  * streams-<revision>.json: Other values of states of the block of streams
+
+The save of a project read from a container only append the entities changed
+as a new revision, the file is rewritten when the outdated entries are the
+most of file. The entries are written to a copy of file which replaces it at
+end, so an interrupted save keeps the previous revision. The old json project
+files can be read too.
+
+  * :func:`isContainer`: Check if a file is a project container
+  * :func:`readData`: Read the manifest of a project file
+  * :func:`load`: Read a project from file
+  * :func:`save`: Save a project to a container file
+  * :class:`LazyItems`: Items of project with equipments decoded at first use
+"""
+
+
+from collections.abc import MutableMapping
+from functools import partial
+from io import BytesIO
+import json
+from math import isfinite, isnan
+import os
+import shutil
+import zipfile
+
+from numpy import full, load as loadArray, nan
+from numpy import save as saveArray
+
+from lib.config import configContext
+from lib.corriente import Corriente
+from lib.project import Project
+from equipment import equipments
+
+
+# Version of container format
+FORMAT = 1
+
+# Dicts of stream data with the float values saved as columns
+_COLUMNAR = ("state", "solid")
+
+
+class LazyItems(MutableMapping):
+    """Dict of items of project, the equipments read from file are decoded at
+    first access
+
+    Parameters
+    ----------
+    items : dict
+        Items already defined
+    loaders : dict
+        Functions without arguments to decode each item not defined
+    """
+
+    def __init__(self, items=None, loaders=None):
+        self._items = dict(items or {})
+        self._loaders = dict(loaders or {})
+        for key in self._loaders:
+            self._items.setdefault(key, None)
+
+    def loaded(self, key):
+        """Check if the item key is already decoded"""
+        return key not in self._loaders
+
+    def __getitem__(self, key):
+        if key in self._loaders:
+            self._items[key] = self._loaders.pop(key)()
+        return self._items[key]
+
+    def __setitem__(self, key, value):
+        self._loaders.pop(key, None)
+        self._items[key] = value
+
+    def __delitem__(self, key):
+        self._loaders.pop(key, None)
+        del self._items[key]
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, list(self._items))
+
+
+def isContainer(fname):
+    """Check if fname is a project container file, else it's a json file"""
+    return zipfile.is_zipfile(fname)
+
+
+def _manifest(zf):
+    """Return the name of the manifest of last revision of container"""
+    revisions = []
+    for name in zf.namelist():
+        if name.startswith("manifest-") and name.endswith(".json"):
+            revisions.append(int(name[9:-5]))
+    if not revisions:
+        raise ValueError("%s isn't a project file" % zf.filename)
+    return "manifest-%i.json" % max(revisions)
+
+
+def readData(fname):
+    """Read the data of project file without its entities, the configuration,
+    external dependences and graphical data. For a json file all the file
+    is returned"""
+    if not isContainer(fname):
+        with open(fname, "r") as file:
+            return json.load(file)
+
+    with zipfile.ZipFile(fname) as zf:
+        return json.loads(zf.read(_manifest(zf)).decode())
+
+
+def _split(data, values, path=()):
+    """Return a copy of nested dict data without its finite float values,
+    saved in values dict by its path of keys"""
+    rest = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            rest[key] = _split(value, values, path+(key, ))
+        elif isinstance(value, float) and isfinite(value):
+            values[path+(key, )] = value
+        else:
+            rest[key] = value
+    return rest
+
+
+def _join(data, path, value):
+    """Set the value in the nested dict data by its path of keys"""
+    for key in path[:-1]:
+        data = data.setdefault(key, {})
+    data[path[-1]] = value
+
+
+def _writeStreams(zf, name, streams):
+    """Write a block of streams data to the container as the array of float
+    values and the json of other values
+
+    Examples
+    --------
+    >>> streams = [{"kwarg": {"T": 300.}, "state": {"T": 300., "x": 0.5}},
+    ...            {"kwarg": {}, "state": {"T": 310., "thermo": "eos"}}]
+    >>> with zipfile.ZipFile(BytesIO(), "w") as zf:
+    ...     _writeStreams(zf, "streams-1", streams)
+    ...     _readStreams(zf, "streams-1") == streams
+    True
+    """
+    columns = {}
+    rows = []
+    values = []
+    for stream in streams:
+        row = {key: value for key, value in stream.items()
+               if key not in _COLUMNAR}
+        floats = {}
+        for key in _COLUMNAR:
+            if key in stream:
+                row[key] = _split(stream[key], floats, (key, ))
+        for path in floats:
+            columns.setdefault(path, len(columns))
+        rows.append(row)
+        values.append(floats)
+
+    array = full((len(rows), len(columns)), nan)
+    for i, floats in enumerate(values):
+        for path, value in floats.items():
+            array[i, columns[path]] = value
+
+    file = BytesIO()
+    saveArray(file, array, allow_pickle=False)
+    zf.writestr(name + ".npy", file.getvalue())
+    data = {"columns": [list(path) for path in columns], "rows": rows}
+    zf.writestr(name + ".json", json.dumps(data))
+
+
+def _readStreams(zf, name):
+    """Read the list of streams data of a block of container"""
+    data = json.loads(zf.read(name + ".json").decode())
+    array = loadArray(BytesIO(zf.read(name + ".npy")), allow_pickle=False)
+    columns = [tuple(path) for path in data["columns"]]
+    rows = data["rows"]
+    for row, values in zip(rows, array.tolist()):
+        for path, value in zip(columns, values):
+            if not isnan(value):
+                _join(row, path, value)
+    return rows
+
+
+def _row(stream):
+    """Return the json of stream state, used to detect the changed streams
+    in the incremental save"""
+    values = {}
+    stream.writeToJSON(values)
+    return json.dumps(values, sort_keys=True)
+
+
+def _readEquipment(project, name, raw, huella):
+    """Decode the equipment name of project from its json"""
+    data = json.loads(raw.decode())
+    equip = equipments[data["id"]]()
+    with configContext(project.config):
+        equip.readFromJSON(data)
+    if huella:
+        project._connect(name, equip)
+    return equip
+
+
+def load(fname, data=None, huella=True, temporal=True):
+    """Read a project from a container or json file
+
+    Parameters
+    ----------
+    fname : str
+        Path of project file
+    data : dict, optional
+        Data of file already read with :func:`readData`
+    huella : bool, optional
+        Connect the streams to its equipments
+    temporal : bool, optional
+        Write the project configuration to the CheProcessrc_temporal file of
+        graphical interface
+    """
+    if data is None:
+        data = readData(fname)
+
+    project = Project(items={}, streams={})
+    if not isContainer(fname):
+        project.readFromJSON(data, huella, temporal)
+        return project
+
+    info = {"name": os.path.abspath(fname), "revision": data["revision"],
+            "equipment": data["equipment"], "stream": data["stream"],
+            "raw": {}, "rows": {}}
+    with zipfile.ZipFile(fname) as zf, project._readConfig(
+            data["config"], huella, temporal):
+        blocks = {}
+        streams = {}
+        for id, stream in data["stream"].items():
+            if stream["block"] not in blocks:
+                blocks[stream["block"]] = _readStreams(zf, stream["block"])
+            obj = Corriente()
+            obj.readFromJSON(blocks[stream["block"]][stream["row"]])
+            streams[int(id)] = (stream["up"], stream["down"],
+                                stream["ind_up"], stream["ind_down"], obj)
+            info["rows"][int(id)] = _row(obj)
+        project.setStreams(streams)
+
+        loaders = {}
+        for name, equip in data["equipment"].items():
+            raw = zf.read(equip["entry"])
+            info["raw"][name] = raw
+            loaders[name] = partial(_readEquipment, project, name, raw, huella)
+        project.setItems(LazyItems(loaders=loaders))
+
+    project._container = info
+    return project
+
+
+def _write(zf, project, data, revision, info=None, append=False):
+    """Write the project to the container with the entries of revision and
+    return the new container info. With append only the entities changed
+    from info are written"""
+    if info is None:
+        info = {"equipment": {}, "stream": {}, "raw": {}, "rows": {}}
+    items = project.items
+    lazy = isinstance(items, LazyItems)
+
+    dependences = set(data.get("external_dependences", ()))
+    equipment = {}
+    raws = {}
+    for name in items:
+        if name[0] != "e":
+            continue
+        old = info["equipment"].get(name)
+        if old and lazy and not items.loaded(name):
+            raw = info["raw"][name]
+            dependence = old["external_dependences"]
+            index = old["id"]
+        else:
+            equip = items[name]
+            index = equipments.index(equip.__class__)
+            eq = {"id": index}
+            equip.writeToJSON(eq)
+            raw = json.dumps(eq).encode()
+            dependence = equip._dependence
+
+        if append and old and info["raw"].get(name) == raw:
+            equipment[name] = old
+        else:
+            entry = "equipment/%s-%i.json" % (name, revision)
+            zf.writestr(entry, raw)
+            equipment[name] = {"id": index, "entry": entry,
+                               "external_dependences": dependence}
+        raws[name] = raw
+        if dependence:
+            dependences.add(dependence)
+
+    block = "streams-%i" % revision
+    stream = {}
+    changed = []
+    rows = {}
+    for id, (up, down, ind_up, ind_down, obj) in project.streams.items():
+        entry = {"up": up, "down": down, "ind_up": ind_up,
+                 "ind_down": ind_down}
+        row = _row(obj)
+        old = info["stream"].get(str(id))
+        if append and old and info["rows"].get(id) == row:
+            entry["block"] = old["block"]
+            entry["row"] = old["row"]
+        else:
+            entry["block"] = block
+            entry["row"] = len(changed)
+            changed.append(json.loads(row))
+        stream[str(id)] = entry
+        rows[id] = row
+        if obj._dependence:
+            dependences.add(obj._dependence)
+    if changed:
+        _writeStreams(zf, block, changed)
+
+    config = {}
+    for section in project.config.sections():
+        config[section] = dict(project.config.items(section))
+
+    manifest = dict(data)
+    manifest["format"] = FORMAT
+    manifest["revision"] = revision
+    manifest["config"] = config
+    manifest["equipment"] = equipment
+    manifest["stream"] = stream
+    manifest["external_dependences"] = sorted(dependences)
+    zf.writestr("manifest-%i.json" % revision, json.dumps(manifest))
+
+    return {"revision": revision, "equipment": equipment, "stream": stream,
+            "raw": raws, "rows": rows}
+
+
+def _outdated(zf, info):
+    """Check if the most of entries of container are of old revisions"""
+    used = {eq["entry"] for eq in info["equipment"].values()}
+    for stream in info["stream"].values():
+        used.add(stream["block"] + ".npy")
+        used.add(stream["block"] + ".json")
+    return len(zf.namelist()) > 2*(len(used)+1)
+
+
+def save(fname, project, data=None, incremental=True):
+    """Save the project to a container file
+
+    Parameters
+    ----------
+    fname : str
+        Path of project file
+    project : Project
+        Project to save
+    data : dict, optional
+        Other data to save in manifest, as the graphical data of project, the
+        external_dependences item is joined with the project dependences
+    incremental : bool, optional
+        If the project was read from or saved to fname, append only the
+        changed entities
+
+    Examples
+    --------
+    >>> import tempfile
+    >>> from tools import firstrun
+    >>> from equipment.heatExchanger import Heat_Exchanger
+    >>> cfg = firstrun.config()
+    >>> cfg.set("Components", "Components", "[2]")
+    >>> cfg.set("Thermo", "MEoS", "True")
+    >>> fname = os.path.join(tempfile.mkdtemp(), "heater.pcq")
+    >>> with configContext(cfg):
+    ...     project = Project(items={}, streams={}, config=cfg)
+    ...     project.addItem("i1", Corriente(
+    ...         T=300, P=1e5, caudalMasico=1, fraccionMolar=[1]))
+    ...     project.addItem("e1", Heat_Exchanger(Tout=350))
+    ...     project.addItem("o1", Corriente())
+    ...     project.addStream(1, "i1", "e1")
+    ...     project.addStream(2, "e1", "o1")
+    ...     convergence = project.solve()
+    ...     save(fname, project)
+    ...     project = load(fname, temporal=False)
+
+    The equipments are decoded at first use
+
+    >>> project.getStream(2).T, project.items.loaded("e1")
+    (350.0, False)
+    >>> project.items["e1"].status, project.items.loaded("e1")
+    (1, True)
+
+    Only the changed entities are appended to the file
+
+    >>> with configContext(project.config):
+    ...     project.items["e1"].cleanOldValues(Tout=360)
+    ...     changed = project.run("e1")
+    ...     save(fname, project)
+    >>> for name in sorted(zipfile.ZipFile(fname).namelist()):
+    ...     print(name)
+    equipment/e1-1.json
+    equipment/e1-2.json
+    manifest-1.json
+    manifest-2.json
+    streams-1.json
+    streams-1.npy
+    streams-2.json
+    streams-2.npy
+    >>> readData(fname)["stream"]["1"]["block"]
+    'streams-1'
+    >>> load(fname, temporal=False).getStream(2).T
+    360.0
+
+    The streams changed in place are detected too, and an interrupted save
+    keeps the file
+
+    >>> with configContext(project.config):
+    ...     stream = project.getStream(1)
+    ...     stream.__dict__.update(stream.clone(T=310).__dict__)
+    ...     save(fname, project)
+    >>> readData(fname)["stream"]["1"]["block"]
+    'streams-3'
+    >>> def fail(data):
+    ...     raise OSError("disk full")
+    >>> project.items["e1"].kwargs["Tout"] = 370
+    >>> project.getStream(2).writeToJSON = fail
+    >>> save(fname, project)
+    Traceback (most recent call last):
+    ...
+    OSError: disk full
+    >>> readData(fname)["revision"], os.listdir(os.path.dirname(fname))
+    (3, ['heater.pcq'])
+    """
+    if data is None:
+        data = {}
+    fname = os.path.abspath(fname)
+    info = project._container
+    if info is not None and info["name"] != fname:
+        # The undecoded equipments are copied from the original file
+        incremental = False
+    elif info is None or not os.path.isfile(fname) or \
+            not isContainer(fname):
+        info = None
+        incremental = False
+
+    if incremental:
+        with zipfile.ZipFile(fname) as zf:
+            incremental = not _outdated(zf, info)
+
+    # Write to a temporal file to keep the file if the save fails
+    tmp = fname + ".tmp"
+    try:
+        if incremental:
+            shutil.copyfile(fname, tmp)
+            with zipfile.ZipFile(tmp, "a", zipfile.ZIP_DEFLATED) as zf:
+                new = _write(zf, project, data, info["revision"]+1, info,
+                             append=True)
+        else:
+            with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+                new = _write(zf, project, data, 1, info)
+        os.replace(tmp, fname)
+    except BaseException:
+        if os.path.isfile(tmp):
+            os.remove(tmp)
+        raise
+    new["name"] = fname
+    project._container = new
@@ -46,11 +46,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###############################################################################
 
 
-from configparser import ConfigParser
 import logging
 import os
 
-from PyQt5.QtWidgets import QApplication
 from scipy.optimize import fsolve
 from scipy import log, exp, arange, concatenate, linspace
 
@@ -59,7 +57,8 @@ try:
 except:
     pass
 
-from lib.config import conf_dir
+from lib.config import loadPreferences
+from lib.kernel import QApplication
 from lib.unidades import (Temperature, Pressure, Dimensionless, SpecificVolume,
                           Density, Enthalpy, Length)
 from lib.utilities import refDoc
@@ -665,8 +664,7 @@ class PsyIdeal(PsyState):
     @classmethod
     def calculatePlot(cls, parent):
         """Funtion to calculate point in chart"""
-        Preferences = ConfigParser()
-        Preferences.read(conf_dir+"CheProcessrc")
+        Preferences = loadPreferences()
         parent.setProgressValue(0)
 
         data = {}
@@ -899,8 +897,7 @@ class PsyCoolprop(PsyState):
     @classmethod
     def calculatePlot(cls, parent):
         """Funtion to calculate point in chart"""
-        Preferences = ConfigParser()
-        Preferences.read(conf_dir+"CheProcessrc")
+        Preferences = loadPreferences()
         parent.setProgressValue(0)
 
         data = {}
@@ -982,8 +979,7 @@ class PsyRefprop(PsyState):
     pass
 
 
-Preferences = ConfigParser()
-Preferences.read(conf_dir+"CheProcessrc")
+Preferences = loadPreferences()
 
 if Preferences.getboolean("Psychr", "virial"):
     if Preferences.getboolean("Psychr", "coolprop") and \
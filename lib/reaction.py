@@ -26,14 +26,13 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 
 
 from math import exp, log
-import sqlite3
 
 from numpy import polyval
 from scipy.optimize import fsolve
-from PyQt5.QtWidgets import QApplication
 
 from lib import unidades
-from lib.sql import databank_name
+from lib.kernel import QApplication
+from lib.sql import getElement
 
 
 class Reaction(object):
@@ -146,21 +145,18 @@ class Reaction(object):
         self.formulas = self.kwargs["formula"]
         self.keq = self.kwargs["keq"]
 
-        databank = sqlite3.connect(databank_name).cursor()
-        databank.execute("select nombre, peso_molecular, formula, Hf from \
-                         compuestos where id  IN \
-                         %s" % str(tuple(self.componentes)))
         nombre = []
         peso_molecular = []
         formula = []
         calor_reaccion = 0
         check_estequiometria = 0
-        for i, compuesto in enumerate(databank):
-            nombre.append(compuesto[0])
-            peso_molecular.append(compuesto[1])
-            formula.append(compuesto[2])
-            calor_reaccion += compuesto[3]*self.coef[i]
-            check_estequiometria += self.coef[i]*compuesto[1]
+        for i, id in enumerate(self.componentes):
+            compuesto = getElement(id)
+            nombre.append(compuesto[2])
+            peso_molecular.append(compuesto[3])
+            formula.append(compuesto[1])
+            calor_reaccion += compuesto[141]*self.coef[i]
+            check_estequiometria += self.coef[i]*compuesto[3]
         self.nombre = nombre
         self.peso_molecular = peso_molecular
         self.formula = formula
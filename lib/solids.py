@@ -27,10 +27,10 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 from scipy import log, exp, r_
 from scipy.optimize import leastsq
 from scipy.special import erf
-from PyQt5.QtWidgets import QApplication
 
 from lib.compuestos import Componente
-from lib.config import Entity, getMainWindowConfig
+from lib.config import Entity, getContext
+from lib.kernel import QApplication
 from lib.unidades import Density, MassFlow, Length, Temperature
 
 
@@ -82,12 +82,7 @@ class Solid(Entity):
         if self.kwargs["solids"] is not None:
             self.ids = self.kwargs["solids"]
         else:
-            Config = getMainWindowConfig()
-            txt = Config.get("Components", "Solids")
-            if isinstance(txt, str):
-                self.ids = eval(txt)
-            else:
-                self.ids = txt
+            self.ids = list(getContext().get("Components", "Solids"))
         self.componente = [Componente(int(i)) for i in self.ids]
 
         caudal = self.kwargs.get("caudalSolido", [])
@@ -26,11 +26,14 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 #   -deleteElement: Delete Element with indice from custom Database
 #   -getElement: Get element from database
 #   -copyElement: Create a copy of element of indice in custom Database
+#   -invalidate: Discard the in-memory store after a change in custom database
 ###############################################################################
 
 
 import os
 import sqlite3
+from threading import RLock
+from types import MappingProxyType
 
 
 databank_name = os.path.join(os.environ["CheProcess"], 'dat', 'databank.db')
@@ -48,6 +51,56 @@ else:
     N_comp_Custom = 0
 
 
+# In-memory store of all compounds rows of both databases, indexed by id.
+# The store is loaded in the first query and replaced as a whole when the
+# custom database is modified, so readers never need lock
+_store = None
+_lock = RLock()
+
+# Counter of changes in custom database, let the users of compound data
+# discard their own caches
+generation = 0
+
+
+def _load():
+    """Read all compounds of main and custom database"""
+    rows = {}
+    for name in (databank_name, databank_Custom_name):
+        if os.path.isfile(name):
+            conn = sqlite3.connect(name)
+            for row in conn.execute("SELECT * FROM compuestos"):
+                rows[row[0]] = row
+            conn.close()
+    return MappingProxyType(rows)
+
+
+def store():
+    """Return the read-only mapping with the rows of all available compounds
+    indexed by id"""
+    global _store
+    data = _store
+    if data is None:
+        with _lock:
+            if _store is None:
+                _store = _load()
+            data = _store
+    return data
+
+
+def invalidate():
+    """Discard the in-memory store, must be called after any change in the
+    custom database"""
+    global _store, N_comp_Custom, generation
+    with _lock:
+        _store = None
+        generation += 1
+        if os.path.isfile(databank_Custom_name):
+            conn = sqlite3.connect(databank_Custom_name)
+            curs = conn.execute("SELECT COUNT(*) AS Total FROM compuestos")
+            N_comp_Custom = curs.fetchone()[0]
+            conn.close()
+
+
 def transformElement(elemento):
     vals = []
     vals.append(str(elemento[0]))
@@ -183,6 +236,7 @@ def inserElementsFromArray(name, lista):
         curs.execute(query+str(tuple(vals)))
     conn.commit()
     conn.close()
+    invalidate()
 
 
 def updateElement(elemento, indice):
@@ -247,6 +301,7 @@ def updateElement(elemento, indice):
                          % (variable, valor, indice))
     conn.commit()
     conn.close()
+    invalidate()
 
 
 def deleteElement(indice):
@@ -256,20 +311,19 @@ def deleteElement(indice):
     curs.execute("DELETE FROM compuestos WHERE id=%i" % indice)
     conn.commit()
     conn.close()
+    invalidate()
 
 
 def getElement(indice):
     """Get element from database
-    indice: index in databank of element"""
-    if indice > 1000:
-        db_Custom = sqlite3.connect(databank_Custom_name).cursor()
-        db_Custom.execute("select * from compuestos where id==%i" % indice)
-        componente = db_Custom.fetchone()
-    else:
-        db = sqlite3.connect(databank_name).cursor()
-        db.execute("select * from compuestos where id==%i" % indice)
-        componente = db.fetchone()
-    return componente
+    indice: index in databank of element
+
+    >>> getElement(2)[2]
+    'Methane'
+    >>> getElement(2) is getElement(2)
+    True
+    """
+    return store().get(indice)
 
 
 def copyElement(indice):
@@ -278,7 +332,9 @@ def copyElement(indice):
     vals = elemento[1:]
     conn = sqlite3.connect(databank_Custom_name)
     curs = conn.cursor()
-    curs.execute("INSERT INTO compuestos VALUES" +
-                 str((1001+N_comp_Custom, ) + vals))
+    vals = (1001+N_comp_Custom, ) + vals
+    query = "INSERT INTO compuestos VALUES (%s)" % ",".join("?"*len(vals))
+    curs.execute(query, vals)
     conn.commit()
     conn.close()
+    invalidate()
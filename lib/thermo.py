@@ -30,9 +30,9 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>."""
 ###############################################################################
 
 
-from PyQt5.QtWidgets import QApplication
 from iapws._utils import getphase
 from lib import unidades
+from lib.kernel import QApplication
 
 
 class Thermo(object):
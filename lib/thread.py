@@ -22,13 +22,20 @@ along with this program.  If not, see <http://www.gnu.org/licenses/>.'''
 ###############################################################################
 # Library for work with thread in pychemqt for improve UI response
 #   - WaitforClick: Thread for draw stream in PFD
-#   - Evaluate: Thread to insolate entity calculation from gui, used in streams,
-#       equipment, and project
+#   - Evaluate: Calculation of entity in the calculation service, used in
+#       streams, equipment, and project
+#   - service: Calculation service shared by the graphical interface
 ###############################################################################
 
+import logging
+import multiprocessing
+import sys
 from time import sleep
 
-from PyQt5.QtCore import QThread, QMutex
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from lib import jobs
+from lib.config import getContext
 
 
 class WaitforClick(QThread):
@@ -47,19 +54,70 @@ class WaitforClick(QThread):
                 break
 
 
-class Evaluate(QThread):
-    """Thread used to insolate calculation process in entities (stream, project
-    and equipment, so gui can response while calculation is in process"""
+_service = None
+
+
+def service():
+    """Return the calculation service of graphical interface, created at
+    first use
+
+    The worker processes are started with spawn in all platforms, a fork of
+    the graphical interface would copy a process with running threads. The
+    spawned workers import the main module of program, and cheprocess starts
+    the graphical interface at import, so the jobs module is defined as main
+    module, as in the batch mode"""
+    global _service
+    if _service is None:
+        sys.modules["__main__"] = jobs
+        _service = jobs.JobQueue(context=multiprocessing.get_context("spawn"))
+    return _service
+
+
+class Evaluate(QObject):
+    """Calculation of entities (stream, project and equipment) as jobs of the
+    calculation service, so gui can response while calculation is in
+    process. A new calculation of the entity supersedes the calculation in
+    progress, and the entity is updated with the result before emit the
+    finished signal"""
+    finished = pyqtSignal()
+    _done = pyqtSignal(object)
+
     def __init__(self, parent=None):
         super(Evaluate, self).__init__(parent)
-        self.mutex = QMutex()
+        self.job = None
+        self.entity = None
+        # The job callback runs in a thread of service, the signal send the
+        # job to the gui thread
+        self._done.connect(self._finish)
 
-    def start(self, entity, kwargs):
+    def start(self, entity, kwargs, priority=0):
         self.entity = entity
-        self.kwargs = kwargs
-        QThread.start(self)
-
-    def run(self):
-        self.mutex.lock()
-        self.entity(**self.kwargs)
-        self.mutex.unlock()
+        self.job = service().submit(
+            jobs.calculate, getContext(), entity, kwargs, priority=priority,
+            key=id(entity), kind=entity.__class__.__name__,
+            callback=self._done.emit)
+
+    def isRunning(self):
+        return self.job is not None and not self.job.done()
+
+    def cancel(self):
+        if self.job is not None:
+            self.job.cancel()
+
+    def _finish(self, job):
+        # The job events aren't shown, the channel is emptied to not fill it
+        service().events()
+        if job is not self.job:
+            # Superseded calculation
+            return
+        self.job = None
+        if job.cancelled():
+            return
+        error = job.exception()
+        if error is not None:
+            logging.error("Calculation of %s failed: %s" % (
+                self.entity.__class__.__name__, error))
+        else:
+            # Update the entity instance, it can be referenced elsewhere
+            self.entity.__dict__.update(job.result().__dict__)
+        self.finished.emit()
@@ -94,17 +94,16 @@ The list of supported unit are:
 '''
 
 
-from configparser import ConfigParser
 import json
 import logging
 import os
 import time
 
-from PyQt5.QtWidgets import QApplication
-from PyQt5 import QtCore
+from numpy import asarray, ndarray, ndim
 import scipy.constants as k
 
-from lib.config import conf_dir, getMainWindowConfig
+from lib.config import conf_dir, getContext, loadPreferences
+from lib.kernel import QApplication, systemLocale
 from lib.utilities import representacion
 from tools.firstrun import getrates
 
@@ -175,7 +174,46 @@ def K2Re(K):
     return (K - 273.15) / 1.25
 
 
-class unidad(float):
+def _debug(obj):
+    """Log the creation of unit instances, only with debug level enabled to
+    avoid the string formatting cost"""
+    if logging.root.isEnabledFor(logging.DEBUG):
+        logging.debug("%s, %f" % (obj.__class__.__name__, obj))
+
+
+class _Conversion(object):
+    """Descriptor of a unit conversion, the value is calculated on access
+    from the base value with the conversion rate or a conversion function
+    for non proportional units"""
+    __slots__ = ("rate", "func")
+
+    def __init__(self, rate=1, func=None):
+        self.rate = rate
+        self.func = func
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        if self.func is None:
+            return float(obj) / self.rate
+        return self.func(float(obj))
+
+
+class _UnitType(type):
+    """Metaclass of unit classes, it define the conversion descriptors of
+    each unit in rates and _conversions, and empty __slots__ so the instances
+    don't have a attribute dict"""
+    def __new__(mcs, name, bases, namespace):
+        namespace.setdefault("__slots__", ())
+        for key, rate in namespace.get("rates", {}).items():
+            if key not in namespace:
+                namespace[key] = _Conversion(rate)
+        for key, func in namespace.get("_conversions", {}).items():
+            namespace[key] = _Conversion(func=func)
+        return type.__new__(mcs, name, bases, namespace)
+
+
+class unidad(float, metaclass=_UnitType):
     """
     Generic class to model units.
 
@@ -189,14 +227,18 @@ class unidad(float):
         is a tuple with format (Name, title)
         * __units_set__: Dict with standart unit for units system (*altsi*,
         *si*, *metric*, *cgs*, *english*)
+        * _conversions: Opcional dict with the conversion functions from
+        base unit of non proportional units
     """
     __title__ = ""
     rates = {}
+    _conversions = {}
     __text__ = []
     __units__ = []
     __tooltip__ = []
     _magnitudes = []
     __units_set__ = []
+    __slots__ = ("code", "magnitud")
 
     def __init__(self, data, unit="", magnitud=""):
         """Constructor
@@ -212,30 +254,24 @@ class unidad(float):
 
         Notes
         -----
-        Non proportional magnitudes (Temperature, Pressure) must rewrite this
-        method
+        The value is saved in base unit, the values in other units are
+        calculated on access. Non proportional magnitudes (Temperature,
+        Pressure) must define its conversions as properties
         """
         if not magnitud:
             magnitud = self.__class__.__name__
         self.magnitud = magnitud
 
         if data is None:
-            self._data = 0
             self.code = "n/a"
         else:
-            self._data = float(data)
             self.code = ""
+        _debug(self)
 
-        if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = self.__units__[Config.getint('Units', magnitud)]
-        elif not unit:
-            unit = self.__units__[0]
-        self._data = self._getBaseValue(data, unit, magnitud)
-        for key in self.__class__.rates:
-            self.__setattr__(key, self._data / self.__class__.rates[key])
-
-        logging.debug("%s, %f" % (self.__class__.__name__, self._data))
+    @property
+    def _data(self):
+        """Value in base unit"""
+        return float(self)
 
     def __new__(cls, data, unit="", magnitud=""):
         """Constructor to let multiple paramter input in float"""
@@ -248,16 +284,33 @@ class unidad(float):
 
         return float.__new__(cls, data)
 
+    @classmethod
+    def array(cls, data, unit="", magnitud=""):
+        """Return a :class:`unidadArray` of this unit with the data values
+
+        Parameters
+        ----------
+        data : array_like
+            Values of array
+        unit : str
+            String with unit of data values input
+        magnitud : str, optional
+            Name of magnitud (i.e. PipeDiameter or Head for length unit)
+        """
+        return unidadArray(data, cls, unit, magnitud)
+
     @classmethod
     def _getBaseValue(cls, data, unit, magnitud):
         """Convert input data to the base unit"""
         if data is None:
             data = 0
+        elif ndim(data):
+            data = asarray(data, dtype=float)
         else:
             data = float(data)
 
         if unit == "conf":
-            Config = getMainWindowConfig()
+            Config = getContext()
             unit = cls.__units__[Config.getint('Units', magnitud)]
         elif not unit:
             unit = cls.__units__[0]
@@ -283,7 +336,7 @@ class unidad(float):
         """Using config file return the value in the configurated unit"""
         if not magnitud:
             magnitud = self.__class__.__name__
-        Config = getMainWindowConfig()
+        Config = getContext()
         value = Config.getint('Units', magnitud)
         return self.__getattribute__(self.__units__[value])
 
@@ -292,7 +345,7 @@ class unidad(float):
         """Using config file return the configurated unit text"""
         if not magnitud:
             magnitud = cls.__name__
-        Config = getMainWindowConfig()
+        Config = getContext()
         return cls.__text__[Config.getint("Units", magnitud)]
 
     @classmethod
@@ -300,7 +353,7 @@ class unidad(float):
         """Return the configurated unit name for getattribute call"""
         if not magnitud:
             magnitud = cls.__name__
-        Config = getMainWindowConfig()
+        Config = getContext()
         return cls.__units__[Config.getint("Units", magnitud)]
 
     @classmethod
@@ -318,8 +371,7 @@ class unidad(float):
             magnitud = self.__class__.__name__
         if not unit:
             unit = self.func(magnitud)
-        Preferences = ConfigParser()
-        Preferences.read(conf_dir+"CheProcessrc")
+        Preferences = loadPreferences()
         kwargs = eval(Preferences.get("NumericFormat", magnitud))
         value = self.__getattribute__(unit)
         return representacion(value, **kwargs)
@@ -346,17 +398,19 @@ with support for class unidad operations: txt, config. func."""
     __text__ = []
     _magnitudes = []
 
-    def __init__(self, data, txt=""):
+    __slots__ = ("txt", "code")
 
+    def __init__(self, data, txt=""):
         self.txt = txt
-
         if data is None:
-            self._data = 0
             self.code = "n/a"
         else:
-            self._data = data
             self.code = ""
-        logging.debug("%s, %f" % (self.__class__.__name__, self._data))
+        _debug(self)
+
+    @property
+    def _data(self):
+        return float(self)
 
     def __new__(cls, data, txt=""):
         """Discard superfluous parameters for this class"""
@@ -364,6 +418,11 @@ with support for class unidad operations: txt, config. func."""
             data = 0
         return float.__new__(cls, data)
 
+    @classmethod
+    def array(cls, data, unit="", magnitud=""):
+        """Return a :class:`unidadArray` of dimensionless values"""
+        return unidadArray(data, cls)
+
     @classmethod
     def text(cls):
         return ""
@@ -377,8 +436,7 @@ with support for class unidad operations: txt, config. func."""
 
     def format(self, unit):
         """Using config file return the unit value in desired numeric format"""
-        Preferences = ConfigParser()
-        Preferences.read(conf_dir+"CheProcessrc")
+        Preferences = loadPreferences()
         kwargs = eval(Preferences.get("NumericFormat", "Dimensionless"))
         return representacion(self, **kwargs)
 
@@ -390,6 +448,156 @@ with support for class unidad operations: txt, config. func."""
         return num
 
 
+class unidadArray(ndarray):
+    """
+    Array of values of a unit class, saved in base unit as float64 data, so
+    the vectorized calculations can return unit aware results without a
+    python object for each value. It's created with the array classmethod of
+    unit classes.
+
+    The values in any unit of magnitud are calculated on access as arrays,
+    the items are the scalar unit instances and the slices are arrays of the
+    same unit. The arithmetic operations return plain arrays, except the
+    addition and substraction that keep the unit like the scalar units
+
+    Examples
+    --------
+    >>> P = Pressure.array([1, 2, 5], "atm")
+    >>> P.bar
+    array([1.01325, 2.0265 , 5.06625])
+    >>> P[1].atm, P[1:].kPa
+    (2.0, array([202.65 , 506.625]))
+    >>> "%0.2f" % P.max().psi
+    '73.48'
+    >>> T = Temperature.array([0, 100], "C")
+    >>> (T+10).C
+    array([ 10., 110.])
+    >>> (T/T[0]).__class__.__name__
+    'ndarray'
+    """
+
+    # ufunc with result with the same unit
+    _keep = ("add", "subtract", "maximum", "minimum", "fmax", "fmin",
+             "negative", "positive", "absolute")
+
+    def __new__(cls, data, kind, unit="", magnitud=""):
+        if not magnitud:
+            magnitud = kind.__name__
+        data = asarray(data, dtype=float)
+        if unit:
+            data = kind._getBaseValue(data, unit, magnitud)
+        obj = asarray(data, dtype=float).view(cls)
+        obj.kind = kind
+        obj.magnitud = magnitud
+        return obj
+
+    def __array_finalize__(self, obj):
+        self.kind = getattr(obj, "kind", None)
+        self.magnitud = getattr(obj, "magnitud", "")
+
+    def __reduce__(self):
+        state = ndarray.__reduce__(self)
+        return state[0], state[1], (state[2], self.kind, self.magnitud)
+
+    def __setstate__(self, state):
+        ndarray.__setstate__(self, state[0])
+        self.kind = state[1]
+        self.magnitud = state[2]
+
+    def __getattr__(self, name):
+        # Values in other units
+        kind = self.__dict__.get("kind")
+        if kind is None or name.startswith("_"):
+            raise AttributeError(name)
+        values = self.view(ndarray)
+        conversions = getattr(kind, "_conversions", {})
+        rates = getattr(kind, "rates", {})
+        if name in conversions:
+            return conversions[name](values)
+        elif name in rates:
+            return values / rates[name]
+        raise AttributeError(name)
+
+    def __getitem__(self, index):
+        value = ndarray.__getitem__(self, index)
+        if isinstance(value, ndarray):
+            return value
+        return self._item(value)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        args = []
+        for value in inputs:
+            if isinstance(value, unidadArray):
+                value = value.view(ndarray)
+            args.append(value)
+        out = kwargs.get("out")
+        if out:
+            kwargs["out"] = tuple(
+                o.view(ndarray) if isinstance(o, unidadArray) else o
+                for o in out)
+
+        result = getattr(ufunc, method)(*args, **kwargs)
+        if out:
+            return out[0] if len(out) == 1 else out
+        if ufunc.__name__ not in self._keep or method == "at":
+            return result
+        if ndim(result) == 0:
+            return self._item(result)
+        return self.__class__(result, self.kind, magnitud=self.magnitud)
+
+    def _item(self, value):
+        """Return a scalar value as unit instance"""
+        if self.kind is None:
+            return value
+        if issubclass(self.kind, unidad):
+            return self.kind(value, magnitud=self.magnitud)
+        return self.kind(value)
+
+    def config(self, magnitud=""):
+        """Using config file return the values in the configurated unit"""
+        if not magnitud:
+            magnitud = self.magnitud
+        if not issubclass(self.kind, unidad):
+            return self.view(ndarray)
+        return getattr(self, self.kind.func(magnitud))
+
+    def text(self, magnitud=""):
+        """Using config file return the configurated unit text"""
+        if not issubclass(self.kind, unidad):
+            return ""
+        return self.kind.text(magnitud or self.magnitud)
+
+    def func(self, magnitud=""):
+        """Return the configurated unit name for getattribute call"""
+        if not issubclass(self.kind, unidad):
+            return ""
+        return self.kind.func(magnitud or self.magnitud)
+
+    def format(self, unit="", magnitud=""):
+        """Using config file return the list of values in desired numeric
+        format"""
+        if not magnitud:
+            magnitud = self.magnitud
+        if not issubclass(self.kind, unidad):
+            magnitud = "Dimensionless"
+            values = self.view(ndarray)
+        else:
+            if not unit:
+                unit = self.kind.func(magnitud)
+            values = getattr(self, unit)
+        Preferences = loadPreferences()
+        kwargs = eval(Preferences.get("NumericFormat", magnitud))
+        return [representacion(value, **kwargs) for value in values.flat]
+
+    @property
+    def str(self):
+        """Return the list of string representation of values"""
+        txt = self.text()
+        if txt:
+            return [num+" "+txt for num in self.format()]
+        return self.format()
+
+
 class Temperature(unidad):
     __title__ = QApplication.translate("pychemqt", "Temperature")
     __text__ = ['K', 'ºC', 'ºR', 'ºF', 'ºRe']
@@ -400,43 +608,8 @@ class Temperature(unidad):
     __test__ = [{"input": {"value": 25, "unit": "C"},
                  "prop": {"K": 298.15, "C": 25, "F": 77}}]
 
-    def __init__(self, data, unit="K", magnitud=""):
-
-        if not magnitud:
-            magnitud = self.__class__.__name__
-        self.magnitud = magnitud
-
-        if data is None:
-            data = 0
-            self.code = "n/a"
-        else:
-            data = float(data)
-            self.code = ""
-
-        if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = self.__units__[Config.getint('Units', magnitud)]
-
-        if unit == "K":
-            self._data = data
-        elif unit == "C":
-            self._data = C2K(data)
-        elif unit == "F":
-            self._data = F2K(data)
-        elif unit == "R":
-            self._data = R2K(data)
-        elif unit == "Re":
-            self._data = Re2K(data)
-        else:
-            raise ValueError(
-                QApplication.translate("pychemqt", "Wrong input code"))
-
-        self.K = self._data
-        self.C = K2C(self._data)
-        self.F = K2F(self._data)
-        self.R = K2R(self._data)
-        self.Re = K2Re(self._data)
-        logging.debug("%s, %f" % (self.__class__.__name__, self._data))
+    _conversions = {"K": lambda K: K, "C": K2C, "F": K2F, "R": K2R,
+                    "Re": K2Re}
 
     @classmethod
     def _getBaseValue(cls, data, unit, magnitud):
@@ -446,7 +619,7 @@ class Temperature(unidad):
             magnitud = cls.__name__
 
         if unit == "conf":
-            Config = getMainWindowConfig()
+            Config = getContext()
             unit = cls.__units__[Config.getint('Units', magnitud)]
         elif not unit:
             unit = "K"
@@ -1027,38 +1200,9 @@ class Pressure(unidad):
                  "prop": {"bar": 1.01325, "atm": 1, "psi": 14.6959487755,
                           "kgcm2g": 0}}]
 
-    def __init__(self, data, unit="Pa", magnitud=""):
-
-        if data is None:
-            data = 0
-            self.code = "n/a"
-        else:
-            self.code = ""
-
-        if not magnitud:
-            magnitud = self.__class__.__name__
-        self.magnitud = magnitud
-
-        if unit == "conf":
-            Config = getMainWindowConfig()
-            unit = self.__units__[Config.getint('Units', magnitud)]
-
-        if unit == "barg":
-            self._data = data*k.bar+k.atm
-        elif unit == "psig":
-            self._data = data*k.psi+k.atm
-        elif unit == "kgcm2g":
-            self._data = data*k.g/k.centi**2+k.atm
-        else:
-            self._data = data * self.__class__.rates[unit]
-
-        for key in self.__class__.rates:
-            self.__setattr__(key, self._data/self.__class__.rates[key])
-
-        self.barg = (self.Pa-k.atm)/k.bar
-        self.psig = (self.Pa-k.atm)/k.psi
-        self.kgcm2g = (self.Pa-k.atm)*k.centi**2/k.g
-        logging.debug("%s, %f" % (self.__class__.__name__, self._data))
+    _conversions = {"barg": lambda Pa: (Pa-k.atm)/k.bar,
+                    "psig": lambda Pa: (Pa-k.atm)/k.psi,
+                    "kgcm2g": lambda Pa: (Pa-k.atm)*k.centi**2/k.g}
 
     @classmethod
     def _getBaseValue(cls, data, unit, magnitud):
@@ -1068,7 +1212,7 @@ class Pressure(unidad):
             magnitud = cls.__name__
 
         if unit == "conf":
-            Config = getMainWindowConfig()
+            Config = getContext()
             unit = cls.__units__[Config.getint('Units', magnitud)]
         elif not unit:
             unit = "Pa"
@@ -2011,6 +2155,10 @@ class Currency(unidad):
     >>> S=Currency(5, "eur")
     """
     filename = conf_dir+"moneda.dat"
+    if not os.path.isfile(filename):
+        # Without user configuration, as in headless use, use the archived
+        # currency rates of pychemqt distribution
+        filename = os.path.join(os.environ["CheProcess"], "dat", "moneda.dat")
     try:
         archivo = open(filename, "r")
         rates = json.load(archivo)
@@ -2233,7 +2381,7 @@ class Currency(unidad):
 
 if os.environ["icu"] == "True":
     import icu
-    locale = QtCore.QLocale.system().name()
+    locale = systemLocale()
 
     subclasses = unidad.__subclasses__()
     names = [unit.__title__ for unit in subclasses]
@@ -32,7 +32,8 @@ import os
 import random
 
 from scipy import exp
-from PyQt5.QtWidgets import QApplication
+
+from lib.kernel import QApplication
 
 
 def format2txt(formato):
@@ -31,6 +31,7 @@ setup(
                   },
     exclude_package_data={'docs': ['*.mEoS.*.rst', "*_ref.rst"]},
 
+    python_requires=">=3.8",
     install_requires=['scipy>=0.14',
                       'numpy>=1.8',
                       'matplotlib>=1.4',
@@ -40,7 +41,8 @@ setup(
         'openbabel':  ["openbabel>=2.4.1"],
         'spreadsheet':  ["openpyxl>=2.3.0", "xlwt>=1.2.0", "ezodf>=0.3.2"],
         'icu': ["PyICU>=2.1"],
-        'reportlab': ["reportlab>=3.5.8"]},
+        'reportlab': ["reportlab>=3.5.8"],
+        'parquet': ["pyarrow>=1.0"]},
 
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -21,6 +21,7 @@ os.environ["openpyxl"] = "False"
 os.environ["xlwt"] = "False"
 os.environ["icu"] = "False"
 os.environ["reportlab"] = "False"
+os.environ["pyarrow"] = "False"
 os.environ["PyQt5.Qsci"] = "False"
 
 
@@ -26,7 +26,7 @@ import os
 
 from PyQt5 import QtGui, QtWidgets
 
-from lib import sql
+from lib import sql, databankMatrix
 from UI import viewComponents
 
 
@@ -100,47 +100,34 @@ class UI_databank_widget(QtWidgets.QWidget):
 
     def rellenar(self):
         """Fill in list with component from database"""
-        self.BaseDatos.setRowCount(0)
-        sql.databank.execute("select * from compuestos")
-        for i in sql.databank:
-            self.BaseDatos.setRowCount(self.BaseDatos.rowCount()+1)
-            self.BaseDatos.setItem(
-                i[0]-1, 0, QtWidgets.QTableWidgetItem(str(i[0])))
-            self.BaseDatos.setItem(i[0]-1, 1, QtWidgets.QTableWidgetItem(i[2]))
-            self.BaseDatos.setItem(i[0]-1, 2, QtWidgets.QTableWidgetItem(i[1]))
-            self.BaseDatos.setRowHeight(self.BaseDatos.rowCount()-1, 20)
-
-        sql.databank_Custom.execute("select * from compuestos")
-        for i in sql.databank_Custom:
-            filas = self.BaseDatos.rowCount()
-            self.BaseDatos.setRowCount(filas+1)
-            self.BaseDatos.setItem(
-                filas, 0, QtWidgets.QTableWidgetItem(str(i[0])))
-            self.BaseDatos.setItem(filas, 1, QtWidgets.QTableWidgetItem(i[2]))
-            self.BaseDatos.setItem(filas, 2, QtWidgets.QTableWidgetItem(i[1]))
-            self.BaseDatos.setRowHeight(self.BaseDatos.rowCount()-1, 20)
+        data = databankMatrix.matrix()
+        self.BaseDatos.setRowCount(len(data))
+        for i, (id, name, formula) in enumerate(
+                zip(data["id"], data["name"], data["formula"])):
+            self.BaseDatos.setItem(i, 0, QtWidgets.QTableWidgetItem(str(id)))
+            self.BaseDatos.setItem(i, 1, QtWidgets.QTableWidgetItem(name))
+            self.BaseDatos.setItem(i, 2, QtWidgets.QTableWidgetItem(formula))
+            self.BaseDatos.setRowHeight(i, 20)
 
         self.BaseDatos.resizeColumnsToContents()
 
     def buscar(self):
         """Search str at database"""
         self.indice = 0
-        texto = "%"+self.Busqueda.text()+"%"
-        query = "select * from compuestos where "
-        query += "name LIKE '%s' or formula LIKE '%s'" % (texto, texto)
-        sql.databank.execute(query)
-        self.correctos = []
-        for i in sql.databank:
-            self.correctos.append(i[0])
-        self.BaseDatos.setCurrentCell(self.correctos[self.indice]-1, 0)
+        ids = databankMatrix.search(self.Busqueda.text())
+        self.correctos = list(databankMatrix.index(ids))
+        if self.correctos:
+            self.BaseDatos.setCurrentCell(self.correctos[self.indice], 0)
 
     def Next(self):
         """Show next coincidence with search string"""
+        if not self.correctos:
+            return
         if self.indice < len(self.correctos)-1:
             self.indice += 1
         else:
             self.indice = 0
-        self.BaseDatos.setCurrentCell(self.correctos[self.indice]-1, 0)
+        self.BaseDatos.setCurrentCell(self.correctos[self.indice], 0)
 
     def checkButton(self, indice):
         """Edit action are only available in custom database elements"""
@@ -32,20 +32,7 @@ from PyQt5 import QtCore, QtWidgets
 
 from UI.widgets import Entrada_con_unidades
 from lib import config
-
-indiceBase = ["Jan-1982", 313.95, 336.19, 326.01, 312.03, 383.18, 297.63,
-              421.1, 235.42, 338.2, 263.92, 290.13, 303.26]
-
-# Load data from config file
-indiceActual = []
-with open(config.conf_dir+"CostIndex.dat", "r") as archivo:
-    indiceActual.append(archivo.readline()[:-1])
-    while True:
-        data = archivo.readline().rstrip("\n")
-        if data:
-            indiceActual.append(float(data))
-            if len(indiceActual) == 13:
-                break
+from lib.config import indiceBase, indiceActual
 
 
 class Ui_CostIndex(QtWidgets.QDialog):